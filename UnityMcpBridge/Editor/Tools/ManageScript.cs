@@ -147,6 +147,11 @@ namespace MCPForUnity.Editor.Tools
             {
                 return Response.Error("Action parameter is required.");
             }
+            // Batched writes send refresh='none' per file, then one 'refresh' for all paths
+            if (action == "refresh")
+            {
+                return RefreshScripts(@params["paths"] as JArray);
+            }
             if (string.IsNullOrEmpty(name))
             {
                 return Response.Error("Name parameter is required.");
@@ -504,6 +509,36 @@ namespace MCPForUnity.Editor.Tools
         /// </summary>
         private const int MaxEditPayloadBytes = 64 * 1024;
 
+        /// <summary>
+        /// Imports the given scripts in one asset-editing pass and requests a single compilation.
+        /// </summary>
+        private static object RefreshScripts(JArray paths)
+        {
+            if (paths == null || paths.Count == 0)
+                return Response.Error("refresh requires a non-empty 'paths' array.");
+
+            var imported = new List<string>();
+            AssetDatabase.StartAssetEditing();
+            try
+            {
+                foreach (var token in paths)
+                {
+                    var sp = ManageScriptRefreshHelpers.SanitizeAssetsPath(token?.ToString());
+                    if (string.IsNullOrEmpty(sp) || sp.Contains("..")) continue;
+                    AssetDatabase.ImportAsset(sp, ImportAssetOptions.ForceUpdate | ImportAssetOptions.ForceSynchronousImport);
+                    imported.Add(sp);
+                }
+            }
+            finally
+            {
+                AssetDatabase.StopAssetEditing();
+            }
+#if UNITY_EDITOR
+            UnityEditor.Compilation.CompilationPipeline.RequestScriptCompilation();
+#endif
+            return Response.Success($"Refreshed {imported.Count} script(s).", new { imported });
+        }
+
         private static object ApplyTextEdits(
             string fullPath,
             string relativePath,
@@ -782,10 +817,14 @@ namespace MCPForUnity.Editor.Tools
                     try { if (File.Exists(backup)) File.Delete(backup); } catch { }
                 }
 
-                // Respect refresh mode: immediate vs debounced
+                // Respect refresh mode: immediate vs debounced; 'none' leaves it to a later 'refresh' action
                 var immediate = string.Equals(refreshModeFromCaller, "immediate", StringComparison.OrdinalIgnoreCase) ||
                                   string.Equals(refreshModeFromCaller, "sync", StringComparison.OrdinalIgnoreCase);
-                if (immediate)
+                if (string.Equals(refreshModeFromCaller, "none", StringComparison.OrdinalIgnoreCase))
+                {
+                    McpLog.Info($"[ManageScript] ApplyTextEdits: refresh deferred by caller for '{relativePath}'");
+                }
+                else if (immediate)
                 {
                     McpLog.Info($"[ManageScript] ApplyTextEdits: immediate refresh for '{relativePath}'");
                     AssetDatabase.ImportAsset(
@@ -0,0 +1,389 @@
+"""
+GUID and dependency graph of the project's assets, read from disk.
+
+Unity gives every asset a GUID in its .meta file and serializes references
+between assets as {fileID: ..., guid: <32 hex>, type: ...}. This index
+reads both without the editor: each .meta contributes its asset's GUID
+(the top-level "guid:" line) plus any references in importer settings,
+and each text-serialized YAML asset (asset_graph_suffixes: .unity,
+.prefab, .mat, .asset, controllers, ...) contributes the GUIDs it
+references. From those it keeps a forward graph (asset -> GUIDs it uses)
+and a reverse graph (GUID -> assets that use it), so "what references this
+material?" is a dict lookup instead of AssetDatabase round trips on the
+editor's main thread.
+
+Binary-serialized assets (a NUL byte in the first _SNIFF_BYTES) are
+skipped. Like the trigram index, the file list comes from project_index
+and a file is re-scanned only when its (mtime, size) changed (or, when it
+was scanned within index_support.RACY_WINDOW_NS of its mtime, on every
+re-stat until a scan lands outside that window); at most every asset_graph_poll_s a query
+re-stats the indexed files. Large scans
+run in project_search's process pool. The graph is saved gzip-compressed
+under asset_graph_dir (default <project>/Library/UnityMcp) and reloaded on
+the next start; like the trigram index, saves are debounced onto a timer
+thread (asset_graph_save_delay_s) instead of running on the query path.
+
+Callers that only need the paths of a few GUIDs (read_hierarchy labelling
+script and prefab references) use resolve_guids, which answers from the
+graph when one has been built and otherwise reads the heads of .meta files
+until every requested GUID is found, remembering what it read by the
+.meta file's own (mtime, size) (re-read while racy).
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from config import config
+from index_support import DebouncedSaver, Registry, is_racy
+import project_index
+import project_search
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+_FORMAT = 1
+_SNIFF_BYTES = 8192
+_CHUNK_FILES = 64
+_OWN_GUID = re.compile(rb"^guid: ?([0-9a-fA-F]{32})", re.MULTILINE)
+_GUID_REF = re.compile(rb"guid: ?([0-9a-fA-F]{32})")
+
+# path -> (mtime_ns, size, own guid for .meta files, referenced guids)
+_Entry = Tuple[int, int, Optional[str], Tuple[str, ...]]
+
+
+def scan_bytes(raw: bytes, is_meta: bool) -> Tuple[Optional[str], Tuple[str, ...]]:
+    """(own GUID for a .meta, sorted distinct GUIDs referenced) of one file's bytes."""
+    own = None
+    if is_meta:
+        m = _OWN_GUID.search(raw)
+        own = m.group(1).decode("ascii").lower() if m else None
+    refs = {g.decode("ascii").lower() for g in _GUID_REF.findall(raw)}
+    refs.discard(own)
+    return own, tuple(sorted(refs))
+
+
+def _scan_chunk(root: str, paths: Sequence[Tuple[str, int, int]]) -> List[Tuple[str, _Entry]]:
+    out = []
+    for rel, mtime_ns, size in paths:
+        try:
+            with open(os.path.join(root, rel), "rb") as f:
+                head = f.read(_SNIFF_BYTES)
+                raw = b"" if b"\x00" in head else head + f.read()
+        except OSError:
+            continue
+        own, refs = scan_bytes(raw, rel.endswith(".meta"))
+        out.append((rel, (mtime_ns, size, own, refs)))
+    return out
+
+
+class AssetGraph:
+    """GUIDs and references for one project's Assets/ tree."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.files: Dict[str, _Entry] = {}
+        self.guids: Dict[str, str] = {}  # guid -> asset path
+        self.users: Dict[str, Set[str]] = {}  # guid -> paths referencing it
+        self.racy: Set[str] = set()  # scanned too soon after their mtime to trust (mtime, size)
+        self._checked: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stats = {"scanned": 0, "queries": 0}
+
+    # -- maintenance -------------------------------------------------------
+
+    @staticmethod
+    def _asset_of(rel: str) -> str:
+        return rel[:-5] if rel.endswith(".meta") else rel
+
+    def _remove(self, rel: str) -> None:
+        _, _, own, refs = self.files.pop(rel)
+        self.racy.discard(rel)
+        if own and self.guids.get(own) == self._asset_of(rel):
+            del self.guids[own]
+        asset = self._asset_of(rel)
+        for guid in refs:
+            users = self.users.get(guid)
+            if users is not None:
+                if not any(guid in self.files.get(r, (0, 0, None, ()))[3] for r in (asset, asset + ".meta")):
+                    users.discard(asset)
+                if not users:
+                    del self.users[guid]
+
+    def _add(self, rel: str, entry: _Entry) -> None:
+        self.files[rel] = entry
+        if is_racy(entry[0]):
+            self.racy.add(rel)
+        asset = self._asset_of(rel)
+        if entry[2]:
+            self.guids[entry[2]] = asset
+        for guid in entry[3]:
+            self.users.setdefault(guid, set()).add(asset)
+        self.stats["scanned"] += 1
+
+    def _scan(self, stale: List[Tuple[str, int, int]]):
+        chunks = [stale[i:i + _CHUNK_FILES] for i in range(0, len(stale), _CHUNK_FILES)]
+        pool = project_search.get_pool() if len(stale) >= int(getattr(config, "search_parallel_min_files", 256)) else None
+        if pool is not None:
+            try:
+                for result in pool.map(_scan_chunk, [str(self.root)] * len(chunks), chunks):
+                    yield from result
+                return
+            except Exception as e:  # broken pool: finish in-process
+                logger.debug(f"Asset graph scanning in-process: {e}")
+        for chunk in chunks:
+            yield from _scan_chunk(str(self.root), chunk)
+
+    def refresh(self, force: bool = False) -> None:
+        suffixes = {s.lower() for s in getattr(config, "asset_graph_suffixes", ())} | {".meta"}
+        listed = [e for e in project_index.get_index(self.root).files() if e["suffix"] in suffixes]
+        with self._lock:
+            now = time.monotonic()
+            poll_s = float(getattr(config, "asset_graph_poll_s", 2.0))
+            restat = force or self._checked is None or now - self._checked >= poll_s
+            seen = set()
+            stale: List[Tuple[str, int, int]] = []
+            for entry in listed:
+                rel = entry["path"]
+                seen.add(rel)
+                known = self.files.get(rel)
+                if known is not None and not restat:
+                    continue
+                mtime_ns, size = entry["mtime_ns"], entry["size"]
+                if restat:
+                    try:
+                        st = os.stat(self.root / rel)
+                        mtime_ns, size = st.st_mtime_ns, st.st_size
+                    except OSError:
+                        continue
+                if known is None or (known[0], known[1]) != (mtime_ns, size) or rel in self.racy:
+                    stale.append((rel, mtime_ns, size))
+            changed = bool(stale)
+            for rel in [r for r in self.files if r not in seen]:
+                self._remove(rel)
+                changed = True
+            for rel, entry in self._scan(stale):
+                if rel in self.files:
+                    self._remove(rel)
+                self._add(rel, entry)
+            if restat:
+                self._checked = time.monotonic()
+        if changed:
+            _saver.schedule(self)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked = None
+
+    # -- queries -----------------------------------------------------------
+
+    def _guid_of(self, asset: str) -> Optional[str]:
+        entry = self.files.get(asset + ".meta")
+        return entry[2] if entry else None
+
+    def guid_of(self, asset: str) -> Optional[str]:
+        """GUID from the asset's .meta file."""
+        self.refresh()
+        with self._lock:
+            return self._guid_of(asset)
+
+    def path_of(self, guid: str) -> Optional[str]:
+        """Asset path whose .meta declares guid."""
+        self.refresh()
+        with self._lock:
+            return self.guids.get(guid.lower())
+
+    def paths_of(self, guids) -> Dict[str, str]:
+        """Asset paths for the known GUIDs among guids, with a single refresh."""
+        self.refresh()
+        with self._lock:
+            return {g: self.guids[g.lower()] for g in guids if g and g.lower() in self.guids}
+
+    def dependencies(self, asset: str, recursive: bool = False, limit: int = 1000) -> List[Dict[str, Any]]:
+        """GUIDs asset references (including through its .meta), with their paths when known."""
+        self.refresh()
+        with self._lock:
+            self.stats["queries"] += 1
+            out: List[Dict[str, Any]] = []
+            seen = {self._guid_of(asset)}
+            queue = [asset]
+            while queue and len(out) < limit:
+                current = queue.pop(0)
+                refs = set()
+                for rel in (current, current + ".meta"):
+                    refs.update(self.files.get(rel, (0, 0, None, ()))[3])
+                for guid in sorted(refs):
+                    if guid in seen:
+                        continue
+                    seen.add(guid)
+                    path = self.guids.get(guid)
+                    out.append({"guid": guid, "path": path, "via": current})
+                    if recursive and path:
+                        queue.append(path)
+                    if len(out) >= limit:
+                        break
+            return out
+
+    def references(self, guid: str, recursive: bool = False, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Assets that reference guid (and, recursively, assets that reference those)."""
+        self.refresh()
+        with self._lock:
+            self.stats["queries"] += 1
+            out: List[Dict[str, Any]] = []
+            seen: Set[str] = set()
+            queue = [guid.lower()]
+            while queue and len(out) < limit:
+                current = queue.pop(0)
+                for path in sorted(self.users.get(current, ())):
+                    if path in seen:
+                        continue
+                    seen.add(path)
+                    own = self._guid_of(path)
+                    out.append({"path": path, "guid": own, "via": current})
+                    if recursive and own:
+                        queue.append(own)
+                    if len(out) >= limit:
+                        break
+            return out
+
+    # -- persistence -------------------------------------------------------
+
+    def to_json(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"format": _FORMAT, "root": str(self.root),
+                    "files": {rel: [e[0], e[1], e[2], list(e[3])] for rel, e in self.files.items()
+                              if rel not in self.racy}}  # racy entries are rescanned after a reload
+
+    def load_json(self, blob: Dict[str, Any]) -> bool:
+        if blob.get("format") != _FORMAT or blob.get("root") != str(self.root):
+            return False
+        with self._lock:
+            self.files, self.guids, self.users, self.racy = {}, {}, {}, set()
+            for rel, v in blob.get("files", {}).items():
+                self._add(rel, (int(v[0]), int(v[1]), v[2], tuple(v[3])))
+            self.stats["scanned"] = 0
+            self._checked = None
+        return True
+
+
+def _graph_file(root: Path) -> Path:
+    base = getattr(config, "asset_graph_dir", None)
+    if base:
+        import hashlib
+        digest = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:16]
+        return Path(base).expanduser() / f"asset-graph-{digest}.json.gz"
+    return root / "Library" / "UnityMcp" / "asset-graph.json.gz"
+
+
+def _save(graph: AssetGraph) -> None:
+    target = _graph_file(graph.root)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(gzip.compress(json.dumps(graph.to_json(), separators=(",", ":")).encode("utf-8"), 6))
+        os.replace(tmp, target)
+    except OSError as e:
+        logger.debug(f"Could not save asset graph to {target}: {e}")
+
+
+def _load(key: str) -> AssetGraph:
+    graph = AssetGraph(Path(key))
+    target = _graph_file(graph.root)
+    if target.is_file():
+        try:
+            graph.load_json(json.loads(gzip.decompress(target.read_bytes()).decode("utf-8")))
+        except (OSError, ValueError, KeyError, IndexError, TypeError, EOFError) as e:
+            logger.debug(f"Ignoring unreadable asset graph {target}: {e}")
+    return graph
+
+
+_graphs: "Registry[AssetGraph]" = Registry(_load)
+_saver = DebouncedSaver(_save, "asset_graph_save_delay_s")
+
+
+def flush_saves() -> None:
+    """Write pending saves now (at exit, or before reading the saved file)."""
+    _saver.flush()
+
+
+def get_graph(root: Path) -> AssetGraph:
+    """The shared asset graph for a project root, loaded from disk when saved earlier."""
+    return _graphs.get(root)
+
+
+def invalidate(root: Optional[Path] = None) -> None:
+    """Re-stat indexed files on the next query (all graphs when root is None)."""
+    _graphs.invalidate(root)
+
+
+# root -> .meta path -> (mtime_ns, size, own guid, racy), filled by resolve_guids
+_metas: Dict[str, Dict[str, Tuple[int, int, Optional[str], bool]]] = {}
+_metas_lock = threading.Lock()
+
+
+def _meta_guid(path: Path) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            m = _OWN_GUID.search(f.read(512))
+    except OSError:
+        return None
+    return m.group(1).decode("ascii").lower() if m else None
+
+
+def resolve_guids(root: Path, guids) -> Dict[str, str]:
+    """Asset paths for the GUIDs among guids that the project declares, without building the graph.
+
+    Uses the graph if it has already been refreshed in this process; otherwise
+    stats the .meta files and reads those new or changed since the last
+    lookup (or read too close to their mtime to trust) only until every
+    requested GUID is found. Keys are lower-case GUIDs.
+    """
+    wanted = {g.lower() for g in guids if g}
+    if not wanted:
+        return {}
+    key = os.path.realpath(root)
+    loaded = _graphs.loaded(key)
+    if loaded and loaded[0]._checked is not None:
+        return loaded[0].paths_of(wanted)
+    listed = [e for e in project_index.get_index(Path(key)).files() if e["suffix"] == ".meta"]
+    found: Dict[str, str] = {}
+    with _metas_lock:
+        seen = _metas.setdefault(key, {})
+        fresh = []
+        for entry in listed:
+            rel = entry["path"]
+            try:
+                st = os.stat(os.path.join(key, rel))  # project_index's (mtime, size) can lag in-place rewrites
+            except OSError:
+                continue
+            known = seen.get(rel)
+            if known is not None and known[:2] == (st.st_mtime_ns, st.st_size) and not known[3]:
+                if known[2] in wanted:
+                    found.setdefault(known[2], rel[:-5])
+            else:
+                fresh.append((rel, st.st_mtime_ns, st.st_size))
+        for rel, mtime_ns, size in fresh:
+            if len(found) == len(wanted):
+                break
+            guid = _meta_guid(Path(key) / rel)
+            seen[rel] = (mtime_ns, size, guid, is_racy(mtime_ns))
+            if guid in wanted:
+                found.setdefault(guid, rel[:-5])
+        if len(seen) > len(listed):
+            current = {e["path"] for e in listed}
+            for rel in [r for r in seen if r not in current]:
+                del seen[rel]
+    return found
+
+
+def reset() -> None:
+    """Forget loaded graphs and drop pending saves."""
+    _saver.cancel()
+    _graphs.clear()
+    with _metas_lock:
+        _metas.clear()
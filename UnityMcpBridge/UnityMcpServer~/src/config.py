@@ -34,5 +34,75 @@ class ServerConfig:
     # 40 × 250ms ≈ 10s default window
     reload_max_retries: int = 40
 
+    # Memory tracing (tracemalloc) for large-payload calls; off by default because
+    # tracing slows allocation-heavy code. UNITY_MCP_MEMORY_TRACE=1 also enables it.
+    memory_trace_enabled: bool = False
+    memory_trace_threshold_bytes: int = 32 * 1024 * 1024  # log calls whose peak exceeds this
+    memory_trace_top_sites: int = 10  # allocation sites kept per spike
+    memory_trace_frames: int = 1  # traceback depth recorded by tracemalloc
+
+    # Bridge traffic capture (gzip NDJSON); see traffic_capture.py. UNITY_MCP_CAPTURE overrides.
+    capture_path: str | None = None
+
+    # Shared compiled-regex LRU for anchors, regex_replace and find_in_file; see regex_cache.py
+    regex_cache_size: int = 256
+    regex_guard_enabled: bool = True  # reject nested-quantifier patterns before matching
+    regex_timeout: float = 2.0  # seconds per guarded match (main thread, POSIX); 0 disables
+
+    # Serve script reads for edits from the local project when it is on disk; see script_mirror.py
+    script_mirror_enabled: bool = True
+    script_mirror_max_entries: int = 64
+    project_root_ttl_s: float = 60.0  # re-ask Unity for its project root (in the background) after this long
+
+    # Diff-based script writes (script_diff.py); past these limits the whole file is sent
+    diff_max_edits: int = 64
+    diff_max_ratio: float = 0.5  # estimated edit payload / new file size
+    diff_max_chars: int = 4 * 1024 * 1024
+
+    # Opt-in write coalescing of script text edits (options.coalesce per call); see edit_coalescer.py
+    edit_coalesce_enabled: bool = False
+    edit_coalesce_window_ms: int = 750
+
+    # Rebase stale apply_text_edits onto the current text once (script_rebase.py)
+    rebase_enabled: bool = True
+    rebase_base_texts: int = 32  # base revisions kept by sha256 in script_mirror
+
+    # In-memory Assets/ file index for list_resources; see project_index.py
+    project_index_enabled: bool = True
+    project_index_poll_s: float = 2.0  # min seconds between directory mtime checks
+    project_index_cache_path: str | None = None  # directory for a persisted index (None: memory only)
+    project_index_save_delay_s: float = 5.0  # changes are saved in the background this long after the first
+
+    # find_in_project (project_search.py)
+    search_workers: int = 0  # process pool size; 0 = min(8, CPUs), 1 = in-process only
+    search_parallel_min_files: int = 256  # smaller searches skip the pool
+    search_max_file_bytes: int = 8 * 1024 * 1024
+
+    # Trigram index narrowing find_in_project / find_in_file candidates; see trigram_index.py
+    trigram_index_enabled: bool = True
+    trigram_index_suffixes: tuple = (".cs", ".shader", ".asmdef", ".json", ".uss", ".uxml")
+    trigram_index_poll_s: float = 2.0  # min seconds between re-stats of indexed files
+    trigram_index_dir: str | None = None  # None: <project>/Library/UnityMcp
+    trigram_index_save_delay_s: float = 5.0  # changes are saved in the background this long after the first
+
+    # C# symbol index for find_symbol / list_symbols; see symbol_index.py
+    symbol_index_poll_s: float = 2.0  # min seconds between re-stats of indexed files
+    symbol_index_parallel_min_files: int = 64  # smaller (re)builds skip the process pool
+
+    # GUID / dependency graph from .meta files and YAML assets; see asset_graph.py
+    asset_graph_suffixes: tuple = (".unity", ".prefab", ".mat", ".asset", ".controller", ".overridecontroller",
+                                   ".anim", ".mask", ".playable", ".physicmaterial", ".spriteatlas", ".lighting")
+    asset_graph_poll_s: float = 2.0  # min seconds between re-stats of indexed files
+    asset_graph_dir: str | None = None  # None: <project>/Library/UnityMcp
+    asset_graph_save_delay_s: float = 5.0  # changes are saved in the background this long after the first
+
+    # Offline scene/prefab hierarchy reads for read_hierarchy; see unity_yaml.py
+    scene_tree_entries: int = 8  # parsed scene/prefab trees kept
+
+    # Windowed read_resource reads (tail_lines, start_line/line_count) via mmap; see file_window.py
+    window_read_min_bytes: int = 64 * 1024  # smaller files are read whole
+    window_line_index_entries: int = 16  # files whose line-offset index is kept
+    read_max_chunk_bytes: int = 1024 * 1024  # larger whole-file reads are paged (next_cursor); 0: never page implicitly
+
 # Create a global config instance
 config = ServerConfig() 
\ No newline at end of file
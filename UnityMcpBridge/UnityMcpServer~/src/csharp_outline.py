@@ -0,0 +1,496 @@
+"""
+Lightweight C# outline for server-side structural edits.
+
+A regex-driven lexer marks comments, string/char literals (regular, verbatim
+and interpolated) as non-code, pairs the braces that remain, and derives
+class/struct/interface/record spans and the method spans directly inside each
+type body. A positional record (or other primary-constructor type) declared
+without a body ("record Point(int X, int Y);") is a type span whose braces are
+both its terminating ';'. Results are cached by the sha256 of the contents, so repeated
+anchor lookups and edits against the same file revision reuse one scan.
+
+This is not a parser. It mirrors the balanced-scan rules Unity's
+ManageScript.cs uses (TryComputeClassSpan / TryComputeMethodSpan), with the
+difference that lookups ignore matches inside comments and strings. Callers
+fall back to Unity when resolve_method_edits raises OutlineError.
+"""
+
+import bisect
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+_CACHE_SIZE = 32
+
+# Earliest-starting token wins, so '//' inside a string and quotes inside
+# comments are handled by scan order. Interpolated strings are treated as one
+# literal (nested quotes inside interpolation holes are not supported).
+_NON_CODE_RE = re.compile(
+    r'//[^\r\n]*'
+    r'|/\*[\s\S]*?(?:\*/|\Z)'
+    r'|(?:\$@|@\$|@)"(?:[^"]|"")*(?:"|\Z)'
+    r'|\$?"(?:[^"\\\r\n]|\\.)*(?:"|$)'
+    r"|'(?:[^'\\\r\n]|\\.){0,8}(?:'|$)",
+    re.MULTILINE,
+)
+_BRACE_RE = re.compile(r"[{}]")
+_TYPE_RE = re.compile(r"\b(class|struct|interface|record|enum)\s+(?!(?:class|struct)\b)(@?[A-Za-z_]\w*)")
+_NAMESPACE_RE = re.compile(r"\bnamespace\s+([A-Za-z_][\w.]*)")
+# Members start a line or follow a '{', '}' or ';' on it (one-line type bodies)
+_METHOD_HEADER_RE = re.compile(
+    r"(?:^|(?<=[{};]))[\t ]*(?:\[[^\]\r\n]+\][\t ]*)*"
+    r"(?:(?:public|private|protected|internal|static|virtual|override|sealed|async|extern|unsafe|new|partial|readonly|abstract)\s+)*"
+    r"(?P<rtype>[^\s(){};=<>,]+(?:\s*<[^{};()]*>)?(?:\[[,\s]*\])*\??)[\t ]+"
+    r"(?P<name>@?[A-Za-z_]\w*)\s*(?:<[^>{};]+>)?\s*\(",
+    re.MULTILINE,
+)
+_STATEMENT_WORDS = frozenset((
+    "if", "else", "for", "foreach", "while", "do", "switch", "case", "catch", "using", "lock",
+    "return", "new", "await", "throw", "fixed", "nameof", "typeof", "sizeof", "default", "when",
+    "yield", "checked", "unchecked", "get", "set", "add", "remove", "init",
+))
+# Property/field declaration at type-body depth: modifiers, type, name, then { => ; = or ,
+_MEMBER_RE = re.compile(
+    r"(?:^|(?<=[{};]))[\t ]*(?:\[[^\]\r\n]+\][\t ]*)*"
+    r"(?P<mods>(?:(?:public|private|protected|internal|static|readonly|const|volatile|new|virtual|override|"
+    r"sealed|abstract|required|event|unsafe|extern|fixed)\s+)*)"
+    r"(?P<type>[^\s(){};=<>,]+(?:\s*<[^{};()=]*>)?(?:\[[,\s]*\])*\??)[\t ]+"
+    r"(?P<name>@?[A-Za-z_]\w*)[\t ]*(?P<tail>=>|[{;=,])",
+    re.MULTILINE,
+)
+_NOT_A_TYPE = _STATEMENT_WORDS | {
+    "class", "struct", "interface", "record", "enum", "namespace", "delegate", "operator", "implicit", "explicit",
+}
+
+
+class OutlineError(Exception):
+    """Raised when an edit cannot be resolved unambiguously from the outline."""
+
+
+@dataclass
+class MethodSpan:
+    name: str
+    class_name: str
+    start: int          # line start, including attribute lines above the header
+    header: int         # index of the header match (line start of the signature, or just after
+                        # the '{', '}' or ';' it follows on a one-line body)
+    end: int            # exclusive; after the closing brace or terminating ';'
+    return_type: str
+    parameters: str
+    expression_bodied: bool = False
+
+
+@dataclass
+class MemberSpan:
+    kind: str           # "property" or "field"
+    name: str
+    start: int          # line start of the declaration
+    end: int            # exclusive; after the accessor block, initializer or ';'
+
+
+@dataclass
+class TypeSpan:
+    kind: str
+    name: str
+    namespace: Optional[str]
+    start: int          # start of the declaration line
+    open_brace: int     # the terminating ';' when has_body is False
+    close_brace: int
+    depth: int          # brace depth of the body (1 = top level type)
+    has_body: bool = True
+    header: int = 0     # index of the type keyword
+    methods: List[MethodSpan] = field(default_factory=list)
+
+
+class Outline:
+    """Structural view of one C# file revision."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        self._non_code_starts: List[int] = []
+        self._non_code_ends: List[int] = []
+        for m in _NON_CODE_RE.finditer(text):
+            if m.end() > m.start():
+                self._non_code_starts.append(m.start())
+                self._non_code_ends.append(m.end())
+        self.brace_pairs: Dict[int, int] = {}
+        self.brace_depth: Dict[int, int] = {}  # brace index -> depth inside it (1 for top level)
+        self._brace_positions: List[int] = []
+        self._depth_after: List[int] = []  # open-brace count just after each code brace
+        self.unbalanced = False
+        self._pair_braces()
+        self._line_starts = [0] + [m.end() for m in re.finditer(r"\r\n|\r|\n", text)]
+        self.namespaces = [(m.start(), m.group(1)) for m in _NAMESPACE_RE.finditer(text) if self.is_code(m.start())]
+        self.types: List[TypeSpan] = []
+        self._collect_types()
+        for t in self.types:
+            self._collect_methods(t)
+
+    # ---- masks ----
+    def is_code(self, pos: int) -> bool:
+        """True when pos is not inside a comment or string/char literal."""
+        i = bisect.bisect_right(self._non_code_starts, pos) - 1
+        return i < 0 or pos >= self._non_code_ends[i]
+
+    def non_code_spans(self) -> List[Tuple[int, int]]:
+        return list(zip(self._non_code_starts, self._non_code_ends))
+
+    def _code_positions(self, regex: "re.Pattern[str]", start: int = 0, end: Optional[int] = None):
+        end = len(self.text) if end is None else end
+        for m in regex.finditer(self.text, start, end):
+            if self.is_code(m.start()):
+                yield m
+
+    def _pair_braces(self) -> None:
+        stack: List[int] = []
+        for m in self._code_positions(_BRACE_RE):
+            pos = m.start()
+            self._brace_positions.append(pos)
+            if self.text[pos] == "{":
+                stack.append(pos)
+                self.brace_depth[pos] = len(stack)
+            elif stack:
+                self.brace_depth[pos] = len(stack)
+                self.brace_pairs[stack.pop()] = pos
+            else:
+                self.unbalanced = True
+            self._depth_after.append(len(stack))
+        if stack:
+            self.unbalanced = True
+
+    def depth_at(self, pos: int) -> int:
+        """Number of code braces open at pos."""
+        i = bisect.bisect_left(self._brace_positions, pos) - 1
+        return self._depth_after[i] if i >= 0 else 0
+
+    # ---- positions ----
+    def line_start(self, pos: int) -> int:
+        return self._line_starts[bisect.bisect_right(self._line_starts, pos) - 1]
+
+    def line_col(self, pos: int) -> Tuple[int, int]:
+        """1-based line/col using Unity's rule that \\r\\n, \\r and \\n each end a line."""
+        line = bisect.bisect_right(self._line_starts, pos) - 1
+        return line + 1, pos - self._line_starts[line] + 1
+
+    def _next_code_char(self, pos: int, chars: str, limit: int) -> int:
+        while pos < limit:
+            if self.text[pos] in chars and self.is_code(pos):
+                return pos
+            pos += 1
+        return -1
+
+    def _skip_trivia(self, pos: int, limit: int) -> int:
+        text = self.text
+        while pos < limit:
+            if text[pos].isspace():
+                pos += 1
+                continue
+            if not self.is_code(pos):
+                i = bisect.bisect_right(self._non_code_starts, pos) - 1
+                pos = self._non_code_ends[i]
+                continue
+            break
+        return pos
+
+    # ---- structure ----
+    def _namespace_for(self, pos: int) -> Optional[str]:
+        name = None
+        for ns_pos, ns_name in self.namespaces:
+            if ns_pos < pos:
+                name = ns_name
+        return name
+
+    def _collect_types(self) -> None:
+        for m in self._code_positions(_TYPE_RE):
+            brace = self._next_code_char(m.end(), "{;", len(self.text))
+            if brace < 0:
+                continue
+            if self.text[brace] == ";":
+                # Positional record / primary constructor: record Point(int X, int Y);
+                after = self._skip_trivia(m.end(), brace)
+                if m.group(1) not in ("class", "struct", "record") or self.text[after:after + 1] not in ("(", "<"):
+                    continue
+                close, depth, has_body = brace, self.depth_at(brace) + 1, False
+            elif brace in self.brace_pairs:
+                close, depth, has_body = self.brace_pairs[brace], self.brace_depth[brace], True
+            else:
+                continue
+            self.types.append(TypeSpan(
+                kind=m.group(1),
+                name=m.group(2).lstrip("@"),
+                namespace=self._namespace_for(m.start()),
+                start=self.line_start(m.start()),
+                open_brace=brace,
+                close_brace=close,
+                depth=depth,
+                has_body=has_body,
+                header=m.start(),
+            ))
+
+    def _attribute_start(self, line_start: int, floor: int) -> int:
+        start = line_start
+        while start > floor:
+            prev = self.line_start(start - 1)
+            if prev < floor or not self.text[prev:start].lstrip().startswith("["):
+                break
+            start = prev
+        return start
+
+    def _collect_methods(self, t: TypeSpan) -> None:
+        if t.kind in ("enum", "interface") or not t.has_body:
+            return
+        body_start, body_end = t.open_brace + 1, t.close_brace
+        for m in self._code_positions(_METHOD_HEADER_RE, body_start, body_end):
+            name = m.group("name").lstrip("@")
+            rtype = m.group("rtype")
+            paren = m.end() - 1
+            if name in _STATEMENT_WORDS or rtype in _NOT_A_TYPE or not self.is_code(paren):
+                continue
+            if self.depth_at(paren) != t.depth:
+                continue  # inside a nested block, not a member of this type
+            close = self._match_paren(paren, body_end)
+            if close < 0:
+                continue
+            pos = self._skip_trivia(close + 1, body_end)
+            # Generic constraints: where T : ...
+            while self.text.startswith("where", pos) and not (self.text[pos + 5:pos + 6].isalnum() or self.text[pos + 5:pos + 6] == "_"):
+                nxt = pos + 5
+                while nxt < body_end and not (self.text[nxt] in "{;" or self.text.startswith("=>", nxt)):
+                    nxt += 1
+                pos = self._skip_trivia(nxt, body_end)
+            expression = self.text.startswith("=>", pos)
+            if expression:
+                semi = self._next_code_char(pos, ";", body_end)
+                if semi < 0:
+                    continue
+                end = semi + 1
+            elif pos < body_end and self.text[pos] == "{" and pos in self.brace_pairs:
+                end = self.brace_pairs[pos] + 1
+            else:
+                continue  # abstract/extern declaration, delegate, field initializer call, ...
+            header = m.start()  # '^' anchored: the signature's line start
+            t.methods.append(MethodSpan(
+                name=name,
+                class_name=t.name,
+                start=self._attribute_start(header, body_start),
+                header=header,
+                end=end,
+                return_type=rtype,
+                parameters=self.text[paren + 1:close],
+                expression_bodied=expression,
+            ))
+
+    def members(self, t: TypeSpan) -> List[MemberSpan]:
+        """Properties and fields declared directly in t's body (first declarator only)."""
+        if t.kind == "enum" or not t.has_body:
+            return []
+        out: List[MemberSpan] = []
+        text, limit = self.text, t.close_brace
+        for m in _MEMBER_RE.finditer(text, t.open_brace + 1, limit):
+            name_pos = m.start("name")
+            if not self.is_code(name_pos) or self.depth_at(name_pos) != t.depth:
+                continue
+            if m.group("type") in _NOT_A_TYPE or m.group("name") in _NOT_A_TYPE:
+                continue
+            tail, tail_pos = m.group("tail"), m.start("tail")
+            if tail == "{" and tail_pos in self.brace_pairs:
+                end = self.brace_pairs[tail_pos] + 1
+                after = self._skip_trivia(end, limit)
+                if text.startswith("=", after):  # auto-property initializer
+                    semi = self._next_code_char(after, ";", limit)
+                    end = semi + 1 if semi >= 0 else end
+                kind = "property"
+            else:
+                semi = self._next_code_char(tail_pos, ";", limit)
+                end = semi + 1 if semi >= 0 else m.end()
+                kind = "property" if tail == "=>" and "event" not in m.group("mods") else "field"
+            out.append(MemberSpan(kind=kind, name=m.group("name").lstrip("@"), start=m.start(), end=end))
+        return out
+
+    def namespace_end(self, pos: int) -> int:
+        """End (exclusive) of the namespace declared at pos: its closing brace, or EOF when file-scoped."""
+        brace = self._next_code_char(pos, "{;", len(self.text))
+        if brace >= 0 and self.text[brace] == "{" and brace in self.brace_pairs:
+            return self.brace_pairs[brace] + 1
+        return len(self.text)
+
+    def _match_paren(self, open_pos: int, limit: int) -> int:
+        depth = 0
+        pos = open_pos
+        text = self.text
+        while pos < limit:
+            c = text[pos]
+            if c in "()" and self.is_code(pos):
+                depth += 1 if c == "(" else -1
+                if depth == 0:
+                    return pos
+            pos += 1
+        return -1
+
+    # ---- queries ----
+    def find_type(self, name: str, namespace: Optional[str] = None) -> TypeSpan:
+        matches = [t for t in self.types if t.name == name and t.kind != "enum"
+                   and (not namespace or t.namespace == namespace)]
+        if not matches:
+            raise OutlineError(f"class '{name}' not found" + (f" in namespace '{namespace}'" if namespace else ""))
+        if len(matches) > 1:
+            raise OutlineError(f"class '{name}' matched {len(matches)} declarations (partial/nested?). Disambiguate.")
+        return matches[0]
+
+    def find_method(self, t: TypeSpan, name: str, return_type: Optional[str] = None,
+                    parameters: Optional[str] = None, attributes_contains: Optional[str] = None) -> MethodSpan:
+        def norm(s: str) -> str:
+            return re.sub(r"\s+", " ", s or "").strip()
+
+        want_params = None
+        if parameters:
+            p = parameters.strip()
+            if p.startswith("(") and p.endswith(")"):
+                p = p[1:-1]
+            want_params = norm(p)
+        for method in t.methods:
+            if method.name != name:
+                continue
+            if return_type and norm(method.return_type) != norm(return_type):
+                continue
+            if want_params is not None and norm(method.parameters) != want_params:
+                continue
+            if attributes_contains and attributes_contains not in self.text[method.start:method.header]:
+                continue
+            return method
+        raise OutlineError(f"method '{name}' not found in class '{t.name}'")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "sha256": self.sha256,
+            "unbalanced": self.unbalanced,
+            "types": [
+                {
+                    "kind": t.kind,
+                    "name": t.name,
+                    "namespace": t.namespace,
+                    "startLine": self.line_col(t.start)[0],
+                    "endLine": self.line_col(t.close_brace)[0],
+                    "methods": [
+                        {"name": mth.name, "startLine": self.line_col(mth.start)[0], "endLine": self.line_col(max(mth.start, mth.end - 1))[0]}
+                        for mth in t.methods
+                    ],
+                }
+                for t in self.types
+            ],
+        }
+
+
+_cache: "OrderedDict[str, Outline]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_outline(text: str) -> Outline:
+    """Return the (cached) outline for text, keyed by its sha256."""
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+    outline = Outline(text)
+    with _cache_lock:
+        _cache[key] = outline
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return outline
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def _dominant_newline(text: str) -> str:
+    """The line break text uses most (\\n when it has none)."""
+    crlf = text.count("\r\n")
+    counts = {"\n": text.count("\n") - crlf, "\r\n": crlf, "\r": text.count("\r") - crlf}
+    return max(counts, key=lambda k: (counts[k], k == "\n"))
+
+
+def _normalize_newlines(s: str, newline: str = "\n") -> str:
+    return (s or "").replace("\r\n", "\n").replace("\r", "\n").replace("\n", newline)
+
+
+LOCAL_METHOD_OPS = frozenset(("replace_method", "delete_method", "insert_method"))
+
+
+def resolve_method_spans(text: str, edits: List[Dict[str, Any]]) -> List[Tuple[int, int, str]]:
+    """Translate replace/insert/delete_method edits into (start, end, newText) offsets.
+
+    All spans are computed against `text` (Unity's atomic mode) and returned
+    sorted by start. Inserted text uses the file's dominant line break.
+    Raises OutlineError for unsupported ops, unresolved targets or
+    overlapping spans.
+    """
+    outline = get_outline(text)
+    nl = _dominant_newline(text)
+    if outline.unbalanced:
+        raise OutlineError("unbalanced braces; cannot resolve structure locally")
+    spans: List[Tuple[int, int, str]] = []
+    for e in edits:
+        op = (e.get("op") or "").lower()
+        if op not in LOCAL_METHOD_OPS:
+            raise OutlineError(f"op '{op}' is not resolved locally")
+        t = outline.find_type(e.get("className") or "", e.get("namespace"))
+        if not t.has_body:
+            raise OutlineError(f"type '{t.name}' is declared without a body")
+        if op in ("replace_method", "delete_method"):
+            method = outline.find_method(t, e.get("methodName") or "", e.get("returnType"),
+                                         e.get("parametersSignature"), e.get("attributesContains"))
+            if op == "replace_method":
+                replacement = e.get("replacement")
+                if replacement is None:
+                    replacement = e.get("text")
+                if replacement is None:
+                    raise OutlineError("replace_method requires 'replacement'")
+                spans.append((method.start, method.end, _normalize_newlines(replacement, nl)))
+            else:
+                spans.append((method.start, method.end, ""))
+        else:
+            snippet = e.get("replacement") or e.get("text") or ""
+            if not snippet.strip():
+                raise OutlineError("insert_method requires a non-empty 'replacement'")
+            position = (e.get("position") or "end").lower()
+            if position == "after":
+                anchor = outline.find_method(t, e.get("afterMethodName") or "", e.get("afterReturnType"),
+                                             e.get("afterParametersSignature"), e.get("afterAttributesContains"))
+                spans.append((anchor.end, anchor.end, _normalize_newlines("\n\n" + snippet.rstrip() + "\n", nl)))
+            elif position == "before":
+                anchor = outline.find_method(t, e.get("beforeMethodName") or "", e.get("beforeReturnType"),
+                                             e.get("beforeParametersSignature"), e.get("beforeAttributesContains"))
+                spans.append((anchor.start, anchor.start, _normalize_newlines(snippet.rstrip() + "\n\n", nl)))
+            elif position == "start":
+                at = t.open_brace + 1
+                spans.append((at, at, _normalize_newlines("\n\n" + snippet.rstrip() + "\n", nl)))
+            else:
+                spans.append((t.close_brace, t.close_brace, _normalize_newlines("\n\n" + snippet.rstrip() + "\n", nl)))
+
+    # Same non-overlap rule as Unity's apply_text_edits (descending by start)
+    ordered = sorted(spans, key=lambda s: s[0], reverse=True)
+    for prev, cur in zip(ordered, ordered[1:]):
+        if cur[1] > prev[0]:
+            raise OutlineError("edits overlap; use options.applyMode='sequential' or split the batch")
+
+    return sorted(spans, key=lambda s: s[0])
+
+
+def resolve_method_edits(text: str, edits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Like resolve_method_spans, as 1-based {startLine,startCol,endLine,endCol,newText}."""
+    outline = get_outline(text)
+    out = []
+    for start, end, new_text in resolve_method_spans(text, edits):
+        sl, sc = outline.line_col(start)
+        el, ec = outline.line_col(end)
+        out.append({"startLine": sl, "startCol": sc, "endLine": el, "endCol": ec, "newText": new_text})
+    return out
@@ -0,0 +1,294 @@
+"""
+Opt-in write coalescing for script text edits.
+
+Agents often send several small edits to one script in quick succession,
+each paying a read, a precondition round trip, a write and a refresh. With
+coalescing on (options.coalesce, or config.edit_coalesce_enabled),
+script_apply_edits hands its text edits to submit() instead of writing
+them. The first edit opens a window of edit_coalesce_window_ms for that
+script; later edits chain onto the window's pending text without reading
+the file again. The window is written as one apply_text_edits, diffed
+against the text it started from and guarded by that text's sha256, so it
+costs one write and one refresh.
+
+Tool calls are served one at a time, so a caller cannot block until the
+deadline without holding up the edits it is waiting for. Each caller gets
+a pending result immediately (status "pending", no "success"): the edit
+is queued, not written, and expected_sha256 is the hash the file will
+have if the window's write succeeds. A window is written at its deadline
+(timer thread), by flush() before any read or non-coalesced write that
+could observe the file, and at interpreter exit. A write that fails after
+its callers returned is kept and reported by take_error() on the next
+call for that script; get_sha tells whether expected_sha256 was reached.
+
+The module lock only guards the window table: a window is popped under
+it and written outside it, so a round trip to Unity for one script never
+blocks edits or reads of another. A reader's flush() waits for a write of
+the script it is about to read that is already in flight. Async tools use
+flush_async(), which does any waiting on a worker thread, not the event
+loop.
+"""
+
+import asyncio
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import config
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+
+class _Window:
+    __slots__ = ("name", "path", "namespace", "script_type", "send", "base_text", "text",
+                 "options", "edits", "deadline", "timer")
+
+    def __init__(self, name: str, path: str, namespace: Optional[str], script_type: Optional[str],
+                 send: Callable[..., Any], base_text: str, deadline: float):
+        self.name = name
+        self.path = path
+        self.namespace = namespace
+        self.script_type = script_type
+        self.send = send
+        self.base_text = base_text
+        self.text = base_text
+        self.options: Dict[str, Any] = {}
+        self.edits = 0
+        self.deadline = deadline
+        self.timer: Optional[threading.Timer] = None
+
+
+_lock = threading.Lock()  # never held across a write
+_windows: Dict[str, _Window] = {}
+_inflight: Dict[str, threading.Event] = {}  # key -> set when its current write finished
+_errors: Dict[str, Dict[str, Any]] = {}
+_stats = {"submitted": 0, "writes": 0, "failed": 0}
+
+
+def _key(name: str, path: Optional[str]) -> str:
+    rel = (path or "Scripts").replace("\\", "/").strip().strip("/")
+    if rel.lower() == "assets" or rel.lower().startswith("assets/"):
+        rel = rel[7:]
+    return f"Assets/{rel}/{name}.cs" if rel else f"Assets/{name}.cs"
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def coalesce_window(options: Optional[Dict[str, Any]]) -> float:
+    """Seconds to hold an edit with these options, or 0 to write it now."""
+    opts = options or {}
+    if not opts.get("coalesce", getattr(config, "edit_coalesce_enabled", False)):
+        return 0.0
+    if opts.get("preview") or str(opts.get("refresh") or "debounced").lower() in ("immediate", "sync"):
+        return 0.0
+    ms = opts.get("coalesce_window_ms", getattr(config, "edit_coalesce_window_ms", 750))
+    try:
+        return max(0.0, float(ms) / 1000.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def pending_text(name: str, path: Optional[str]) -> Optional[str]:
+    """The text a script will have once its open window is written, if one is open."""
+    key = _key(name, path)
+    with _lock:
+        window = _windows.get(key)
+        if window is not None:
+            return window.text
+    _wait_inflight(key)  # the file is read next; let a write already under way land first
+    return None
+
+
+def submit(send: Callable[..., Any], name: str, path: Optional[str], namespace: Optional[str],
+           script_type: Optional[str], base_text: str, edits: List[Dict[str, Any]],
+           options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Queue apply_text_edits ranges (relative to base_text) into the script's window.
+
+    base_text must be the window's pending text when one is open, or the
+    file's current contents otherwise. send is the caller's
+    send_command_with_retry, used for the eventual write.
+    """
+    from script_diff import apply_line_col_edits
+    options = dict(options or {})
+    window_s = coalesce_window(options) or max(0.0, float(getattr(config, "edit_coalesce_window_ms", 750)) / 1000.0)
+    new_text = apply_line_col_edits(base_text, edits)
+    key = _key(name, path)
+    with _lock:
+        window = _windows.get(key)
+        if window is not None and window.text != base_text:
+            return {"success": False, "code": "stale_file",
+                    "message": f"'{key}' changed while the edit was prepared; re-read and retry."}
+        if window is None:
+            window = _Window(name, path, namespace, script_type, send, base_text, time.monotonic() + window_s)
+            window.timer = threading.Timer(window_s, _flush_due, args=(key, window))
+            window.timer.daemon = True
+            _windows[key] = window
+            window.timer.start()
+        window.text = new_text
+        window.send = send
+        window.edits += 1
+        window.options = {k: options[k] for k in ("refresh", "validate") if k in options}
+        _stats["submitted"] += 1
+        flush_in_ms = max(0, int((window.deadline - time.monotonic()) * 1000))
+        count = window.edits
+    return {
+        "status": "pending",
+        "message": f"Edit queued, not written yet; {count} edit(s) to '{key}' will be written together "
+                   f"in about {flush_in_ms} ms. A failed write is reported on the next edit of this script.",
+        "data": {"coalesced": True, "pending": True, "expected_sha256": _sha(new_text),
+                 "pending_edits": count, "flush_in_ms": flush_in_ms},
+    }
+
+
+def _write(key: str, window: _Window) -> Dict[str, Any]:
+    if window.text == window.base_text:
+        return {"success": True, "message": "No-op: contents unchanged", "data": {"no_op": True}}
+    opts: Dict[str, Any] = {"refresh": window.options.get("refresh", "debounced"),
+                            "validate": window.options.get("validate", "standard")}
+    from script_diff import diff_edits
+    from script_rebase import send_text_edits
+    edits = diff_edits(window.base_text, window.text)
+    if edits:
+        if len(edits) > 1:
+            opts["applyMode"] = "atomic"
+    else:
+        edits = [{"startLine": 1, "startCol": 1, "endLine": len(window.base_text.splitlines(keepends=True)) + 1,
+                  "endCol": 1, "newText": window.text}]
+    params = {
+        "action": "apply_text_edits",
+        "name": window.name,
+        "path": window.path,
+        "namespace": window.namespace,
+        "scriptType": window.script_type,
+        "edits": edits,
+        "precondition_sha256": _sha(window.base_text),
+        "options": opts,
+    }
+    try:
+        resp = send_text_edits(window.send, params)
+    except Exception as e:
+        resp = {"success": False, "message": str(e)}
+    if not isinstance(resp, dict):
+        resp = {"success": False, "message": str(resp)}
+    with _lock:
+        _stats["writes"] += 1
+        if not resp.get("success"):
+            _stats["failed"] += 1
+            _errors[key] = {
+                "success": False,
+                "code": "coalesced_write_failed",
+                "message": f"{window.edits} queued edit(s) to '{key}' were not written: {resp.get('message') or resp.get('code')}",
+                "data": {"response": resp, "pending_edits": window.edits, "expected_sha256": _sha(window.text)},
+            }
+    if not resp.get("success"):
+        logger.warning(f"Coalesced write of {window.edits} edit(s) to '{key}' failed: {resp.get('message')}")
+    return resp
+
+
+_Taken = Tuple[_Window, Optional[threading.Event], threading.Event]
+
+
+def _take(key: str) -> Optional[_Taken]:
+    """Pop key's window for writing; call with _lock held."""
+    window = _windows.pop(key, None)
+    if window is None:
+        return None
+    if window.timer is not None:
+        window.timer.cancel()
+    done = threading.Event()
+    previous = _inflight.get(key)
+    _inflight[key] = done
+    return window, previous, done
+
+
+def _write_taken(key: str, taken: _Taken) -> Dict[str, Any]:
+    window, previous, done = taken
+    try:
+        if previous is not None:
+            previous.wait()  # writes to one script stay in order
+        return _write(key, window)
+    finally:
+        with _lock:
+            if _inflight.get(key) is done:
+                del _inflight[key]
+        done.set()
+
+
+def _wait_inflight(key: str) -> None:
+    with _lock:
+        event = _inflight.get(key)
+    if event is not None:
+        event.wait()
+
+
+def _flush_due(key: str, window: _Window) -> None:
+    with _lock:
+        if _windows.get(key) is not window:
+            return  # already flushed by a reader
+        taken = _take(key)
+    _write_taken(key, taken)
+
+
+def flush(name: Optional[str] = None, path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Write one script's open window (or all of them when name is None) now.
+
+    Also waits for writes of those scripts already in flight, so a read
+    that follows sees every queued edit.
+    """
+    with _lock:
+        if not _windows and not _inflight:
+            return []
+        keys = [_key(name, path)] if name is not None else list(set(_windows) | set(_inflight))
+        waiting = [_inflight[k] for k in keys if k in _inflight and k not in _windows]
+        taken = [(k, t) for k in keys for t in (_take(k),) if t is not None]
+    results = [_write_taken(k, t) for k, t in taken]
+    for event in waiting:
+        event.wait()
+    return results
+
+
+def idle() -> bool:
+    """True when no window is open and no write is in flight."""
+    with _lock:
+        return not _windows and not _inflight
+
+
+async def flush_async(name: Optional[str] = None, path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """flush() for async tools: returns at once when idle, else writes on a worker thread."""
+    if idle():
+        return []
+    return await asyncio.get_running_loop().run_in_executor(None, flush, name, path)
+
+
+def take_error(name: str, path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Pop the failure of an earlier coalesced write to this script, if any."""
+    key = _key(name, path)
+    _wait_inflight(key)
+    with _lock:
+        return _errors.pop(key, None)
+
+
+def coalescer_stats() -> Dict[str, Any]:
+    with _lock:
+        return {**_stats, "open_windows": len(_windows), "writes_in_flight": len(_inflight),
+                "unreported_errors": len(_errors)}
+
+
+def reset() -> None:
+    """Drop open windows without writing them, and forget errors."""
+    with _lock:
+        for window in _windows.values():
+            if window.timer is not None:
+                window.timer.cancel()
+        _windows.clear()
+        _errors.clear()
+        for k in _stats:
+            _stats[k] = 0
+
+
+atexit.register(flush)
@@ -0,0 +1,208 @@
+"""
+Windowed line reads for read_resource without decoding the whole file.
+
+Large files are memory-mapped. A slice (start_line/line_count) looks up
+its byte range in a line-offset index: the start offset of every line,
+found with one bytes regex pass over the map and cached per file while
+its (mtime, size) is unchanged, so later windows of the same file only
+decode the lines they return. A tail scans backwards from the end of the
+file in chunks (n * _TAIL_LINE_BYTES bytes first, doubling) until it has
+seen enough line breaks, without an index.
+
+read_chunk() serves read_resource's cursor pagination: a bounded byte
+range that ends after the last \\n it contains (or on a UTF-8 character
+boundary when one line is longer than the chunk, running past max_bytes
+only when a single character is), so concatenated chunks are the file's
+text. file_sha256() hashes the file's bytes once per (mtime, size) and
+caches the digest; remember_sha()/cached_sha() keep other per-file
+digests (read_resource's full-text sha, its ETag) the same way. Files modified within index_support.RACY_WINDOW_NS are not
+cached, since a same-size rewrite in one timestamp tick would look
+unchanged.
+
+Line breaks are those of str.splitlines() (\\n, \\r, \\r\\n, \\v, \\f,
+\\x1c-\\x1e and the UTF-8 encodings of U+0085, U+2028 and U+2029), and a
+trailing break does not start an empty line, so the windows equal the
+slices read_resource takes of text.splitlines(). Only the returned window
+is decoded.
+"""
+
+import bisect
+import hashlib
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from config import config
+from index_support import is_racy
+
+_BREAK = re.compile(rb"\r\n|[\n\r\x0b\x0c\x1c-\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]")
+# A break found this close to the start of a partial tail buffer may be cut (\r|\n, multibyte)
+_BREAK_MAX_LEN = 3
+# First backward chunk of a tail: this many bytes per requested line, doubled until enough breaks are seen
+_TAIL_LINE_BYTES = 256
+
+_cache: "OrderedDict[Tuple[str, int, int], array]" = OrderedDict()
+_cache_lock = threading.Lock()
+_shas: "OrderedDict[Tuple[str, int, int, str], str]" = OrderedDict()
+_SHA_ENTRIES = 1024
+
+
+def _map(path: Path):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _decode_lines(raw: bytes) -> str:
+    return "\n".join(raw.decode("utf-8").splitlines())
+
+
+def line_starts(path: Path) -> array:
+    """Byte offset of each line's start, cached by (path, mtime, size)."""
+    st = os.stat(path)
+    key = (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        starts = _cache.get(key)
+        if starts is not None:
+            _cache.move_to_end(key)
+            return starts
+    starts = array("Q", [0])
+    if st.st_size:
+        with _map(path) as mm:
+            starts.extend(m.end() for m in _BREAK.finditer(mm))
+    if starts[-1] == st.st_size:
+        starts.pop()  # a trailing break (or an empty file) starts no line
+    with _cache_lock:
+        for stale in [k for k in _cache if k[0] == key[0]]:
+            del _cache[stale]
+        _cache[key] = starts
+        while len(_cache) > max(1, int(getattr(config, "window_line_index_entries", 16))):
+            _cache.popitem(last=False)
+    return starts
+
+
+def read_window(path: Path, start_line: int, line_count: int) -> str:
+    """Lines start_line .. start_line + line_count - 1 (1-based), joined with \\n."""
+    starts = line_starts(path)
+    s = max(0, start_line - 1)
+    e = min(len(starts), s + max(0, line_count))
+    if s >= e:
+        return ""
+    with _map(path) as mm:
+        end = starts[e] if e < len(starts) else len(mm)
+        return _decode_lines(mm[starts[s]:end])
+
+
+def read_tail(path: Path, n: int) -> str:
+    """The last n lines, joined with \\n."""
+    size = os.stat(path).st_size
+    if n <= 0 or size == 0:
+        return ""
+    with _map(path) as mm:
+        off, step = size, max(1, n * _TAIL_LINE_BYTES)
+        while True:
+            off = max(0, off - step)
+            step *= 2
+            buf = mm[off:]
+            ends = [m.end() for m in _BREAK.finditer(buf)
+                    if off == 0 or m.start() >= _BREAK_MAX_LEN]
+            if ends and ends[-1] == len(buf):
+                ends.pop()  # the file's trailing break
+            if len(ends) >= n:
+                return _decode_lines(buf[ends[-n]:])
+            if off == 0:
+                return _decode_lines(buf)
+
+
+def find_line(path: Path, needle: str, accept: Callable[[str], bool]) -> Optional[int]:
+    """First 1-based line containing needle for which accept(line) is true.
+
+    Only lines where needle occurs are decoded, located with a byte search
+    of the map, so needle must be the UTF-8 text accept requires.
+    """
+    starts = line_starts(path)
+    if not starts:
+        return None
+    key = needle.encode("utf-8")
+    with _map(path) as mm:
+        pos = mm.find(key)
+        while pos != -1:
+            i = bisect.bisect_right(starts, pos) - 1
+            end = starts[i + 1] if i + 1 < len(starts) else len(mm)
+            lines = mm[starts[i]:end].decode("utf-8").splitlines()
+            if lines and accept(lines[0]):
+                return i + 1
+            pos = mm.find(key, end)
+    return None
+
+
+def read_chunk(path: Path, offset: int, max_bytes: int) -> Tuple[str, int]:
+    """Text of the bytes from offset up to max_bytes, and the offset where the next chunk starts."""
+    size = os.stat(path).st_size
+    offset = min(max(0, offset), size)
+    end = min(size, offset + max(1, max_bytes))
+    if offset == end:
+        return "", end
+    with _map(path) as mm:
+        if end < size:
+            cut = mm.rfind(b"\n", offset, end)
+            if cut != -1:
+                end = cut + 1
+            else:
+                back = end
+                while back > offset and mm[back] & 0xC0 == 0x80:
+                    back -= 1  # do not split a UTF-8 sequence
+                if back > offset:
+                    end = back
+                else:  # the chunk is shorter than the character at offset: return that character whole
+                    while end < size and mm[end] & 0xC0 == 0x80:
+                        end += 1
+        return mm[offset:end].decode("utf-8", errors="replace"), end
+
+
+def _sha_key(path: Path, st: os.stat_result, kind: str) -> Tuple[str, int, int, str]:
+    return (os.path.realpath(path), st.st_mtime_ns, st.st_size, kind)
+
+
+def cached_sha(path: Path, st: os.stat_result, kind: str) -> Optional[str]:
+    """A digest remembered for this (path, mtime, size), or None."""
+    key = _sha_key(path, st, kind)
+    with _cache_lock:
+        digest = _shas.get(key)
+        if digest is not None:
+            _shas.move_to_end(key)
+        return digest
+
+
+def remember_sha(path: Path, st: os.stat_result, kind: str, digest: str) -> None:
+    """Remember a digest of the file as it was when st was taken."""
+    if is_racy(st.st_mtime_ns):
+        return
+    with _cache_lock:
+        _shas[_sha_key(path, st, kind)] = digest
+        while len(_shas) > _SHA_ENTRIES:
+            _shas.popitem(last=False)
+
+
+def file_sha256(path: Path) -> str:
+    """sha256 of the file's bytes, cached by (path, mtime, size)."""
+    st = os.stat(path)
+    digest = cached_sha(path, st, "bytes")
+    if digest is None:
+        h = hashlib.sha256()
+        if st.st_size:
+            with _map(path) as mm:
+                h.update(mm)
+        digest = h.hexdigest()
+        remember_sha(path, st, "bytes", digest)
+    return digest
+
+
+def reset() -> None:
+    with _cache_lock:
+        _cache.clear()
+        _shas.clear()
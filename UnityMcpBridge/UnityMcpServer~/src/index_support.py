@@ -0,0 +1,145 @@
+"""
+Plumbing shared by the on-disk caches and indexes.
+
+project_index, trigram_index, symbol_index, asset_graph, file_window and
+script_mirror all trust a file's (mtime, size) to tell whether what they
+read earlier is still current, and the indexes keep one instance per
+project root, some of them persisted. This module holds those pieces once:
+
+- is_racy(): a read taken within RACY_WINDOW_NS of the file's mtime cannot
+  be trusted by (mtime, size), because a same-size rewrite in the same
+  timestamp tick keeps both. Callers re-read such entries until a read
+  lands outside the window.
+- Registry: the shared instance per project root, keyed by realpath.
+- notify_written(): the tools that write, create or delete a file call it
+  once, and every loaded index whose registry has a recheck brings just
+  that path up to date; the rest waits for the index's next re-stat.
+- DebouncedSaver: saves an index on a timer thread a configured delay
+  after its first unsaved change, so changes made meanwhile share one save
+  and no query waits for serialization. Pending saves are written at exit
+  or by flush().
+"""
+
+import atexit
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from config import config
+
+RACY_WINDOW_NS = 2_000_000_000
+
+T = TypeVar("T")
+
+_rechecking: List["Registry[Any]"] = []  # registries whose instances re-check written files
+
+
+def is_racy(mtime_ns: int, checked_ns: Optional[int] = None) -> bool:
+    """True when a read at checked_ns (default: now) is too close to mtime_ns to trust (mtime, size)."""
+    return (time.time_ns() if checked_ns is None else checked_ns) - mtime_ns <= RACY_WINDOW_NS
+
+
+class Registry(Generic[T]):
+    """One shared instance per project root, created by create(realpath) on first use.
+
+    recheck(instance, rel_path), when given, is how notify_written brings one
+    file of an instance up to date.
+    """
+
+    def __init__(self, create: Callable[[str], T], recheck: Optional[Callable[[T, str], None]] = None):
+        self._create = create
+        self._recheck = recheck
+        self._items: Dict[str, T] = {}
+        self._lock = threading.Lock()
+        if recheck is not None:
+            _rechecking.append(self)
+
+    def get(self, root) -> T:
+        key = os.path.realpath(root)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                item = self._items[key] = self._create(key)
+            return item
+
+    def loaded(self, root=None) -> List[T]:
+        """Instances created so far: all of them, or root's when root is given."""
+        with self._lock:
+            if root is None:
+                return list(self._items.values())
+            item = self._items.get(os.path.realpath(root))
+            return [] if item is None else [item]
+
+    def items(self) -> List[Tuple[str, T]]:
+        with self._lock:
+            return list(self._items.items())
+
+    def invalidate(self, root=None) -> None:
+        """Call invalidate() on the loaded instances (all of them when root is None)."""
+        for item in self.loaded(root):
+            item.invalidate()  # type: ignore[attr-defined]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+def notify_written(root, rel_path: Optional[str]) -> None:
+    """Re-check rel_path (Assets/...), just written, created or deleted under root, in the loaded indexes.
+
+    When root or rel_path is None (where the write landed is not known), the
+    loaded indexes re-stat all of their files on their next query instead.
+    """
+    for registry in list(_rechecking):
+        if root is None or rel_path is None:
+            registry.invalidate()
+            continue
+        for item in registry.loaded(root):
+            registry._recheck(item, rel_path)  # type: ignore[misc]
+
+
+class DebouncedSaver:
+    """Runs save(index) on a timer thread, config.<delay_field> seconds after the first unsaved change."""
+
+    def __init__(self, save: Callable[[Any], None], delay_field: str, default_delay_s: float = 5.0):
+        self._save = save
+        self._delay_field = delay_field
+        self._default_delay_s = default_delay_s
+        self._timers: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def schedule(self, index: Any) -> None:
+        """Save index (anything with a .root) soon; changes made before the timer fires share one save."""
+        key = str(index.root)
+        with self._lock:
+            if key in self._timers:
+                return
+            delay = float(getattr(config, self._delay_field, self._default_delay_s))
+            timer = self._timers[key] = threading.Timer(delay, self._due, args=(key, index))
+            timer.daemon = True
+        timer.start()
+
+    def _due(self, key: str, index: Any) -> None:
+        with self._lock:
+            if self._timers.get(key) is not threading.current_thread():
+                return  # flushed or cancelled meanwhile
+            del self._timers[key]
+        self._save(index)
+
+    def flush(self) -> None:
+        """Write pending saves now (at exit, or before reading the saved file)."""
+        with self._lock:
+            pending = list(self._timers.values())
+            self._timers.clear()
+        for timer in pending:
+            timer.cancel()
+            self._save(timer.args[1])
+
+    def cancel(self) -> None:
+        """Drop pending saves without writing them."""
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
@@ -0,0 +1,183 @@
+"""
+Optional per-call peak allocation tracing for large-payload tool calls.
+
+When enabled (config.memory_trace_enabled or UNITY_MCP_MEMORY_TRACE=1), calls
+wrapped with `traced(...)` record the tracemalloc peak reached while they ran.
+Calls whose peak exceeds config.memory_trace_threshold_bytes are logged and a
+snapshot of the top allocation sites is kept for the server_stats tool.
+
+Notes:
+- tracemalloc is process-wide. Nested calls (a tool handler calling
+  send_command) share the outermost call's peak window, and overlapping
+  calls from different threads can inflate each other's numbers; treat the
+  values as upper bounds.
+- Top sites come from a snapshot taken when the call finishes, i.e. the
+  allocations still alive at that point (typically the payload being
+  returned), not a historical peak breakdown.
+"""
+
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+from config import config
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+_lock = threading.Lock()
+_depth = 0
+_started_tracing = False
+_calls: Dict[str, Dict[str, Any]] = {}
+_spikes: deque = deque(maxlen=20)
+
+
+def is_enabled() -> bool:
+    env = os.environ.get("UNITY_MCP_MEMORY_TRACE", "").strip().lower()
+    if env in ("1", "true", "yes", "on"):
+        return True
+    if env in ("0", "false", "no", "off"):
+        return False
+    return bool(getattr(config, "memory_trace_enabled", False))
+
+
+def _ensure_tracing() -> None:
+    global _started_tracing
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(max(1, int(getattr(config, "memory_trace_frames", 1))))
+        _started_tracing = True
+
+
+def _top_sites(limit: int) -> List[Dict[str, Any]]:
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    sites = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        sites.append({"site": f"{frame.filename}:{frame.lineno}", "size_bytes": stat.size, "count": stat.count})
+    return sites
+
+
+def _record(name: str, peak: int, duration_s: float) -> None:
+    threshold = int(getattr(config, "memory_trace_threshold_bytes", 32 * 1024 * 1024))
+    with _lock:
+        entry = _calls.setdefault(name, {"calls": 0, "max_peak_bytes": 0, "total_peak_bytes": 0, "over_threshold": 0})
+        entry["calls"] += 1
+        entry["total_peak_bytes"] += peak
+        entry["max_peak_bytes"] = max(entry["max_peak_bytes"], peak)
+        over = peak > threshold
+        if over:
+            entry["over_threshold"] += 1
+    if not over:
+        return
+    try:
+        sites = _top_sites(int(getattr(config, "memory_trace_top_sites", 10)))
+    except Exception as e:
+        sites = [{"site": f"<snapshot failed: {e}>", "size_bytes": 0, "count": 0}]
+    logger.warning(
+        "Memory spike in %s: peak %.1f MiB over %.3fs (threshold %.1f MiB)",
+        name, peak / (1024 * 1024), duration_s, threshold / (1024 * 1024),
+    )
+    with _lock:
+        _spikes.append({
+            "name": name,
+            "peak_bytes": peak,
+            "duration_ms": int(duration_s * 1000),
+            "timestamp": time.time(),
+            "top_sites": sites,
+        })
+
+
+@contextmanager
+def measure(name: str) -> Iterator[None]:
+    """Record the tracemalloc peak reached inside the block under `name`."""
+    global _depth
+    if not is_enabled():
+        yield
+        return
+    with _lock:
+        _ensure_tracing()
+        outermost = _depth == 0
+        _depth += 1
+        if outermost:
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        peak = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+        with _lock:
+            _depth -= 1
+        _record(name, peak, time.monotonic() - start)
+
+
+def traced(name: str | Callable[..., str]):
+    """Decorator form of `measure` for sync and async callables.
+
+    `name` may be a string or a callable receiving the wrapped call's
+    arguments and returning the label (e.g. to include a command type).
+    """
+    def label(args, kwargs) -> str:
+        if callable(name):
+            try:
+                return name(*args, **kwargs)
+            except Exception:
+                return getattr(name, "__name__", "call")
+        return name
+
+    def deco(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not is_enabled():
+                    return await fn(*args, **kwargs)
+                with measure(label(args, kwargs)):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return fn(*args, **kwargs)
+            with measure(label(args, kwargs)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def get_stats() -> Dict[str, Any]:
+    with _lock:
+        calls = {
+            k: dict(v, avg_peak_bytes=int(v["total_peak_bytes"] / v["calls"]) if v["calls"] else 0)
+            for k, v in _calls.items()
+        }
+        spikes = list(_spikes)
+    current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    return {
+        "enabled": is_enabled(),
+        "tracing": tracemalloc.is_tracing(),
+        "threshold_bytes": int(getattr(config, "memory_trace_threshold_bytes", 32 * 1024 * 1024)),
+        "traced_current_bytes": current,
+        "calls": calls,
+        "recent_spikes": spikes,
+    }
+
+
+def reset() -> None:
+    """Clear recorded statistics and stop tracing if this module started it."""
+    global _started_tracing
+    with _lock:
+        _calls.clear()
+        _spikes.clear()
+        if _started_tracing and _depth == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            _started_tracing = False
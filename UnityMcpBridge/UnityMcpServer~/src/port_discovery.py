@@ -9,6 +9,8 @@ What changed and why:
 - This module now scans for both patterns, prefers the most recently
   modified file, and verifies that the port is actually a MCP for Unity listener
   (quick socket connect + ping) before choosing it.
+- Candidate ports are probed concurrently so a few stale registry files cost
+  one probe timeout instead of one per file.
 """
 
 import json
@@ -18,6 +20,7 @@ from pathlib import Path
 from typing import Optional, List
 import glob
 import socket
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger("mcp-for-unity-server")
 
@@ -26,6 +29,7 @@ class PortDiscovery:
     REGISTRY_FILE = "unity-mcp-port.json"  # legacy single-project file
     DEFAULT_PORT = 6400
     CONNECT_TIMEOUT = 0.3  # seconds, keep this snappy during discovery
+    MAX_PARALLEL_PROBES = 8
     
     @staticmethod
     def get_registry_path() -> Path:
@@ -99,19 +103,16 @@ class PortDiscovery:
         Returns:
             Port number to connect to
         """
-        # Prefer the latest heartbeat status if it points to a responsive port
+        # Ordered preference: latest heartbeat status, then registry files newest first
+        ordered: List[tuple] = []  # (source label, port)
         status = PortDiscovery._read_latest_status()
         if status:
             port = status.get('unity_port')
-            if isinstance(port, int) and PortDiscovery._try_probe_unity_mcp(port):
-                logger.info(f"Using Unity port from status: {port}")
-                return port
-
-        candidates = PortDiscovery.list_candidate_files()
+            if isinstance(port, int):
+                ordered.append(("status", port))
 
         first_seen_port: Optional[int] = None
-
-        for path in candidates:
+        for path in PortDiscovery.list_candidate_files():
             try:
                 with open(path, 'r') as f:
                     cfg = json.load(f)
@@ -119,12 +120,18 @@ class PortDiscovery:
                 if isinstance(unity_port, int):
                     if first_seen_port is None:
                         first_seen_port = unity_port
-                    if PortDiscovery._try_probe_unity_mcp(unity_port):
-                        logger.info(f"Using Unity port from {path.name}: {unity_port}")
-                        return unity_port
+                    ordered.append((path.name, unity_port))
             except Exception as e:
                 logger.warning(f"Could not read port registry {path}: {e}")
 
+        unique_ports = list(dict.fromkeys(port for _, port in ordered))
+        if unique_ports:
+            responsive = PortDiscovery._probe_ports(unique_ports)
+            for source, port in ordered:
+                if responsive.get(port):
+                    logger.info(f"Using Unity port from {source}: {port}")
+                    return port
+
         if first_seen_port is not None:
             logger.info(f"No responsive port found; using first seen value {first_seen_port}")
             return first_seen_port
@@ -132,6 +139,15 @@ class PortDiscovery:
         # Fallback to default port
         logger.info(f"No port registry found; using default port {PortDiscovery.DEFAULT_PORT}")
         return PortDiscovery.DEFAULT_PORT
+
+    @staticmethod
+    def _probe_ports(ports: List[int]) -> dict:
+        """Probe ports concurrently; returns {port: responsive}."""
+        if len(ports) == 1:
+            return {ports[0]: PortDiscovery._try_probe_unity_mcp(ports[0])}
+        workers = min(len(ports), PortDiscovery.MAX_PARALLEL_PROBES)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="unity-port-probe") as pool:
+            return dict(zip(ports, pool.map(PortDiscovery._try_probe_unity_mcp, ports)))
     
     @staticmethod
     def get_port_config() -> Optional[dict]:
@@ -0,0 +1,285 @@
+"""
+In-memory index of the files under a project's Assets/ folder.
+
+list_resources used to rglob the whole subtree and resolve every entry on
+each call. A ProjectIndex scans Assets/ once with os.scandir and keeps, per
+directory, its mtime, subdirectories and files (name, lower-case suffix,
+size, mtime). Queries filter that table without touching the filesystem.
+
+Freshness comes from mtime polling: at most every project_index_poll_s a
+query stats each known directory and rescans only those whose mtime
+changed (entries added, removed or renamed), or that were modified within
+a timestamp tick of their last scan. File size and mtime can lag
+in-place rewrites until their directory changes; listing does not depend
+on them. Tools that write, create or delete a script report it through
+index_support.notify_written, which re-scans just that file's directory.
+
+Like the old walk, symlinked directories are not descended into, and a
+symlinked file is listed only when its target stays under Assets/.
+
+With project_index_cache_path set, the index is saved as JSON in the
+background after a change (debounced by project_index_save_delay_s, and
+at exit) and loaded on first use, so a restarted server only re-stats
+directories instead of re-listing the tree.
+"""
+
+import fnmatch
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import config
+from index_support import DebouncedSaver, Registry, is_racy
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+_FORMAT = 2
+# Directories modified this close to their scan are rescanned even when the mtime matches
+
+# name, lower-case suffix, size, mtime_ns
+_File = Tuple[str, str, int, int]
+
+
+class _Dir:
+    __slots__ = ("mtime_ns", "scanned_ns", "dirs", "files")
+
+    def __init__(self, mtime_ns: int, scanned_ns: int, dirs: List[str], files: List[_File]):
+        self.mtime_ns = mtime_ns
+        self.scanned_ns = scanned_ns
+        self.dirs = dirs
+        self.files = files
+
+
+class ProjectIndex:
+    """Directory table for one project's Assets/ tree."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.assets = self.root / "Assets"
+        self._assets_real = os.path.realpath(self.assets)
+        self._dirs: Dict[str, _Dir] = {}
+        self._checked: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stats = {"scans": 0, "dir_rescans": 0, "queries": 0}
+
+    # -- scanning ---------------------------------------------------------
+
+    def _scan_dir(self, rel: str) -> Optional[_Dir]:
+        full = self.root / rel
+        scanned_ns = time.time_ns()
+        try:
+            mtime_ns = os.stat(full).st_mtime_ns
+            it = os.scandir(full)
+        except OSError:
+            return None
+        dirs: List[str] = []
+        files: List[_File] = []
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.name)
+                        continue
+                    if entry.is_symlink():
+                        real = os.path.realpath(entry.path)
+                        if not real.startswith(self._assets_real + os.sep) or not os.path.isfile(real):
+                            continue
+                    elif not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                files.append((entry.name, os.path.splitext(entry.name)[1].lower(), st.st_size, st.st_mtime_ns))
+        dirs.sort()
+        files.sort()
+        return _Dir(mtime_ns, scanned_ns, dirs, files)
+
+    def _scan_tree(self, rel: str) -> None:
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            node = self._scan_dir(current)
+            if node is None:
+                continue
+            self._dirs[current] = node
+            stack.extend(f"{current}/{d}" for d in node.dirs)
+
+    def _drop_tree(self, rel: str) -> None:
+        prefix = rel + "/"
+        for key in [k for k in self._dirs if k == rel or k.startswith(prefix)]:
+            del self._dirs[key]
+
+    def _refresh_locked(self) -> bool:
+        if not self._dirs:
+            self._scan_tree("Assets")
+            self.stats["scans"] += 1
+            return True
+        changed = False
+        for rel in sorted(self._dirs):
+            node = self._dirs.get(rel)
+            if node is None:
+                continue  # dropped with a removed parent
+            try:
+                mtime_ns = os.stat(self.root / rel).st_mtime_ns
+            except OSError:
+                self._drop_tree(rel)
+                changed = True
+                continue
+            if mtime_ns == node.mtime_ns and not is_racy(mtime_ns, node.scanned_ns):
+                continue
+            self._rescan_dir(rel, node)
+            changed = True
+        return changed
+
+    def _rescan_dir(self, rel: str, node: _Dir) -> None:
+        fresh = self._scan_dir(rel)
+        if fresh is None:
+            self._drop_tree(rel)
+            return
+        for gone in set(node.dirs) - set(fresh.dirs):
+            self._drop_tree(f"{rel}/{gone}")
+        self._dirs[rel] = fresh
+        for added in set(fresh.dirs) - set(node.dirs):
+            self._scan_tree(f"{rel}/{added}")
+        self.stats["dir_rescans"] += 1
+
+    def refresh(self, force: bool = False) -> None:
+        """Bring the index up to date, at most once per poll interval unless forced."""
+        with self._lock:
+            now = time.monotonic()
+            poll_s = float(getattr(config, "project_index_poll_s", 2.0))
+            if not force and self._checked is not None and now - self._checked < poll_s:
+                return
+            changed = self._refresh_locked()
+            self._checked = time.monotonic()
+        if changed:
+            _saver.schedule(self)
+
+    def invalidate(self) -> None:
+        """Make the next query re-check directory mtimes."""
+        with self._lock:
+            self._checked = None
+
+    def recheck(self, rel: str) -> None:
+        """Re-scan the directory holding rel, a file just written, created or deleted."""
+        parent = rel.rsplit("/", 1)[0]
+        with self._lock:
+            node = self._dirs.get(parent)
+            if node is None:
+                self._checked = None  # a new directory: found by the next directory check
+                return
+            self._rescan_dir(parent, node)
+        _saver.schedule(self)
+
+    # -- queries ----------------------------------------------------------
+
+    def files(self, under: str = "Assets", pattern: Optional[str] = None, suffix: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Files under the project-relative folder `under`, sorted by path.
+
+        pattern is an fnmatch glob on the file name; suffix (e.g. ".cs") is
+        compared case-insensitively. Entries: {path, suffix, size, mtime_ns}.
+        """
+        self.refresh()
+        under = under.strip("/")
+        prefix = under + "/"
+        suffix = suffix.lower() if suffix else None
+        out: List[Dict[str, Any]] = []
+        with self._lock:
+            self.stats["queries"] += 1
+            for rel in sorted(k for k in self._dirs if k == under or k.startswith(prefix)):
+                for name, sfx, size, mtime_ns in self._dirs[rel].files:
+                    if suffix is not None and sfx != suffix:
+                        continue
+                    if pattern and not fnmatch.fnmatch(name, pattern):
+                        continue
+                    out.append({"path": f"{rel}/{name}", "suffix": sfx, "size": size, "mtime_ns": mtime_ns})
+                    if limit is not None and len(out) >= limit:
+                        return out
+        return out
+
+    # -- persistence ------------------------------------------------------
+
+    def to_json(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "format": _FORMAT,
+                "root": str(self.root),
+                "dirs": {k: [d.mtime_ns, d.scanned_ns, d.dirs, [list(f) for f in d.files]]
+                         for k, d in self._dirs.items()},
+            }
+
+    def load_json(self, blob: Dict[str, Any]) -> bool:
+        if blob.get("format") != _FORMAT or blob.get("root") != str(self.root):
+            return False
+        with self._lock:
+            self._dirs = {k: _Dir(v[0], v[1], list(v[2]), [tuple(f) for f in v[3]])
+                          for k, v in blob.get("dirs", {}).items()}
+            self._checked = None
+        return True
+
+
+def _cache_file(root: Path) -> Optional[Path]:
+    base = getattr(config, "project_index_cache_path", None)
+    if not base:
+        return None
+    import hashlib
+    digest = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:16]
+    return Path(base).expanduser() / f"project-index-{digest}.json"
+
+
+def _save(index: ProjectIndex) -> None:
+    target = _cache_file(index.root)
+    if target is None:
+        return
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index.to_json(), separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, target)
+    except OSError as e:
+        logger.debug(f"Could not save project index to {target}: {e}")
+
+
+def _load(key: str) -> ProjectIndex:
+    index = ProjectIndex(Path(key))
+    target = _cache_file(index.root)
+    if target is not None and target.is_file():
+        try:
+            index.load_json(json.loads(target.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable project index cache {target}: {e}")
+    return index
+
+
+_indexes: "Registry[ProjectIndex]" = Registry(_load, recheck=ProjectIndex.recheck)
+_saver = DebouncedSaver(_save, "project_index_save_delay_s")
+
+
+def flush_saves() -> None:
+    """Write pending saves now (at exit, or before reading the cache file)."""
+    _saver.flush()
+
+
+def get_index(root: Path) -> ProjectIndex:
+    """The shared index for a project root, loaded from the on-disk cache when configured."""
+    return _indexes.get(root)
+
+
+def invalidate(root: Optional[Path] = None) -> None:
+    """Re-check directories on the next query (all indexes when root is None)."""
+    _indexes.invalidate(root)
+
+
+def index_stats() -> Dict[str, Any]:
+    return {key: {**index.stats, "dirs": len(index._dirs)} for key, index in _indexes.items()}
+
+
+def reset() -> None:
+    """Forget loaded indexes and drop pending saves."""
+    _saver.cancel()
+    _indexes.clear()
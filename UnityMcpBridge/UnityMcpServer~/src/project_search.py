@@ -0,0 +1,166 @@
+"""
+Project-wide regex search for find_in_project.
+
+search() takes project-relative paths (normally from project_index) and
+yields one group per file with matches, in path order:
+{"path": "Assets/...", "matches": [{"line": n, "text": line}, ...]}.
+
+Matching has find_in_file's semantics: the pattern runs against each line.
+A file is first searched as a whole and skipped when that finds nothing,
+which is equivalent for patterns without \\A, \\Z or lookarounds (those
+always take the per-line path). The whole-text check runs under MULTILINE
+on the text with its str.splitlines() breaks (\\r\\n, \\r, ...) turned
+into \\n, so ^ and $ see the same line ends as the per-line scan. Files
+whose first _SNIFF_BYTES contain a NUL byte are treated as binary and
+skipped; files larger than search_max_file_bytes are skipped too.
+
+Large searches run in a shared process pool (regex matching holds the
+GIL), in chunks of files so each task amortizes its IPC. Chunks are
+consumed in submission order, and the chunks not yet started are
+cancelled once max_results is reached. Each worker guards its matching
+with regex_cache.time_limit, which works there because pool tasks run on
+the worker's main thread. Small searches, and platforms where the pool
+cannot start, run in-process. Workers are started with forkserver (spawn
+where that is unavailable), never fork: the server is multithreaded, and
+a forked child could inherit a lock another thread held.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config import config
+from regex_cache import compile_pattern, time_limit
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+_SNIFF_BYTES = 8192
+_CHUNK_FILES = 64
+# Constructs whose per-line meaning differs from a whole-text search
+_LINE_SENSITIVE = re.compile(r"\\[AZz]|\(\?<?[=!]")
+# Line breaks of str.splitlines() other than \n, which MULTILINE ^/$ do not recognise
+_OTHER_BREAKS = re.compile("[\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _read_text(full: str, max_bytes: int) -> Optional[str]:
+    try:
+        with open(full, "rb") as f:
+            head = f.read(_SNIFF_BYTES)
+            if b"\x00" in head:
+                return None
+            if os.fstat(f.fileno()).st_size > max_bytes:
+                return None
+            raw = head + f.read()
+    except OSError:
+        return None
+    return raw.decode("utf-8", errors="replace")
+
+
+def _search_chunk(root: str, paths: Sequence[str], pattern: str, flags: int,
+                  limit: int, max_bytes: int) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """Search one chunk of files; returns (path, matches) for files with matches."""
+    rx = compile_pattern(pattern, flags)
+    whole = compile_pattern(pattern, flags | re.MULTILINE) if not _LINE_SENSITIVE.search(pattern) else None
+    out: List[Tuple[str, List[Dict[str, Any]]]] = []
+    found = 0
+    with time_limit():
+        for rel in paths:
+            text = _read_text(os.path.join(root, rel), max_bytes)
+            if text is None:
+                continue
+            lines = None
+            if whole is not None:
+                probe = text
+                if _OTHER_BREAKS.search(text):
+                    lines = text.splitlines()
+                    probe = "\n".join(lines)
+                if not whole.search(probe):
+                    continue
+            matches = []
+            for i, line in enumerate(lines if lines is not None else text.splitlines(), start=1):
+                if rx.search(line):
+                    matches.append({"line": i, "text": line})
+                    found += 1
+                    if found >= limit:
+                        break
+            if matches:
+                out.append((rel, matches))
+            if found >= limit:
+                break
+    return out
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    workers = int(getattr(config, "search_workers", 0) or min(8, os.cpu_count() or 1))
+    if workers <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            try:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            except (OSError, NotImplementedError, ValueError) as e:
+                logger.debug(f"Project search runs in-process: {e}")
+                return None
+        return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown)
+
+
+def search(root: str, paths: Sequence[str], pattern: str, flags: int = re.MULTILINE,
+           max_results: Optional[int] = 200) -> Iterator[Dict[str, Any]]:
+    """Yield {"path", "matches"} per matching file until max_results matches were produced.
+
+    The pattern is compiled (and screened) up front, so a bad pattern
+    raises here rather than in a worker.
+    """
+    compile_pattern(pattern, flags)
+    limit = int(max_results) if max_results else 1 << 62
+    max_bytes = int(getattr(config, "search_max_file_bytes", 8 * 1024 * 1024))
+    paths = list(paths)
+    chunks = [paths[i:i + _CHUNK_FILES] for i in range(0, len(paths), _CHUNK_FILES)]
+    pool = get_pool() if len(paths) >= int(getattr(config, "search_parallel_min_files", 256)) else None
+
+    remaining = limit
+    if pool is None:
+        for chunk in chunks:
+            for rel, matches in _search_chunk(root, chunk, pattern, flags, remaining, max_bytes):
+                yield {"path": rel, "matches": matches}
+                remaining -= len(matches)
+            if remaining <= 0:
+                return
+        return
+
+    futures = [pool.submit(_search_chunk, root, chunk, pattern, flags, limit, max_bytes) for chunk in chunks]
+    try:
+        for fut in futures:
+            for rel, matches in fut.result():
+                if remaining <= 0:
+                    return
+                matches = matches[:remaining]
+                yield {"path": rel, "matches": matches}
+                remaining -= len(matches)
+            if remaining <= 0:
+                return
+    finally:
+        for fut in futures:
+            fut.cancel()
@@ -0,0 +1,202 @@
+"""
+Shared cache of compiled regular expressions for the edit and search tools.
+
+Agents repeat the same anchors (\\s*}\\s*$, #endregion, method signatures)
+across many calls. compile_pattern keeps a bounded LRU keyed on
+(pattern, flags), and each pattern is screened once, when it is first
+compiled, for the nested-quantifier shapes that backtrack exponentially
+((a+)+, (\\s*\\w+)*, (.*)*). Those are rejected with RegexGuardError, a
+subclass of re.error, so callers' existing "bad_regex" handling reports
+them.
+
+time_limit() adds a runtime guard for patterns the screen misses. CPython's
+re cannot be cancelled from another thread, but the matcher polls for
+signals, so on POSIX the main thread arms a SIGALRM timer around the match.
+Elsewhere (worker threads, Windows) the static screen is the only guard.
+"""
+
+import re
+import signal
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from config import config
+
+try:  # Python 3.11+
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_parse as _sre_parse
+
+_REPEATS = (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT)
+# Possessive quantifiers and atomic groups (3.11+) never backtrack into their body
+_NO_BACKTRACK = tuple(op for op in (getattr(_sre_parse, "POSSESSIVE_REPEAT", None),
+                                    getattr(_sre_parse, "ATOMIC_GROUP", None)) if op is not None)
+_ZERO_WIDTH = (_sre_parse.AT, _sre_parse.ASSERT, _sre_parse.ASSERT_NOT, _sre_parse.GROUPREF)
+
+
+class RegexGuardError(re.error):
+    """Raised for patterns rejected by the backtracking screen."""
+
+
+class RegexTimeoutError(RegexGuardError):
+    """Raised when a guarded match runs past config.regex_timeout."""
+
+
+def _unwrap(item):
+    # Strip capturing/non-capturing groups that hold a single item
+    op, av = item
+    while op == _sre_parse.SUBPATTERN and len(av[-1]) == 1:
+        op, av = list(av[-1])[0]
+    return op, av
+
+
+def _nullable(items) -> bool:
+    for op, av in items:
+        if op in _REPEATS:
+            if av[0] > 0 and not _nullable(av[2]):
+                return False
+        elif op == _sre_parse.SUBPATTERN:
+            if not _nullable(av[-1]):
+                return False
+        elif op == _sre_parse.BRANCH:
+            if not any(_nullable(b) for b in av[1]):
+                return False
+        elif op not in _ZERO_WIDTH:
+            return False
+    return True
+
+
+def _unbounded(item) -> bool:
+    op, av = _unwrap(item)
+    return op in _REPEATS and av[1] == _sre_parse.MAXREPEAT
+
+
+def _has_unbounded(items) -> bool:
+    for op, av in items:
+        if op in _REPEATS:
+            if av[1] == _sre_parse.MAXREPEAT or _has_unbounded(av[2]):
+                return True
+        elif op == _sre_parse.SUBPATTERN:
+            if _has_unbounded(av[-1]):
+                return True
+        elif op == _sre_parse.BRANCH:
+            if any(_has_unbounded(b) for b in av[1]):
+                return True
+    return False
+
+
+def _find_nested_repeat(items) -> bool:
+    """True when an unbounded repeat's body is, in effect, another unbounded repeat.
+
+    After dropping parts of the body that can match empty, a body left with
+    nothing but an unbounded repeat (or with nothing at all) lets the engine
+    split the same input between iterations in exponentially many ways.
+    """
+    for op, av in items:
+        if op in _NO_BACKTRACK:
+            continue
+        if op in _REPEATS:
+            body = list(av[2])
+            while len(body) == 1 and body[0][0] == _sre_parse.SUBPATTERN:
+                body = list(body[0][1][-1])
+            if av[1] == _sre_parse.MAXREPEAT and _has_unbounded(body):
+                significant = [it for it in body if not _nullable([it])]
+                if not significant or (len(significant) == 1 and _unbounded(significant[0])):
+                    return True
+            if _find_nested_repeat(body):
+                return True
+        elif op == _sre_parse.SUBPATTERN:
+            if _find_nested_repeat(av[-1]):
+                return True
+        elif op == _sre_parse.BRANCH:
+            if any(_find_nested_repeat(b) for b in av[1]):
+                return True
+        elif op in (_sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+            if _find_nested_repeat(av[1]):
+                return True
+    return False
+
+
+def check_pattern(pattern: str, flags: int = 0) -> None:
+    """Raise RegexGuardError when pattern has a catastrophic-backtracking shape."""
+    if not getattr(config, "regex_guard_enabled", True):
+        return
+    parsed = _sre_parse.parse(pattern, flags)
+    if _find_nested_repeat(parsed):
+        raise RegexGuardError(
+            f"Pattern rejected: nested unbounded quantifiers can backtrack exponentially: {pattern!r}. "
+            "Make the inner repeat specific (e.g. \\w+ -> [A-Za-z_]\\w*) or anchor each iteration."
+        )
+
+
+_cache: "OrderedDict[Tuple[str, int], re.Pattern]" = OrderedDict()
+_cache_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def compile_pattern(pattern: str, flags: int = 0) -> "re.Pattern":
+    """Return the compiled, screened pattern for (pattern, flags) from the shared LRU."""
+    global _hits, _misses
+    key = (pattern, int(flags))
+    with _cache_lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            _hits += 1
+            return compiled
+    compiled = re.compile(pattern, flags)  # re.error for invalid syntax
+    check_pattern(pattern, flags)
+    with _cache_lock:
+        _misses += 1
+        _cache[key] = compiled
+        _cache.move_to_end(key)
+        while len(_cache) > max(1, int(getattr(config, "regex_cache_size", 256))):
+            _cache.popitem(last=False)
+    return compiled
+
+
+def cache_info() -> Dict[str, int]:
+    with _cache_lock:
+        return {"size": len(_cache), "hits": _hits, "misses": _misses}
+
+
+def clear_cache() -> None:
+    global _hits, _misses
+    with _cache_lock:
+        _cache.clear()
+        _hits = _misses = 0
+
+
+def _can_arm_timer() -> bool:
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+        # Leave SIGALRM alone when anyone (including an outer time_limit) owns it
+        and signal.getsignal(signal.SIGALRM) in (signal.SIG_DFL, signal.SIG_IGN, None)
+    )
+
+
+@contextmanager
+def time_limit(seconds: Optional[float] = None) -> Iterator[None]:
+    """Bound the regex work in the block; raises RegexTimeoutError on expiry.
+
+    A no-op when the timer cannot be armed (see module docstring).
+    """
+    limit = getattr(config, "regex_timeout", 0.0) if seconds is None else seconds
+    if not limit or limit <= 0 or not _can_arm_timer():
+        yield
+        return
+
+    def _expired(signum, frame):
+        raise RegexTimeoutError(f"Regex evaluation exceeded {limit:g}s; simplify the pattern")
+
+    previous = signal.signal(signal.SIGALRM, _expired)
+    signal.setitimer(signal.ITIMER_REAL, limit)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
@@ -0,0 +1,211 @@
+"""
+Minimal range edits between two revisions of a script.
+
+The text paths compute a file's new contents locally. diff_edits turns the
+(old, new) pair into apply_text_edits ranges: common leading/trailing lines
+are stripped, difflib matches the remaining lines, and each changed hunk is
+narrowed to the differing characters. Positions are 1-based line/col in
+Unity's convention (\\r\\n, \\r and \\n each end a line) and never split a
+\\r\\n pair.
+
+diff_edits returns None when the full contents are the better payload:
+too many hunks, edits not much smaller than the file, or inputs too large
+to diff cheaply. The edits are replayed locally before they are returned,
+so a None result is also the answer to any mismatch.
+
+rebase_edits is the three-way counterpart used on a precondition mismatch:
+ranges written against a base revision are moved past the hunks that turn
+base into the current text, unless the two touch a common line.
+"""
+
+import bisect
+import difflib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import config
+
+_LINE_RE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+\Z")
+
+# Rough per-edit JSON overhead (keys, numbers, quotes) used in the size comparison
+_EDIT_OVERHEAD = 80
+
+
+def _lines(text: str) -> List[str]:
+    return _LINE_RE.findall(text)
+
+
+def _line_starts(lines: List[str]) -> List[int]:
+    starts = [0]
+    for line in lines:
+        starts.append(starts[-1] + len(line))
+    return starts
+
+
+def _line_col(starts: List[int], idx: int, open_last: bool) -> Tuple[int, int]:
+    line = bisect.bisect_right(starts, idx) - 1
+    if line == len(starts) - 1 and open_last:
+        line -= 1  # EOF inside an unterminated last line
+    return line + 1, idx - starts[line] + 1
+
+
+def _narrow(old: str, new: str, a: int, b: int, c: int, d: int) -> Tuple[int, int, int, int]:
+    """Shrink old[a:b] -> new[c:d] to the differing characters, keeping \\r\\n pairs whole."""
+    limit = min(b - a, d - c)
+    p = 0
+    while p < limit and old[a + p] == new[c + p]:
+        p += 1
+    limit -= p
+    s = 0
+    while s < limit and old[b - 1 - s] == new[d - 1 - s]:
+        s += 1
+    a2, b2, c2, d2 = a + p, b - s, c + p, d - s
+    if 0 < a2 < len(old) and old[a2 - 1] == "\r" and old[a2] == "\n":
+        a2 -= 1
+        c2 -= 1
+    if 0 < b2 < len(old) and old[b2 - 1] == "\r" and old[b2] == "\n":
+        b2 += 1
+        d2 += 1
+    return a2, b2, c2, d2
+
+
+def _replay(old: str, spans: List[Tuple[int, int, str]]) -> str:
+    out = []
+    pos = 0
+    for a, b, text in spans:
+        out.append(old[pos:a])
+        out.append(text)
+        pos = b
+    out.append(old[pos:])
+    return "".join(out)
+
+
+def _index(starts: List[int], line: int, col: int, length: int) -> int:
+    if line < 1 or line > len(starts) or col < 1:
+        raise ValueError(f"position {line}:{col} is out of range")
+    return min(starts[line - 1] + col - 1, length)
+
+
+def _edit_spans(text: str, edits: List[Dict[str, Any]]) -> List[Tuple[int, int, str]]:
+    starts = _line_starts(_lines(text))
+    spans = []
+    for e in edits:
+        a = _index(starts, int(e["startLine"]), int(e["startCol"]), len(text))
+        b = _index(starts, int(e["endLine"]), int(e["endCol"]), len(text))
+        spans.append((min(a, b), max(a, b), e.get("newText") or ""))
+    spans.sort(key=lambda s: (s[0], s[1]))
+    for (_, b, _), (c, _, _) in zip(spans, spans[1:]):
+        if c < b:
+            raise ValueError("edit ranges overlap")
+    return spans
+
+
+def _to_edits(text: str, spans: List[Tuple[int, int, str]]) -> List[Dict[str, Any]]:
+    lines = _lines(text)
+    starts = _line_starts(lines)
+    open_last = bool(lines) and not lines[-1].endswith(("\n", "\r"))
+    edits: List[Dict[str, Any]] = []
+    for a, b, new_text in spans:
+        sl, sc = _line_col(starts, a, open_last)
+        el, ec = _line_col(starts, b, open_last)
+        edits.append({"startLine": sl, "startCol": sc, "endLine": el, "endCol": ec, "newText": new_text})
+    return edits
+
+
+def apply_line_col_edits(text: str, edits: List[Dict[str, Any]]) -> str:
+    """Apply apply_text_edits ranges (all relative to text) the way Unity does."""
+    return _replay(text, _edit_spans(text, edits))
+
+
+def _diff_spans(old: str, new: str, max_edits: int) -> Optional[List[Tuple[int, int, str]]]:
+    old_lines = _lines(old)
+    new_lines = _lines(new)
+    lo = 0
+    hi_old, hi_new = len(old_lines), len(new_lines)
+    while lo < hi_old and lo < hi_new and old_lines[lo] == new_lines[lo]:
+        lo += 1
+    while hi_old > lo and hi_new > lo and old_lines[hi_old - 1] == new_lines[hi_new - 1]:
+        hi_old -= 1
+        hi_new -= 1
+
+    old_starts = _line_starts(old_lines)
+    new_starts = _line_starts(new_lines)
+    matcher = difflib.SequenceMatcher(None, old_lines[lo:hi_old], new_lines[lo:hi_new], autojunk=False)
+    spans: List[Tuple[int, int, str]] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        a, b = old_starts[lo + i1], old_starts[lo + i2]
+        c, d = new_starts[lo + j1], new_starts[lo + j2]
+        a, b, c, d = _narrow(old, new, a, b, c, d)
+        spans.append((a, b, new[c:d]))
+        if len(spans) > max_edits:
+            return None
+    return spans if _replay(old, spans) == new else None
+
+
+def diff_edits(old: str, new: str, max_edits: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    """Return apply_text_edits ranges turning old into new, or None to send a full write."""
+    if old == new:
+        return []
+    max_edits = int(getattr(config, "diff_max_edits", 64) if max_edits is None else max_edits)
+    max_chars = int(getattr(config, "diff_max_chars", 4 * 1024 * 1024))
+    if len(old) + len(new) > max_chars:
+        return None
+    spans = _diff_spans(old, new, max_edits)
+    if spans is None:
+        return None
+    payload = sum(len(t) + _EDIT_OVERHEAD for _, _, t in spans)
+    if payload > len(new) * float(getattr(config, "diff_max_ratio", 0.5)):
+        return None
+    return _to_edits(old, spans)
+
+
+def _shift(pos: int, theirs: List[Tuple[int, int, str]], is_start: bool) -> int:
+    # Their changes wholly before pos move it; an insertion exactly at pos moves a start, not an end
+    delta = 0
+    for c, d, t in theirs:
+        if d < pos or (d == pos and (c < d or is_start)):
+            delta += len(t) - (d - c)
+        else:
+            break
+    return pos + delta
+
+
+def _line_span(starts: List[int], a: int, b: int) -> Tuple[int, int]:
+    first = bisect.bisect_right(starts, a) - 1
+    last = bisect.bisect_right(starts, b - 1) - 1 if b > a else first
+    return first, last
+
+
+def rebase_edits(base: str, current: str, edits: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """Three-way merge: move edits written against base onto current.
+
+    Returns ranges relative to current that make the same change, or None
+    when they touch a line that also changed between base and current (a
+    real conflict), the edits are invalid for base, or the texts are too
+    large.
+    """
+    if base == current:
+        return list(edits)
+    if len(base) + len(current) > int(getattr(config, "diff_max_chars", 4 * 1024 * 1024)):
+        return None
+    try:
+        ours = _edit_spans(base, edits)
+    except (KeyError, TypeError, ValueError):
+        return None
+    theirs = _diff_spans(base, current, max_edits=len(base) + len(current) + 1)
+    if theirs is None:
+        return None
+    # Like a line-based merge, changes touching a common line are a conflict
+    starts = _line_starts(_lines(base))
+    changed = [_line_span(starts, c, d) for c, d, _ in theirs]
+    for a, b, _ in ours:
+        first, last = _line_span(starts, a, b)
+        if any(first <= hi and lo <= last for lo, hi in changed):
+            return None
+    moved = [(_shift(a, theirs, True), _shift(b, theirs, False), t) for a, b, t in ours]
+    merged = sorted(ours + theirs, key=lambda s: (s[0], s[1]))
+    if _replay(current, moved) != _replay(base, merged):
+        return None
+    return _to_edits(current, moved)
@@ -0,0 +1,272 @@
+"""
+Local, content-addressed mirror of project scripts.
+
+The edit tools read a script before changing it (to compute line/col spans
+and the precondition sha256). When the Unity project lives on local disk,
+read_script serves that read from the filesystem instead of a
+manage_script read round trip. Entries are keyed by (mtime_ns, size) and
+carry the sha256 of the decoded text. A file whose mtime is within
+index_support.RACY_WINDOW_NS of the last check is re-read anyway, because a same-size
+rewrite inside one timestamp tick would otherwise look unchanged.
+
+The project root comes from UNITY_PROJECT_ROOT or from
+unity_project_root: a manage_editor.get_project_root call, shared with the
+resource tools (the server prefetches it after connecting) and re-asked in
+the background after config.project_root_ttl_s. read_script falls
+back to Unity's read when the mirror is disabled, no root is known, the
+file is missing, a path component is a symlink (Unity rejects those), or
+the file is not valid UTF-8.
+
+Every text the edit tools read or write is also kept by sha256 in a small
+LRU (remember_text / text_for_sha), so a stale precondition can be rebased
+from the revision the caller's edits were computed against.
+
+script_written() maps a script the tools wrote, created or deleted to its
+Assets/ path and hands it to index_support.notify_written.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import config
+from index_support import is_racy, notify_written
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+# How long a failed root lookup is remembered before asking Unity again
+_ROOT_RETRY_S = 30.0
+
+
+class _Entry:
+    __slots__ = ("mtime_ns", "size", "sha256", "contents", "checked_ns")
+
+    def __init__(self, mtime_ns: int, size: int, sha256: str, contents: str, checked_ns: int):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.sha256 = sha256
+        self.contents = contents
+        self.checked_ns = checked_ns
+
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, _Entry]" = OrderedDict()
+_stats = {"hits": 0, "loads": 0, "fallbacks": 0}
+_texts: "OrderedDict[str, str]" = OrderedDict()
+_root: Optional[Path] = None
+_root_at = 0.0
+_root_failed_at: Optional[float] = None
+_refresh_thread: Optional[threading.Thread] = None
+
+
+def _ask_unity_root(send: Callable[..., Any]) -> Optional[Path]:
+    global _root, _root_at, _root_failed_at
+    root: Optional[Path] = None
+    try:
+        resp = send("manage_editor", {"action": "get_project_root"})
+        if isinstance(resp, dict) and resp.get("success"):
+            value = (resp.get("data") or {}).get("projectRoot")
+            if value and (Path(value) / "Assets").is_dir():
+                root = Path(value).expanduser().resolve()
+    except Exception as e:
+        logger.debug(f"Script mirror could not resolve the project root: {e}")
+    with _lock:
+        if root is not None:
+            _root, _root_at, _root_failed_at = root, time.monotonic(), None
+        else:
+            _root_failed_at = time.monotonic()
+        return _root
+
+
+def _refresh_root(send: Callable[..., Any]) -> None:
+    global _refresh_thread
+    try:
+        _ask_unity_root(send)
+    finally:
+        with _lock:
+            _refresh_thread = None
+
+
+def unity_project_root(send: Callable[..., Any]) -> Optional[Path]:
+    """The project root Unity reported (manage_editor.get_project_root).
+
+    Only the first lookup waits on Unity. Once a root is known it is served
+    as is; after config.project_root_ttl_s it is re-asked on a background
+    thread, so switching the open project is picked up without a round trip
+    on the caller's path. A failed lookup is not repeated for _ROOT_RETRY_S.
+    """
+    global _refresh_thread
+    ttl = float(getattr(config, "project_root_ttl_s", 60.0))
+    now = time.monotonic()
+    with _lock:
+        retry_wait = _root_failed_at is not None and now - _root_failed_at < _ROOT_RETRY_S
+        if _root is not None:
+            if now - _root_at >= ttl and not retry_wait and _refresh_thread is None:
+                _refresh_thread = threading.Thread(target=_refresh_root, args=(send,),
+                                                   name="unity-project-root", daemon=True)
+                _refresh_thread.start()
+            return _root
+        if retry_wait:
+            return None
+    return _ask_unity_root(send)
+
+
+def known_project_root() -> Optional[Path]:
+    """The last project root Unity reported, without asking it."""
+    with _lock:
+        return _root
+
+
+def _project_root(send: Optional[Callable[..., Any]]) -> Optional[Path]:
+    # send None: only a root already known, without asking Unity
+    env = os.environ.get("UNITY_PROJECT_ROOT")
+    if env:
+        pr = Path(env).expanduser()
+        pr = (pr if pr.is_absolute() else Path.cwd() / pr).resolve()
+        return pr if (pr / "Assets").is_dir() else None
+    return unity_project_root(send) if send is not None else known_project_root()
+
+
+def _script_path(root: Path, name: str, path: Optional[str]) -> Optional[Tuple[Path, str]]:
+    # Same directory rules as ManageScript.TryResolveUnderAssets
+    if not name or any(c in name for c in "/\\:"):
+        return None  # a name is a file name, not a path; let Unity judge it
+    rel = (path or "Scripts").replace("\\", "/").strip() or "Scripts"
+    if rel.lower().startswith("assets/") or rel.lower() == "assets":
+        rel = rel[7:]
+    rel = rel.strip("/")
+    assets = root / "Assets"
+    target = assets / rel / f"{name}.cs" if rel else assets / f"{name}.cs"
+    try:
+        parts = target.relative_to(assets).parts
+    except ValueError:  # a drive-qualified path escaped Assets/
+        return None
+    current = assets
+    for part in parts:
+        if part in ("..", "."):
+            return None
+        current = current / part
+        if current.is_symlink():
+            return None
+    relative = f"Assets/{rel}/{name}.cs" if rel else f"Assets/{name}.cs"
+    return target, relative
+
+
+def _load(target: Path) -> Optional[_Entry]:
+    key = str(target)
+    try:
+        st = target.stat()
+    except OSError:
+        return None
+    now = time.time_ns()
+    with _lock:
+        entry = _entries.get(key)
+        if (entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size
+                and not is_racy(st.st_mtime_ns, entry.checked_ns)):
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return entry
+    try:
+        raw = target.read_bytes()
+        # File.ReadAllText drops a UTF-8 BOM; the sha Unity checks is over the decoded text
+        contents = raw.decode("utf-8-sig")
+    except (OSError, UnicodeDecodeError):
+        return None
+    entry = _Entry(st.st_mtime_ns, st.st_size, hashlib.sha256(contents.encode("utf-8")).hexdigest(), contents, now)
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > max(1, int(getattr(config, "script_mirror_max_entries", 64))):
+            _entries.popitem(last=False)
+        _stats["loads"] += 1
+    return entry
+
+
+def remember_text(text: str, sha256: Optional[str] = None) -> str:
+    """Keep text as the base revision for its sha256 (computed unless given); returns the sha."""
+    sha = sha256 or hashlib.sha256(text.encode("utf-8")).hexdigest()
+    limit = int(getattr(config, "rebase_base_texts", 32))
+    if limit <= 0:
+        return sha
+    with _lock:
+        _texts[sha] = text
+        _texts.move_to_end(sha)
+        while len(_texts) > limit:
+            _texts.popitem(last=False)
+    return sha
+
+
+def text_for_sha(sha256: Optional[str]) -> Optional[str]:
+    """The remembered text whose sha256 is sha256, if any."""
+    if not sha256:
+        return None
+    with _lock:
+        text = _texts.get(sha256.lower())
+        if text is not None:
+            _texts.move_to_end(sha256.lower())
+        return text
+
+
+def read_script(send: Callable[..., Any], name: str, path: Optional[str],
+                namespace: Optional[str] = None, script_type: Optional[str] = None) -> Dict[str, Any]:
+    """Read a script like manage_script.read, from disk when possible.
+
+    send is the caller's send_command_with_retry, used for the fallback read.
+    Mirror responses add data.sha256 and data.source == "mirror".
+    """
+    if getattr(config, "script_mirror_enabled", True):
+        root = _project_root(send)
+        located = _script_path(root, name, path) if root is not None else None
+        entry = _load(located[0]) if located is not None else None
+        if entry is not None:
+            relative = located[1]
+            remember_text(entry.contents, entry.sha256)
+            return {
+                "success": True,
+                "message": f"Script '{name}.cs' read from local mirror.",
+                "data": {
+                    "uri": f"unity://path/{relative}",
+                    "path": relative,
+                    "contents": entry.contents,
+                    "sha256": entry.sha256,
+                    "source": "mirror",
+                },
+            }
+    with _lock:
+        _stats["fallbacks"] += 1
+    params = {"action": "read", "name": name, "path": path, "namespace": namespace, "scriptType": script_type}
+    resp = send("manage_script", {k: v for k, v in params.items() if v is not None})
+    contents = ((resp.get("data") or {}).get("contents") if isinstance(resp, dict) and resp.get("success") else None)
+    if isinstance(contents, str):
+        remember_text(contents)
+    return resp
+
+
+def script_written(name: Optional[str], path: Optional[str]) -> None:
+    """Report a script the tools just wrote, created or deleted to the loaded indexes."""
+    root = _project_root(None)
+    located = _script_path(root, name, path) if root is not None and name else None
+    notify_written(root, located[1] if located is not None else None)
+
+
+def mirror_stats() -> Dict[str, Any]:
+    with _lock:
+        return {**_stats, "entries": len(_entries), "base_texts": len(_texts),
+                "project_root": str(_root) if _root else None}
+
+
+def reset() -> None:
+    """Forget cached files and the resolved project root."""
+    global _root, _root_at, _root_failed_at
+    with _lock:
+        _entries.clear()
+        _texts.clear()
+        _root = None
+        _root_failed_at = None
+        for k in _stats:
+            _stats[k] = 0
@@ -0,0 +1,101 @@
+"""
+Automatic rebase of apply_text_edits writes on a stale precondition.
+
+A write carries precondition_sha256, the sha of the text its ranges were
+computed against. When another edit lands first, Unity answers stale_file
+and the caller would have to re-read, recompute and resend. When the base
+text for that sha is still known (script_mirror keeps recent revisions by
+sha), send_text_edits instead reads the current text, moves the ranges
+onto it with script_diff.rebase_edits and retries once. Edits that overlap
+what changed in between are a real conflict: the original stale_file
+response is returned, marked with data.rebase == "conflict".
+
+Successful writes are reported to the indexes (script_mirror.script_written)
+and remember the resulting text, so a caller chaining edits on the sha it
+computed can be rebased as well.
+"""
+
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from config import config
+from script_mirror import read_script, remember_text, script_written, text_for_sha
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _is_stale(resp: Any) -> bool:
+    if not isinstance(resp, dict) or resp.get("success"):
+        return False
+    data = resp.get("data") if isinstance(resp.get("data"), dict) else {}
+    return "stale_file" in (resp.get("code"), data.get("status"))
+
+
+def _remember_result(params: Dict[str, Any], base: Optional[str], edits: List[Dict[str, Any]]) -> None:
+    script_written(params.get("name"), params.get("path"))
+    if base is None:
+        return
+    from script_diff import apply_line_col_edits
+    try:
+        remember_text(apply_line_col_edits(base, edits))
+    except (KeyError, TypeError, ValueError):
+        pass
+
+
+def _current_text(send: Callable[..., Any], params: Dict[str, Any], expected_sha: Optional[str]) -> Optional[str]:
+    resp = read_script(send, params.get("name"), params.get("path"), params.get("namespace"), params.get("scriptType"))
+    contents = (resp.get("data") or {}).get("contents") if isinstance(resp, dict) and resp.get("success") else None
+    if isinstance(contents, str) and expected_sha and _sha(contents) != expected_sha.lower():
+        # The local mirror lags Unity's view; ask Unity
+        fresh = {k: params[k] for k in ("name", "path", "namespace", "scriptType") if params.get(k) is not None}
+        resp = send("manage_script", {"action": "read", **fresh})
+        contents = (resp.get("data") or {}).get("contents") if isinstance(resp, dict) and resp.get("success") else None
+    if not isinstance(contents, str) or (expected_sha and _sha(contents) != expected_sha.lower()):
+        return None
+    return contents
+
+
+def send_text_edits(send: Callable[..., Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Send a manage_script apply_text_edits command, rebasing once on stale_file.
+
+    send is the caller's send_command_with_retry. A rebased response gains
+    data.rebased = {from_sha256, onto_sha256}.
+    """
+    edits = params.get("edits") or []
+    base = text_for_sha(params.get("precondition_sha256"))
+    resp = send("manage_script", params)
+    if not isinstance(resp, dict):
+        return {"success": False, "message": str(resp)}
+    if resp.get("success"):
+        _remember_result(params, base, edits)
+        return resp
+    if not _is_stale(resp) or base is None or not getattr(config, "rebase_enabled", True):
+        return resp
+
+    from script_diff import rebase_edits
+    data = resp.get("data") if isinstance(resp.get("data"), dict) else {}
+    current = _current_text(send, params, data.get("current_sha256"))
+    rebased = rebase_edits(base, current, edits) if current is not None else None
+    if rebased is None:
+        logger.info(f"Stale edit to '{params.get('name')}' overlaps newer changes; not rebased")
+        return {**resp, "data": {**data, "rebase": "conflict"}}
+
+    onto = _sha(current)
+    retry = {**params, "edits": rebased, "precondition_sha256": onto}
+    options = dict(params.get("options") or {})
+    if len(rebased) > 1:
+        options["applyMode"] = "atomic"
+    retry["options"] = options
+    resp2 = send("manage_script", retry)
+    if not isinstance(resp2, dict):
+        return {"success": False, "message": str(resp2)}
+    if resp2.get("success"):
+        _remember_result(params, current, rebased)
+        data2 = resp2.get("data") if isinstance(resp2.get("data"), dict) else {}
+        resp2 = {**resp2, "data": {**data2, "rebased": {"from_sha256": params.get("precondition_sha256"), "onto_sha256": onto}}}
+    return resp2
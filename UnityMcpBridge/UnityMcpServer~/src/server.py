@@ -1,11 +1,13 @@
 from mcp.server.fastmcp import FastMCP, Context, Image
 import logging
+import threading
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Dict, Any, List
 from config import config
 from tools import register_all_tools
-from unity_connection import get_unity_connection, UnityConnection
+from unity_connection import get_unity_connection, send_command_with_retry, UnityConnection
+from script_mirror import unity_project_root
 
 # Configure logging using settings from config
 logging.basicConfig(
@@ -17,21 +19,42 @@ logger = logging.getLogger("mcp-for-unity-server")
 # Global connection state
 _unity_connection: UnityConnection = None
 
-@asynccontextmanager
-async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
-    """Handle server startup and shutdown."""
+
+def _connect_in_background(state: Dict[str, Any]) -> None:
+    """Connect to Unity off the event loop so `initialize` is answered immediately.
+
+    Tools resolve the connection lazily through get_unity_connection(), so a
+    call arriving before this finishes simply waits on the same connection lock.
+    """
     global _unity_connection
-    logger.info("MCP for Unity Server starting up")
     try:
         _unity_connection = get_unity_connection()
+        state["bridge"] = _unity_connection
         logger.info("Connected to Unity on startup")
     except Exception as e:
         logger.warning(f"Could not connect to Unity on startup: {str(e)}")
         _unity_connection = None
+        return
+    # Prefetch the project root so resource and edit tools never wait on it
+    try:
+        root = unity_project_root(send_command_with_retry)
+        if root is not None:
+            logger.info(f"Unity project root: {root}")
+    except Exception as e:
+        logger.debug(f"Project root prefetch failed: {e}")
+
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
+    """Handle server startup and shutdown."""
+    global _unity_connection
+    logger.info("MCP for Unity Server starting up")
+    # The key 'bridge' matches how tools like read_console expect to access it (ctx.bridge);
+    # it is filled in once the background connection succeeds
+    state: Dict[str, Any] = {"bridge": None}
+    threading.Thread(target=_connect_in_background, args=(state,), name="unity-connect", daemon=True).start()
     try:
-        # Yield the connection object so it can be attached to the context
-        # The key 'bridge' matches how tools like read_console expect to access it (ctx.bridge)
-        yield {"bridge": _unity_connection}
+        yield state
     finally:
         if _unity_connection:
             _unity_connection.disconnect()
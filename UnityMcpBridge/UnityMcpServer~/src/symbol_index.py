@@ -0,0 +1,241 @@
+"""
+Project-wide C# symbol index for find_symbol and list_symbols.
+
+Every .cs file under Assets/ (from project_index) is outlined with
+csharp_outline, and its namespaces, types (class, struct, interface,
+record, enum), methods, constructors, properties and fields are recorded
+with their line spans: {name, kind, container, path, line, end_line}.
+container is the dotted namespace and enclosing types. Symbols are held in
+a dict by name, so a lookup does not touch any file.
+
+Like the trigram index, the file list comes from project_index and a file
+is re-outlined only when its (mtime, size) changed; at most every
+symbol_index_poll_s a query re-stats the indexed files, and scripts the
+tools write are re-outlined at once (index_support.notify_written). A file outlined within
+index_support.RACY_WINDOW_NS of its mtime is re-outlined on every re-stat
+until an outline lands outside that window, since a same-size rewrite in
+one timestamp tick keeps (mtime, size). Large (re)builds outline files in
+project_search's process pool, in chunks.
+
+Properties and fields come from Outline.members; like the rest of the
+outline this is a heuristic over masked source text, not a C# parser.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import config
+from csharp_outline import Outline, TypeSpan
+from index_support import Registry, is_racy
+import project_index
+import project_search
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+_CHUNK_FILES = 32
+
+Symbol = Dict[str, Any]
+
+
+def _qualify(*parts: Optional[str]) -> Optional[str]:
+    joined = ".".join(p for p in parts if p)
+    return joined or None
+
+
+def _outer_types(types: List[TypeSpan], t: TypeSpan) -> List[str]:
+    outer = [o for o in types if o.open_brace < t.open_brace and t.close_brace < o.close_brace]
+    return [o.name for o in sorted(outer, key=lambda o: o.open_brace)]
+
+
+def outline_symbols(text: str, path: str) -> List[Symbol]:
+    """Symbols declared in one file's text, in source order."""
+    outline = Outline(text)
+    out: List[Tuple[int, Symbol]] = []
+
+    def add(pos: int, end: int, name: str, kind: str, container: Optional[str]) -> None:
+        out.append((pos, {
+            "name": name, "kind": kind, "container": container, "path": path,
+            "line": outline.line_col(pos)[0], "end_line": outline.line_col(max(pos, end - 1))[0],
+        }))
+
+    for pos, name in outline.namespaces:
+        add(pos, outline.namespace_end(pos), name, "namespace", None)
+
+    for t in outline.types:
+        parent = _qualify(t.namespace, *_outer_types(outline.types, t))
+        qualified = _qualify(parent, t.name)
+        add(t.header, t.close_brace + 1, t.name, t.kind, parent)
+        for m in t.methods:
+            add(m.header, m.end, m.name, "constructor" if m.name == t.name else "method", qualified)
+        for member in outline.members(t):
+            add(member.start, member.end, member.name, member.kind, qualified)
+
+    out.sort(key=lambda item: item[0])
+    return [symbol for _, symbol in out]
+
+
+def _outline_chunk(root: str, paths: Sequence[Tuple[str, int, int]]) -> List[Tuple[str, int, int, List[Symbol]]]:
+    """Outline one chunk of (path, mtime_ns, size) entries; unreadable files get no symbols."""
+    out = []
+    for rel, mtime_ns, size in paths:
+        try:
+            with open(os.path.join(root, rel), "rb") as f:
+                text = f.read().decode("utf-8-sig", errors="replace")
+            symbols = outline_symbols(text, rel)
+        except (OSError, RecursionError, ValueError):
+            symbols = []
+        out.append((rel, mtime_ns, size, symbols))
+    return out
+
+
+class SymbolIndex:
+    """Symbols of one project's .cs files, by name and by file."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.files: Dict[str, Tuple[int, int, List[Symbol]]] = {}  # path -> (mtime_ns, size, symbols)
+        self.by_name: Dict[str, List[Symbol]] = {}
+        self.by_lower: Dict[str, set] = {}  # lower-case name -> names
+        self.racy: set = set()  # outlined too soon after their mtime to trust (mtime, size)
+        self._checked: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stats = {"outlined": 0, "queries": 0}
+
+    def _remove(self, rel: str) -> None:
+        _, _, symbols = self.files.pop(rel)
+        self.racy.discard(rel)
+        for name in {s["name"] for s in symbols}:
+            kept = [s for s in self.by_name.get(name, ()) if s["path"] != rel]
+            if kept:
+                self.by_name[name] = kept
+            else:
+                self.by_name.pop(name, None)
+                names = self.by_lower.get(name.lower())
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del self.by_lower[name.lower()]
+
+    def _add(self, rel: str, mtime_ns: int, size: int, symbols: List[Symbol]) -> None:
+        self.files[rel] = (mtime_ns, size, symbols)
+        if is_racy(mtime_ns):
+            self.racy.add(rel)
+        for s in symbols:
+            self.by_name.setdefault(s["name"], []).append(s)
+            self.by_lower.setdefault(s["name"].lower(), set()).add(s["name"])
+        self.stats["outlined"] += 1
+
+    def _outline(self, stale: List[Tuple[str, int, int]]):
+        chunks = [stale[i:i + _CHUNK_FILES] for i in range(0, len(stale), _CHUNK_FILES)]
+        pool = project_search.get_pool() if len(stale) >= int(getattr(config, "symbol_index_parallel_min_files", 64)) else None
+        if pool is not None:
+            try:
+                for result in pool.map(_outline_chunk, [self.root] * len(chunks), chunks):
+                    yield from result
+                return
+            except Exception as e:  # broken pool: finish in-process
+                logger.debug(f"Symbol index outlining in-process: {e}")
+        for chunk in chunks:
+            yield from _outline_chunk(self.root, chunk)
+
+    def refresh(self, force: bool = False) -> None:
+        listed = project_index.get_index(self.root).files(suffix=".cs")
+        with self._lock:
+            now = time.monotonic()
+            poll_s = float(getattr(config, "symbol_index_poll_s", 2.0))
+            restat = force or self._checked is None or now - self._checked >= poll_s
+            seen = set()
+            stale: List[Tuple[str, int, int]] = []
+            for entry in listed:
+                rel = entry["path"]
+                seen.add(rel)
+                known = self.files.get(rel)
+                if known is not None and not restat:
+                    continue
+                mtime_ns, size = entry["mtime_ns"], entry["size"]
+                if restat:
+                    try:
+                        st = os.stat(os.path.join(self.root, rel))
+                        mtime_ns, size = st.st_mtime_ns, st.st_size
+                    except OSError:
+                        continue
+                if known is None or (known[0], known[1]) != (mtime_ns, size) or rel in self.racy:
+                    stale.append((rel, mtime_ns, size))
+            for rel in [r for r in self.files if r not in seen]:
+                self._remove(rel)
+            for rel, mtime_ns, size, symbols in self._outline(stale):
+                if rel in self.files:
+                    self._remove(rel)
+                self._add(rel, mtime_ns, size, symbols)
+            if restat:
+                self._checked = time.monotonic()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked = None
+
+    def recheck(self, rel: str) -> None:
+        """Re-outline one .cs file just written, created or deleted, instead of at the next re-stat."""
+        if not rel.lower().endswith(".cs"):
+            return
+        with self._lock:
+            if self._checked is None:
+                return  # the next query re-stats every file anyway
+            try:
+                st = os.stat(os.path.join(self.root, rel))
+            except OSError:
+                if rel in self.files:
+                    self._remove(rel)
+                return
+            known = self.files.get(rel)
+            if known is not None and (known[0], known[1]) == (st.st_mtime_ns, st.st_size) and rel not in self.racy:
+                return
+            for path, mtime_ns, size, symbols in _outline_chunk(self.root, [(rel, st.st_mtime_ns, st.st_size)]):
+                if path in self.files:
+                    self._remove(path)
+                self._add(path, mtime_ns, size, symbols)
+
+    def find(self, name: str, kind: Optional[str] = None, container: Optional[str] = None,
+             ignore_case: bool = False) -> List[Symbol]:
+        """Symbols named name (optionally of one kind / whose container ends with container)."""
+        self.refresh()
+        with self._lock:
+            self.stats["queries"] += 1
+            names = self.by_lower.get(name.lower(), ()) if ignore_case else (name,)
+            hits = [s for n in sorted(names) for s in self.by_name.get(n, ())]
+        if kind:
+            hits = [s for s in hits if s["kind"] == kind]
+        if container:
+            hits = [s for s in hits if s["container"] and (s["container"] == container or s["container"].endswith("." + container))]
+        return sorted(hits, key=lambda s: (s["path"], s["line"]))
+
+    def symbols(self, under: str = "Assets", path: Optional[str] = None) -> List[Symbol]:
+        """Symbols of one file, or of every file under a folder, in path and line order."""
+        self.refresh()
+        prefix = under.strip("/") + "/"
+        with self._lock:
+            self.stats["queries"] += 1
+            if path is not None:
+                entry = self.files.get(path)
+                return list(entry[2]) if entry else []
+            return [s for rel in sorted(self.files) if rel.startswith(prefix) for s in self.files[rel][2]]
+
+
+_indexes: "Registry[SymbolIndex]" = Registry(SymbolIndex, recheck=SymbolIndex.recheck)
+
+
+def get_index(root) -> SymbolIndex:
+    """The shared symbol index for a project root."""
+    return _indexes.get(root)
+
+
+def invalidate(root=None) -> None:
+    """Re-stat indexed files on the next query (all indexes when root is None)."""
+    _indexes.invalidate(root)
+
+
+def reset() -> None:
+    _indexes.clear()
@@ -10,6 +10,7 @@ from .read_console import register_read_console_tools
 from .execute_menu_item import register_execute_menu_item_tools
 from .resource_tools import register_resource_tools
 from .manage_queue import register_manage_queue
+from .server_stats import register_server_stats_tools
 
 logger = logging.getLogger("mcp-for-unity-server")
 
@@ -30,4 +31,5 @@ def register_all_tools(mcp):
     register_manage_queue(mcp)
     # Expose resource wrappers as normal tools so IDEs without resources primitive can use them
     register_resource_tools(mcp)
+    register_server_stats_tools(mcp)
     logger.info("MCP for Unity Server tool registration complete.")
@@ -1,6 +1,7 @@
 from mcp.server.fastmcp import FastMCP, Context
 from typing import Dict, Any, List
 from unity_connection import get_unity_connection, send_command_with_retry
+from memory_trace import traced
 from config import config
 import time
 
@@ -8,6 +9,7 @@ def register_manage_gameobject_tools(mcp: FastMCP):
     """Register all GameObject management tools with the MCP server."""
 
     @mcp.tool()
+    @traced("tool:manage_gameobject")
     def manage_gameobject(
         ctx: Context,
         action: str,
@@ -1,7 +1,13 @@
 from mcp.server.fastmcp import FastMCP, Context
 from typing import Dict, Any, List
 from unity_connection import send_command_with_retry
+from memory_trace import traced
+from script_mirror import read_script
+import edit_coalescer
+from script_rebase import send_text_edits
+from script_mirror import remember_text, script_written
 import base64
+import hashlib
 import os
 from urllib.parse import urlparse, unquote
 
@@ -80,6 +86,7 @@ def register_manage_script_tools(mcp: FastMCP):
         "- For method/class operations, use script_apply_edits (safer, structured edits)\n"
         "- For pattern-based replacements, consider anchor operations in script_apply_edits\n"
     ))
+    @traced("tool:apply_text_edits")
     def apply_text_edits(
         ctx: Context,
         uri: str,
@@ -90,6 +97,8 @@ def register_manage_script_tools(mcp: FastMCP):
     ) -> Dict[str, Any]:
         """Apply small text edits to a C# script identified by URI."""
         name, directory = _split_uri(uri)
+        # Ranges and preconditions refer to the file on disk, so queued coalesced edits land first
+        edit_coalescer.flush()
 
         # Normalize common aliases/misuses for resilience:
         # - Accept LSP-style range objects: {range:{start:{line,character}, end:{...}}, newText|text}
@@ -105,11 +114,7 @@ def register_manage_script_tools(mcp: FastMCP):
         warnings: List[str] = []
         if _needs_normalization(edits):
             # Read file to support index->line/col conversion when needed
-            read_resp = send_command_with_retry("manage_script", {
-                "action": "read",
-                "name": name,
-                "path": directory,
-            })
+            read_resp = read_script(send_command_with_retry, name, directory)
             if not (isinstance(read_resp, dict) and read_resp.get("success")):
                 return read_resp if isinstance(read_resp, dict) else {"success": False, "message": str(read_resp)}
             data = read_resp.get("data", {})
@@ -300,7 +305,8 @@ def register_manage_script_tools(mcp: FastMCP):
             "options": opts,
         }
         params = {k: v for k, v in params.items() if v is not None}
-        resp = send_command_with_retry("manage_script", params)
+        # A stale precondition is rebased onto the current text once when the edits do not conflict
+        resp = send_text_edits(send_command_with_retry, params)
         if isinstance(resp, dict):
             data = resp.setdefault("data", {})
             data.setdefault("normalizedEdits", normalized_edits)
@@ -378,6 +384,7 @@ def register_manage_script_tools(mcp: FastMCP):
             params["contentsEncoded"] = True
         params = {k: v for k, v in params.items() if v is not None}
         resp = send_command_with_retry("manage_script", params)
+        script_written(name, directory)
         return resp if isinstance(resp, dict) else {"success": False, "message": str(resp)}
 
     @mcp.tool(description=(
@@ -390,8 +397,10 @@ def register_manage_script_tools(mcp: FastMCP):
         name, directory = _split_uri(uri)
         if not directory or directory.split("/")[0].lower() != "assets":
             return {"success": False, "code": "path_outside_assets", "message": "URI must resolve under 'Assets/'."}
+        edit_coalescer.flush()
         params = {"action": "delete", "name": name, "path": directory}
         resp = send_command_with_retry("manage_script", params)
+        script_written(name, directory)
         return resp if isinstance(resp, dict) else {"success": False, "message": str(resp)}
 
     @mcp.tool(description=(
@@ -409,6 +418,7 @@ def register_manage_script_tools(mcp: FastMCP):
             return {"success": False, "code": "path_outside_assets", "message": "URI must resolve under 'Assets/'."}
         if level not in ("basic", "standard"):
             return {"success": False, "code": "bad_level", "message": "level must be 'basic' or 'standard'."}
+        edit_coalescer.flush()
         params = {
             "action": "validate",
             "name": name,
@@ -421,9 +431,11 @@ def register_manage_script_tools(mcp: FastMCP):
     @mcp.tool(description=(
         "Compatibility router for legacy script operations.\n\n"
         "Actions: create|read|delete (update is routed to apply_text_edits with precondition).\n"
-        "Args: name (no .cs), path (Assets/...), contents (for create), script_type, namespace.\n"
+        "Args: name (no .cs), path (Assets/...), contents (for create), script_type, namespace,\n"
+        "if_none_match (read: sha256 from an earlier read; unchanged scripts return not_modified without contents).\n"
         "Notes: prefer apply_text_edits (ranges) or script_apply_edits (structured) for edits.\n"
     ))
+    @traced("tool:manage_script")
     def manage_script(
         ctx: Context,
         action: str,
@@ -432,6 +444,7 @@ def register_manage_script_tools(mcp: FastMCP):
         contents: str = "",
         script_type: str | None = None,
         namespace: str | None = None,
+        if_none_match: str | None = None,
     ) -> Dict[str, Any]:
         """Compatibility router for legacy script operations.
 
@@ -446,20 +459,19 @@ def register_manage_script_tools(mcp: FastMCP):
             contents: C# code for 'create'/'update'.
             script_type: Type hint (e.g., 'MonoBehaviour').
             namespace: Script namespace.
+            if_none_match: For 'read', a sha256 from an earlier read; when the
+                script still has it, data is just {not_modified, sha256}.
 
         Returns:
             Dictionary with results ('success', 'message', 'data').
         """
+        edit_coalescer.flush()
         try:
             # Graceful migration for legacy 'update': route to apply_text_edits (whole-file replace)
             if action == 'update':
                 try:
                     # 1) Read current contents to compute end range and precondition
-                    read_resp = send_command_with_retry("manage_script", {
-                        "action": "read",
-                        "name": name,
-                        "path": path,
-                    })
+                    read_resp = read_script(send_command_with_retry, name, path)
                     if not (isinstance(read_resp, dict) and read_resp.get("success")):
                         return {"success": False, "code": "deprecated_update", "message": "Use apply_text_edits; automatic migration failed to read current file."}
                     data = read_resp.get("data", {})
@@ -471,18 +483,21 @@ def register_manage_script_tools(mcp: FastMCP):
 
                     # 2) Compute whole-file range (1-based, end exclusive) and SHA
                     import hashlib as _hashlib
+                    from script_diff import diff_edits
                     old_lines = current.splitlines(keepends=True)
                     end_line = len(old_lines) + 1
                     sha = _hashlib.sha256(current.encode("utf-8")).hexdigest()
 
-                    # 3) Apply single whole-file text edit with provided 'contents'
-                    edits = [{
-                        "startLine": 1,
-                        "startCol": 1,
-                        "endLine": end_line,
-                        "endCol": 1,
-                        "newText": contents or "",
-                    }]
+                    # 3) Apply the changed ranges, or a single whole-file text edit when the diff is not worth it
+                    edits = diff_edits(current, contents or "")
+                    if not edits:
+                        edits = [{
+                            "startLine": 1,
+                            "startCol": 1,
+                            "endLine": end_line,
+                            "endCol": 1,
+                            "newText": contents or "",
+                        }]
                     route_params = {
                         "action": "apply_text_edits",
                         "name": name,
@@ -491,6 +506,8 @@ def register_manage_script_tools(mcp: FastMCP):
                         "precondition_sha256": sha,
                         "options": {"refresh": "debounced", "validate": "standard"},
                     }
+                    if len(edits) > 1:
+                        route_params["options"]["applyMode"] = "atomic"
                     # Preflight size vs. default cap (256 KiB) to avoid opaque server errors
                     try:
                         import json as _json
@@ -507,6 +524,22 @@ def register_manage_script_tools(mcp: FastMCP):
                 except Exception as e:
                     return {"success": False, "code": "deprecated_update", "message": f"Use apply_text_edits; migration error: {e}"}
 
+            if action == "read" and if_none_match:
+                # Conditional read: the local mirror keeps each script's sha256 by (mtime, size)
+                resp = read_script(send_command_with_retry, name, path, namespace, script_type)
+                if not (isinstance(resp, dict) and resp.get("success")):
+                    return resp if isinstance(resp, dict) else {"success": False, "message": str(resp)}
+                data = dict(resp.get("data") or {})
+                if data.get("contentsEncoded"):
+                    data["contents"] = base64.b64decode(data.pop("encodedContents")).decode("utf-8")
+                    del data["contentsEncoded"]
+                sha = data.get("sha256")
+                if not sha and isinstance(data.get("contents"), str):
+                    sha = data["sha256"] = hashlib.sha256(data["contents"].encode("utf-8")).hexdigest()
+                if sha and sha == if_none_match.strip().lower():
+                    return {"success": True, "message": "Not modified.", "data": {"not_modified": True, "sha256": sha}}
+                return {"success": True, "message": resp.get("message", "Operation successful."), "data": data}
+
             # Prepare parameters for Unity
             params = {
                 "action": action,
@@ -527,6 +560,8 @@ def register_manage_script_tools(mcp: FastMCP):
             params = {k: v for k, v in params.items() if v is not None}
 
             response = send_command_with_retry("manage_script", params)
+            if action in ("create", "update", "delete"):
+                script_written(name, path)
 
             if isinstance(response, dict):
                 if response.get("success"):
@@ -535,6 +570,8 @@ def register_manage_script_tools(mcp: FastMCP):
                         response["data"]["contents"] = decoded_contents
                         del response["data"]["encodedContents"]
                         del response["data"]["contentsEncoded"]
+                    if action == "read" and isinstance(response["data"].get("contents"), str):
+                        remember_text(response["data"]["contents"])  # base for later precondition rebases
 
                     return {
                         "success": True,
@@ -586,6 +623,7 @@ def register_manage_script_tools(mcp: FastMCP):
         """Return SHA256 and basic metadata for a script."""
         try:
             name, directory = _split_uri(uri)
+            edit_coalescer.flush()
             params = {"action": "get_sha", "name": name, "path": directory}
             resp = send_command_with_retry("manage_script", params)
             return resp if isinstance(resp, dict) else {"success": False, "message": str(resp)}
@@ -1,13 +1,200 @@
 from mcp.server.fastmcp import FastMCP, Context
 from typing import Dict, Any, List, Tuple
 import base64
+import bisect
 import re
 import os
 from unity_connection import send_command_with_retry
+from memory_trace import traced
+from regex_cache import compile_pattern, time_limit
+from script_mirror import read_script, script_written
+import edit_coalescer
+from script_rebase import send_text_edits
+
+# $1, $2... backreferences in replacement text (our input syntax)
+_DOLLAR_BACKREF_RE = re.compile(r"\$(\d+)")
+
+
+class _PieceTable:
+    """Piece-table document for a batch of local edits.
+
+    The text is a list of (source, start, end) pieces over immutable strings
+    (the original file and each inserted snippet). replace() locates the
+    affected pieces by bisecting piece offsets and splices only the piece
+    list, so edits never copy the file. text() materializes the document and
+    caches the result until the next edit; ops that need a flat string
+    (regex searches) use that cache. Slicing (doc[lo:hi]) and len() work like
+    str, which is what _LineIndex relies on.
+    """
+
+    def __init__(self, text: str = ""):
+        self._pieces: List[Tuple[str, int, int]] = [(text, 0, len(text))] if text else []
+        self._starts: List[int] = [0] if text else []
+        self._length = len(text)
+        self._text: str | None = text
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _locate(self, pos: int) -> int:
+        return min(max(bisect.bisect_right(self._starts, pos) - 1, 0), len(self._pieces) - 1)
+
+    def replace(self, a: int, b: int, insert: str) -> None:
+        """self = self[:a] + insert + self[b:] (a > b duplicates self[b:a], as str slicing would)."""
+        a = min(max(a, 0), self._length)
+        b = min(max(b, 0), self._length)
+        if not self._pieces:
+            self._pieces = [(insert, 0, len(insert))] if insert else []
+            self._starts = [0] if insert else []
+            self._length = len(insert)
+            self._text = insert
+            return
+        i = self._locate(a)
+        j = self._locate(b)
+        src_i, st_i, _ = self._pieces[i]
+        src_j, st_j, en_j = self._pieces[j]
+        middle = [
+            (src_i, st_i, st_i + (a - self._starts[i])),
+            (insert, 0, len(insert)),
+            (src_j, st_j + (b - self._starts[j]), en_j),
+        ]
+        new = self._pieces[:i] + [pc for pc in middle if pc[2] > pc[1]] + self._pieces[j + 1:]
+        # Offsets before the first touched piece are unchanged; recompute the rest
+        starts = self._starts[:i]
+        pos = self._starts[i]
+        for _, st, en in new[i:]:
+            starts.append(pos)
+            pos += en - st
+        self._pieces = new
+        self._starts = starts
+        self._length = pos
+        self._text = None
+
+    def text(self) -> str:
+        if self._text is None:
+            if len(self._pieces) == 1 and self._pieces[0][1] == 0 and self._pieces[0][2] == len(self._pieces[0][0]):
+                self._text = self._pieces[0][0]
+            else:
+                self._text = "".join(src[st:en] for src, st, en in self._pieces)
+            if len(self._pieces) > 1:
+                # Collapse so later lookups and slices stay cheap
+                self._pieces = [(self._text, 0, self._length)] if self._text else []
+                self._starts = [0] if self._text else []
+        return self._text
+
+    def __getitem__(self, key: slice) -> str:
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("_PieceTable supports contiguous slices only")
+        lo, hi, _ = key.indices(self._length)
+        if hi <= lo:
+            return ""
+        if self._text is not None:
+            return self._text[lo:hi]
+        out = []
+        i = self._locate(lo)
+        while i < len(self._pieces) and self._starts[i] < hi:
+            src, st, en = self._pieces[i]
+            off = self._starts[i]
+            out.append(src[st + max(0, lo - off): st + min(en - st, hi - off)])
+            i += 1
+        return "".join(out)
+
+
+class _LineIndex:
+    """Line-start offsets of a text, kept in sync across local edits.
+
+    Line boundaries follow str.splitlines(keepends=True), so offsets match the
+    previous per-edit re-split exactly. Starts are stored in blocks relative to
+    a per-block base: a splice re-splits only the lines around the edited span
+    and shifts the bases of later blocks, so an edit costs O(edit + n/_BLOCK)
+    rather than a full re-split of the text. Lookups bisect the block bases.
+    """
+
+    _BLOCK = 256
+
+    def __init__(self, text: str):
+        self._set_blocks(0, 0, self._split_starts(text, 0), [], [])
+
+    @staticmethod
+    def _split_starts(segment: str, base: int) -> List[int]:
+        starts = []
+        pos = base
+        for line in segment.splitlines(keepends=True):
+            starts.append(pos)
+            pos += len(line)
+        return starts
+
+    def _set_blocks(self, b_lo: int, b_hi: int, flat: List[int], bases: List[int], blocks: List[List[int]]) -> None:
+        """Replace blocks [b_lo, b_hi) of (bases, blocks) with `flat` absolute starts."""
+        new_bases: List[int] = []
+        new_blocks: List[List[int]] = []
+        for i in range(0, len(flat), self._BLOCK):
+            chunk = flat[i:i + self._BLOCK]
+            base = chunk[0]
+            new_bases.append(base)
+            new_blocks.append([v - base for v in chunk])
+        self.bases = bases[:b_lo] + new_bases + bases[b_hi:]
+        self.blocks = blocks[:b_lo] + new_blocks + blocks[b_hi:]
+        self.firsts: List[int] = []
+        count = 0
+        for block in self.blocks:
+            self.firsts.append(count)
+            count += len(block)
+        self.line_count = count
+
+    def _start(self, i: int) -> int:
+        b = bisect.bisect_right(self.firsts, i) - 1
+        return self.bases[b] + self.blocks[b][i - self.firsts[b]]
+
+    def _line_at(self, pos: int) -> int:
+        """0-based index of the last line starting at or before pos (-1 if none)."""
+        b = bisect.bisect_right(self.bases, pos) - 1
+        if b < 0:
+            return -1
+        return self.firsts[b] + bisect.bisect_right(self.blocks[b], pos - self.bases[b]) - 1
+
+    def offset(self, line: int, col: int, text_len: int) -> int:
+        """Index of 1-based (line, col); lines past the end map to text_len."""
+        if line <= self.line_count:
+            return self._start(line - 1) + (col - 1)
+        return text_len
+
+    def update(self, new_text: "str | _PieceTable", a: int, b: int, inserted_len: int) -> None:
+        """Account for new_text == old[:a] + inserted + old[b:]."""
+        if not self.line_count:
+            self._set_blocks(0, 0, self._split_starts(new_text[0:len(new_text)], 0), [], [])
+            return
+        delta = inserted_len - (b - a)
+        # Re-split from the line before the edit (a trailing '\r' there may pair with an
+        # inserted '\n') up to the first line start after b, which is unaffected.
+        # (a > b is possible for inverted columns on one line; old[min:max] is then duplicated)
+        i_lo = max(0, self._line_at(min(a, b)) - 1)
+        k = self._line_at(max(a, b)) + 1
+        lo = self._start(i_lo)
+        hi = self._start(k) + delta if k < self.line_count else len(new_text)
+        middle = self._split_starts(new_text[lo:hi], lo)
+
+        b_lo = bisect.bisect_right(self.firsts, i_lo) - 1
+        b_hi = bisect.bisect_right(self.firsts, k - 1)  # exclusive
+        flat = [self.bases[x] + r for x in range(b_lo, b_hi) for r in self.blocks[x]]
+        first = self.firsts[b_lo]
+        flat = flat[:i_lo - first] + middle + [v + delta for v in flat[k - first:]]
+        bases = self.bases
+        if delta:
+            bases = bases[:b_hi] + [v + delta for v in bases[b_hi:]]
+        self._set_blocks(b_lo, b_hi, flat, bases, self.blocks)
 
 
 def _apply_edits_locally(original_text: str, edits: List[Dict[str, Any]]) -> str:
-    text = original_text
+    doc = _PieceTable(original_text)
+    # Built lazily on the first replace_range; dropped after ops that rewrite arbitrary spans
+    line_index: _LineIndex | None = None
+
+    def splice(a: int, b: int, insert: str) -> None:
+        doc.replace(a, b, insert)
+        if line_index is not None:
+            line_index.update(doc, a, b, len(insert))
+
     for edit in edits or []:
         op = (
             (edit.get("op")
@@ -27,14 +214,14 @@ def _apply_edits_locally(original_text: str, edits: List[Dict[str, Any]]) -> str
 
         if op == "prepend":
             prepend_text = edit.get("text", "")
-            text = (prepend_text if prepend_text.endswith("\n") else prepend_text + "\n") + text
+            splice(0, 0, prepend_text if prepend_text.endswith("\n") else prepend_text + "\n")
         elif op == "append":
             append_text = edit.get("text", "")
-            if not text.endswith("\n"):
-                text += "\n"
-            text += append_text
-            if not text.endswith("\n"):
-                text += "\n"
+            end = len(doc)
+            suffix = ("" if doc[end - 1:end] == "\n" else "\n") + append_text
+            if suffix and not suffix.endswith("\n"):
+                suffix += "\n"
+            splice(end, end, suffix)
         elif op == "anchor_insert":
             anchor = edit.get("anchor", "")
             position = (edit.get("position") or "before").lower()
@@ -42,45 +229,47 @@ def _apply_edits_locally(original_text: str, edits: List[Dict[str, Any]]) -> str
             flags = re.MULTILINE | (re.IGNORECASE if edit.get("ignore_case") else 0)
             
             # Find the best match using improved heuristics
-            match = _find_best_anchor_match(anchor, text, flags, bool(edit.get("prefer_last", True)))
+            match = _find_best_anchor_match(anchor, doc.text(), flags, bool(edit.get("prefer_last", True)))
             if not match:
                 if edit.get("allow_noop", True):
                     continue
                 raise RuntimeError(f"anchor not found: {anchor}")
             idx = match.start() if position == "before" else match.end()
-            text = text[:idx] + insert_text + text[idx:]
+            splice(idx, idx, insert_text)
         elif op == "replace_range":
             start_line = int(edit.get("startLine", 1))
             start_col  = int(edit.get("startCol", 1))
             end_line   = int(edit.get("endLine", start_line))
             end_col    = int(edit.get("endCol", 1))
             replacement = edit.get("text", "")
-            lines = text.splitlines(keepends=True)
-            max_line = len(lines) + 1  # 1-based, exclusive end
+            if line_index is None:
+                line_index = _LineIndex(doc.text())
+            max_line = line_index.line_count + 1  # 1-based, exclusive end
             if (start_line < 1 or end_line < start_line or end_line > max_line
                     or start_col < 1 or end_col < 1):
                 raise RuntimeError("replace_range out of bounds")
-            def index_of(line: int, col: int) -> int:
-                if line <= len(lines):
-                    return sum(len(l) for l in lines[: line - 1]) + (col - 1)
-                return sum(len(l) for l in lines)
-            a = index_of(start_line, start_col)
-            b = index_of(end_line, end_col)
-            text = text[:a] + replacement + text[b:]
+            a = line_index.offset(start_line, start_col, len(doc))
+            b = line_index.offset(end_line, end_col, len(doc))
+            splice(a, b, replacement)
         elif op == "regex_replace":
             pattern = edit.get("pattern", "")
             repl = edit.get("replacement", "")
             # Translate $n backrefs (our input) to Python \g<n>
-            repl_py = re.sub(r"\$(\d+)", r"\\g<\1>", repl)
+            repl_py = _DOLLAR_BACKREF_RE.sub(r"\\g<\1>", repl)
             count = int(edit.get("count", 0))  # 0 = replace all
             flags = re.MULTILINE
             if edit.get("ignore_case"):
                 flags |= re.IGNORECASE
-            text = re.sub(pattern, repl_py, text, count=count, flags=flags)
+            regex_obj = compile_pattern(pattern, flags)
+            with time_limit():
+                new_text, replaced = regex_obj.subn(repl_py, doc.text(), count=count)
+            if replaced:
+                doc = _PieceTable(new_text)
+                line_index = None
         else:
             allowed = "anchor_insert, prepend, append, replace_range, regex_replace"
             raise RuntimeError(f"unknown edit op: {op}; allowed: {allowed}. Use 'op' (aliases accepted: type/mode/operation).")
-    return text
+    return doc.text()
 
 
 def _find_best_anchor_match(pattern: str, text: str, flags: int, prefer_last: bool = True):
@@ -103,10 +292,10 @@ def _find_best_anchor_match(pattern: str, text: str, flags: int, prefer_last: bo
     Returns:
         Match object of the best match, or None if no match found
     """
-    import re
-    
     # Find all matches
-    matches = list(re.finditer(pattern, text, flags))
+    regex_obj = compile_pattern(pattern, flags)
+    with time_limit():
+        matches = list(regex_obj.finditer(text))
     if not matches:
         return None
     
@@ -118,13 +307,20 @@ def _find_best_anchor_match(pattern: str, text: str, flags: int, prefer_last: bo
     is_closing_brace_pattern = '}' in pattern and ('$' in pattern or pattern.endswith(r'\s*'))
     
     if is_closing_brace_pattern and prefer_last:
+        # Ignore braces inside comments/strings when any real ones matched
+        from csharp_outline import get_outline
+        outline = get_outline(text)
+        in_code = [m for m in matches if outline.is_code(m.start() + max(0, m.group(0).find('}')))]
         # Use heuristics to find the best closing brace match
-        return _find_best_closing_brace_match(matches, text)
+        return _find_best_closing_brace_match(in_code or matches, text)
     
     # Default behavior: use last match if prefer_last, otherwise first match
     return matches[-1] if prefer_last else matches[0]
 
 
+_METHOD_SIGNATURE_RE = re.compile(r'\b(void|public|private|protected)\s+\w+\s*\(')
+
+
 def _find_best_closing_brace_match(matches, text: str):
     """
     Find the best closing brace match using C# structure heuristics.
@@ -145,51 +341,52 @@ def _find_best_closing_brace_match(matches, text: str):
     """
     if not matches:
         return None
-        
-    scored_matches = []
+
+    # Per-line facts are computed once so each candidate scores in O(log n)
+    # instead of re-counting newlines and re-scanning its context lines.
     lines = text.splitlines()
-    
+    line_count = len(lines)
+    newlines = [m.start() for m in re.finditer('\n', text)]
+    signature_prefix = [0]
+    for line in lines:
+        signature_prefix.append(signature_prefix[-1] + (1 if _METHOD_SIGNATURE_RE.search(line) else 0))
+
+    best_match = None
+    best_score = None
     for match in matches:
         score = 0
         start_pos = match.start()
-        
-        # Find which line this match is on
-        lines_before = text[:start_pos].count('\n')
-        line_num = lines_before
-        
-        if line_num < len(lines):
+
+        # Find which line this match is on (number of '\n' before it)
+        line_num = bisect.bisect_left(newlines, start_pos)
+
+        if line_num < line_count:
             line_content = lines[line_num]
-            
+
             # Calculate indentation level (lower is better for class braces)
             indentation = len(line_content) - len(line_content.lstrip())
-            
+
             # Prefer lower indentation (class braces are typically less indented than method braces)
             score += max(0, 20 - indentation)  # Max 20 points for indentation=0
-            
+
             # Prefer matches closer to end of file (class closing braces are typically at the end)
-            distance_from_end = len(lines) - line_num
+            distance_from_end = line_count - line_num
             score += max(0, 10 - distance_from_end)  # More points for being closer to end
-            
-            # Look at surrounding context to avoid method braces
+
+            # Penalize if this looks like it's inside a method (method signatures in the lines around it)
             context_start = max(0, line_num - 3)
-            context_end = min(len(lines), line_num + 2) 
-            context_lines = lines[context_start:context_end]
-            
-            # Penalize if this looks like it's inside a method (has method-like patterns above)
-            for context_line in context_lines:
-                if re.search(r'\b(void|public|private|protected)\s+\w+\s*\(', context_line):
-                    score -= 5  # Penalty for being near method signatures
-                    
+            context_end = min(line_count, line_num + 2)
+            score -= 5 * (signature_prefix[context_end] - signature_prefix[context_start])
+
             # Bonus if this looks like a class-ending brace (very minimal indentation and near EOF)
             if indentation <= 4 and distance_from_end <= 3:
                 score += 15  # Bonus for likely class-ending brace
-        
-        scored_matches.append((score, match))
-    
-    # Return the match with the highest score
-    scored_matches.sort(key=lambda x: x[0], reverse=True)
-    best_match = scored_matches[0][1]
-    
+
+        # Strictly greater keeps the earliest of equally scored matches
+        if best_score is None or score > best_score:
+            best_score = score
+            best_match = match
+
     return best_match
 
 
@@ -292,6 +489,98 @@ def _err(code: str, message: str, *, expected: Dict[str, Any] | None = None, rew
         payload["data"] = data
     return payload
 
+def _apply_method_edits_locally(name: str, path: str, namespace: str, script_type: str,
+                                edits: List[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Resolve replace/insert/delete_method edits locally and send them as one apply_text_edits.
+
+    Returns None when the batch cannot be resolved locally (unsupported op,
+    ambiguous target, sequential mode, read failure) so the caller falls back
+    to Unity's structured editor.
+    """
+    from csharp_outline import LOCAL_METHOD_OPS, OutlineError, resolve_method_edits
+
+    if (options.get("applyMode") or "").lower() == "sequential":
+        return None
+    if not all((e.get("op") or "").lower() in LOCAL_METHOD_OPS for e in edits):
+        return None
+    read_resp = read_script(send_command_with_retry, name, path, namespace, script_type)
+    if not isinstance(read_resp, dict) or not read_resp.get("success"):
+        return None
+    data = read_resp.get("data") or {}
+    contents = data.get("contents")
+    if contents is None and data.get("contentsEncoded") and data.get("encodedContents"):
+        contents = base64.b64decode(data["encodedContents"]).decode("utf-8")
+    if contents is None:
+        return None
+    try:
+        at_edits = resolve_method_edits(contents, edits)
+    except OutlineError:
+        return None
+
+    import hashlib
+    params: Dict[str, Any] = {
+        "action": "apply_text_edits",
+        "name": name,
+        "path": path,
+        "namespace": namespace,
+        "scriptType": script_type,
+        "edits": at_edits,
+        "precondition_sha256": hashlib.sha256(contents.encode("utf-8")).hexdigest(),
+        "options": {
+            "refresh": options.get("refresh", "immediate"),
+            "validate": options.get("validate", "standard"),
+            "applyMode": "atomic" if len(at_edits) > 1 else "sequential",
+        },
+    }
+    resp = send_text_edits(send_command_with_retry, params)
+    return resp if isinstance(resp, dict) else {"success": False, "message": str(resp)}
+
+_BATCH_TEXT_OPS = {"anchor_insert", "prepend", "append", "replace_range", "regex_replace"}
+
+
+def _edit_op(edit: Dict[str, Any]) -> str:
+    return (edit.get("op") or edit.get("operation") or edit.get("type") or edit.get("mode") or "").strip().lower()
+
+
+def _apply_batch_file_edits(contents: str, edits: List[Dict[str, Any]], class_name: str) -> str:
+    """Apply one file's batch edits locally and return the new text.
+
+    Consecutive method ops are resolved together with the C# outline (atomic
+    against the text at that point); consecutive text ops go through
+    _apply_edits_locally. Raises RuntimeError/OutlineError on anything that
+    cannot be applied locally.
+    """
+    from csharp_outline import LOCAL_METHOD_OPS, resolve_method_spans
+
+    text = contents
+    i = 0
+    while i < len(edits):
+        is_method = _edit_op(edits[i]) in LOCAL_METHOD_OPS
+        j = i
+        while j < len(edits) and (_edit_op(edits[j]) in LOCAL_METHOD_OPS) == is_method:
+            op = _edit_op(edits[j])
+            if not is_method and op not in _BATCH_TEXT_OPS:
+                allowed = ", ".join(sorted(LOCAL_METHOD_OPS | _BATCH_TEXT_OPS))
+                raise RuntimeError(f"op '{op}' is not supported in batches; allowed: {allowed}")
+            j += 1
+        run = [dict(e, op=_edit_op(e)) for e in edits[i:j]]
+        if is_method:
+            for e in run:
+                e.setdefault("className", class_name)
+            parts = []
+            pos = 0
+            for start, end, new_text in resolve_method_spans(text, run):
+                parts.append(text[pos:start])
+                parts.append(new_text)
+                pos = end
+            parts.append(text[pos:])
+            text = "".join(parts)
+        else:
+            text = _apply_edits_locally(text, run)
+        i = j
+    return text
+
+
 # Natural-language parsing removed; clients should send structured edits.
 
 
@@ -303,7 +592,11 @@ def register_manage_script_edits_tools(mcp: FastMCP):
         "- Use replace_method/delete_method for whole-method changes (keeps signatures balanced)\n"
         "- Avoid whole-file regex deletes; validators will guard unbalanced braces\n"
         "- For tail insertions, prefer anchor/regex_replace on final brace (class closing)\n"
-        "- Pass options.validate='standard' for structural checks; 'relaxed' for interior-only edits\n\n"
+        "- Pass options.validate='standard' for structural checks; 'relaxed' for interior-only edits\n"
+        "- Pass options.resolve='local' to resolve method ops on the server into one precise apply_text_edits\n"
+        "- Pass options.coalesce=true for bursts of small text edits: edits to one script within "
+        "coalesce_window_ms are written together with one refresh; such results are status='pending' (queued, not yet "
+        "written) with expected_sha256, and a failed write is reported on the next edit of that script\n\n"
         "Canonical fields (use these exact keys):\n"
         "- op: replace_method | insert_method | delete_method | anchor_insert | anchor_delete | anchor_replace\n"
         "- className: string (defaults to 'name' if omitted on method/class ops)\n"
@@ -326,6 +619,7 @@ def register_manage_script_edits_tools(mcp: FastMCP):
         "    'position':'after','afterMethodName':'GetCurrentTarget' }\n"
         "] }\n"
     ))
+    @traced("tool:script_apply_edits")
     def script_apply_edits(
         ctx: Context,
         name: str,
@@ -531,6 +825,21 @@ def register_manage_script_edits_tools(mcp: FastMCP):
         all_text = ops_set.issubset(TEXT)
         mixed = not (all_struct or all_text)
 
+        # Opt-in coalescing: text edits chain onto the script's open window instead of being written now.
+        # Anything else that touches the script writes the window first.
+        coalesce = all_text and edit_coalescer.coalesce_window(options) > 0
+        if not coalesce:
+            edit_coalescer.flush(name, path)
+        failed_window = edit_coalescer.take_error(name, path)
+        if failed_window is not None:
+            return _with_norm(failed_window, normalized_for_echo, routing="text/coalesced")
+
+        # Opt-in: resolve method ops against a local outline and send one apply_text_edits
+        if all_struct and (options or {}).get("resolve") == "local":
+            resp_local = _apply_method_edits_locally(name, path, namespace, script_type, edits, options or {})
+            if resp_local is not None:
+                return _with_norm(resp_local, normalized_for_echo, routing="structured/local")
+
         # If everything is structured (method/class/anchor ops), forward directly to Unity's structured editor.
         if all_struct:
             opts2 = dict(options or {})
@@ -547,17 +856,15 @@ def register_manage_script_edits_tools(mcp: FastMCP):
             }
             resp_struct = send_command_with_retry("manage_script", params_struct)
             if isinstance(resp_struct, dict) and resp_struct.get("success"):
-                pass  # Optional sentinel reload removed (deprecated)
+                script_written(name, path)
             return _with_norm(resp_struct if isinstance(resp_struct, dict) else {"success": False, "message": str(resp_struct)}, normalized_for_echo, routing="structured")
 
-        # 1) read from Unity
-        read_resp = send_command_with_retry("manage_script", {
-            "action": "read",
-            "name": name,
-            "path": path,
-            "namespace": namespace,
-            "scriptType": script_type,
-        })
+        # 1) read current contents (local mirror when the project is on disk, else Unity)
+        pending = edit_coalescer.pending_text(name, path) if coalesce else None
+        if pending is not None:
+            read_resp = {"success": True, "data": {"contents": pending}}
+        else:
+            read_resp = read_script(send_command_with_retry, name, path, namespace, script_type)
         if not isinstance(read_resp, dict) or not read_resp.get("success"):
             return read_resp if isinstance(read_resp, dict) else {"success": False, "message": str(read_resp)}
 
@@ -568,9 +875,6 @@ def register_manage_script_edits_tools(mcp: FastMCP):
         if contents is None:
             return {"success": False, "message": "No contents returned from Unity read."}
 
-        # Optional preview/dry-run: apply locally and return diff without writing
-        preview = bool((options or {}).get("preview"))
-
         # If we have a mixed batch (TEXT + STRUCT), apply text first with precondition, then structured
         if mixed:
             text_edits = [e for e in edits or [] if (e.get("op") or "").lower() in TEXT]
@@ -623,15 +927,16 @@ def register_manage_script_edits_tools(mcp: FastMCP):
                     elif opx == "regex_replace":
                         pattern = e.get("pattern") or ""
                         try:
-                            regex_obj = _re.compile(pattern, _re.MULTILINE | (_re.IGNORECASE if e.get("ignore_case") else 0))
+                            regex_obj = compile_pattern(pattern, _re.MULTILINE | (_re.IGNORECASE if e.get("ignore_case") else 0))
+                            with time_limit():
+                                m = regex_obj.search(base_text)
                         except Exception as ex:
                             return _with_norm(_err("bad_regex", f"Invalid regex pattern: {ex}", normalized=normalized_for_echo, routing="mixed/text-first", extra={"hint": "Escape special chars or prefer structured delete for methods."}), normalized_for_echo, routing="mixed/text-first")
-                        m = regex_obj.search(base_text)
                         if not m:
                             continue
                         # Expand $1, $2... in replacement using this match
                         def _expand_dollars(rep: str, _m=m) -> str:
-                            return _re.sub(r"\$(\d+)", lambda g: _m.group(int(g.group(1))) or "", rep)
+                            return _DOLLAR_BACKREF_RE.sub(lambda g: _m.group(int(g.group(1))) or "", rep)
                         repl = _expand_dollars(text_field)
                         sl, sc = line_col_from_index(m.start())
                         el, ec = line_col_from_index(m.end())
@@ -665,7 +970,7 @@ def register_manage_script_edits_tools(mcp: FastMCP):
                         "precondition_sha256": sha,
                         "options": {"refresh": (options or {}).get("refresh", "debounced"), "validate": (options or {}).get("validate", "standard"), "applyMode": ("atomic" if len(at_edits) > 1 else (options or {}).get("applyMode", "sequential"))}
                     }
-                    resp_text = send_command_with_retry("manage_script", params_text)
+                    resp_text = send_text_edits(send_command_with_retry, params_text)
                     if not (isinstance(resp_text, dict) and resp_text.get("success")):
                         return _with_norm(resp_text if isinstance(resp_text, dict) else {"success": False, "message": str(resp_text)}, normalized_for_echo, routing="mixed/text-first")
                     # Optional sentinel reload removed (deprecated)
@@ -687,7 +992,7 @@ def register_manage_script_edits_tools(mcp: FastMCP):
                 }
                 resp_struct = send_command_with_retry("manage_script", params_struct)
                 if isinstance(resp_struct, dict) and resp_struct.get("success"):
-                    pass  # Optional sentinel reload removed (deprecated)
+                    script_written(name, path)
                 return _with_norm(resp_struct if isinstance(resp_struct, dict) else {"success": False, "message": str(resp_struct)}, normalized_for_echo, routing="mixed/text-first")
 
             return _with_norm({"success": True, "message": "Applied text edits (no structured ops)"}, normalized_for_echo, routing="mixed/text-first")
@@ -759,7 +1064,7 @@ def register_manage_script_edits_tools(mcp: FastMCP):
                         flags = _re.MULTILINE | (_re.IGNORECASE if e.get("ignore_case") else 0)
                         # Early compile for clearer error messages
                         try:
-                            regex_obj = _re.compile(pattern, flags)
+                            compile_pattern(pattern, flags)
                         except Exception as ex:
                             return _with_norm(_err("bad_regex", f"Invalid regex pattern: {ex}", normalized=normalized_for_echo, routing="text", extra={"hint": "Escape special chars or prefer structured delete for methods."}), normalized_for_echo, routing="text")
                         # Use smart anchor matching for consistent behavior with anchor_insert
@@ -768,7 +1073,7 @@ def register_manage_script_edits_tools(mcp: FastMCP):
                             continue
                         # Expand $1, $2... backrefs in replacement using the first match (consistent with mixed-path behavior)
                         def _expand_dollars(rep: str, _m=m) -> str:
-                            return _re.sub(r"\$(\d+)", lambda g: _m.group(int(g.group(1))) or "", rep)
+                            return _DOLLAR_BACKREF_RE.sub(lambda g: _m.group(int(g.group(1))) or "", rep)
                         repl_expanded = _expand_dollars(repl)
                         # Let C# side handle validation using Unity's built-in compiler services
                         sl, sc = line_col_from_index(m.start())
@@ -787,6 +1092,11 @@ def register_manage_script_edits_tools(mcp: FastMCP):
                 if not at_edits:
                     return _with_norm({"success": False, "code": "no_spans", "message": "No applicable text edit spans computed (anchor not found or zero-length)."}, normalized_for_echo, routing="text")
 
+                if coalesce:
+                    queued = edit_coalescer.submit(send_command_with_retry, name, path, namespace, script_type,
+                                                   base_text, at_edits, options)
+                    return _with_norm(queued, normalized_for_echo, routing="text/coalesced")
+
                 # Send to Unity with precondition SHA to enforce guards and immediate refresh
                 import hashlib
                 sha = hashlib.sha256(base_text.encode("utf-8")).hexdigest()
@@ -804,7 +1114,7 @@ def register_manage_script_edits_tools(mcp: FastMCP):
                         "applyMode": ("atomic" if len(at_edits) > 1 else (options or {}).get("applyMode", "sequential"))
                     }
                 }
-                resp = send_command_with_retry("manage_script", params)
+                resp = send_text_edits(send_command_with_retry, params)
                 if isinstance(resp, dict) and resp.get("success"):
                     pass  # Optional sentinel reload removed (deprecated)
                 return _with_norm(
@@ -815,88 +1125,178 @@ def register_manage_script_edits_tools(mcp: FastMCP):
             except Exception as e:
                 return _with_norm({"success": False, "code": "conversion_failed", "message": f"Edit conversion failed: {e}"}, normalized_for_echo, routing="text")
 
-        # For regex_replace, honor preview consistently: if preview=true, always return diff without writing.
-        # If confirm=false (default) and preview not requested, return diff and instruct confirm=true to apply.
-        if "regex_replace" in text_ops and (preview or not (options or {}).get("confirm")):
-            try:
-                preview_text = _apply_edits_locally(contents, edits)
-                import difflib
-                diff = list(difflib.unified_diff(contents.splitlines(), preview_text.splitlines(), fromfile="before", tofile="after", n=2))
-                if len(diff) > 800:
-                    diff = diff[:800] + ["... (diff truncated) ..."]
-                if preview:
-                    return {"success": True, "message": "Preview only (no write)", "data": {"diff": "\n".join(diff), "normalizedEdits": normalized_for_echo}}
-                return _with_norm({"success": False, "message": "Preview diff; set options.confirm=true to apply.", "data": {"diff": "\n".join(diff)}}, normalized_for_echo, routing="text")
-            except Exception as e:
-                return _with_norm({"success": False, "code": "preview_failed", "message": f"Preview failed: {e}"}, normalized_for_echo, routing="text")
-        # 2) apply edits locally (only if not text-ops)
-        try:
-            new_contents = _apply_edits_locally(contents, edits)
-        except Exception as e:
-            return {"success": False, "message": f"Edit application failed: {e}"}
-
-        # Short-circuit no-op edits to avoid false "applied" reports downstream
-        if new_contents == contents:
-            return _with_norm({
-                "success": True,
-                "message": "No-op: contents unchanged",
-                "data": {"no_op": True, "evidence": {"reason": "identical_content"}}
-            }, normalized_for_echo, routing="text")
-
-        if preview:
-            # Produce a compact unified diff limited to small context
-            import difflib
-            a = contents.splitlines()
-            b = new_contents.splitlines()
-            diff = list(difflib.unified_diff(a, b, fromfile="before", tofile="after", n=3))
-            # Limit diff size to keep responses small
-            if len(diff) > 2000:
-                diff = diff[:2000] + ["... (diff truncated) ..."]
-            return {"success": True, "message": "Preview only (no write)", "data": {"diff": "\n".join(diff), "normalizedEdits": normalized_for_echo}}
-
-        # 3) update to Unity
-        # Default refresh/validate for natural usage on text path as well
-        options = dict(options or {})
-        options.setdefault("validate", "standard")
-        options.setdefault("refresh", "debounced")
+        # Every op is routed above: structured, mixed/text-first or converted text edits
+        return _with_norm({"success": False, "code": "unsupported_op", "message": f"No route for ops: {sorted(text_ops)}"},
+                          normalized_for_echo, routing="text")
 
+    @mcp.tool(description=(
+        "Apply edits to many C# scripts as one batch with a single refresh/compile at the end.\n\n"
+        "Use this instead of N script_apply_edits calls for multi-file refactors: files are read in parallel,\n"
+        "edited locally, and written with one Unity refresh, so the change costs one domain reload.\n\n"
+        "Args:\n"
+        "- files: list of {name, path, edits, namespace?, script_type?}; edits use script_apply_edits ops:\n"
+        "  replace_method | insert_method | delete_method | anchor_insert | prepend | append | replace_range | regex_replace\n"
+        "- options: {refresh: immediate (default) | debounced, validate: standard | relaxed, preview: bool}\n\n"
+        "Nothing is written unless every file prepares cleanly. Writes are not atomic across files: if a write\n"
+        "fails, files already written in this batch are restored best-effort, and any that could not be\n"
+        "restored are reported as rollback_failed (they keep the batch's edits). Results are reported per file.\n"
+    ))
+    @traced("tool:script_apply_edits_batch")
+    def script_apply_edits_batch(
+        ctx: Context,
+        files: List[Dict[str, Any]],
+        options: Dict[str, Any] | None = None,
+    ) -> Dict[str, Any]:
         import hashlib
-        # Compute the SHA of the current file contents for the precondition
-        old_lines = contents.splitlines(keepends=True)
-        end_line = len(old_lines) + 1  # 1-based exclusive end
-        sha = hashlib.sha256(contents.encode("utf-8")).hexdigest()
-
-        # Apply a whole-file text edit rather than the deprecated 'update' action
-        params = {
-            "action": "apply_text_edits",
-            "name": name,
-            "path": path,
-            "namespace": namespace,
-            "scriptType": script_type,
-            "edits": [
-                {
-                    "startLine": 1,
-                    "startCol": 1,
-                    "endLine": end_line,
-                    "endCol": 1,
-                    "newText": new_contents,
-                }
-            ],
-            "precondition_sha256": sha,
-            "options": options or {"validate": "standard", "refresh": "debounced"},
-        }
-
-        write_resp = send_command_with_retry("manage_script", params)
-        if isinstance(write_resp, dict) and write_resp.get("success"):
-            pass  # Optional sentinel reload removed (deprecated)
-        return _with_norm(
-            write_resp if isinstance(write_resp, dict) 
-                      else {"success": False, "message": str(write_resp)},
-            normalized_for_echo,
-            routing="text",
-        )
-
-
+        from concurrent.futures import ThreadPoolExecutor
+        from script_diff import diff_edits
 
+        options = dict(options or {})
+        if not files:
+            return _err("missing_field", "files must be a non-empty list of {name, path, edits}")
+        edit_coalescer.flush()
+        refresh = (options.get("refresh") or "immediate").lower()
+        validate = options.get("validate", "standard")
+
+        entries: List[Dict[str, Any]] = []
+        for f in files:
+            name, path = _normalize_script_locator(f.get("name") or "", f.get("path") or "")
+            entries.append({
+                "name": name,
+                "path": path,
+                "namespace": f.get("namespace"),
+                "script_type": f.get("script_type") or f.get("scriptType"),
+                "edits": list(f.get("edits") or []),
+            })
+
+        # 1) Read every file; mirror reads run concurrently, Unity reads share one connection
+        def _read(entry: Dict[str, Any]) -> Dict[str, Any]:
+            return read_script(send_command_with_retry, entry["name"], entry["path"], entry["namespace"], entry["script_type"])
+
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(entries)))) as pool:
+            reads = list(pool.map(_read, entries))
+
+        # 2) Apply edits locally; nothing is written unless every file prepares
+        results: List[Dict[str, Any]] = []
+        failed = False
+        for entry, read_resp in zip(entries, reads):
+            result: Dict[str, Any] = {"name": entry["name"], "path": entry["path"]}
+            results.append(result)
+            data = (read_resp.get("data") or {}) if isinstance(read_resp, dict) else {}
+            contents = data.get("contents")
+            if contents is None and data.get("contentsEncoded") and data.get("encodedContents"):
+                contents = base64.b64decode(data["encodedContents"]).decode("utf-8")
+            if not (isinstance(read_resp, dict) and read_resp.get("success")) or contents is None:
+                failed = True
+                result.update(status="error", code="read_failed",
+                              message=(read_resp or {}).get("message") if isinstance(read_resp, dict) else str(read_resp))
+                continue
+            if not entry["edits"]:
+                result["status"] = "unchanged"
+                continue
+            try:
+                new_contents = _apply_batch_file_edits(contents, entry["edits"], entry["name"])
+            except Exception as e:
+                failed = True
+                result.update(status="error", code="prepare_failed", message=str(e))
+                continue
+            if new_contents == contents:
+                result["status"] = "unchanged"
+                continue
+            edits = diff_edits(contents, new_contents) or [{
+                "startLine": 1, "startCol": 1,
+                "endLine": len(contents.splitlines(keepends=True)) + 1, "endCol": 1,
+                "newText": new_contents,
+            }]
+            entry.update(contents=contents, new_contents=new_contents, write_edits=edits,
+                         sha=hashlib.sha256(contents.encode("utf-8")).hexdigest())
+            result.update(status="prepared", edits=len(edits))
+
+        if failed:
+            return {"success": False, "code": "batch_prepare_failed",
+                    "message": "No files were written; fix the failing files and retry.",
+                    "data": {"files": results}}
+        pending = [(e, r) for e, r in zip(entries, results) if r["status"] == "prepared"]
+        if options.get("preview") or not pending:
+            message = "Preview only (no write)" if options.get("preview") else "No-op: contents unchanged"
+            return {"success": True, "message": message, "data": {"files": results}}
+
+        # 3) Write each file without its own refresh, then refresh all of them once
+        per_file_refresh = "none" if refresh in ("immediate", "sync") else "debounced"
+        written: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        for entry, result in pending:
+            resp = send_command_with_retry("manage_script", {
+                "action": "apply_text_edits",
+                "name": entry["name"],
+                "path": entry["path"],
+                "namespace": entry["namespace"],
+                "scriptType": entry["script_type"],
+                "edits": entry["write_edits"],
+                "precondition_sha256": entry["sha"],
+                "options": {"refresh": per_file_refresh, "validate": validate,
+                            "applyMode": "atomic" if len(entry["write_edits"]) > 1 else "sequential"},
+            })
+            if isinstance(resp, dict) and resp.get("success"):
+                script_written(entry["name"], entry["path"])
+                entry["written_sha"] = (resp.get("data") or {}).get("sha256")
+                written.append((entry, result))
+                result["status"] = "written"
+                continue
+            result.update(status="error", code=(resp or {}).get("code", "write_failed") if isinstance(resp, dict) else "write_failed",
+                          message=(resp or {}).get("message") if isinstance(resp, dict) else str(resp))
+            # Restore the files this batch already wrote (best-effort: each restore is its own write)
+            for done, done_result in reversed(written):
+                locator = {"name": done["name"], "path": done["path"],
+                           "namespace": done["namespace"], "scriptType": done["script_type"]}
+                locator = {k: v for k, v in locator.items() if v is not None}
+                # Unity's sha of what it wrote (it may normalize the text), else ask for the current one
+                sha = done.get("written_sha")
+                if not sha:
+                    current = send_command_with_retry("manage_script", {"action": "get_sha", **locator})
+                    if isinstance(current, dict) and current.get("success"):
+                        sha = (current.get("data") or {}).get("sha256")
+                if not sha:
+                    done_result["status"] = "rollback_failed"
+                    continue
+                restore = diff_edits(done["new_contents"], done["contents"]) or [{
+                    "startLine": 1, "startCol": 1,
+                    "endLine": len(done["new_contents"].splitlines(keepends=True)) + 1, "endCol": 1,
+                    "newText": done["contents"],
+                }]
+                undo = send_command_with_retry("manage_script", {
+                    "action": "apply_text_edits",
+                    **locator,
+                    "edits": restore,
+                    "precondition_sha256": sha,
+                    "options": {"refresh": per_file_refresh, "validate": "relaxed",
+                                "applyMode": "atomic" if len(restore) > 1 else "sequential"},
+                })
+                if isinstance(undo, dict) and undo.get("success"):
+                    script_written(done["name"], done["path"])
+                    done_result["status"] = "rolled_back"
+                else:
+                    done_result["status"] = "rollback_failed"
+            if written and per_file_refresh == "none":
+                # Restored or not, these files changed on disk since Unity last imported them
+                send_command_with_retry("manage_script", {"action": "refresh", "paths": [
+                    f"{e['path'].rstrip('/')}/{e['name']}.cs" for e, _ in written]})
+            kept = [e["name"] for e, r in written if r["status"] == "rollback_failed"]
+            if kept:
+                message = (f"Write failed for {entry['name']}; could not restore {', '.join(kept)}, "
+                           "which keep this batch's edits (status rollback_failed).")
+            elif written:
+                message = f"Write failed for {entry['name']}; earlier writes in this batch were restored."
+            else:
+                message = f"Write failed for {entry['name']}; no other file was written."
+            return {"success": False, "code": "batch_write_failed", "message": message,
+                    "data": {"files": results}}
+
+        data: Dict[str, Any] = {"files": results, "refresh": refresh}
+        if per_file_refresh == "none":
+            paths = [f"{e['path'].rstrip('/')}/{e['name']}.cs" for e, _ in written]
+            refreshed = send_command_with_retry("manage_script", {"action": "refresh", "paths": paths})
+            if not (isinstance(refreshed, dict) and refreshed.get("success")):
+                data["warning"] = "Batch refresh failed; Unity will pick the changes up on its next refresh."
+        return {"success": True, "message": f"Applied edits to {len(written)} file(s) with one refresh.", "data": data}
 
     # safe_script_edit removed to simplify API; clients should call script_apply_edits directly
@@ -5,24 +5,41 @@ safe path logic (re-implemented here to avoid importing server.py).
 """
 from __future__ import annotations
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+import asyncio
+import base64
+import json
 import re
 from pathlib import Path
 from urllib.parse import urlparse, unquote
 import fnmatch
 import hashlib
 import os
+import threading
+import time
 
 from mcp.server.fastmcp import FastMCP, Context
 from unity_connection import send_command_with_retry
+from config import config
+from memory_trace import traced
+from regex_cache import compile_pattern, time_limit
+from script_mirror import known_project_root, remember_text, unity_project_root
+import edit_coalescer
+import project_index
 
 
-def _resolve_project_root(override: str | None) -> Path:
+# (override, UNITY_PROJECT_ROOT, cwd) -> (root, found, monotonic time, Unity's root when it was resolved)
+_root_cache: Dict[Tuple[Any, ...], Tuple[Path, bool, float, Path | None]] = {}
+_root_cache_lock = threading.Lock()
+_ROOT_MISS_TTL_S = 30.0
+
+
+def _find_project_root(override: str | None) -> Tuple[Path, bool]:
     # 1) Explicit override
     if override:
         pr = Path(override).expanduser().resolve()
         if (pr / "Assets").exists():
-            return pr
+            return pr, True
     # 2) Environment
     env = os.environ.get("UNITY_PROJECT_ROOT")
     if env:
@@ -30,22 +47,17 @@ def _resolve_project_root(override: str | None) -> Path:
         # If UNITY_PROJECT_ROOT is relative, resolve against repo root (cwd's repo) instead of src dir
         pr = (Path.cwd() / env_path).resolve() if not env_path.is_absolute() else env_path.resolve()
         if (pr / "Assets").exists():
-            return pr
-    # 3) Ask Unity via manage_editor.get_project_root
-    try:
-        resp = send_command_with_retry("manage_editor", {"action": "get_project_root"})
-        if isinstance(resp, dict) and resp.get("success"):
-            pr = Path(resp.get("data", {}).get("projectRoot", "")).expanduser().resolve()
-            if pr and (pr / "Assets").exists():
-                return pr
-    except Exception:
-        pass
+            return pr, True
+    # 3) Ask Unity via manage_editor.get_project_root (prefetched at startup; re-asked after project_root_ttl_s)
+    pr = unity_project_root(send_command_with_retry)
+    if pr is not None and (pr / "Assets").exists():
+        return pr, True
 
     # 4) Walk up from CWD to find a Unity project (Assets + ProjectSettings)
     cur = Path.cwd().resolve()
     for _ in range(6):
         if (cur / "Assets").exists() and (cur / "ProjectSettings").exists():
-            return cur
+            return cur, True
         if cur.parent == cur:
             break
         cur = cur.parent
@@ -67,11 +79,47 @@ def _resolve_project_root(override: str | None) -> Path:
                 dirnames[:] = []
                 continue
             if (rel / "Assets").exists() and (rel / "ProjectSettings").exists():
-                return rel
+                return rel, True
     except Exception:
         pass
     # 6) Fallback: CWD
-    return Path.cwd().resolve()
+    return Path.cwd().resolve(), False
+
+
+def _resolve_project_root(override: str | None) -> Path:
+    """Memoized _find_project_root, keyed by the override, UNITY_PROJECT_ROOT and the CWD.
+
+    A hit is revalidated with one stat of <root>/Assets, plus an in-memory
+    comparison with the last root Unity reported (script_mirror refreshes
+    that in the background), so a switched project is picked up without a
+    Unity round trip here. The CWD fallback (nothing found) is kept for
+    _ROOT_MISS_TTL_S so misses do not repeat the Unity query and directory
+    walks on every call.
+    """
+    key = (override or None, os.environ.get("UNITY_PROJECT_ROOT"), os.getcwd())
+    with _root_cache_lock:
+        hit = _root_cache.get(key)
+    if hit is not None:
+        root, found, at, unity = hit
+        if unity is not None:
+            unity_project_root(send_command_with_retry)  # a root is known: returns at once, re-asks in the background when due
+        explicit = key[0] or key[1]  # take precedence over Unity's answer
+        if found and (explicit or unity == known_project_root()) and (root / "Assets").is_dir():
+            return root
+        if not found and time.monotonic() - at < _ROOT_MISS_TTL_S:
+            return root
+    root, found = _find_project_root(override)
+    unity = known_project_root()
+    with _root_cache_lock:
+        if len(_root_cache) >= 32:
+            _root_cache.clear()
+        _root_cache[key] = (root, found, time.monotonic(), unity)
+    return root
+
+
+async def _off_loop(fn) -> Dict[str, Any]:
+    """Run a tool's blocking index, search or parse work in a worker thread so the event loop keeps serving."""
+    return await asyncio.to_thread(fn)
 
 
 def _resolve_safe_path_from_uri(uri: str, project: Path) -> Path | None:
@@ -105,8 +153,58 @@ def _resolve_safe_path_from_uri(uri: str, project: Path) -> Path | None:
     return p
 
 
+def _encode_cursor(rel: str, offset: int, st: os.stat_result) -> str:
+    raw = json.dumps({"p": rel, "o": offset, "m": st.st_mtime_ns, "z": st.st_size}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(token: str) -> Dict[str, Any] | None:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        cur = json.loads(raw.decode("utf-8"))
+        return cur if isinstance(cur, dict) and {"p", "o", "m", "z"} <= cur.keys() else None
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _not_modified(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return {"success": True, "data": {"not_modified": True, "metadata": metadata}}
+
+
+def _read_chunk(p: Path, project: Path, cursor: str | None, max_chunk_bytes: int | None,
+                etag: str | None = None) -> Dict[str, Any]:
+    """One bounded chunk of a file, with the whole-file sha256 and a cursor for the next chunk."""
+    import file_window
+    rel = p.relative_to(project).as_posix()
+    st = p.stat()
+    if etag and not cursor and file_window.file_sha256(p) == etag:
+        return _not_modified({"file_sha256": etag})
+    offset = 0
+    if cursor:
+        cur = _decode_cursor(cursor)
+        if cur is None or cur["p"] != rel:
+            return {"success": False, "code": "invalid_cursor", "error": "cursor does not belong to this uri"}
+        if (cur["m"], cur["z"]) != (st.st_mtime_ns, st.st_size):
+            return {"success": False, "code": "cursor_stale",
+                    "error": "File changed since the cursor was issued; restart without a cursor.",
+                    "data": {"file_sha256": file_window.file_sha256(p)}}
+        offset = int(cur["o"])
+    cap = int(getattr(config, "read_max_chunk_bytes", 1024 * 1024)) or 1024 * 1024
+    size = min(cap, max_chunk_bytes) if max_chunk_bytes and max_chunk_bytes > 0 else cap
+    text, end = file_window.read_chunk(p, offset, size)
+    return {"success": True, "data": {
+        "text": text,
+        "metadata": {
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            "file_sha256": file_window.file_sha256(p),
+            "range": {"start": offset, "end": end, "total": st.st_size},
+        },
+        "next_cursor": _encode_cursor(rel, end, st) if end < st.st_size else None,
+    }}
+
+
 def register_resource_tools(mcp: FastMCP) -> None:
-    """Registers list_resources and read_resource wrapper tools."""
+    """Registers list_resources, read_resource and the project search, symbol, asset graph and hierarchy tools."""
 
     @mcp.tool(description=(
         "List project URIs (unity://path/...) under a folder (default: Assets).\n\n"
@@ -141,24 +239,31 @@ def register_resource_tools(mcp: FastMCP) -> None:
                 return {"success": False, "error": "Listing is restricted to Assets/"}
 
             matches: List[str] = []
-            for p in base.rglob("*"):
-                if not p.is_file():
-                    continue
-                # Resolve symlinks and ensure the real path stays under project/Assets
-                try:
-                    rp = p.resolve()
-                    rp.relative_to(project / "Assets")
-                except Exception:
-                    continue
-                # Enforce .cs extension regardless of provided pattern
-                if p.suffix.lower() != ".cs":
-                    continue
-                if pattern and not fnmatch.fnmatch(p.name, pattern):
-                    continue
-                rel = p.relative_to(project).as_posix()
-                matches.append(f"unity://path/{rel}")
-                if len(matches) >= max(1, limit):
-                    break
+            if getattr(config, "project_index_enabled", True):
+                # Served from the in-memory Assets/ index; .cs is enforced regardless of pattern
+                index = project_index.get_index(project)
+                for entry in index.files(base.relative_to(project).as_posix(), pattern=pattern,
+                                         suffix=".cs", limit=max(1, limit)):
+                    matches.append(f"unity://path/{entry['path']}")
+            else:
+                for p in base.rglob("*"):
+                    if not p.is_file():
+                        continue
+                    # Resolve symlinks and ensure the real path stays under project/Assets
+                    try:
+                        rp = p.resolve()
+                        rp.relative_to(project / "Assets")
+                    except Exception:
+                        continue
+                    # Enforce .cs extension regardless of provided pattern
+                    if p.suffix.lower() != ".cs":
+                        continue
+                    if pattern and not fnmatch.fnmatch(p.name, pattern):
+                        continue
+                    rel = p.relative_to(project).as_posix()
+                    matches.append(f"unity://path/{rel}")
+                    if len(matches) >= max(1, limit):
+                        break
 
             # Always include the canonical spec resource so NL clients can discover it
             if "unity://spec/script-edits" not in matches:
@@ -173,7 +278,12 @@ def register_resource_tools(mcp: FastMCP) -> None:
         "Args: uri, start_line/line_count or head_bytes, tail_lines (optional), project_root, request (NL hints).\n"
         "Security: uri must resolve under Assets/.\n"
         "Examples: head_bytes=1024; start_line=100,line_count=40; tail_lines=120.\n"
+        "Large files: whole-file reads over the server's chunk limit return the first chunk and a next_cursor;\n"
+        "pass cursor (and optionally max_chunk_bytes) to continue. Chunks end on line breaks and carry file_sha256.\n"
+        "Conditional reads: pass if_none_match=<sha256 from an earlier read> (file_sha256 for paged reads);\n"
+        "an unchanged result returns {not_modified: true} without the text.\n"
     ))
+    @traced("tool:read_resource")
     async def read_resource(
         uri: str,
         ctx: Context | None = None,
@@ -183,11 +293,18 @@ def register_resource_tools(mcp: FastMCP) -> None:
         tail_lines: int | None = None,
         project_root: str | None = None,
         request: str | None = None,
+        cursor: str | None = None,
+        max_chunk_bytes: int | None = None,
+        if_none_match: str | None = None,
     ) -> Dict[str, Any]:
         """
         Reads a resource by unity://path/... URI with optional slicing.
         One of line window (start_line/line_count) or head_bytes can be used to limit size.
+        cursor/max_chunk_bytes page through the file in byte chunks (see _read_chunk).
+        if_none_match: a sha256 from an earlier read; an unchanged result returns data.not_modified.
         """
+        import file_window
+        await edit_coalescer.flush_async()  # reads see queued coalesced edits
         try:
             # Serve the canonical spec directly when requested (allow bare or with scheme)
             if uri in ("unity://spec/script-edits", "spec/script-edits", "script-edits"):
@@ -278,24 +395,37 @@ def register_resource_tools(mcp: FastMCP) -> None:
                     window = int(m.group(1))
                     method = m.group(2)
                     # naive search for method header to get a line number
-                    text_all = p.read_text(encoding="utf-8")
-                    lines_all = text_all.splitlines()
                     pat = re.compile(rf"^\s*(?:\[[^\]]+\]\s*)*(?:public|private|protected|internal|static|virtual|override|sealed|async|extern|unsafe|new|partial).*?\b{re.escape(method)}\s*\(", re.MULTILINE)
-                    hit_line = None
-                    for i, line in enumerate(lines_all, start=1):
-                        if pat.search(line):
-                            hit_line = i
-                            break
+                    hit_line = file_window.find_line(p, method, lambda line: bool(pat.search(line)))
                     if hit_line:
                         half = max(1, window // 2)
                         start_line = max(1, hit_line - half)
                         line_count = window
 
+            sliced = bool(head_bytes and head_bytes > 0) or (tail_lines is not None and tail_lines > 0) or (
+                start_line is not None and line_count is not None and line_count >= 0)
+            st = p.stat()
+            etag = if_none_match.strip().lower() if if_none_match else None
+            page_over = int(getattr(config, "read_max_chunk_bytes", 1024 * 1024))
+            if not sliced and (cursor or max_chunk_bytes or (page_over and st.st_size > page_over)):
+                return _read_chunk(p, project, cursor, max_chunk_bytes, etag)
+            if etag and not sliced and file_window.cached_sha(p, st, "text") == etag:
+                return _not_modified({"sha256": etag})
+
             # Mutually exclusive windowing options precedence:
             # 1) head_bytes, 2) tail_lines, 3) start_line+line_count, else full text
+            windowed = tail_lines is not None and tail_lines > 0 or (
+                start_line is not None and line_count is not None and line_count >= 0)
             if head_bytes and head_bytes > 0:
-                raw = p.read_bytes()[: head_bytes]
+                with open(p, "rb") as f:
+                    raw = f.read(head_bytes)
                 text = raw.decode("utf-8", errors="replace")
+            elif windowed and st.st_size >= int(getattr(config, "window_read_min_bytes", 64 * 1024)):
+                # Decode only the requested lines (mmap + cached line offsets)
+                if tail_lines is not None and tail_lines > 0:
+                    text = file_window.read_tail(p, tail_lines)
+                else:
+                    text = file_window.read_window(p, start_line, line_count)
             else:
                 text = p.read_text(encoding="utf-8")
                 if tail_lines is not None and tail_lines > 0:
@@ -309,6 +439,12 @@ def register_resource_tools(mcp: FastMCP) -> None:
                     text = "\n".join(lines[s:e])
 
             sha = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if not sliced:
+                file_window.remember_sha(p, st, "text", sha)
+            if sha == etag:
+                return _not_modified({"sha256": sha})
+            if not (head_bytes or tail_lines or line_count is not None):
+                remember_text(text, sha)  # base for later precondition rebases
             return {"success": True, "data": {"text": text, "metadata": {"sha256": sha}}}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -329,29 +465,332 @@ def register_resource_tools(mcp: FastMCP) -> None:
         - ignore_case: case-insensitive by default
         - max_results: cap results to avoid huge payloads
         """
+        import trigram_index
         # re is already imported at module level
+        await edit_coalescer.flush_async()
         try:
             project = _resolve_project_root(project_root)
             p = _resolve_safe_path_from_uri(uri, project)
             if not p or not p.exists() or not p.is_file():
                 return {"success": False, "error": f"Resource not found: {uri}"}
 
-            text = p.read_text(encoding="utf-8")
             flags = re.MULTILINE
             if ignore_case:
                 flags |= re.IGNORECASE
-            rx = re.compile(pattern, flags)
+            rx = compile_pattern(pattern, flags)
+            if getattr(config, "trigram_index_enabled", True):
+                try:
+                    rel = p.relative_to(project).as_posix()
+                except ValueError:
+                    rel = None
+                if rel and trigram_index.get_index(project).rules_out(rel, pattern, flags):
+                    return {"success": True, "data": {"matches": [], "count": 0}}
+            text = p.read_text(encoding="utf-8")
 
             results = []
             lines = text.splitlines()
-            for i, line in enumerate(lines, start=1):
-                if rx.search(line):
-                    results.append({"line": i, "text": line})
-                    if max_results and len(results) >= max_results:
-                        break
+            with time_limit():
+                for i, line in enumerate(lines, start=1):
+                    if rx.search(line):
+                        results.append({"line": i, "text": line})
+                        if max_results and len(results) >= max_results:
+                            break
 
             return {"success": True, "data": {"matches": results, "count": len(results)}}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    @mcp.tool(description=(
+        "Search every file under a folder (default: Assets) with a regex; results are grouped by file.\n\n"
+        "Args: pattern (Python re, matched per line), under, glob (file-name filter such as *.cs; default all files),\n"
+        "ignore_case (default true), max_results (total matching lines, default 200), project_root.\n"
+        "Binary files are skipped. Prefer this over calling find_in_file on many URIs.\n"
+    ))
+    @traced("tool:find_in_project")
+    async def find_in_project(
+        pattern: str,
+        ctx: Context | None = None,
+        under: str = "Assets",
+        glob: str | None = None,
+        ignore_case: bool | None = True,
+        max_results: int | None = 200,
+        project_root: str | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Searches the project's files (from the Assets/ index) with a regex pattern.
+        Returns {files: [{uri, matches: [{line, text}]}], count, files_searched, truncated}.
+        """
+        await edit_coalescer.flush_async()
+        def run() -> Dict[str, Any]:
+            import project_search
+            import trigram_index
+            try:
+                project = _resolve_project_root(project_root)
+                base = (project / under).resolve()
+                try:
+                    base.relative_to(project / "Assets")
+                except ValueError:
+                    return {"success": False, "error": "Search is restricted to Assets/"}
+                flags = re.MULTILINE
+                if ignore_case:
+                    flags |= re.IGNORECASE
+
+                paths = [e["path"] for e in project_index.get_index(project).files(base.relative_to(project).as_posix(), pattern=glob)]
+                if getattr(config, "trigram_index_enabled", True):
+                    index = trigram_index.get_index(project)
+                    candidates = index.candidates(pattern, flags)
+                    if candidates is not None:
+                        paths = [rel for rel in paths if rel in candidates or not index.covers(rel)]
+                files: List[Dict[str, Any]] = []
+                count = 0
+                for group in project_search.search(str(project), paths, pattern, flags, max_results):
+                    files.append({"uri": f"unity://path/{group['path']}", "matches": group["matches"]})
+                    count += len(group["matches"])
+                truncated = bool(max_results) and count >= max_results
+                return {"success": True, "data": {"files": files, "count": count, "files_searched": len(paths), "truncated": truncated}}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+        return await _off_loop(run)
+
+    @mcp.tool(description=(
+        "Find C# declarations by name across Assets/ (namespaces, types, methods, constructors, properties, fields).\n\n"
+        "Args: name, kind (class|struct|interface|record|enum|namespace|method|constructor|property|field),\n"
+        "container (enclosing type or namespace, e.g. Player or Game.Player), ignore_case, max_results, project_root.\n"
+        "Returns uri, line and end_line per declaration; pass them to read_resource (start_line/line_count) or edits.\n"
+    ))
+    @traced("tool:find_symbol")
+    async def find_symbol(
+        name: str,
+        ctx: Context | None = None,
+        kind: str | None = None,
+        container: str | None = None,
+        ignore_case: bool | None = False,
+        max_results: int | None = 50,
+        project_root: str | None = None,
+    ) -> Dict[str, Any]:
+        """Looks a symbol up in the project's C# symbol index."""
+        await edit_coalescer.flush_async()
+        def run() -> Dict[str, Any]:
+            import symbol_index
+            try:
+                project = _resolve_project_root(project_root)
+                hits = symbol_index.get_index(project).find(name, kind, container, bool(ignore_case))
+                shown = hits[:max_results] if max_results else hits
+                symbols = [{**s, "uri": f"unity://path/{s['path']}"} for s in shown]
+                return {"success": True, "data": {"symbols": symbols, "count": len(symbols), "truncated": len(shown) < len(hits)}}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+        return await _off_loop(run)
+
+    @mcp.tool(description=(
+        "List C# declarations in one script (uri) or in every script under a folder (default: Assets).\n\n"
+        "Args: uri, under, kind, pattern (glob on the symbol name), limit, project_root.\n"
+    ))
+    @traced("tool:list_symbols")
+    async def list_symbols(
+        ctx: Context | None = None,
+        uri: str | None = None,
+        under: str = "Assets",
+        kind: str | None = None,
+        pattern: str | None = None,
+        limit: int | None = 500,
+        project_root: str | None = None,
+    ) -> Dict[str, Any]:
+        """Lists symbols from the project's C# symbol index, in file and line order."""
+        await edit_coalescer.flush_async()
+        def run() -> Dict[str, Any]:
+            import symbol_index
+            try:
+                project = _resolve_project_root(project_root)
+                index = symbol_index.get_index(project)
+                if uri:
+                    p = _resolve_safe_path_from_uri(uri, project)
+                    if not p or not p.is_file():
+                        return {"success": False, "error": f"Resource not found: {uri}"}
+                    symbols = index.symbols(path=p.relative_to(project).as_posix())
+                else:
+                    base = (project / under).resolve()
+                    try:
+                        base.relative_to(project / "Assets")
+                    except ValueError:
+                        return {"success": False, "error": "Listing is restricted to Assets/"}
+                    symbols = index.symbols(under=base.relative_to(project).as_posix())
+                if kind:
+                    symbols = [s for s in symbols if s["kind"] == kind]
+                if pattern:
+                    symbols = [s for s in symbols if fnmatch.fnmatch(s["name"], pattern)]
+                total = len(symbols)
+                if limit:
+                    symbols = symbols[:limit]
+                out = [{**s, "uri": f"unity://path/{s['path']}"} for s in symbols]
+                return {"success": True, "data": {"symbols": out, "count": len(out), "truncated": len(out) < total}}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+        return await _off_loop(run)
+
+    def _asset_target(project: Path, uri: str | None, guid: str | None, graph: "asset_graph.AssetGraph") -> Tuple[str | None, str | None]:
+        """(asset path, guid) for a uri or a guid argument."""
+        if guid:
+            return graph.path_of(guid), guid.lower()
+        p = _resolve_safe_path_from_uri(uri or "", project)
+        if not p or not p.exists():
+            return None, None
+        rel = p.relative_to(project).as_posix()
+        if not rel.startswith("Assets/"):
+            return None, None
+        return rel, graph.guid_of(rel)
+
+    def _with_uri(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {**entry, "uri": f"unity://path/{entry['path']}" if entry.get("path") else None}
+
+    @mcp.tool(description=(
+        "Find the assets that reference an asset (scenes, prefabs, materials, ScriptableObjects, .meta settings).\n\n"
+        "Args: uri (unity://path/Assets/...) or guid, recursive (also assets referencing those), max_results, project_root.\n"
+        "Read from .meta files and text-serialized YAML on disk; never blocks the editor.\n"
+    ))
+    @traced("tool:find_asset_references")
+    async def find_asset_references(
+        ctx: Context | None = None,
+        uri: str | None = None,
+        guid: str | None = None,
+        recursive: bool | None = False,
+        max_results: int | None = 500,
+        project_root: str | None = None,
+    ) -> Dict[str, Any]:
+        """Reverse dependency lookup in the project's asset graph."""
+        await edit_coalescer.flush_async()
+        def run() -> Dict[str, Any]:
+            import asset_graph
+            try:
+                project = _resolve_project_root(project_root)
+                graph = asset_graph.get_graph(project)
+                path, target = _asset_target(project, uri, guid, graph)
+                if not target:
+                    return {"success": False, "error": f"No GUID known for {uri or guid} (missing .meta?)"}
+                refs = graph.references(target, bool(recursive), max_results + 1 if max_results else 1 << 30)
+                shown = refs[:max_results] if max_results else refs
+                return {"success": True, "data": {"guid": target, "path": path, "references": [_with_uri(r) for r in shown],
+                                                   "count": len(shown), "truncated": len(shown) < len(refs)}}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+        return await _off_loop(run)
+
+    @mcp.tool(description=(
+        "List the assets an asset depends on (GUID references in its YAML and .meta), resolved to paths when known.\n\n"
+        "Args: uri or guid, recursive (transitive dependencies), max_results, project_root.\n"
+        "Unresolved GUIDs (built-in resources, packages) are returned with path null.\n"
+    ))
+    @traced("tool:list_asset_dependencies")
+    async def list_asset_dependencies(
+        ctx: Context | None = None,
+        uri: str | None = None,
+        guid: str | None = None,
+        recursive: bool | None = False,
+        max_results: int | None = 500,
+        project_root: str | None = None,
+    ) -> Dict[str, Any]:
+        """Forward dependency lookup in the project's asset graph."""
+        await edit_coalescer.flush_async()
+        def run() -> Dict[str, Any]:
+            import asset_graph
+            try:
+                project = _resolve_project_root(project_root)
+                graph = asset_graph.get_graph(project)
+                path, target = _asset_target(project, uri, guid, graph)
+                if not path:
+                    return {"success": False, "error": f"Resource not found: {uri or guid}"}
+                deps = graph.dependencies(path, bool(recursive), max_results + 1 if max_results else 1 << 30)
+                shown = deps[:max_results] if max_results else deps
+                return {"success": True, "data": {"guid": target, "path": path, "dependencies": [_with_uri(d) for d in shown],
+                                                   "count": len(shown), "truncated": len(shown) < len(deps)}}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+        return await _off_loop(run)
+
+    def _prefab_root(project: Path):
+        def resolve(guid: str) -> Tuple[int, str] | None:
+            import asset_graph
+            import unity_yaml
+            rel = asset_graph.resolve_guids(project, [guid]).get(guid)
+            prefab = project / rel if rel else None
+            if prefab is None or not prefab.is_file() or not unity_yaml.is_text_yaml(prefab):
+                return None
+            roots = unity_yaml.load(prefab).roots
+            return (roots[0]["fileID"], roots[0]["name"]) if roots else None
+        return resolve
+
+    def _tree_node(node: Dict[str, Any], depth: int, max_depth: int | None, include_components: bool,
+                   paths: Dict[str, str]) -> Dict[str, Any]:
+        out = {k: v for k, v in node.items() if k not in ("components", "children", "prefab")}
+        if node.get("prefab"):
+            out["prefab"] = {"guid": node["prefab"], "uri": f"unity://path/{paths[node['prefab']]}" if node["prefab"] in paths else None}
+        if include_components:
+            out["components"] = [
+                {**c, "script": {"guid": c["script"], "uri": f"unity://path/{paths[c['script']]}" if c["script"] in paths else None}}
+                if "script" in c else c for c in node["components"]]
+        if max_depth is not None and depth >= max_depth:
+            out["childCount"] = len(node["children"])
+        else:
+            out["children"] = [_tree_node(c, depth + 1, max_depth, include_components, paths) for c in node["children"]]
+        return out
+
+    @mcp.tool(description=(
+        "Read the GameObject hierarchy of a saved scene (.unity) or prefab (.prefab) from disk, without the editor.\n\n"
+        "Args: uri, root_path (e.g. 'Canvas/Panel'), max_depth, name (glob) and/or component (type name) to list matching objects flat,\n"
+        "include_components, max_results, project_root.\n"
+        "Requires text serialization; shows the last saved state, not unsaved changes. Works while Unity is busy or reloading.\n"
+    ))
+    @traced("tool:read_hierarchy")
+    async def read_hierarchy(
+        uri: str,
+        ctx: Context | None = None,
+        root_path: str | None = None,
+        max_depth: int | None = None,
+        name: str | None = None,
+        component: str | None = None,
+        include_components: bool | None = True,
+        max_results: int | None = 500,
+        project_root: str | None = None,
+    ) -> Dict[str, Any]:
+        """Parses a saved scene or prefab into a compact GameObject tree (cached per file mtime)."""
+        def run() -> Dict[str, Any]:
+            import asset_graph
+            import unity_yaml
+            try:
+                project = _resolve_project_root(project_root)
+                p = _resolve_safe_path_from_uri(uri, project)
+                if not p or not p.is_file():
+                    return {"success": False, "error": f"Resource not found: {uri}"}
+                try:
+                    p.relative_to(project / "Assets")
+                except ValueError:
+                    return {"success": False, "error": "Hierarchy reads are restricted to Assets/"}
+                if not unity_yaml.is_text_yaml(p):
+                    return {"success": False, "error": f"{uri} is not text-serialized YAML (set Asset Serialization to Force Text)"}
+                tree = unity_yaml.load(p, _prefab_root(project))
+
+                guids = {n["prefab"] for n in tree.nodes.values() if n.get("prefab")}
+                if include_components:
+                    guids.update(c["script"] for n in tree.nodes.values() for c in n["components"] if "script" in c)
+                paths = asset_graph.resolve_guids(project, guids)
+
+                if name is not None or component is not None:
+                    hits = tree.find(name, component)
+                    shown = hits[:max_results] if max_results else hits
+                    matches = [{"path": path, **_tree_node(node, 0, 0, bool(include_components), paths)} for path, node in shown]
+                    return {"success": True, "data": {"matches": matches, "count": len(matches), "truncated": len(shown) < len(hits)}}
 
+                if root_path:
+                    start = tree.at(root_path)
+                    if start is None:
+                        return {"success": False, "error": f"No GameObject at '{root_path}' in {uri}"}
+                    roots = [start]
+                else:
+                    roots = tree.roots
+                return {"success": True, "data": {
+                    "roots": [_tree_node(n, 0, max_depth, bool(include_components), paths) for n in roots],
+                    "objects": len(tree.nodes),
+                }}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+        return await _off_loop(run)
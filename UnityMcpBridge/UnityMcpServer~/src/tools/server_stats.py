@@ -0,0 +1,30 @@
+"""
+Defines the server_stats tool for inspecting Python-side server diagnostics.
+"""
+from typing import Dict, Any
+from mcp.server.fastmcp import FastMCP, Context
+import memory_trace
+
+
+def register_server_stats_tools(mcp: FastMCP):
+    """Registers the server_stats tool with the MCP server."""
+
+    @mcp.tool(description=(
+        "Python server diagnostics (does not contact Unity).\n\n"
+        "Args: action = 'get' (default) | 'reset'.\n"
+        "Returns: memory tracing stats per traced call (peak bytes, calls over threshold)\n"
+        "and the top allocation sites captured for recent memory spikes.\n"
+        "Memory tracing is off unless config.memory_trace_enabled or UNITY_MCP_MEMORY_TRACE=1.\n"
+    ))
+    def server_stats(ctx: Context, action: str = "get") -> Dict[str, Any]:
+        """Returns server-side statistics, or resets them."""
+        try:
+            action = (action or "get").lower()
+            if action == "reset":
+                memory_trace.reset()
+                return {"success": True, "message": "Server stats reset."}
+            if action != "get":
+                return {"success": False, "message": f"Unknown action '{action}'. Use 'get' or 'reset'."}
+            return {"success": True, "data": {"memory": memory_trace.get_stats()}}
+        except Exception as e:
+            return {"success": False, "message": f"Python error reading server stats: {str(e)}"}
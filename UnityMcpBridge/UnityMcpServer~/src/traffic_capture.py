@@ -0,0 +1,157 @@
+"""
+Optional capture of Unity bridge traffic to a gzip-compressed NDJSON file.
+
+Enable with config.capture_path or UNITY_MCP_CAPTURE=/path/to/capture.ndjson.gz.
+Every framed request/response exchanged by UnityConnection.send_command is
+written as one JSON object per line:
+
+    {"sid": "1234-1718000000", "seq": 1, "dir": "request", "t": 1718000000.123, "type": "manage_script", "bytes": 120, "payload": "..."}
+    {"sid": "1234-1718000000", "seq": 1, "dir": "response", "t": 1718000000.140, "elapsed_ms": 17.2, "bytes": 512, "payload": "..."}
+    {"sid": "1234-1718000000", "seq": 2, "dir": "error", "t": ..., "error": "Timeout receiving Unity response"}
+
+Payloads are stored as UTF-8 text when decodable, otherwise as
+{"b64": "..."}. tools/replay_capture.py feeds a capture back through a fake
+bridge for offline reproduction and benchmarking.
+"""
+
+import atexit
+import base64
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from config import config
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+# Flush the gzip stream every N records; close() always flushes
+_FLUSH_EVERY = 32
+
+
+def _encode_payload(payload: bytes) -> Any:
+    try:
+        return payload.decode("utf-8")
+    except UnicodeDecodeError:
+        return {"b64": base64.b64encode(payload).decode("ascii")}
+
+
+def decode_payload(value: Any) -> bytes:
+    """Inverse of the on-disk payload encoding."""
+    if isinstance(value, dict) and "b64" in value:
+        return base64.b64decode(value["b64"])
+    return (value or "").encode("utf-8")
+
+
+class TrafficRecorder:
+    """Thread-safe NDJSON writer for framed bridge traffic."""
+
+    def __init__(self, path: str):
+        self.path = path
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        import gzip  # deferred: capture is opt-in and off the startup path
+
+        # Append mode yields a multi-member gzip stream, which gzip readers handle transparently
+        self._fh = gzip.open(path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        # Distinguishes server sessions appended to the same capture file
+        self.session = f"{os.getpid()}-{int(time.time())}"
+        self._pending = 0
+        self._closed = False
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._closed:
+                return
+            self._fh.write(line + "\n")
+            self._pending += 1
+            if self._pending >= _FLUSH_EVERY:
+                self._fh.flush()
+                self._pending = 0
+
+    def record_request(self, command_type: str, payload: bytes) -> int:
+        seq = next(self._seq)
+        self._write({
+            "sid": self.session,
+            "seq": seq,
+            "dir": "request",
+            "t": time.time(),
+            "type": command_type,
+            "bytes": len(payload),
+            "payload": _encode_payload(payload),
+        })
+        return seq
+
+    def record_response(self, seq: int, payload: bytes, elapsed_s: float) -> None:
+        self._write({
+            "sid": self.session,
+            "seq": seq,
+            "dir": "response",
+            "t": time.time(),
+            "elapsed_ms": round(elapsed_s * 1000.0, 3),
+            "bytes": len(payload),
+            "payload": _encode_payload(payload),
+        })
+
+    def record_error(self, seq: int, error: str) -> None:
+        self._write({"sid": self.session, "seq": seq, "dir": "error", "t": time.time(), "error": error})
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                self._fh.close()
+            except Exception as e:
+                logger.debug(f"Error closing traffic capture {self.path}: {e}")
+
+
+_recorder: Optional[TrafficRecorder] = None
+_recorder_lock = threading.Lock()
+_recorder_failed = False
+
+
+def get_recorder() -> Optional[TrafficRecorder]:
+    """Return the process-wide recorder, or None when capture is disabled."""
+    global _recorder, _recorder_failed
+    if _recorder is not None or _recorder_failed:
+        return _recorder
+    path = os.environ.get("UNITY_MCP_CAPTURE") or getattr(config, "capture_path", None)
+    if not path:
+        return None
+    with _recorder_lock:
+        if _recorder is None and not _recorder_failed:
+            try:
+                _recorder = TrafficRecorder(os.path.expanduser(path))
+                atexit.register(_recorder.close)
+                logger.info(f"Recording Unity bridge traffic to {_recorder.path}")
+            except Exception as e:
+                _recorder_failed = True
+                logger.warning(f"Could not open traffic capture {path}: {e}")
+    return _recorder
+
+
+def load_capture(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records from a capture file, skipping a truncated trailing line."""
+    import gzip
+
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        try:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        except EOFError:
+            # Capture was not closed cleanly (e.g. process killed); keep what we have
+            return
@@ -0,0 +1,425 @@
+"""
+Trigram index over the project's text assets, used to narrow searches.
+
+For each text asset (trigram_index_suffixes: .cs, .shader, .asmdef, .json,
+.uss, .uxml) the index keeps the set of three-character substrings of its
+distinct lines, case-folded. Postings map each trigram to the sorted ids of
+the files containing it. candidates() turns a regex into literal runs it
+requires (a disjunction of conjunctions, read from the parsed pattern) and
+intersects their trigrams' postings, so a symbol lookup only runs the real
+regex on files that can match. Patterns without a usable literal (three
+printable ASCII characters in a row) return None: search everything.
+
+The filter is conservative: indexed text is case-folded (Turkish dotted
+and dotless i folded onto "i" as re.IGNORECASE does), literals are
+restricted to printable ASCII, and trigrams never span lines, matching the
+per-line semantics of find_in_file and find_in_project.
+
+The file list comes from project_index. Files are re-read when their
+(mtime, size) changed; at most every trigram_index_poll_s a query re-stats
+the indexed files, because in-place edits do not change directory mtimes.
+Scripts the tools write are re-read at once (index_support.notify_written).
+A file read within index_support.RACY_WINDOW_NS of its mtime is "racy": a same-size
+rewrite in the same timestamp tick would look unchanged, so it is re-read
+on every re-stat, always kept as a candidate and never ruled out, until a
+read lands outside the window (as in project_index and script_mirror).
+A changed file gets a new id and its old id is masked until the postings
+are compacted. The index is saved zlib-compressed under
+trigram_index_dir (default <project>/Library/UnityMcp) and reloaded on the
+next start. Saving is debounced onto a timer thread (an
+index_support.DebouncedSaver, trigram_index_save_delay_s after the first
+unsaved change, and at exit), so a query never waits for the whole index
+to be serialized.
+"""
+
+import bisect
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import config
+from index_support import DebouncedSaver, Registry, is_racy
+import project_index
+
+try:  # Python 3.11+
+    import re._parser as _sre_parse  # type: ignore[import-not-found]
+    import re._constants as _sre_constants  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+    import sre_constants as _sre_constants  # type: ignore[no-redef]
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+_MAGIC = b"UMCPTRI1"
+_MAX_CLAUSES = 16
+_LITERAL_CHARS = frozenset(chr(c) for c in range(0x20, 0x7F)) | {"\t"}
+
+
+def _fold(text: str) -> str:
+    return text.casefold().replace("\u0307", "").replace("\u0131", "i")
+
+
+def extract_trigrams(text: str) -> Set[str]:
+    grams: Set[str] = set()
+    add = grams.add
+    for line in set(_fold(text).splitlines()):
+        for i in range(len(line) - 2):
+            add(line[i:i + 3])
+    return grams
+
+
+# -- query planning ---------------------------------------------------------
+
+_Plan = List[List[str]]  # OR of clauses, each an AND of literal runs
+
+
+def _and(a: _Plan, b: _Plan) -> Optional[_Plan]:
+    product = [x + y for x in a for y in b]
+    return product if len(product) <= _MAX_CLAUSES else None
+
+
+def _plan_seq(items) -> _Plan:
+    plan: _Plan = [[]]
+    run: List[str] = []
+
+    def flush() -> None:
+        nonlocal plan
+        if len(run) >= 3:
+            plan = [clause + ["".join(run)] for clause in plan]
+        run.clear()
+
+    for op, av in items:
+        if op is _sre_constants.LITERAL and chr(av) in _LITERAL_CHARS:
+            run.append(chr(av))
+            continue
+        flush()
+        sub: Optional[_Plan] = None
+        if op is _sre_constants.SUBPATTERN:
+            sub = _plan_seq(av[-1])
+        elif op in (_sre_constants.MAX_REPEAT, _sre_constants.MIN_REPEAT) and av[0] >= 1:
+            sub = _plan_seq(av[2])
+        elif op is _sre_constants.BRANCH:
+            alternatives = [_plan_seq(alt) for alt in av[1]]
+            if all(any(clause) for alt in alternatives for clause in alt):
+                sub = [clause for alt in alternatives for clause in alt]
+                if len(sub) > _MAX_CLAUSES:
+                    sub = None
+        if sub:
+            combined = _and(plan, sub)
+            if combined is not None:
+                plan = combined
+    flush()
+    return plan
+
+
+def plan_pattern(pattern: str, flags: int = 0) -> Optional[_Plan]:
+    """Literal runs a match must contain, as OR-of-AND, or None when nothing can be required."""
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+    plan = _plan_seq(list(parsed))
+    if not plan or any(not clause for clause in plan):
+        return None
+    return plan
+
+
+# -- index ------------------------------------------------------------------
+
+class TrigramIndex:
+    """Postings for one project root."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.files: Dict[str, Tuple[int, int, int]] = {}  # path -> (id, mtime_ns, size)
+        self.paths: Dict[int, str] = {}
+        self.postings: Dict[str, array] = {}
+        self.next_id = 0
+        self.dead = 0
+        self.racy: Set[str] = set()  # indexed too soon after their mtime to trust (mtime, size)
+        self._checked: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stats = {"indexed": 0, "queries": 0}
+
+    def _add(self, rel: str, mtime_ns: int, size: int, text: str) -> None:
+        fid = self.next_id
+        self.next_id += 1
+        self.files[rel] = (fid, mtime_ns, size)
+        self.paths[fid] = rel
+        if is_racy(mtime_ns):
+            self.racy.add(rel)
+        else:
+            self.racy.discard(rel)
+        for gram in extract_trigrams(text):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("I")
+            posting.append(fid)
+        self.stats["indexed"] += 1
+
+    def _drop(self, rel: str) -> None:
+        fid = self.files.pop(rel)[0]
+        del self.paths[fid]
+        self.racy.discard(rel)
+        self.dead += 1
+
+    def _compact(self) -> None:
+        live = self.paths
+        for gram in list(self.postings):
+            kept = array("I", (f for f in self.postings[gram] if f in live))
+            if kept:
+                self.postings[gram] = kept
+            else:
+                del self.postings[gram]
+        self.dead = 0
+
+    def _read(self, rel: str, mtime_ns: int, size: int) -> None:
+        try:
+            text = (self.root / rel).read_bytes().decode("utf-8", errors="replace")
+        except OSError:
+            return
+        self._add(rel, mtime_ns, size, text)
+
+    def _update_locked(self, listed: List[Dict[str, Any]], restat: bool) -> bool:
+        max_bytes = int(getattr(config, "search_max_file_bytes", 8 * 1024 * 1024))
+        seen = set()
+        changed = False
+        for entry in listed:
+            rel = entry["path"]
+            seen.add(rel)
+            mtime_ns, size = entry["mtime_ns"], entry["size"]
+            if restat:
+                try:
+                    st = os.stat(self.root / rel)
+                    mtime_ns, size = st.st_mtime_ns, st.st_size
+                except OSError:
+                    continue
+            known = self.files.get(rel)
+            if known is not None and (not restat or ((known[1], known[2]) == (mtime_ns, size) and rel not in self.racy)):
+                continue
+            if known is not None:
+                self._drop(rel)
+            changed = True
+            if size <= max_bytes:
+                self._read(rel, mtime_ns, size)
+        for rel in [r for r in self.files if r not in seen]:
+            self._drop(rel)
+            changed = True
+        if self.dead > max(64, len(self.files) // 4):
+            self._compact()
+        return changed
+
+    def refresh(self, force: bool = False) -> None:
+        suffixes = {s.lower() for s in getattr(config, "trigram_index_suffixes", ())}
+        listed = [e for e in project_index.get_index(self.root).files() if e["suffix"] in suffixes]
+        with self._lock:
+            now = time.monotonic()
+            poll_s = float(getattr(config, "trigram_index_poll_s", 2.0))
+            restat = force or self._checked is None or now - self._checked >= poll_s
+            changed = self._update_locked(listed, restat)
+            if restat:
+                self._checked = time.monotonic()
+        if changed:
+            _saver.schedule(self)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked = None
+
+    def recheck(self, rel: str) -> None:
+        """Re-read one file just written, created or deleted, instead of at the next re-stat."""
+        if not self.covers(rel):
+            return
+        with self._lock:
+            if self._checked is None:
+                return  # the next query re-stats every file anyway
+            try:
+                st = os.stat(self.root / rel)
+            except OSError:
+                st = None
+            known = self.files.get(rel)
+            if st is not None and known is not None and (known[1], known[2]) == (st.st_mtime_ns, st.st_size) and rel not in self.racy:
+                return
+            if known is not None:
+                self._drop(rel)
+            if st is not None and st.st_size <= int(getattr(config, "search_max_file_bytes", 8 * 1024 * 1024)):
+                self._read(rel, st.st_mtime_ns, st.st_size)
+        _saver.schedule(self)
+
+    def covers(self, rel: str) -> bool:
+        return os.path.splitext(rel)[1].lower() in {s.lower() for s in getattr(config, "trigram_index_suffixes", ())}
+
+    def candidates(self, pattern: str, flags: int = 0) -> Optional[Set[str]]:
+        """Indexed files that can contain a match, or None when the pattern cannot be narrowed.
+
+        Files the index does not cover (other suffixes) are not included;
+        callers search those separately.
+        """
+        plan = plan_pattern(pattern, flags)
+        if plan is None:
+            return None
+        self.refresh()
+        out: Set[str] = set()
+        with self._lock:
+            self.stats["queries"] += 1
+            for clause in plan:
+                grams = {g for literal in clause for g in extract_trigrams(literal)}
+                lists = sorted((self.postings.get(g, array("I")) for g in grams), key=len)
+                if not lists:
+                    continue
+                ids = [f for f in lists[0] if f in self.paths]
+                for posting in lists[1:]:
+                    if not ids:
+                        break
+                    ids = [f for f in ids if _contains(posting, f)]
+                out.update(self.paths[f] for f in ids)
+            out.update(self.racy)  # may have changed since they were read
+        return out
+
+    def rules_out(self, rel: str, pattern: str, flags: int = 0) -> bool:
+        """True when the indexed, still current copy of one file cannot match.
+
+        Does not refresh or build the index; an unknown or modified file is
+        never ruled out.
+        """
+        plan = plan_pattern(pattern, flags)
+        if plan is None:
+            return False
+        try:
+            st = os.stat(self.root / rel)
+        except OSError:
+            return False
+        if is_racy(st.st_mtime_ns):
+            return False
+        with self._lock:
+            known = self.files.get(rel)
+            if known is None or rel in self.racy or (known[1], known[2]) != (st.st_mtime_ns, st.st_size):
+                return False
+            self.stats["queries"] += 1
+            fid = known[0]
+            for clause in plan:
+                grams = {g for literal in clause for g in extract_trigrams(literal)}
+                if all(_contains(self.postings.get(g, array("I")), fid) for g in grams):
+                    return False
+        return True
+
+    # -- persistence -------------------------------------------------------
+
+    def dump(self) -> bytes:
+        with self._lock:
+            if self.dead:
+                self._compact()
+            header = json.dumps({
+                "root": str(self.root),
+                "next_id": self.next_id,
+                "files": {rel: list(v) for rel, v in self.files.items() if rel not in self.racy},  # re-read after a reload
+            }, separators=(",", ":")).encode("utf-8")
+            parts = [struct.pack("<I", len(header)), header]
+            for gram, posting in self.postings.items():
+                key = gram.encode("utf-8")
+                parts.append(struct.pack("<BI", len(key), len(posting)))
+                parts.append(key)
+                parts.append(posting.tobytes())
+        return _MAGIC + zlib.compress(b"".join(parts), 6)
+
+    def load(self, blob: bytes) -> bool:
+        if not blob.startswith(_MAGIC):
+            return False
+        data = zlib.decompress(blob[len(_MAGIC):])
+        (hlen,) = struct.unpack_from("<I", data, 0)
+        header = json.loads(data[4:4 + hlen].decode("utf-8"))
+        if header.get("root") != str(self.root):
+            return False
+        postings: Dict[str, array] = {}
+        pos = 4 + hlen
+        while pos < len(data):
+            klen, count = struct.unpack_from("<BI", data, pos)
+            pos += 5
+            gram = data[pos:pos + klen].decode("utf-8")
+            pos += klen
+            posting = array("I")
+            posting.frombytes(data[pos:pos + 4 * count])
+            pos += 4 * count
+            postings[gram] = posting
+        with self._lock:
+            self.files = {rel: tuple(v) for rel, v in header["files"].items()}  # type: ignore[misc]
+            self.paths = {v[0]: rel for rel, v in self.files.items()}
+            self.postings = postings
+            self.next_id = int(header["next_id"])
+            self.dead = 0
+            self.racy = set()
+            self._checked = None
+        return True
+
+
+def _contains(posting: array, fid: int) -> bool:
+    i = bisect.bisect_left(posting, fid)
+    return i < len(posting) and posting[i] == fid
+
+
+def _index_file(root: Path) -> Path:
+    base = getattr(config, "trigram_index_dir", None)
+    if base:
+        import hashlib
+        digest = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:16]
+        return Path(base).expanduser() / f"trigrams-{digest}.bin"
+    return root / "Library" / "UnityMcp" / "trigrams.bin"
+
+
+def _save(index: TrigramIndex) -> None:
+    target = _index_file(index.root)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(index.dump())
+        os.replace(tmp, target)
+    except OSError as e:
+        logger.debug(f"Could not save trigram index to {target}: {e}")
+
+
+def _load(key: str) -> TrigramIndex:
+    index = TrigramIndex(Path(key))
+    target = _index_file(index.root)
+    if target.is_file():
+        try:
+            index.load(target.read_bytes())
+        except (OSError, ValueError, KeyError, struct.error, zlib.error) as e:
+            logger.debug(f"Ignoring unreadable trigram index {target}: {e}")
+    return index
+
+
+_indexes: "Registry[TrigramIndex]" = Registry(_load, recheck=TrigramIndex.recheck)
+_saver = DebouncedSaver(_save, "trigram_index_save_delay_s")
+
+
+def flush_saves() -> None:
+    """Write pending saves now (at exit, or before reading the saved file)."""
+    _saver.flush()
+
+
+def get_index(root: Path) -> TrigramIndex:
+    """The shared trigram index for a project root, loaded from disk when saved earlier."""
+    return _indexes.get(root)
+
+
+def invalidate(root: Optional[Path] = None) -> None:
+    """Re-stat indexed files on the next query (all indexes when root is None)."""
+    _indexes.invalidate(root)
+
+
+def index_stats() -> Dict[str, Any]:
+    return {key: {**index.stats, "files": len(index.files), "trigrams": len(index.postings)}
+            for key, index in _indexes.items()}
+
+
+def reset() -> None:
+    """Forget loaded indexes and drop pending saves."""
+    _saver.cancel()
+    _indexes.clear()
@@ -11,7 +11,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict
 from config import config
+from memory_trace import traced
 from port_discovery import PortDiscovery
+from traffic_capture import get_recorder
 
 # Configure logging using settings from config
 logging.basicConfig(
@@ -204,6 +206,7 @@ class UnityConnection:
             logger.error(f"Error during receive: {str(e)}")
             raise
 
+    @traced(lambda self, command_type, *args, **kwargs: f"send_command:{command_type}")
     def send_command(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Send a command with retry/backoff and port rediscovery. Pings only when requested."""
         # Defensive guard: catch empty/placeholder invocations early
@@ -227,6 +230,7 @@ class UnityConnection:
                 return None
 
         last_short_timeout = None
+        recorder = get_recorder()
 
         # Preflight: if Unity reports reloading, return a structured hint so clients can retry politely
         try:
@@ -243,6 +247,7 @@ class UnityConnection:
             pass
 
         for attempt in range(attempts + 1):
+            capture_seq = None
             try:
                 # Ensure connected (handshake occurs within connect())
                 if not self.sock and not self.connect():
@@ -265,6 +270,9 @@ class UnityConnection:
                             mode,
                             (payload[:32]).decode('utf-8', 'ignore'),
                         )
+                    if recorder is not None:
+                        capture_seq = recorder.record_request(command_type, payload)
+                        sent_at = time.monotonic()
                     if self.use_framing:
                         header = struct.pack('>Q', len(payload))
                         self.sock.sendall(header)
@@ -279,6 +287,8 @@ class UnityConnection:
                         self.sock.settimeout(1.0)
                     try:
                         response_data = self.receive_full_response(self.sock)
+                        if capture_seq is not None:
+                            recorder.record_response(capture_seq, response_data, time.monotonic() - sent_at)
                         with contextlib.suppress(Exception):
                             logger.debug("recv %d bytes; mode=%s", len(response_data), mode)
                     finally:
@@ -300,6 +310,8 @@ class UnityConnection:
                 return resp.get('result', {})
             except Exception as e:
                 logger.warning(f"Unity communication attempt {attempt+1} failed: {e}")
+                if recorder is not None and capture_seq is not None:
+                    recorder.record_error(capture_seq, str(e))
                 try:
                     if self.sock:
                         self.sock.close()
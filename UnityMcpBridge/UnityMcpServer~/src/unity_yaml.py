@@ -0,0 +1,374 @@
+"""
+Offline reader for text-serialized Unity scenes and prefabs.
+
+A .unity or .prefab file saved with Force Text serialization is a stream
+of YAML documents, one per object, each introduced by a header such as
+"--- !u!1 &123456" (class id 1, GameObject, fileID 123456; "stripped"
+marks a placeholder for an object inside a prefab instance). This module
+reads that stream line by line, keeps only the handful of fields a
+hierarchy needs (names, tags, layers, active flags, Transform parents and
+children, local position/rotation/scale, component types and MonoBehaviour
+script GUIDs, prefab instance sources and m_Name overrides) and links
+them into a tree of plain dicts, without a YAML library and without the
+editor. Other documents (meshes, lightmap settings, serialized component
+data) are skipped as they stream past.
+
+A prefab instance's m_Modifications may rename any object inside the
+prefab, so each m_Name override is kept with its target fileID. Given a
+prefab_root resolver, load names the instance from the override that
+targets the prefab's root GameObject; without one, a lone override is
+used and several leave the name empty.
+
+Trees are cached per file (mtime, size) in a small LRU
+(scene_tree_entries), so repeated hierarchy queries on an unchanged scene
+do not re-read it. Only saved state is visible: unsaved editor changes
+and objects inside prefab instances (other than the instance root) are
+not, since those live in the prefab asset, not in the scene file.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import config
+
+_HEADER = re.compile(r"^--- !u!(\d+) &(-?\d+)( stripped)?")
+_KEY = re.compile(r"^( *)(-? ?)(\w+):(?: (.*))?$")
+_FILE_ID = re.compile(r"fileID: (-?\d+)")
+_GUID = re.compile(r"guid: ([0-9a-fA-F]{32})")
+_COMPONENT = re.compile(r"(\w+): ([^,}]+)")
+
+GAME_OBJECT = 1
+TRANSFORM = 4
+RECT_TRANSFORM = 224
+PREFAB_INSTANCE = 1001
+SCENE_ROOTS = 1660057539
+_TRANSFORMS = (TRANSFORM, RECT_TRANSFORM)
+
+# Fields read at any depth <= _MAX_INDENT; everything else is skipped.
+_SCALARS = {
+    "m_Name", "m_TagString", "m_Layer", "m_IsActive", "m_StaticEditorFlags", "m_Enabled", "m_RootOrder",
+    "m_GameObject", "m_Father", "m_PrefabInstance", "m_TransformParent", "m_SourcePrefab", "m_Script",
+    "m_LocalPosition", "m_LocalRotation", "m_LocalScale",
+}
+_LISTS = {"m_Component", "m_Children", "m_Roots"}
+_MAX_INDENT = 4
+
+Node = Dict[str, Any]
+
+
+class Document:
+    """The fields of one YAML document that the hierarchy uses."""
+
+    __slots__ = ("class_id", "file_id", "stripped", "type", "fields", "lists", "name_overrides")
+
+    def __init__(self, class_id: int, file_id: int, stripped: bool):
+        self.class_id = class_id
+        self.file_id = file_id
+        self.stripped = stripped
+        self.type: Optional[str] = None
+        self.fields: Dict[str, str] = {}
+        self.lists: Dict[str, List[int]] = {}
+        self.name_overrides: Dict[int, str] = {}  # PrefabInstance: m_Name value by target fileID
+
+    def ref(self, key: str) -> int:
+        m = _FILE_ID.search(self.fields.get(key, ""))
+        return int(m.group(1)) if m else 0
+
+    def guid(self, key: str) -> Optional[str]:
+        m = _GUID.search(self.fields.get(key, ""))
+        return m.group(1).lower() if m else None
+
+
+def _scalar(raw: str) -> str:
+    raw = raw.strip()
+    if len(raw) >= 2 and raw[0] == raw[-1] == "'":
+        return raw[1:-1].replace("''", "'")
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        try:
+            return raw[1:-1].encode("latin-1", "backslashreplace").decode("unicode_escape")
+        except UnicodeDecodeError:
+            return raw[1:-1]
+    return raw
+
+
+def _vector(raw: Optional[str]) -> Optional[Dict[str, float]]:
+    if not raw:
+        return None
+    out = {}
+    for key, value in _COMPONENT.findall(raw):
+        try:
+            out[key] = float(value)
+        except ValueError:
+            return None
+    return out or None
+
+
+def iter_documents(lines: Iterable[str]) -> Iterator[Document]:
+    """Documents of a Unity YAML stream, in file order."""
+    doc: Optional[Document] = None
+    list_key: Optional[str] = None
+    path_is_name = False
+    target = 0
+    for line in lines:
+        if line.startswith("---"):
+            if doc is not None:
+                yield doc
+            m = _HEADER.match(line)
+            doc = Document(int(m.group(1)), int(m.group(2)), bool(m.group(3))) if m else None
+            list_key, path_is_name, target = None, False, 0
+            continue
+        if doc is None:
+            continue
+        if doc.type is None:
+            if line[:1].isalpha():
+                doc.type = line.split(":", 1)[0].strip()
+            continue
+        if list_key is not None and line.startswith("  - "):
+            ref = _FILE_ID.search(line)
+            if ref:
+                doc.lists[list_key].append(int(ref.group(1)))
+            continue
+        m = _KEY.match(line.rstrip("\r\n"))
+        if m is None:
+            continue
+        indent, dash, key, value = len(m.group(1)), m.group(2), m.group(3), m.group(4)
+        if key == "target" and doc.class_id == PREFAB_INSTANCE:
+            ref = _FILE_ID.search(value or "")
+            target = int(ref.group(1)) if ref else 0
+            continue
+        if key == "propertyPath":
+            path_is_name = (value or "").strip() == "m_Name"
+            continue
+        if key == "value" and path_is_name:
+            doc.name_overrides.setdefault(target, _scalar(value or ""))
+            path_is_name = False
+            continue
+        if indent > _MAX_INDENT or dash:
+            continue
+        list_key = None
+        if key in _LISTS and indent == 2:
+            if value and value.strip() != "[]":
+                doc.lists[key] = [int(r) for r in _FILE_ID.findall(value)]
+            else:
+                doc.lists[key] = []
+                list_key = key
+        elif key in _SCALARS and key not in doc.fields:
+            doc.fields[key] = value or ""
+    if doc is not None:
+        yield doc
+
+
+class SceneTree:
+    """GameObject hierarchy of one saved scene or prefab."""
+
+    def __init__(self, docs: Iterable[Document]):
+        self.roots: List[Node] = []
+        self.nodes: Dict[int, Node] = {}
+        self.documents = 0
+        # Prefab instances not yet named from their prefab's root: fileID -> (prefab guid, m_Name overrides)
+        self._unnamed: Dict[int, Tuple[str, Dict[int, str]]] = {}
+        self._build(docs)
+
+    def _build(self, docs: Iterable[Document]) -> None:
+        objects: Dict[int, Document] = {}
+        transforms: Dict[int, Document] = {}
+        components: List[Document] = []
+        instances: Dict[int, Document] = {}
+        order: Dict[int, int] = {}  # document order, for stable sibling order
+        scene_roots: List[int] = []
+        for doc in docs:
+            self.documents += 1
+            order[doc.file_id] = self.documents
+            if doc.class_id == GAME_OBJECT:
+                objects[doc.file_id] = doc
+            elif doc.class_id in _TRANSFORMS:
+                transforms[doc.file_id] = doc
+            elif doc.class_id == PREFAB_INSTANCE:
+                instances[doc.file_id] = doc
+            elif doc.class_id == SCENE_ROOTS:
+                scene_roots = doc.lists.get("m_Roots", [])
+            if doc.class_id not in (GAME_OBJECT, PREFAB_INSTANCE, SCENE_ROOTS) and not doc.stripped:
+                components.append(doc)
+
+        for fid, doc in objects.items():
+            if doc.stripped:
+                continue
+            self.nodes[fid] = {
+                "name": _scalar(doc.fields.get("m_Name", "")),
+                "fileID": fid,
+                "active": doc.fields.get("m_IsActive", "1").strip() != "0",
+                "tag": _scalar(doc.fields.get("m_TagString", "Untagged")),
+                "layer": int(doc.fields.get("m_Layer", "0") or 0),
+                "isStatic": doc.fields.get("m_StaticEditorFlags", "0").strip() not in ("0", ""),
+                "components": [],
+                "children": [],
+            }
+        for fid, doc in instances.items():
+            overrides = doc.name_overrides
+            prefab = doc.guid("m_SourcePrefab")
+            self.nodes[fid] = {
+                # An override may rename any object in the prefab; a lone one is taken to be the root's
+                "name": next(iter(overrides.values())) if len(overrides) == 1 else "",
+                "fileID": fid,
+                "prefab": prefab,
+                "components": [],
+                "children": [],
+            }
+            if prefab:
+                self._unnamed[fid] = (prefab, overrides)
+
+        # A stripped GameObject / Transform stands for an object inside a prefab instance
+        def owner(fid: int, pool: Dict[int, Document]) -> Optional[Node]:
+            doc = pool.get(fid)
+            if doc is not None and doc.stripped:
+                return self.nodes.get(doc.ref("m_PrefabInstance"))
+            return self.nodes.get(fid)
+
+        node_of_transform: Dict[int, Node] = {}
+        for tid, doc in transforms.items():
+            node = self.nodes.get(doc.ref("m_PrefabInstance")) if doc.stripped else owner(doc.ref("m_GameObject"), objects)
+            if node is not None:
+                node_of_transform.setdefault(tid, node)
+        for doc in components:
+            node = owner(doc.ref("m_GameObject"), objects)
+            if node is None:
+                continue
+            if doc.class_id in _TRANSFORMS:
+                transform = {k: _vector(doc.fields.get(f)) for k, f in
+                             (("position", "m_LocalPosition"), ("rotation", "m_LocalRotation"), ("scale", "m_LocalScale"))}
+                node.setdefault("transform", {k: v for k, v in transform.items() if v is not None})
+            entry: Dict[str, Any] = {"type": doc.type, "fileID": doc.file_id}
+            script = doc.guid("m_Script")
+            if script:
+                entry["script"] = script
+            if "m_Enabled" in doc.fields:
+                entry["enabled"] = doc.fields["m_Enabled"].strip() != "0"
+            node["components"].append(entry)
+
+        # Sibling order: position in the parent's m_Children (or in SceneRoots / m_RootOrder for
+        # roots), then document order for children only linked through m_Father / m_TransformParent
+        listed: Dict[int, int] = {}
+        for doc in transforms.values():
+            for i, child in enumerate(doc.lists.get("m_Children", [])):
+                listed.setdefault(child, i)
+        root_rank = {tid: i for i, tid in enumerate(scene_roots)}
+
+        def rank(tid: int, parent: Optional[Node]) -> Tuple[int, float]:
+            if parent is not None:
+                return (0, listed[tid]) if tid in listed else (1, order.get(tid, 0))
+            if tid in root_rank:
+                return 0, root_rank[tid]
+            root_order = transforms[tid].fields.get("m_RootOrder", "").strip() if tid in transforms else ""
+            return (0, int(root_order)) if root_order.lstrip("-").isdigit() else (1, order.get(tid, 0))
+
+        links: List[Tuple[Optional[Node], Tuple[int, float], Node]] = []
+        linked = set()
+        for tid, doc in transforms.items():
+            node = node_of_transform.get(tid)
+            if doc.stripped or node is None or id(node) in linked:
+                continue
+            parent = node_of_transform.get(doc.ref("m_Father"))
+            links.append((parent, rank(tid, parent), node))
+            linked.add(id(node))
+        for fid, doc in instances.items():
+            parent = node_of_transform.get(doc.ref("m_TransformParent"))
+            own = [tid for tid, t in transforms.items() if t.stripped and t.ref("m_PrefabInstance") == fid]
+            links.append((parent, min([rank(t, parent) for t in own] or [(1, order.get(fid, 0))]), self.nodes[fid]))
+            linked.add(id(self.nodes[fid]))
+        for node in self.nodes.values():
+            if id(node) not in linked:  # a GameObject without a Transform
+                links.append((None, (2, order.get(node["fileID"], 0)), node))
+        for parent, _, node in sorted(links, key=lambda link: link[1]):
+            (parent["children"] if parent is not None and parent is not node else self.roots).append(node)
+
+    def name_instances(self, prefab_root: Callable[[str], Optional[Tuple[int, str]]]) -> None:
+        """Name prefab instances after their root GameObject.
+
+        prefab_root maps a prefab GUID to its root GameObject (fileID, name);
+        the instance takes the m_Name override targeting that fileID, else
+        the prefab root's own name. Each instance is resolved once.
+        """
+        roots: Dict[str, Optional[Tuple[int, str]]] = {}
+        for fid, (prefab, overrides) in list(self._unnamed.items()):
+            if prefab not in roots:
+                roots[prefab] = prefab_root(prefab)
+            root = roots[prefab]
+            if root is not None:
+                self.nodes[fid]["name"] = overrides.get(root[0], root[1])
+            self._unnamed.pop(fid, None)
+
+    def walk(self, start: Optional[List[Node]] = None, prefix: str = "") -> Iterator[Tuple[str, Node]]:
+        """(slash-separated path, node) for every node, depth first."""
+        stack = [(prefix, node) for node in reversed(self.roots if start is None else start)]
+        while stack:  # iterative: saved hierarchies can be deeper than the recursion limit
+            parent_path, node = stack.pop()
+            path = f"{parent_path}/{node['name']}" if parent_path else node["name"]
+            yield path, node
+            stack.extend((path, child) for child in reversed(node["children"]))
+
+    def find(self, name: Optional[str] = None, component: Optional[str] = None) -> List[Tuple[str, Node]]:
+        """Nodes whose name matches a glob and/or that have a component of a type."""
+        out = []
+        for path, node in self.walk():
+            if name is not None and not fnmatchcase(node["name"], name):
+                continue
+            if component is not None and not any(c["type"] == component for c in node["components"]):
+                continue
+            out.append((path, node))
+        return out
+
+    def at(self, path: str) -> Optional[Node]:
+        """The node at a slash-separated path from a root, e.g. 'Canvas/Panel/Button'."""
+        for found, node in self.walk():
+            if found == path.strip("/"):
+                return node
+        return None
+
+
+_cache: "OrderedDict[Tuple[str, int, int], SceneTree]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def is_text_yaml(path: Path) -> bool:
+    """True when the file starts like a text-serialized Unity asset."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(5) == b"%YAML"
+    except OSError:
+        return False
+
+
+def load(path: Path, prefab_root: Optional[Callable[[str], Optional[Tuple[int, str]]]] = None) -> SceneTree:
+    """The hierarchy of a saved scene or prefab, cached by (path, mtime, size).
+
+    With prefab_root, prefab instances are named after their prefab's root
+    GameObject (see SceneTree.name_instances).
+    """
+    st = os.stat(path)
+    key = (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        tree = _cache.get(key)
+        if tree is not None:
+            _cache.move_to_end(key)
+    if tree is None:
+        with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+            tree = SceneTree(iter_documents(f))
+        with _cache_lock:
+            for stale in [k for k in _cache if k[0] == key[0]]:
+                del _cache[stale]
+            _cache[key] = tree
+            while len(_cache) > max(1, int(getattr(config, "scene_tree_entries", 8))):
+                _cache.popitem(last=False)
+    if prefab_root is not None:
+        tree.name_instances(prefab_root)
+    return tree
+
+
+def reset() -> None:
+    with _cache_lock:
+        _cache.clear()
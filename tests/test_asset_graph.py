@@ -0,0 +1,199 @@
+import sys
+import asyncio
+import os
+import pathlib
+import time
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+import asset_graph  # noqa: E402
+import project_index  # noqa: E402
+from config import config  # noqa: E402
+from tools.resource_tools import register_resource_tools  # noqa: E402
+
+
+SHADER = "a" * 32
+TEX = "b" * 32
+MAT = "c" * 32
+PREFAB = "d" * 32
+SCENE = "e" * 32
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+def _meta(path: pathlib.Path, guid: str, extra: str = "") -> None:
+    path.with_name(path.name + ".meta").write_text(f"fileFormatVersion: 2\nguid: {guid}\n{extra}", encoding="utf-8")
+
+
+def _age(path: pathlib.Path, seconds: float = 60.0) -> None:
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "asset_graph_dir", str(tmp_path / "cache"))
+    project_index.reset()
+    asset_graph.reset()
+    art = tmp_path / "Assets" / "Art"
+    art.mkdir(parents=True)
+    (art / "Hero.shader").write_text("Shader \"Hero\" {}\n", encoding="utf-8")
+    _meta(art / "Hero.shader", SHADER)
+    (art / "Hero.png").write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00")
+    _meta(art / "Hero.png", TEX, "TextureImporter:\n  spritePackingTag:\n")
+    (art / "Hero.mat").write_text(
+        "%YAML 1.1\n--- !u!21 &2100000\nMaterial:\n"
+        f"  m_Shader: {{fileID: 4800000, guid: {SHADER}, type: 3}}\n"
+        f"  m_Texture: {{fileID: 2800000, guid: {TEX}, type: 3}}\n", encoding="utf-8")
+    _meta(art / "Hero.mat", MAT)
+    (art / "Hero.prefab").write_text(
+        "--- !u!23 &1\nMeshRenderer:\n"
+        f"  m_Materials:\n  - {{fileID: 2100000, guid: {MAT}, type: 2}}\n", encoding="utf-8")
+    _meta(art / "Hero.prefab", PREFAB)
+    (tmp_path / "Assets" / "Main.unity").write_text(
+        f"--- !u!1001 &5\nPrefabInstance:\n  m_SourcePrefab: {{fileID: 100100000, guid: {PREFAB}, type: 3}}\n",
+        encoding="utf-8")
+    _meta(tmp_path / "Assets" / "Main.unity", SCENE)
+    for path in (tmp_path / "Assets").rglob("*.*"):
+        _age(path)
+    yield tmp_path
+    project_index.reset()
+    asset_graph.reset()
+
+
+def _call(tool, **kw):
+    mcp = DummyMCP()
+    register_resource_tools(mcp)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(mcp.tools[tool](**kw))
+    finally:
+        loop.close()
+
+
+def test_scan_bytes_separates_own_guid_from_references():
+    raw = f"fileFormatVersion: 2\nguid: {MAT.upper()}\nuserData: {{guid: {TEX}}}\n".encode()
+    assert asset_graph.scan_bytes(raw, True) == (MAT, (TEX,))
+    assert asset_graph.scan_bytes(f"m: {{guid: {MAT}}}\nn: {{guid: {TEX}}}\n".encode(), False) == (None, (TEX, MAT))
+
+
+def test_forward_and_reverse_lookups(project):
+    data = _call("list_asset_dependencies", uri="unity://path/Assets/Art/Hero.mat", project_root=str(project))["data"]
+    assert data["guid"] == MAT
+    assert [(d["path"], d["uri"]) for d in data["dependencies"]] == [
+        ("Assets/Art/Hero.shader", "unity://path/Assets/Art/Hero.shader"),
+        ("Assets/Art/Hero.png", "unity://path/Assets/Art/Hero.png")]
+
+    data = _call("find_asset_references", guid=TEX, project_root=str(project))["data"]
+    assert [r["path"] for r in data["references"]] == ["Assets/Art/Hero.mat"]
+    data = _call("find_asset_references", uri="unity://path/Assets/Art/Hero.png", recursive=True,
+                 project_root=str(project))["data"]
+    assert [r["path"] for r in data["references"]] == ["Assets/Art/Hero.mat", "Assets/Art/Hero.prefab", "Assets/Main.unity"]
+    data = _call("list_asset_dependencies", uri="unity://path/Assets/Main.unity", recursive=True, max_results=2,
+                 project_root=str(project))["data"]
+    assert [d["path"] for d in data["dependencies"]] == ["Assets/Art/Hero.prefab", "Assets/Art/Hero.mat"]
+    assert data["truncated"] is True
+
+
+def test_edits_are_picked_up_incrementally(project, monkeypatch):
+    monkeypatch.setattr(config, "asset_graph_poll_s", 3600.0)
+    graph = asset_graph.get_graph(project)
+    assert [r["path"] for r in graph.references(SHADER)] == ["Assets/Art/Hero.mat"]
+    scanned = graph.stats["scanned"]
+    (project / "Assets" / "Art" / "Hero.mat").write_text(
+        f"Material:\n  m_Texture: {{fileID: 2800000, guid: {TEX}, type: 3}}\n", encoding="utf-8")
+    _age(project / "Assets" / "Art" / "Hero.mat", 30.0)
+    project_index.invalidate(project)
+    asset_graph.invalidate(project)
+    assert graph.references(SHADER) == []
+    assert [r["path"] for r in graph.references(TEX)] == ["Assets/Art/Hero.mat"]
+    assert graph.stats["scanned"] == scanned + 1
+
+    (project / "Assets" / "Art" / "Hero.prefab.meta").unlink()
+    project_index.invalidate(project)
+    asset_graph.invalidate(project)
+    assert graph.path_of(PREFAB) is None
+    assert [r["guid"] for r in graph.references(MAT)] == [None]
+
+
+def test_graph_is_reloaded_from_disk(project):
+    first = asset_graph.get_graph(project).references(PREFAB)
+    assert not (project / "cache").exists()  # saved in the background
+    asset_graph.flush_saves()
+    assert list((project / "cache").glob("asset-graph-*.json.gz"))
+    asset_graph.reset()
+    graph = asset_graph.get_graph(project)
+    assert graph.references(PREFAB) == first
+    assert graph.stats["scanned"] == 0
+
+
+def test_same_size_rewrite_in_one_timestamp_tick_is_rescanned(project):
+    graph = asset_graph.get_graph(project)
+    target = project / "Assets" / "Art" / "Hero.prefab"
+    target.write_text(target.read_text(encoding="utf-8").replace(MAT, SHADER), encoding="utf-8")
+    assert [r["path"] for r in graph.references(SHADER)] == ["Assets/Art/Hero.mat", "Assets/Art/Hero.prefab"]
+    st = target.stat()
+    target.write_text(target.read_text(encoding="utf-8").replace(SHADER, MAT), encoding="utf-8")
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+    asset_graph.invalidate(project)
+    assert [r["path"] for r in graph.references(MAT)] == ["Assets/Art/Hero.prefab"]
+
+
+def test_resolve_guids_reads_meta_files_without_building_the_graph(project, monkeypatch):
+    reads = []
+    real = asset_graph._meta_guid
+    monkeypatch.setattr(asset_graph, "_meta_guid", lambda path: reads.append(path.name) or real(path))
+    assert asset_graph.resolve_guids(project, [MAT.upper(), "0" * 32]) == {MAT: "Assets/Art/Hero.mat"}
+    assert asset_graph._graphs.loaded() == [] and len(reads) == 5  # the unknown GUID needed every .meta once
+    reads.clear()
+    assert asset_graph.resolve_guids(project, [MAT, SHADER]) == {MAT: "Assets/Art/Hero.mat", SHADER: "Assets/Art/Hero.shader"}
+    assert reads == []
+
+    _meta(project / "Assets" / "Art" / "Hero.png", "9" * 32)  # guid changed: that .meta is read again
+    project_index.invalidate(project)
+    assert asset_graph.resolve_guids(project, ["9" * 32]) == {"9" * 32: "Assets/Art/Hero.png"}
+    assert reads == ["Hero.png.meta"]
+
+
+def test_resolve_guids_stats_meta_files_itself(project):
+    meta = project / "Assets" / "Art" / "Hero.mat.meta"
+    assert asset_graph.resolve_guids(project, [MAT]) == {MAT: "Assets/Art/Hero.mat"}
+    st = meta.stat()
+    meta.write_text(meta.read_text(encoding="utf-8").replace(MAT, "f" * 32), encoding="utf-8")
+    os.utime(meta, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # project_index is not told
+    assert asset_graph.resolve_guids(project, ["f" * 32]) == {"f" * 32: "Assets/Art/Hero.mat"}
+    assert asset_graph.resolve_guids(project, [MAT]) == {}
+
+
+def test_resolve_guids_rereads_racy_meta_files(project):
+    meta = project / "Assets" / "Art" / "Hero.mat.meta"
+    meta.write_text(meta.read_text(encoding="utf-8"), encoding="utf-8")  # fresh mtime: racy
+    assert asset_graph.resolve_guids(project, [MAT]) == {MAT: "Assets/Art/Hero.mat"}
+    st = meta.stat()
+    meta.write_text(meta.read_text(encoding="utf-8").replace(MAT, "f" * 32), encoding="utf-8")
+    os.utime(meta, ns=(st.st_atime_ns, st.st_mtime_ns))  # same size, same timestamp tick
+    assert asset_graph.resolve_guids(project, ["f" * 32]) == {"f" * 32: "Assets/Art/Hero.mat"}
@@ -0,0 +1,41 @@
+import importlib.util
+import pathlib
+import sys
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+TOOLS = ROOT / "tools"
+
+
+def _load(name: str):
+    sys.path.insert(0, str(TOOLS))
+    spec = importlib.util.spec_from_file_location(name, TOOLS / f"{name}.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+bench = _load("benchmark_server")
+
+
+def _doc(**medians):
+    return {"benchmarks": {k: {"median": v} for k, v in medians.items()}}
+
+
+def test_compare_flags_regressions_past_threshold():
+    report = bench.compare(_doc(a=1.0, b=1.0, c=1.0), _doc(a=1.2, b=1.5, c=0.5), threshold=0.25)
+    status = {r["name"]: r["status"] for r in report["rows"]}
+    assert status == {"a": "ok", "b": "regressed", "c": "improved"}
+    assert [r["name"] for r in report["regressions"]] == ["b"]
+
+
+def test_compare_reports_missing_without_failing():
+    report = bench.compare(_doc(a=1.0), _doc(b=1.0), threshold=0.1)
+    assert not report["regressions"]
+    assert {r["status"] for r in report["rows"]} == {"missing_in_current", "missing_in_baseline"}
+
+
+def test_run_benchmark_against_fake_bridge():
+    result = bench.run_benchmark("e2e.script_apply_edits.fake_bridge", rounds=1, min_time=0.0)
+    assert result["median"] > 0
+    assert result["rounds"] == 1
@@ -0,0 +1,125 @@
+import sys
+import asyncio
+import hashlib
+import importlib.util
+import os
+import pathlib
+import time
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+import file_window  # noqa: E402
+import script_mirror  # noqa: E402
+from config import config  # noqa: E402
+from tools.resource_tools import register_resource_tools  # noqa: E402
+
+
+def _load(path: pathlib.Path, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+manage_script = _load(SRC / "tools" / "manage_script.py", "manage_script_conditional")
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    scripts = tmp_path / "Assets" / "Scripts"
+    scripts.mkdir(parents=True)
+    monkeypatch.setenv("UNITY_PROJECT_ROOT", str(tmp_path))
+    file_window.reset()
+    script_mirror.reset()
+    yield tmp_path
+    file_window.reset()
+    script_mirror.reset()
+
+
+def _age(path: pathlib.Path, seconds: float = 60.0) -> None:
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def _read(project, **kw):
+    mcp = DummyMCP()
+    register_resource_tools(mcp)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(mcp.tools["read_resource"](project_root=str(project), **kw))
+    finally:
+        loop.close()
+
+
+def test_unchanged_resource_returns_not_modified_without_reading(project, monkeypatch):
+    f = project / "Assets" / "Scripts" / "Player.cs"
+    f.write_text("class Player {}\n", encoding="utf-8")
+    _age(f)
+    uri = "unity://path/Assets/Scripts/Player.cs"
+    sha = _read(project, uri=uri)["data"]["metadata"]["sha256"]
+
+    monkeypatch.setattr(pathlib.Path, "read_text", lambda *a, **k: pytest.fail("file re-read"))
+    resp = _read(project, uri=uri, if_none_match=sha.upper())
+    assert resp == {"success": True, "data": {"not_modified": True, "metadata": {"sha256": sha}}}
+    monkeypatch.undo()
+
+    f.write_text("class Player { int hp; }\n", encoding="utf-8")
+    changed = _read(project, uri=uri, if_none_match=sha)["data"]
+    assert changed["text"] == "class Player { int hp; }\n" and changed["metadata"]["sha256"] != sha
+
+    window = _read(project, uri=uri, tail_lines=1)["data"]["metadata"]["sha256"]
+    assert _read(project, uri=uri, tail_lines=1, if_none_match=window)["data"]["not_modified"] is True
+
+
+def test_paged_resource_matches_on_file_sha(project, monkeypatch):
+    monkeypatch.setattr(config, "read_max_chunk_bytes", 64)
+    f = project / "Assets" / "Level.unity"
+    f.write_text("m_Name: Root\n" * 20, encoding="utf-8")
+    uri = "unity://path/Assets/Level.unity"
+    first = _read(project, uri=uri)["data"]
+    resp = _read(project, uri=uri, if_none_match=first["metadata"]["file_sha256"])
+    assert resp["data"] == {"not_modified": True, "metadata": {"file_sha256": first["metadata"]["file_sha256"]}}
+
+
+def test_manage_script_read_honours_if_none_match(project):
+    f = project / "Assets" / "Scripts" / "Enemy.cs"
+    f.write_bytes(b"class Enemy {}\n")
+    _age(f)
+    mcp = DummyMCP()
+    manage_script.register_manage_script_tools(mcp)
+    sha = hashlib.sha256(b"class Enemy {}\n").hexdigest()
+
+    def no_unity(cmd, params):
+        raise AssertionError(f"unexpected Unity call: {cmd} {params}")
+    manage_script.send_command_with_retry = no_unity
+
+    resp = mcp.tools["manage_script"](None, "read", "Enemy", "Assets/Scripts", if_none_match=sha)
+    assert resp["data"] == {"not_modified": True, "sha256": sha}
+    resp = mcp.tools["manage_script"](None, "read", "Enemy", "Assets/Scripts", if_none_match="0" * 64)
+    assert resp["data"]["contents"] == "class Enemy {}\n" and resp["data"]["sha256"] == sha
@@ -0,0 +1,205 @@
+import sys
+import pathlib
+import importlib.util
+import re
+import types
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+
+def _load(path: pathlib.Path, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+import csharp_outline  # noqa: E402
+manage_script_edits = _load(SRC / "tools" / "manage_script_edits.py", "manage_script_edits_outline")
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+SOURCE = """using UnityEngine;
+
+namespace Game.Logic
+{
+    // class Decoy { void Hidden() { } }
+    public class Player : MonoBehaviour
+    {
+        private string s = "void Fake() { }";
+        private char c = '{';
+
+        [SerializeField]
+        [Tooltip("speed")]
+        public void Move(int x)
+        {
+            if (x > 0) { Debug.Log(@"}""{"); }
+        }
+
+        public int Score() => 42;
+
+        void Jump<T>(T t) where T : class
+        {
+        }
+    }
+}
+"""
+
+
+def _apply_line_col_edits(text, edits):
+    # Same CR/LF rules as Unity's TryIndexFromLineCol for \\n-only text
+    starts = [0] + [m.end() for m in re.finditer(r"\n", text)]
+    spans = []
+    for e in edits:
+        a = starts[e["startLine"] - 1] + e["startCol"] - 1
+        b = starts[e["endLine"] - 1] + e["endCol"] - 1
+        spans.append((a, b, e["newText"]))
+    for a, b, new in sorted(spans, reverse=True):
+        text = text[:a] + new + text[b:]
+    return text
+
+
+def test_outline_ignores_comments_and_strings():
+    outline = csharp_outline.Outline(SOURCE)
+    assert not outline.unbalanced
+    assert [(t.kind, t.name, t.namespace) for t in outline.types] == [("class", "Player", "Game.Logic")]
+    player = outline.types[0]
+    assert [m.name for m in player.methods] == ["Move", "Score", "Jump"]
+    move = player.methods[0]
+    assert SOURCE[move.start:].startswith("        [SerializeField]")
+    assert SOURCE[:move.end].endswith("}\n        }")
+    assert player.methods[1].expression_bodied
+    assert not outline.is_code(SOURCE.index("Decoy"))
+    assert outline.is_code(SOURCE.index("Player"))
+
+
+def test_outline_handles_one_line_bodies_and_positional_records():
+    text = (
+        "struct S { public void M() { } }\n"
+        "class Outer\n{\n"
+        "    class Inner { public void Foo() {} int x; void Bar() => x++; }\n"
+        "    public record Point(int X, int Y);\n"
+        "    record Pair<T>(T A, T B) { public T Sum() => A; }\n"
+        "}\n"
+    )
+    outline = csharp_outline.Outline(text)
+    assert [(t.name, [m.name for m in t.methods], t.has_body) for t in outline.types] == [
+        ("S", ["M"], True), ("Outer", [], True), ("Inner", ["Foo", "Bar"], True),
+        ("Point", [], False), ("Pair", ["Sum"], True)]
+    point = outline.types[3]
+    assert text[point.open_brace] == ";" and point.depth == 2
+    out = _apply_line_col_edits(text, csharp_outline.resolve_method_edits(
+        text, [{"op": "delete_method", "className": "Inner", "methodName": "Foo"}]))
+    assert "Foo" not in out and "class Inner { int x;" in out
+    try:
+        csharp_outline.resolve_method_edits(text, [{"op": "insert_method", "className": "Point", "replacement": "void X() {}"}])
+    except csharp_outline.OutlineError as e:
+        assert "without a body" in str(e)
+    else:
+        raise AssertionError("expected OutlineError")
+
+
+def test_spliced_text_uses_the_files_line_breaks():
+    text = SOURCE.replace("\n", "\r\n")
+    edits = [
+        {"op": "replace_method", "className": "Player", "methodName": "Score", "replacement": "public int Score()\n{\n    return 7;\n}"},
+        {"op": "insert_method", "className": "Player", "position": "end", "replacement": "void Added()\r\n{\n}"},
+    ]
+    out = _apply_line_col_edits(text, csharp_outline.resolve_method_edits(text, edits))
+    assert "return 7;" in out and "void Added()" in out
+    assert "\n" not in out.replace("\r\n", "")  # every break is CRLF, like the file
+    lf = _apply_line_col_edits(SOURCE, csharp_outline.resolve_method_edits(SOURCE, edits))
+    assert "\r" not in lf
+
+
+def test_outline_cache_is_keyed_by_content():
+    csharp_outline.clear_cache()
+    a = csharp_outline.get_outline(SOURCE)
+    assert csharp_outline.get_outline(SOURCE) is a
+    assert csharp_outline.get_outline(SOURCE + "\n") is not a
+
+
+def test_resolve_method_edits_matches_expected_text():
+    edits = [
+        {"op": "replace_method", "className": "Player", "methodName": "Score", "replacement": "public int Score() => 7;"},
+        {"op": "delete_method", "className": "Player", "methodName": "Jump"},
+        {"op": "insert_method", "className": "Player", "position": "after", "afterMethodName": "Move",
+         "replacement": "        void Added() { }"},
+    ]
+    at_edits = csharp_outline.resolve_method_edits(SOURCE, edits)
+    out = _apply_line_col_edits(SOURCE, at_edits)
+    assert "public int Score() => 7;" in out and "=> 42" not in out
+    assert "Jump" not in out
+    assert out.index("void Added()") > out.index("public void Move")
+    assert out.count("{") - out.count("}") == SOURCE.count("{") - SOURCE.count("}")
+
+
+def test_resolve_method_edits_rejects_unknown_targets():
+    try:
+        csharp_outline.resolve_method_edits(SOURCE, [{"op": "delete_method", "className": "Player", "methodName": "Fake"}])
+    except csharp_outline.OutlineError as e:
+        assert "Fake" in str(e)
+    else:
+        raise AssertionError("expected OutlineError")
+
+
+def test_script_apply_edits_local_resolution_sends_single_text_edit(monkeypatch):
+    mcp = DummyMCP()
+    manage_script_edits.register_manage_script_edits_tools(mcp)
+    calls = []
+
+    def fake_send(cmd, params):
+        if cmd != "manage_script":
+            return {"success": False}
+        calls.append(params)
+        if params.get("action") == "read":
+            return {"success": True, "data": {"contents": SOURCE}}
+        return {"success": True, "data": {"sha256": "new"}}
+
+    monkeypatch.setattr(manage_script_edits, "send_command_with_retry", fake_send)
+    resp = mcp.tools["script_apply_edits"](
+        None, name="Player", path="Assets/Scripts",
+        edits=[{"op": "delete_method", "methodName": "Jump"}],
+        options={"resolve": "local"},
+    )
+    assert resp["success"] is True
+    assert [c["action"] for c in calls] == ["read", "apply_text_edits"]
+    assert calls[-1]["precondition_sha256"]
+    assert "Jump" not in _apply_line_col_edits(SOURCE, calls[-1]["edits"])
+
+    # Unresolvable locally -> falls back to Unity's structured editor
+    calls.clear()
+    mcp.tools["script_apply_edits"](
+        None, name="Player", path="Assets/Scripts",
+        edits=[{"op": "delete_method", "methodName": "Missing"}],
+        options={"resolve": "local"},
+    )
+    assert [c["action"] for c in calls] == ["read", "edit"]
+
+
+def test_closing_brace_anchor_skips_braces_in_comments():
+    text = "public class A\n{\n    void M()\n    {\n    }\n}\n// }\n"
+    m = manage_script_edits._find_best_anchor_match(r"^\s*}\s*$|//\s*}\s*$", text, re.MULTILINE, prefer_last=True)
+    assert text[:m.start()].count("\n") == 5  # the class brace, not the commented one
@@ -0,0 +1,177 @@
+import sys
+import asyncio
+import pathlib
+import importlib.util
+import hashlib
+import threading
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+
+def _load(path: pathlib.Path, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+import edit_coalescer  # noqa: E402
+import script_diff  # noqa: E402
+from config import config  # noqa: E402
+manage_script_edits = _load(SRC / "tools" / "manage_script_edits.py", "manage_script_edits_coalesce")
+manage_script = _load(SRC / "tools" / "manage_script.py", "manage_script_coalesce")
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+SOURCE = "public class Player\n{\n" + "".join(f"    int f{i} = {i};\n" for i in range(30)) + "}\n"
+
+
+def _sha(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class FakeUnity:
+    def __init__(self, text, fail=False):
+        self.text = text
+        self.fail = fail
+        self.calls = []
+        self.gate = threading.Event()  # cleared: writes block until it is set
+        self.gate.set()
+        self.writing = threading.Event()
+
+    def __call__(self, cmd, params):
+        if cmd != "manage_script":
+            return {"success": False}
+        self.calls.append(params)
+        if params["action"] == "read":
+            return {"success": True, "data": {"contents": self.text}}
+        if params["action"] == "apply_text_edits":
+            self.writing.set()
+            self.gate.wait(5.0)
+            if self.fail or params["precondition_sha256"] != _sha(self.text):
+                return {"success": False, "code": "stale_file", "message": "File changed"}
+            self.text = script_diff.apply_line_col_edits(self.text, params["edits"])
+            return {"success": True, "data": {"sha256": _sha(self.text)}}
+        return {"success": True, "data": {}}
+
+
+@pytest.fixture
+def unity(monkeypatch):
+    monkeypatch.setattr(config, "script_mirror_enabled", False)
+    monkeypatch.setattr(config, "edit_coalesce_window_ms", 60_000)  # only explicit flushes in these tests
+    edit_coalescer.reset()
+    fake = FakeUnity(SOURCE)
+    monkeypatch.setattr(manage_script_edits, "send_command_with_retry", fake)
+    monkeypatch.setattr(manage_script, "send_command_with_retry", fake)
+    mcp = DummyMCP()
+    manage_script_edits.register_manage_script_edits_tools(mcp)
+    manage_script.register_manage_script_tools(mcp)
+    fake.tools = mcp.tools
+    yield fake
+    edit_coalescer.reset()
+
+
+def _edit(tools, i):
+    return tools["script_apply_edits"](
+        None, name="Player", path="Assets/Scripts",
+        edits=[{"op": "regex_replace", "pattern": rf"f{i} = {i};", "text": f"f{i} = {i * 10};"}],
+        options={"coalesce": True, "confirm": True},
+    )
+
+
+def test_burst_of_edits_is_one_read_and_one_write(unity):
+    results = [_edit(unity.tools, i) for i in range(5)]
+    assert all(r["status"] == "pending" and "success" not in r and r["data"]["coalesced"] for r in results)
+    assert [r["data"]["pending_edits"] for r in results] == [1, 2, 3, 4, 5]
+    assert [c["action"] for c in unity.calls] == ["read"]
+
+    # A read of the script flushes the window first
+    resp = unity.tools["manage_script"](None, action="read", name="Player", path="Assets/Scripts")
+    assert resp["data"]["contents"] == unity.text
+    assert [c["action"] for c in unity.calls] == ["read", "apply_text_edits", "read"]
+    write = unity.calls[1]
+    assert write["precondition_sha256"] == _sha(SOURCE)
+    assert write["options"]["refresh"] == "debounced" and write["edits"][0]["startLine"] == 4  # diffed, not whole-file
+    assert all(f"f{i} = {i * 10};" in unity.text for i in range(5))
+    assert results[-1]["data"]["expected_sha256"] == _sha(unity.text)
+
+
+def test_window_is_written_at_its_deadline(unity, monkeypatch):
+    monkeypatch.setattr(config, "edit_coalesce_window_ms", 20)
+    _edit(unity.tools, 1)
+    window = next(iter(edit_coalescer._windows.values()))
+    window.timer.join(2.0)
+    assert edit_coalescer.coalescer_stats()["open_windows"] == 0
+    assert "f1 = 10;" in unity.text
+
+
+def test_non_coalesced_edit_flushes_first(unity):
+    _edit(unity.tools, 2)
+    resp = unity.tools["script_apply_edits"](
+        None, name="Player", path="Assets/Scripts",
+        edits=[{"op": "regex_replace", "pattern": r"f3 = 3;", "text": "f3 = 30;"}],
+        options={"confirm": True},
+    )
+    assert resp["success"] is True
+    assert [c["action"] for c in unity.calls] == ["read", "apply_text_edits", "read", "apply_text_edits"]
+    assert "f2 = 20;" in unity.text and "f3 = 30;" in unity.text
+
+
+def test_failed_window_is_reported_to_the_next_caller(unity):
+    _edit(unity.tools, 4)
+    unity.text = SOURCE.replace("f4 = 4;", "f4 = -4;")  # conflicting edit behind our back
+    edit_coalescer.flush()
+    resp = _edit(unity.tools, 5)
+    assert resp["success"] is False and resp["code"] == "coalesced_write_failed"
+    assert resp["data"]["response"]["code"] == "stale_file"
+    assert edit_coalescer.take_error("Player", "Assets/Scripts") is None
+
+
+def test_slow_write_holds_up_only_readers_of_that_script(unity):
+    _edit(unity.tools, 1)
+    unity.gate.clear()
+    writer = threading.Thread(target=edit_coalescer.flush)
+    writer.start()
+    assert unity.writing.wait(2.0)
+    assert edit_coalescer.pending_text("Enemy", "Assets/Scripts") is None  # not blocked by the write
+    assert edit_coalescer.coalescer_stats()["writes_in_flight"] == 1
+
+    reader = threading.Thread(target=edit_coalescer.flush, args=("Player", "Assets/Scripts"))
+    reader.start()
+    reader.join(0.2)
+    assert reader.is_alive()  # waits for the write of the script it is about to read
+    unity.gate.set()
+    writer.join(2.0)
+    reader.join(2.0)
+    assert not reader.is_alive() and "f1 = 10;" in unity.text
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(edit_coalescer.flush_async()) == []
+    finally:
+        loop.close()
@@ -0,0 +1,152 @@
+import sys
+import asyncio
+import hashlib
+import pathlib
+import random
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+import file_window  # noqa: E402
+from config import config  # noqa: E402
+from tools.resource_tools import register_resource_tools  # noqa: E402
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+def _read(project, **kw):
+    mcp = DummyMCP()
+    register_resource_tools(mcp)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(mcp.tools["read_resource"](project_root=str(project), **kw))
+    finally:
+        loop.close()
+
+
+def test_windows_match_splitlines_slices(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_window, "_TAIL_LINE_BYTES", 1)  # force breaks across chunk edges
+    rng = random.Random(5)
+    pieces = ["a", "bé", "\n", "\r", "\r\n", "\x0c", " ", "\x85", "  "]
+    for trial in range(60):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+        path = tmp_path / f"f{trial}.txt"
+        path.write_bytes(text.encode("utf-8"))
+        lines = text.splitlines()
+        for n in (1, 2, 5, 100):
+            assert file_window.read_tail(path, n) == "\n".join(lines[-n:]), (text, n)
+        for start, count in ((1, 3), (2, 1), (4, 10), (50, 2), (1, 0)):
+            s = start - 1
+            assert file_window.read_window(path, start, count) == "\n".join(lines[s:s + count]), (text, start, count)
+    file_window.reset()
+
+
+def test_chunks_never_split_a_character(tmp_path):
+    rng = random.Random(7)
+    pieces = ["a", "é", "€", "😀", "\n", "  "]
+    for trial in range(40):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 60)))
+        path = tmp_path / f"c{trial}.txt"
+        path.write_bytes(text.encode("utf-8"))
+        for max_bytes in (1, 2, 3, 5, 16):
+            parts, offset = [], 0
+            while offset < len(text.encode("utf-8")):
+                chunk, offset = file_window.read_chunk(path, offset, max_bytes)
+                assert chunk and "\ufffd" not in chunk, (text, max_bytes)
+                parts.append(chunk)
+            assert "".join(parts) == text, (text, max_bytes)
+
+
+def test_short_tail_of_a_large_file_reads_little(tmp_path, monkeypatch):
+    path = tmp_path / "big.log"
+    path.write_bytes(b"".join(b"line %d\n" % i for i in range(200_000)))
+    seen = []
+    real = file_window._BREAK
+    monkeypatch.setattr(file_window, "_BREAK", type("Spy", (), {"finditer": lambda self, buf: seen.append(len(buf)) or real.finditer(buf)})())
+    assert file_window.read_tail(path, 3) == "line 199997\nline 199998\nline 199999"
+    assert seen == [3 * file_window._TAIL_LINE_BYTES]
+
+
+def test_line_index_is_rebuilt_when_the_file_changes(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text("one\ntwo\n", encoding="utf-8")
+    assert list(file_window.line_starts(path)) == [0, 4]
+    path.write_text("one\ntwo\nthree\n", encoding="utf-8")
+    assert file_window.read_window(path, 3, 1) == "three"
+    file_window.reset()
+
+
+def test_read_resource_windows_do_not_read_the_whole_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "window_read_min_bytes", 1)
+    assets = tmp_path / "Assets"
+    assets.mkdir()
+    body = "".join(f"// line {i}\n" for i in range(1, 5001))
+    body += "    public void tick() {\n    }\n"
+    (assets / "Big.cs").write_text(body, encoding="utf-8")
+    monkeypatch.setattr(pathlib.Path, "read_text", lambda *a, **k: pytest.fail("whole file decoded"))
+
+    uri = "unity://path/Assets/Big.cs"
+    tail = _read(tmp_path, uri=uri, tail_lines=3)["data"]
+    assert tail["text"] == "// line 5000\n    public void tick() {\n    }"
+    window = _read(tmp_path, uri=uri, start_line=4000, line_count=2)["data"]["text"]
+    assert window == "// line 4000\n// line 4001"
+    around = _read(tmp_path, uri=uri, request="show 4 lines around tick")["data"]["text"]
+    assert around.splitlines()[2] == "    public void tick() {"
+    file_window.reset()
+
+
+def test_large_reads_page_through_cursors(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "read_max_chunk_bytes", 4096)
+    assets = tmp_path / "Assets"
+    assets.mkdir()
+    text = "".join(f"  m_Name: Object ü {i}\n" for i in range(2000)) + "é" * 5000
+    path = assets / "Level.unity"
+    path.write_text(text, encoding="utf-8")
+    uri = "unity://path/Assets/Level.unity"
+
+    parts, cursor, reads = [], None, 0
+    while True:
+        data = _read(tmp_path, uri=uri, cursor=cursor)["data"]
+        reads += 1
+        meta = data["metadata"]
+        assert meta["range"]["end"] - meta["range"]["start"] <= 4096
+        assert meta["file_sha256"] == hashlib.sha256(path.read_bytes()).hexdigest()
+        parts.append(data["text"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert "".join(parts) == text and reads > 10
+    assert all(p.endswith("\n") for p in parts[:-5])  # chunks end on line breaks
+
+    first = _read(tmp_path, uri=uri, max_chunk_bytes=100)["data"]
+    assert len(first["text"].encode("utf-8")) <= 100 and first["next_cursor"]
+    path.write_text(text + "tail\n", encoding="utf-8")
+    stale = _read(tmp_path, uri=uri, cursor=first["next_cursor"])
+    assert stale["success"] is False and stale["code"] == "cursor_stale"
+    (assets / "Other.unity").write_text(text, encoding="utf-8")
+    other = _read(tmp_path, uri="unity://path/Assets/Other.unity", cursor=first["next_cursor"])
+    assert other["code"] == "invalid_cursor"
+    file_window.reset()
@@ -0,0 +1,124 @@
+import sys
+import asyncio
+import threading
+import pathlib
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+import project_index  # noqa: E402
+import project_search  # noqa: E402
+from config import config  # noqa: E402
+from tools.resource_tools import register_resource_tools  # noqa: E402
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+@pytest.fixture
+def project(tmp_path):
+    project_index.reset()
+    for i in range(40):
+        d = tmp_path / "Assets" / f"Folder{i % 4}"
+        d.mkdir(parents=True, exist_ok=True)
+        body = "\n".join(f"    void Method{j}() {{ }}" for j in range(10))
+        (d / f"File{i:02d}.cs").write_text(f"public class File{i:02d}\n{{\n{body}\n    // TODO fix {i}\n}}\n", encoding="utf-8")
+    (tmp_path / "Assets" / "Folder0" / "Texture.png").write_bytes(b"\x89PNG\x00\x00TODO fix")
+    (tmp_path / "Assets" / "Folder0" / "Notes.txt").write_text("TODO fix the notes\n", encoding="utf-8")
+    yield tmp_path
+    project_index.reset()
+
+
+def _run(project, **kw):
+    mcp = DummyMCP()
+    register_resource_tools(mcp)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(mcp.tools["find_in_project"](project_root=str(project), **kw))
+    finally:
+        loop.close()
+
+
+def test_results_are_grouped_by_file_and_skip_binaries(project):
+    resp = _run(project, pattern=r"todo fix \d+|notes")
+    assert resp["success"] is True
+    data = resp["data"]
+    uris = [f["uri"] for f in data["files"]]
+    assert len(uris) == 41 and not any(u.endswith(".png") for u in uris)
+    first = data["files"][0]
+    assert first["uri"] == "unity://path/Assets/Folder0/File00.cs"
+    assert first["matches"] == [{"line": 13, "text": "    // TODO fix 0"}]
+    assert data["count"] == 41 and data["truncated"] is False
+
+
+def test_glob_under_and_max_results(project):
+    data = _run(project, pattern="TODO", under="Assets/Folder1", glob="*.cs", max_results=3)["data"]
+    assert data["count"] == 3 and data["truncated"] is True
+    assert all(f["uri"].startswith("unity://path/Assets/Folder1/") for f in data["files"])
+
+
+def test_process_pool_matches_in_process_results(project, monkeypatch):
+    paths = [e["path"] for e in project_index.get_index(project).files(suffix=".cs")]
+    monkeypatch.setattr(config, "search_parallel_min_files", 10 ** 9)
+    serial = list(project_search.search(str(project), paths, r"Method[37]", max_results=50))
+    monkeypatch.setattr(config, "search_parallel_min_files", 1)
+    monkeypatch.setattr(config, "search_workers", 2)
+    try:
+        parallel = list(project_search.search(str(project), paths, r"Method[37]", max_results=50))
+    finally:
+        project_search.shutdown()
+    assert parallel == serial and sum(len(g["matches"]) for g in serial) == 50
+
+
+def test_line_anchors_keep_per_line_semantics(project):
+    data = _run(project, pattern=r"\A\s*// TODO fix 1\Z", glob="File01.cs")["data"]
+    assert data["count"] == 1
+
+
+def test_crlf_files_match_end_of_line_anchors(project):
+    (project / "Assets" / "Crlf.cs").write_bytes(b"class Crlf\r\n{\r\n    int x;\r\n}\r\n")
+    (project / "Assets" / "OldMac.cs").write_bytes(b"class OldMac\r{\r    int x;\r}\r")
+    groups = list(project_search.search(str(project), ["Assets/Crlf.cs", "Assets/OldMac.cs"], r"int x;$"))
+    assert groups == [{"path": "Assets/Crlf.cs", "matches": [{"line": 3, "text": "    int x;"}]},
+                      {"path": "Assets/OldMac.cs", "matches": [{"line": 3, "text": "    int x;"}]}]
+    assert list(project_search.search(str(project), ["Assets/Crlf.cs"], r"^\{$", flags=0))[0]["matches"][0]["line"] == 2
+
+
+def test_rejects_search_outside_assets(project):
+    resp = _run(project, pattern="x", under="..")
+    assert resp["success"] is False
+
+
+def test_search_runs_off_the_event_loop(project, monkeypatch):
+    threads = []
+    real = project_search.search
+
+    def spy(*args, **kwargs):
+        threads.append(threading.current_thread())
+        yield from real(*args, **kwargs)
+
+    monkeypatch.setattr(project_search, "search", spy)
+    assert _run(project, pattern="Player")["success"] is True
+    assert threads and threads[0] is not threading.main_thread()
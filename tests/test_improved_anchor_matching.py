@@ -149,6 +149,16 @@ public class TestClass : MonoBehaviour
     total_lines = len(lines)
     assert idx >= total_lines - 5, f"method inserted too early (idx={idx}, total_lines={total_lines})"
 
+def test_closing_brace_scoring_ties_keep_earliest_match():
+    """Equal scores resolve to the first candidate, as with the previous stable sort."""
+    import re
+
+    test_code = "class A\n{\n}\nclass B\n{\n}\n\n\n\n\n\n\n\n\n\n\n"
+    matches = list(re.finditer(r"^}$", test_code, re.MULTILINE))
+    best = manage_script_edits_module._find_best_closing_brace_match(matches, test_code)
+    # Both braces are unindented and more than 10 lines from EOF, so they tie
+    assert len(matches) == 2 and best is matches[0]
+
 if __name__ == "__main__":
     print("Testing improved anchor matching...")
     print("="*60)
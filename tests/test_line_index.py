@@ -0,0 +1,104 @@
+import sys
+import pathlib
+import importlib.util
+import random
+import types
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+
+def _load(path: pathlib.Path, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+mse = _load(SRC / "tools" / "manage_script_edits.py", "manage_script_edits_line_index")
+
+
+def _reference_replace_range(text, sl, sc, el, ec, repl):
+    # The original per-edit implementation
+    lines = text.splitlines(keepends=True)
+    def index_of(line, col):
+        if line <= len(lines):
+            return sum(len(l) for l in lines[: line - 1]) + (col - 1)
+        return sum(len(l) for l in lines)
+    return text[:index_of(sl, sc)] + repl + text[index_of(el, ec):]
+
+
+def test_line_index_tracks_splices_across_blocks(monkeypatch):
+    # Tiny blocks force edits to span and merge block boundaries
+    monkeypatch.setattr(mse._LineIndex, "_BLOCK", 3)
+    rng = random.Random(11)
+    pieces = ["a", "bb", "\n", "\r", "\r\n", " ", " "]
+    for _ in range(500):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+        index = mse._LineIndex(text)
+        for _ in range(6):
+            a = rng.randint(0, len(text))
+            b = rng.randint(a, len(text))
+            ins = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 5)))
+            text = text[:a] + ins + text[b:]
+            index.update(text, a, b, len(ins))
+            assert [index.offset(i + 1, 1, len(text)) for i in range(index.line_count)] == \
+                mse._LineIndex._split_starts(text, 0)
+
+
+def test_replace_range_batch_matches_resplit_reference():
+    rng = random.Random(5)
+    text = "".join(f"    line {i}\n" if i % 7 else f"    line {i}\r\n" for i in range(400))
+    edits = []
+    expected = text
+    for i in range(80):
+        sl = rng.randint(1, 380)
+        el = sl + rng.randint(0, 3)
+        repl = rng.choice(["", "// x\n", "a\nb\nc\n", "tail"])
+        edits.append({"op": "replace_range", "startLine": sl, "startCol": rng.randint(1, 3),
+                      "endLine": el, "endCol": 1, "text": repl})
+        expected = _reference_replace_range(expected, sl, edits[-1]["startCol"], el, 1, repl)
+    assert mse._apply_edits_locally(text, edits) == expected
+
+
+def test_piece_table_matches_string_splicing():
+    rng = random.Random(23)
+    text = "".join(rng.choice("ab\n{}") for _ in range(200))
+    doc = mse._PieceTable(text)
+    for step in range(300):
+        a = rng.randint(0, len(text) + 2)
+        b = rng.randint(0, len(text) + 2)  # includes inverted and out-of-range spans
+        ins = "".join(rng.choice("xy\n") for _ in range(rng.randint(0, 4)))
+        text = text[:a] + ins + text[b:]
+        doc.replace(a, b, ins)
+        assert len(doc) == len(text)
+        lo = rng.randint(0, len(text))
+        assert doc[lo:lo + 7] == text[lo:lo + 7]
+        if step % 50 == 0:
+            assert doc.text() == text  # materializing mid-batch keeps later edits consistent
+    assert doc.text() == text
+
+
+def test_regex_replace_without_match_keeps_line_index():
+    text = "line1\nline2\nline3\n"
+    edits = [
+        {"op": "replace_range", "startLine": 1, "startCol": 1, "endLine": 1, "endCol": 1, "text": "// a\n"},
+        {"op": "regex_replace", "pattern": "nomatch", "replacement": "x"},
+        {"op": "replace_range", "startLine": 3, "startCol": 1, "endLine": 4, "endCol": 1, "text": "LINE2\n"},
+    ]
+    assert mse._apply_edits_locally(text, edits) == "// a\nline1\nLINE2\nline3\n"
@@ -0,0 +1,68 @@
+import sys
+import pathlib
+import asyncio
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+import memory_trace  # noqa: E402
+from config import config  # noqa: E402
+
+
+@pytest.fixture()
+def tracing(monkeypatch):
+    monkeypatch.setenv("UNITY_MCP_MEMORY_TRACE", "1")
+    monkeypatch.setattr(config, "memory_trace_threshold_bytes", 1024 * 1024)
+    memory_trace.reset()
+    yield
+    memory_trace.reset()
+
+
+def test_disabled_by_default_records_nothing(monkeypatch):
+    monkeypatch.delenv("UNITY_MCP_MEMORY_TRACE", raising=False)
+    memory_trace.reset()
+
+    @memory_trace.traced("noop")
+    def work():
+        return b"x" * (4 * 1024 * 1024)
+
+    work()
+    assert memory_trace.get_stats()["calls"] == {}
+
+
+def test_records_peak_and_spike_sites(tracing):
+    @memory_trace.traced(lambda kind: f"payload:{kind}")
+    def big(kind):
+        blob = bytearray(8 * 1024 * 1024)
+        return len(blob)
+
+    @memory_trace.traced("small")
+    def small():
+        return [0] * 10
+
+    big("read")
+    small()
+    stats = memory_trace.get_stats()
+    assert stats["calls"]["payload:read"]["max_peak_bytes"] >= 8 * 1024 * 1024
+    assert stats["calls"]["payload:read"]["over_threshold"] == 1
+    assert stats["calls"]["small"]["over_threshold"] == 0
+    assert [s["name"] for s in stats["recent_spikes"]] == ["payload:read"]
+    assert isinstance(stats["recent_spikes"][0]["top_sites"], list)
+
+
+def test_async_handlers_are_traced(tracing):
+    @memory_trace.traced("tool:async")
+    async def handler(n: int):
+        return len(b"y" * n)
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(handler(2 * 1024 * 1024)) == 2 * 1024 * 1024
+    finally:
+        loop.close()
+    assert handler.__name__ == "handler"
+    assert memory_trace.get_stats()["calls"]["tool:async"]["calls"] == 1
@@ -0,0 +1,57 @@
+import json
+import os
+import pathlib
+import sys
+import threading
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+from port_discovery import PortDiscovery  # noqa: E402
+
+
+def _write_registry(base: pathlib.Path, name: str, port: int, mtime: float):
+    path = base / name
+    path.write_text(json.dumps({"unity_port": port}))
+    os.utime(path, (mtime, mtime))
+
+
+def test_probes_run_concurrently_and_keep_preference_order(tmp_path, monkeypatch):
+    base = tmp_path / ".unity-mcp"
+    base.mkdir()
+    now = time.time()
+    _write_registry(base, "unity-mcp-port-a.json", 7001, now)
+    _write_registry(base, "unity-mcp-port-b.json", 7002, now - 10)
+    _write_registry(base, "unity-mcp-port-c.json", 7003, now - 20)
+    monkeypatch.setattr(PortDiscovery, "get_registry_dir", staticmethod(lambda: base))
+    monkeypatch.setattr(PortDiscovery, "get_registry_path", staticmethod(lambda: base / "unity-mcp-port.json"))
+
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def slow_probe(port):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.1)
+        with lock:
+            active["now"] -= 1
+        return port in (7002, 7003)
+
+    monkeypatch.setattr(PortDiscovery, "_try_probe_unity_mcp", staticmethod(slow_probe))
+    start = time.monotonic()
+    assert PortDiscovery.discover_unity_port() == 7002  # newest responsive file wins
+    assert active["max"] > 1
+    assert time.monotonic() - start < 0.25
+
+
+def test_falls_back_to_first_seen_port_when_nothing_responds(tmp_path, monkeypatch):
+    base = tmp_path / ".unity-mcp"
+    base.mkdir()
+    _write_registry(base, "unity-mcp-port-a.json", 7101, time.time())
+    monkeypatch.setattr(PortDiscovery, "get_registry_dir", staticmethod(lambda: base))
+    monkeypatch.setattr(PortDiscovery, "get_registry_path", staticmethod(lambda: base / "unity-mcp-port.json"))
+    monkeypatch.setattr(PortDiscovery, "_try_probe_unity_mcp", staticmethod(lambda port: False))
+    assert PortDiscovery.discover_unity_port() == 7101
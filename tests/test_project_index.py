@@ -0,0 +1,97 @@
+import sys
+import pathlib
+import os
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+import project_index  # noqa: E402
+from config import config  # noqa: E402
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "project_index_poll_s", 3600.0)  # refresh only when invalidated
+    project_index.reset()
+    scripts = tmp_path / "Assets" / "Scripts"
+    (scripts / "AI").mkdir(parents=True)
+    (scripts / "Player.cs").write_text("class Player {}", encoding="utf-8")
+    (scripts / "AI" / "Brain.cs").write_text("class Brain {}", encoding="utf-8")
+    (scripts / "Notes.txt").write_text("notes", encoding="utf-8")
+    yield tmp_path
+    project_index.reset()
+
+
+def _paths(index, **kw):
+    return [e["path"] for e in index.files(**kw)]
+
+
+def test_queries_filter_by_folder_suffix_and_glob(project):
+    index = project_index.get_index(project)
+    assert _paths(index, suffix=".cs") == ["Assets/Scripts/Player.cs", "Assets/Scripts/AI/Brain.cs"]
+    assert _paths(index, under="Assets/Scripts/AI", suffix=".cs") == ["Assets/Scripts/AI/Brain.cs"]
+    assert _paths(index, pattern="P*", suffix=".CS") == ["Assets/Scripts/Player.cs"]
+    entry = index.files(pattern="Notes.txt")[0]
+    assert entry["suffix"] == ".txt" and entry["size"] == 5
+
+
+def test_queries_do_not_touch_the_filesystem_until_invalidated(project, monkeypatch):
+    index = project_index.get_index(project)
+    index.files()
+    (project / "Assets" / "Scripts" / "AI" / "Eyes.cs").write_text("class Eyes {}", encoding="utf-8")
+    (project / "Assets" / "Scripts" / "Player.cs").unlink()
+
+    def no_scan(*a, **k):
+        raise AssertionError("filesystem touched")
+    monkeypatch.setattr(project_index.os, "scandir", no_scan)
+    monkeypatch.setattr(project_index.os, "stat", no_scan)
+    assert "Assets/Scripts/Player.cs" in _paths(index)
+    monkeypatch.undo()
+    monkeypatch.setattr(config, "project_index_poll_s", 3600.0)
+
+    project_index.invalidate(project)
+    assert _paths(index, suffix=".cs") == ["Assets/Scripts/AI/Brain.cs", "Assets/Scripts/AI/Eyes.cs"]
+    assert index.stats["scans"] == 1  # rescanned per directory, not re-listed
+
+
+def test_new_and_removed_folders_are_picked_up(project):
+    index = project_index.get_index(project)
+    index.files()
+    (project / "Assets" / "Editor").mkdir()
+    (project / "Assets" / "Editor" / "Tool.cs").write_text("class Tool {}", encoding="utf-8")
+    for f in (project / "Assets" / "Scripts" / "AI").iterdir():
+        f.unlink()
+    (project / "Assets" / "Scripts" / "AI").rmdir()
+    index.refresh(force=True)
+    assert _paths(index, suffix=".cs") == ["Assets/Editor/Tool.cs", "Assets/Scripts/Player.cs"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not available")
+def test_symlinks_outside_assets_are_skipped(project, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside")
+    (outside / "Escape.cs").write_text("class Escape {}", encoding="utf-8")
+    try:
+        (project / "Assets" / "Scripts" / "Escape.cs").symlink_to(outside / "Escape.cs")
+        (project / "Assets" / "Linked").symlink_to(outside, target_is_directory=True)
+    except OSError:
+        pytest.skip("cannot create symlinks here")
+    paths = _paths(project_index.get_index(project), suffix=".cs")
+    assert not any("Escape" in p for p in paths)
+
+
+def test_index_is_persisted_and_reloaded(project, tmp_path_factory, monkeypatch):
+    cache = tmp_path_factory.mktemp("cache")
+    monkeypatch.setattr(config, "project_index_cache_path", str(cache))
+    project_index.get_index(project).files()
+    assert not list(cache.glob("project-index-*.json"))  # saved in the background
+    project_index.flush_saves()
+    assert list(cache.glob("project-index-*.json"))
+
+    project_index.reset()
+    reloaded = project_index.get_index(project)
+    assert _paths(reloaded, suffix=".cs") == ["Assets/Scripts/Player.cs", "Assets/Scripts/AI/Brain.cs"]
+    assert reloaded.stats["scans"] == 0  # only directories were re-checked
@@ -0,0 +1,81 @@
+import sys
+import pathlib
+import importlib.util
+import re
+import signal
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+
+def _load(path: pathlib.Path, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+import regex_cache  # noqa: E402
+from config import config  # noqa: E402
+manage_script_edits = _load(SRC / "tools" / "manage_script_edits.py", "manage_script_edits_regex_cache")
+
+
+def test_compile_pattern_reuses_and_evicts(monkeypatch):
+    regex_cache.clear_cache()
+    monkeypatch.setattr(config, "regex_cache_size", 2)
+    a = regex_cache.compile_pattern(r"\s*}\s*$", re.MULTILINE)
+    assert regex_cache.compile_pattern(r"\s*}\s*$", re.MULTILINE) is a
+    assert regex_cache.compile_pattern(r"\s*}\s*$") is not a  # flags are part of the key
+    regex_cache.compile_pattern("#endregion")
+    info = regex_cache.cache_info()
+    assert info == {"size": 2, "hits": 1, "misses": 3}
+
+
+@pytest.mark.parametrize("pattern", [r"(a+)+$", r"(\s*\w+)*$", r"(.*)*x", r"((a|b)+)*"])
+def test_nested_quantifiers_are_rejected(pattern):
+    with pytest.raises(regex_cache.RegexGuardError):
+        regex_cache.compile_pattern(pattern)
+
+
+@pytest.mark.parametrize("pattern", [
+    r"\s*}\s*$",
+    r"(?m)^\s*public\s+bool\s+HasTarget\s*\(",
+    r"^\s*(?:\[[^\]]+\]\s*)*(?:public|private).*?\bMove\s*\(",
+    r"(?:\s*,\s*\w+)*",
+    r"(ab*)*",
+])
+def test_common_anchors_pass_the_screen(pattern):
+    regex_cache.compile_pattern(pattern)
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="SIGALRM timer not available")
+def test_time_limit_interrupts_runaway_match(monkeypatch):
+    monkeypatch.setattr(config, "regex_guard_enabled", False)
+    rx = regex_cache.compile_pattern(r"(x+x+)+y")
+    with pytest.raises(regex_cache.RegexTimeoutError):
+        with regex_cache.time_limit(0.05):
+            rx.search("x" * 40)
+    assert signal.getsignal(signal.SIGALRM) is signal.SIG_DFL
+
+
+def test_regex_replace_reports_rejected_pattern():
+    with pytest.raises(re.error):
+        manage_script_edits._apply_edits_locally("aaaa", [{"op": "regex_replace", "pattern": r"(a*)*$", "replacement": "b"}])
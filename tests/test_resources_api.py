@@ -2,6 +2,7 @@ import pytest
 
 
 import sys
+import time
 from pathlib import Path
 import pytest
 import types
@@ -79,3 +80,86 @@ def test_resource_list_rejects_outside_paths(resource_tools, tmp_path):
     )
     assert resp["success"] is False
     assert "Assets" in resp.get("error", "") or "under project root" in resp.get("error", "")
+
+
+def test_project_root_is_memoized(tmp_path, monkeypatch):
+    from tools import resource_tools as rt  # type: ignore
+    import script_mirror  # type: ignore
+    (tmp_path / "Assets").mkdir()
+    (tmp_path / "ProjectSettings").mkdir()
+    monkeypatch.delenv("UNITY_PROJECT_ROOT", raising=False)
+    monkeypatch.chdir(tmp_path)
+    script_mirror.reset()
+    rt._root_cache.clear()
+    calls = []
+
+    def fake_send(cmd, params):
+        calls.append(cmd)
+        return {"success": False}
+
+    monkeypatch.setattr(rt, "send_command_with_retry", fake_send)
+    assert rt._resolve_project_root(None) == tmp_path.resolve()
+
+    def not_memoized(override):
+        raise AssertionError("project root resolved again")
+
+    monkeypatch.setattr(rt, "_find_project_root", not_memoized)
+    for _ in range(3):
+        assert rt._resolve_project_root(None) == tmp_path.resolve()
+    assert calls == ["manage_editor"]
+    script_mirror.reset()
+
+
+def test_expired_unity_root_is_refreshed_off_the_request_path(tmp_path, monkeypatch):
+    from tools import resource_tools as rt  # type: ignore
+    import script_mirror  # type: ignore
+    import threading
+    first, second = tmp_path / "A", tmp_path / "B"
+    for p in (first, second):
+        (p / "Assets").mkdir(parents=True)
+    monkeypatch.delenv("UNITY_PROJECT_ROOT", raising=False)
+    script_mirror.reset()
+    rt._root_cache.clear()
+    answers, gate = [first, second], threading.Event()
+
+    def fake_send(cmd, params):
+        if len(answers) == 1:
+            assert gate.wait(2.0)  # the refresh is slow; requests must not wait for it
+        return {"success": True, "data": {"projectRoot": str(answers.pop(0))}}
+
+    monkeypatch.setattr(rt, "send_command_with_retry", fake_send)
+    assert rt._resolve_project_root(None) == first.resolve()
+    monkeypatch.setattr(script_mirror, "_root_at", time.monotonic() - 3600)
+    assert rt._resolve_project_root(None) == first.resolve()
+    gate.set()
+    script_mirror._refresh_thread.join(2.0)
+    assert rt._resolve_project_root(None) == second.resolve()
+    script_mirror.reset()
+
+
+def test_memoized_root_is_revalidated(tmp_path, monkeypatch):
+    from tools import resource_tools as rt  # type: ignore
+    first, second = tmp_path / "A", tmp_path / "B"
+    for p in (first, second):
+        (p / "Assets").mkdir(parents=True)
+    rt._root_cache.clear()
+    monkeypatch.setenv("UNITY_PROJECT_ROOT", str(first))
+    assert rt._resolve_project_root(None) == first.resolve()
+    (first / "Assets").rmdir()
+    monkeypatch.setattr(rt, "_find_project_root", lambda override: (second.resolve(), True))
+    assert rt._resolve_project_root(None) == second.resolve()
+
+
+def test_registering_tools_does_not_import_index_or_search_modules():
+    import subprocess
+    script = (
+        "import sys, types\n"
+        "m, s, f = (types.ModuleType(n) for n in ('mcp', 'mcp.server', 'mcp.server.fastmcp'))\n"
+        "f.FastMCP = f.Context = f.Image = type('_Dummy', (), {})\n"
+        "sys.modules.update({'mcp': m, 'mcp.server': s, 'mcp.server.fastmcp': f})\n"
+        "import tools\n"
+        "heavy = ['asset_graph', 'file_window', 'project_search', 'script_diff', 'symbol_index', 'trigram_index', 'unity_yaml']\n"
+        "print(','.join(n for n in heavy if n in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], cwd=str(SRC), capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
@@ -0,0 +1,151 @@
+import sys
+import pathlib
+import importlib.util
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+
+def _load(path: pathlib.Path, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+from config import config  # noqa: E402
+manage_script_edits = _load(SRC / "tools" / "manage_script_edits.py", "manage_script_edits_batch")
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+def _source(cls):
+    body = "\n".join(f"    // filler {i}" for i in range(40))
+    return f"public class {cls}\n{{\n{body}\n    public void Tick()\n    {{\n        int x = 1;\n    }}\n}}\n"
+
+
+class FakeUnity:
+    def __init__(self, files, fail_write=None, write_sha=True, get_sha=True):
+        self.files = dict(files)
+        self.fail_write = fail_write
+        self.write_sha = write_sha
+        self.get_sha = get_sha
+        self.calls = []
+
+    def __call__(self, cmd, params):
+        if cmd != "manage_script":
+            return {"success": False}
+        self.calls.append(params)
+        action = params["action"]
+        if action == "read":
+            return {"success": True, "data": {"contents": self.files[params["name"]]}}
+        if action == "apply_text_edits":
+            if params["name"] == self.fail_write:
+                return {"success": False, "code": "validation_failed", "message": "nope"}
+            return {"success": True, "data": {"sha256": f"written-{params['name']}"} if self.write_sha else {}}
+        if action == "get_sha":
+            if not self.get_sha:
+                return {"success": False, "message": "unavailable"}
+            return {"success": True, "data": {"sha256": f"current-{params['name']}"}}
+        if action == "refresh":
+            return {"success": True, "data": {"imported": params["paths"]}}
+        return {"success": False, "message": action}
+
+
+@pytest.fixture
+def tool(monkeypatch):
+    monkeypatch.setattr(config, "script_mirror_enabled", False)
+    mcp = DummyMCP()
+    manage_script_edits.register_manage_script_edits_tools(mcp)
+    return mcp.tools["script_apply_edits_batch"]
+
+
+def _files(names):
+    return [{"name": n, "path": "Assets/Scripts", "edits": [
+        {"op": "replace_method", "methodName": "Tick", "replacement": "public void Tick() { }"},
+        {"op": "regex_replace", "pattern": r"// filler 3\b", "replacement": "// changed"},
+    ]} for n in names]
+
+
+def test_batch_writes_without_per_file_refresh_then_refreshes_once(tool, monkeypatch):
+    unity = FakeUnity({n: _source(n) for n in ("A", "B", "C")})
+    monkeypatch.setattr(manage_script_edits, "send_command_with_retry", unity)
+    resp = tool(None, files=_files(["A", "B", "C"]))
+    assert resp["success"] is True
+    assert [f["status"] for f in resp["data"]["files"]] == ["written"] * 3
+    writes = [c for c in unity.calls if c["action"] == "apply_text_edits"]
+    assert len(writes) == 3
+    assert all(w["options"]["refresh"] == "none" and w["precondition_sha256"] for w in writes)
+    refresh = [c for c in unity.calls if c["action"] == "refresh"]
+    assert refresh == [{"action": "refresh", "paths": ["Assets/Scripts/A.cs", "Assets/Scripts/B.cs", "Assets/Scripts/C.cs"]}]
+
+
+def test_prepare_failure_writes_nothing(tool, monkeypatch):
+    unity = FakeUnity({n: _source(n) for n in ("A", "B")})
+    monkeypatch.setattr(manage_script_edits, "send_command_with_retry", unity)
+    files = _files(["A", "B"])
+    files[1]["edits"] = [{"op": "delete_method", "methodName": "Missing"}]
+    resp = tool(None, files=files)
+    assert resp["success"] is False and resp["code"] == "batch_prepare_failed"
+    assert [f["status"] for f in resp["data"]["files"]] == ["prepared", "error"]
+    assert not [c for c in unity.calls if c["action"] != "read"]
+
+
+def test_write_failure_restores_earlier_files(tool, monkeypatch):
+    unity = FakeUnity({n: _source(n) for n in ("A", "B")}, fail_write="B")
+    monkeypatch.setattr(manage_script_edits, "send_command_with_retry", unity)
+    resp = tool(None, files=_files(["A", "B"]))
+    assert resp["code"] == "batch_write_failed" and "were restored" in resp["message"]
+    assert [f["status"] for f in resp["data"]["files"]] == ["rolled_back", "error"]
+    writes = [c for c in unity.calls if c["action"] == "apply_text_edits"]
+    assert [w["name"] for w in writes] == ["A", "B", "A"]
+    assert writes[-1]["precondition_sha256"] == "written-A"  # the sha Unity reported, not a local hash
+    assert writes[-1]["options"]["refresh"] == "none"
+    # A was imported with neither the batch's write nor its restore: refresh it once
+    assert [c for c in unity.calls if c["action"] == "refresh"] == [{"action": "refresh", "paths": ["Assets/Scripts/A.cs"]}]
+
+
+def test_rollback_asks_for_the_sha_when_the_write_did_not_report_one(tool, monkeypatch):
+    unity = FakeUnity({n: _source(n) for n in ("A", "B")}, fail_write="B", write_sha=False)
+    monkeypatch.setattr(manage_script_edits, "send_command_with_retry", unity)
+    files = _files(["A", "B"])
+    files[0].update(namespace="Game", script_type="MonoBehaviour")
+    resp = tool(None, files=files)
+    assert [f["status"] for f in resp["data"]["files"]] == ["rolled_back", "error"]
+    get_sha, undo, refresh = unity.calls[-3:]
+    assert (get_sha["action"], undo["action"], refresh["action"]) == ("get_sha", "apply_text_edits", "refresh")
+    assert undo["precondition_sha256"] == "current-A"
+    for call in (get_sha, undo):
+        assert (call["namespace"], call["scriptType"]) == ("Game", "MonoBehaviour")
+
+
+def test_files_that_could_not_be_restored_are_reported(tool, monkeypatch):
+    unity = FakeUnity({n: _source(n) for n in ("A", "B", "C")}, fail_write="C", write_sha=False, get_sha=False)
+    monkeypatch.setattr(manage_script_edits, "send_command_with_retry", unity)
+    resp = tool(None, files=_files(["A", "B", "C"]))
+    assert [f["status"] for f in resp["data"]["files"]] == ["rollback_failed", "rollback_failed", "error"]
+    assert "could not restore A, B" in resp["message"] and "were restored" not in resp["message"]
+    assert unity.calls[-1] == {"action": "refresh", "paths": ["Assets/Scripts/A.cs", "Assets/Scripts/B.cs"]}
@@ -0,0 +1,137 @@
+import sys
+import pathlib
+import importlib.util
+import random
+import types
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+
+def _load(path: pathlib.Path, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+import script_diff  # noqa: E402
+from config import config  # noqa: E402
+manage_script = _load(SRC / "tools" / "manage_script.py", "manage_script_diff")
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+def _unity_apply(text, edits):
+    # Mirrors ManageScript.TryIndexFromLineCol: \r\n, \r and \n each end a line
+    starts = [0]
+    i = 0
+    while i < len(text):
+        if text[i] == "\r" and i + 1 < len(text) and text[i + 1] == "\n":
+            i += 1
+        if text[i] in "\r\n":
+            starts.append(i + 1)
+        i += 1
+    spans = []
+    for e in edits:
+        a = starts[e["startLine"] - 1] + e["startCol"] - 1
+        b = starts[e["endLine"] - 1] + e["endCol"] - 1
+        spans.append((a, b, e["newText"]))
+    for a, b, new in sorted(spans, reverse=True):
+        text = text[:a] + new + text[b:]
+    return text
+
+
+def _script(lines=3000, newline="\n"):
+    return newline.join(f"    // line {i} of a long script" for i in range(lines)) + newline
+
+
+def test_one_line_change_sends_one_small_edit():
+    old = _script()
+    new = old.replace("// line 1500 of", "// LINE 1500 of")
+    edits = script_diff.diff_edits(old, new)
+    assert len(edits) == 1
+    assert edits[0]["startLine"] == 1501 and edits[0]["newText"] == "LINE"
+    assert _unity_apply(old, edits) == new
+
+
+def test_crlf_and_unterminated_last_line(monkeypatch):
+    monkeypatch.setattr(config, "diff_max_ratio", 1e9)  # tiny inputs would otherwise be sent whole
+    old = "a\r\nb\r\nc"
+    for new in ("a\r\nB\r\nc", "a\r\nb\nc", "a\r\nb\r\nc!", "a\rb\r\nc", "x" + old):
+        edits = script_diff.diff_edits(old, new)
+        assert edits is not None and _unity_apply(old, edits) == new
+
+
+def test_random_edits_round_trip(monkeypatch):
+    monkeypatch.setattr(config, "diff_max_ratio", 1e9)
+    monkeypatch.setattr(config, "diff_max_edits", 10 ** 6)
+    rnd = random.Random(7)
+    tokens = ["a", "b", "{", "}", "\n", "\r\n", "\r", "  ", "int x;"]
+    for _ in range(2000):
+        old = "".join(rnd.choice(tokens) for _ in range(rnd.randint(0, 25)))
+        new = list(old)
+        for _ in range(rnd.randint(1, 4)):
+            k = rnd.randint(0, len(new))
+            if new and rnd.random() < 0.5:
+                del new[min(k, len(new) - 1):min(k, len(new) - 1) + rnd.randint(1, 3)]
+            else:
+                new[k:k] = list(rnd.choice(tokens))
+        new = "".join(new)
+        edits = script_diff.diff_edits(old, new)
+        if edits is None:
+            assert new == ""
+            continue
+        assert _unity_apply(old, edits) == new
+
+
+def test_falls_back_when_edits_are_not_smaller():
+    old = _script(20)
+    assert script_diff.diff_edits(old, old.upper()) is None
+    scattered = "".join(line.replace("line", "LINE") if i % 2 else line
+                        for i, line in enumerate(old.splitlines(keepends=True)))
+    assert script_diff.diff_edits(old, scattered, max_edits=3) is None
+
+
+def test_update_routes_minimal_edits(monkeypatch):
+    mcp = DummyMCP()
+    manage_script.register_manage_script_tools(mcp)
+    old = _script(400)
+    new = old.replace("// line 10 of", "// line ten of")
+    sent = []
+
+    def fake_send(cmd, params):
+        if cmd != "manage_script":
+            return {"success": False}
+        sent.append(params)
+        if params["action"] == "read":
+            return {"success": True, "data": {"contents": old}}
+        return {"success": True, "data": {}}
+
+    monkeypatch.setattr(manage_script, "send_command_with_retry", fake_send)
+    resp = mcp.tools["manage_script"](None, action="update", name="Long", path="Assets/Scripts", contents=new)
+    assert resp["success"] is True
+    write = sent[-1]
+    assert write["action"] == "apply_text_edits"
+    assert len(write["edits"]) == 1 and len(write["edits"][0]["newText"]) < 10
+    assert _unity_apply(old, write["edits"]) == new
@@ -0,0 +1,150 @@
+import sys
+import pathlib
+import hashlib
+import os
+import time
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+import script_mirror  # noqa: E402
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    scripts = tmp_path / "Assets" / "Scripts"
+    scripts.mkdir(parents=True)
+    monkeypatch.setenv("UNITY_PROJECT_ROOT", str(tmp_path))
+    script_mirror.reset()
+    yield tmp_path
+    script_mirror.reset()
+
+
+def _age(path: pathlib.Path, seconds: float = 60.0) -> None:
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def _no_unity(cmd, params):
+    raise AssertionError(f"unexpected Unity call: {cmd} {params}")
+
+
+def test_reads_from_disk_with_unity_sha(project):
+    f = project / "Assets" / "Scripts" / "Player.cs"
+    f.write_bytes(b"\xef\xbb\xbfclass Player {}\n")
+    resp = script_mirror.read_script(_no_unity, "Player", "Assets/Scripts")
+    assert resp["success"] and resp["data"]["source"] == "mirror"
+    assert resp["data"]["contents"] == "class Player {}\n"  # BOM dropped like File.ReadAllText
+    assert resp["data"]["sha256"] == hashlib.sha256(b"class Player {}\n").hexdigest()
+    assert resp["data"]["uri"] == "unity://path/Assets/Scripts/Player.cs"
+
+
+def test_unchanged_files_are_served_from_cache_and_changes_reload(project):
+    f = project / "Assets" / "Scripts" / "Player.cs"
+    f.write_text("class Player {}\n", encoding="utf-8")
+    _age(f)
+    script_mirror.read_script(_no_unity, "Player", "Scripts")
+    script_mirror.read_script(_no_unity, "Player", "Scripts")
+    assert script_mirror.mirror_stats()["hits"] == 1
+
+    f.write_text("class Player { int x; }\n", encoding="utf-8")
+    resp = script_mirror.read_script(_no_unity, "Player", "Scripts")
+    assert resp["data"]["contents"] == "class Player { int x; }\n"
+    assert script_mirror.mirror_stats()["loads"] == 2
+
+
+def test_recently_modified_files_are_always_reread(project):
+    f = project / "Assets" / "Scripts" / "Player.cs"
+    f.write_text("class A {}\n", encoding="utf-8")
+    script_mirror.read_script(_no_unity, "Player", "Scripts")
+    stat = f.stat()
+    # Same size, same mtime: only the racy-window check catches this rewrite
+    f.write_text("class B {}\n", encoding="utf-8")
+    os.utime(f, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert script_mirror.read_script(_no_unity, "Player", "Scripts")["data"]["contents"] == "class B {}\n"
+
+
+def test_missing_files_fall_back_to_unity(project):
+    calls = []
+
+    def fake_send(cmd, params):
+        calls.append((cmd, params))
+        return {"success": True, "data": {"contents": "from unity"}}
+
+    resp = script_mirror.read_script(fake_send, "Missing", "Assets/Scripts", None, "MonoBehaviour")
+    assert resp["data"]["contents"] == "from unity"
+    assert calls == [("manage_script", {"action": "read", "name": "Missing", "path": "Assets/Scripts", "scriptType": "MonoBehaviour"})]
+
+
+def test_path_like_names_fall_back_to_unity(project):
+    calls = []
+
+    def fake_send(cmd, params):
+        calls.append(params["name"])
+        return {"success": False, "message": "Invalid name"}
+
+    for name in ("/tmp/x", "../Escape", "C:\\x"):
+        assert script_mirror.read_script(fake_send, name, "Assets/Scripts")["success"] is False
+    assert script_mirror.read_script(fake_send, "Player", "C:/Elsewhere")["success"] is False
+    assert calls == ["/tmp/x", "../Escape", "C:\\x", "Player"]
+
+
+def test_project_root_is_learned_from_unity_once(tmp_path, monkeypatch):
+    monkeypatch.delenv("UNITY_PROJECT_ROOT", raising=False)
+    script_mirror.reset()
+    (tmp_path / "Assets" / "Scripts").mkdir(parents=True)
+    (tmp_path / "Assets" / "Scripts" / "A.cs").write_text("class A {}\n", encoding="utf-8")
+    calls = []
+
+    def fake_send(cmd, params):
+        calls.append(params["action"])
+        return {"success": True, "data": {"projectRoot": str(tmp_path)}}
+
+    for _ in range(3):
+        assert script_mirror.read_script(fake_send, "A", "Scripts")["data"]["source"] == "mirror"
+    assert calls == ["get_project_root"]
+    script_mirror.reset()
+
+
+def test_project_root_is_asked_again_after_its_ttl_in_the_background(tmp_path, monkeypatch):
+    monkeypatch.delenv("UNITY_PROJECT_ROOT", raising=False)
+    script_mirror.reset()
+    first, second = tmp_path / "First", tmp_path / "Second"
+    (first / "Assets").mkdir(parents=True)
+    (second / "Assets").mkdir(parents=True)
+    answers = [first, second]
+
+    def fake_send(cmd, params):
+        return {"success": True, "data": {"projectRoot": str(answers.pop(0))}}
+
+    assert script_mirror.unity_project_root(fake_send) == first.resolve()
+    monkeypatch.setattr(script_mirror, "_root_at", time.monotonic() - 3600)
+    assert script_mirror.unity_project_root(fake_send) == first.resolve()  # served at once, re-asked off-thread
+    refresh = script_mirror._refresh_thread
+    if refresh is not None:
+        refresh.join(2.0)
+    assert answers == [] and script_mirror.known_project_root() == second.resolve()
+    script_mirror.reset()
+
+
+def test_written_scripts_are_rechecked_in_the_loaded_indexes(project, monkeypatch):
+    import trigram_index
+    from config import config
+    monkeypatch.setattr(config, "trigram_index_dir", str(project / "cache"))
+    monkeypatch.setattr(config, "trigram_index_poll_s", 3600.0)
+    trigram_index.reset()
+    f = project / "Assets" / "Scripts" / "Player.cs"
+    f.write_text("class Player { void Walk() {} }\n", encoding="utf-8")
+    index = trigram_index.get_index(project)
+    assert index.candidates("Walk") == {"Assets/Scripts/Player.cs"}
+    f.write_text("class Player { void Run() {} }\n", encoding="utf-8")
+    script_mirror.script_written("Player", "Assets/Scripts")
+    assert index._checked is not None and index.stats["indexed"] == 2  # only that file was re-read
+    assert index.files["Assets/Scripts/Player.cs"][0] in index.postings["run"]
+    script_mirror.script_written("Player", "../Outside")  # not a path under Assets/: every index re-stats
+    assert index._checked is None
+    trigram_index.reset()
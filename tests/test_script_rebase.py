@@ -0,0 +1,127 @@
+import sys
+import pathlib
+import importlib.util
+import hashlib
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+
+def _load(path: pathlib.Path, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+import script_diff  # noqa: E402
+import script_mirror  # noqa: E402
+from config import config  # noqa: E402
+manage_script = _load(SRC / "tools" / "manage_script.py", "manage_script_rebase")
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+BASE = "using UnityEngine;\n\npublic class Door\n{\n    int open = 0;\n\n    void Update()\n    {\n    }\n}\n"
+
+
+def _sha(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _edit(text, old, new):
+    i = text.index(old)
+    return script_diff._to_edits(text, [(i, i + len(old), new)])
+
+
+class FakeUnity:
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+
+    def __call__(self, cmd, params):
+        if cmd != "manage_script":
+            return {"success": False}
+        self.calls.append(params)
+        if params["action"] == "read":
+            return {"success": True, "data": {"contents": self.text}}
+        if params["action"] == "apply_text_edits":
+            if params["precondition_sha256"] != _sha(self.text):
+                return {"success": False, "code": "stale_file",
+                        "data": {"status": "stale_file", "current_sha256": _sha(self.text)}}
+            self.text = script_diff.apply_line_col_edits(self.text, params["edits"])
+            return {"success": True, "data": {}}
+        return {"success": False}
+
+
+@pytest.fixture
+def tool(monkeypatch):
+    monkeypatch.setattr(config, "script_mirror_enabled", False)
+    script_mirror.reset()
+    mcp = DummyMCP()
+    manage_script.register_manage_script_tools(mcp)
+    yield mcp.tools["apply_text_edits"]
+    script_mirror.reset()
+
+
+def test_rebase_moves_edits_past_earlier_changes():
+    current = BASE.replace("using UnityEngine;\n", "using UnityEngine;\nusing System;\n")
+    ours = _edit(BASE, "int open = 0;", "int open = 1;")
+    rebased = script_diff.rebase_edits(BASE, current, ours)
+    assert rebased[0]["startLine"] == ours[0]["startLine"] + 1
+    assert script_diff.apply_line_col_edits(current, rebased) == current.replace("open = 0", "open = 1")
+
+
+def test_edits_touching_a_changed_line_conflict():
+    current = BASE.replace("int open = 0;", "int open = 2;")
+    assert script_diff.rebase_edits(BASE, current, _edit(BASE, "open", "closed")) is None
+
+
+def test_stale_precondition_is_rebased_once(tool, monkeypatch):
+    unity = FakeUnity(BASE)
+    monkeypatch.setattr(manage_script, "send_command_with_retry", unity)
+    script_mirror.remember_text(BASE)  # the caller read BASE earlier
+    unity.text = BASE.replace("    {\n    }", "    {\n        Tick();\n    }")  # someone else's edit
+
+    resp = tool(None, uri="unity://path/Assets/Scripts/Door.cs",
+                edits=_edit(BASE, "int open = 0;", "int open = 1;"), precondition_sha256=_sha(BASE))
+    assert resp["success"] is True
+    assert resp["data"]["rebased"]["from_sha256"] == _sha(BASE)
+    assert "int open = 1;" in unity.text and "Tick();" in unity.text
+    assert [c["action"] for c in unity.calls] == ["apply_text_edits", "read", "apply_text_edits"]
+
+
+def test_conflicting_stale_edit_fails_without_retry(tool, monkeypatch):
+    unity = FakeUnity(BASE)
+    monkeypatch.setattr(manage_script, "send_command_with_retry", unity)
+    script_mirror.remember_text(BASE)
+    unity.text = BASE.replace("int open = 0;", "int open = 2;")
+
+    resp = tool(None, uri="unity://path/Assets/Scripts/Door.cs",
+                edits=_edit(BASE, "int open = 0;", "int open = 1;"), precondition_sha256=_sha(BASE))
+    assert resp["success"] is False and resp["code"] == "stale_file"
+    assert resp["data"]["rebase"] == "conflict"
+    assert [c["action"] for c in unity.calls] == ["apply_text_edits", "read"]
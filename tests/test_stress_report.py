@@ -0,0 +1,54 @@
+import importlib.util
+import pathlib
+import random
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+STRESS = ROOT / "tools" / "stress_mcp.py"
+
+
+def _load():
+    spec = importlib.util.spec_from_file_location("stress_mcp", STRESS)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+stress = _load()
+
+
+def test_histogram_percentiles_within_bucket_error():
+    rng = random.Random(7)
+    samples = sorted(rng.uniform(0.0001, 0.5) for _ in range(5000))
+    hist = stress.LatencyHistogram()
+    for s in samples:
+        hist.record(s)
+    for pct in (50, 90, 99):
+        exact_us = samples[int(pct / 100 * len(samples)) - 1] * 1_000_000
+        assert abs(hist.percentile(pct) - exact_us) / exact_us < 0.02
+    assert hist.percentile(100) == hist.max_us
+
+
+def test_histogram_merge_and_report_shape():
+    a, b = stress.LatencyHistogram(), stress.LatencyHistogram()
+    a.record(0.001)
+    b.record(0.010)
+    a.merge(b)
+    assert a.total == 2 and a.max_us == 10000 and a.min_us == 1000
+
+    rec = stress.LoadRecorder(start=0.0)
+    rec.record("ping", 0.002, True)
+    rec.record("script_read", 0.0, False)
+    report = rec.report()
+    assert report["completed"] == 1 and report["errors"] == 1
+    assert report["by_command"]["script_read"] == dict(stress.LatencyHistogram().summary(), errors=1)
+    assert sum(slot["completed"] + slot["errors"] for slot in report["timeline"]) == 2
+
+
+def test_parse_mix_rejects_unknown_commands():
+    assert stress.parse_mix("ping=3, editor_state=1") == [("ping", 3.0), ("editor_state", 1.0)]
+    try:
+        stress.parse_mix("ping=1,drop_tables=1")
+    except ValueError as e:
+        assert "drop_tables" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
@@ -0,0 +1,195 @@
+import sys
+import asyncio
+import os
+import pathlib
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+import project_index  # noqa: E402
+import project_search  # noqa: E402
+import symbol_index  # noqa: E402
+from config import config  # noqa: E402
+from tools.resource_tools import register_resource_tools  # noqa: E402
+
+
+BRAIN = '''using UnityEngine;
+namespace Game.AI
+{
+    // class Fake { }
+    [System.Serializable]
+    public class Brain : MonoBehaviour
+    {
+        [SerializeField] private float speed = 2f;
+        public int Health { get; private set; } = 100;
+        public string Label => "brain";
+        public event System.Action Died;
+
+        public Brain() { }
+
+        void Update()
+        {
+            int local = 5;
+            var s = "public int Fake;";
+        }
+
+        public class Memory
+        {
+            public Vector3 Last;
+            public void Clear() => Last = default;
+        }
+    }
+}
+'''
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+@pytest.fixture
+def project(tmp_path):
+    project_index.reset()
+    symbol_index.reset()
+    scripts = tmp_path / "Assets" / "Scripts"
+    scripts.mkdir(parents=True)
+    (scripts / "Brain.cs").write_text(BRAIN, encoding="utf-8")
+    (scripts / "Player.cs").write_text("public class Player : MonoBehaviour\n{\n    void Update() { }\n}\n", encoding="utf-8")
+    yield tmp_path
+    project_index.reset()
+    symbol_index.reset()
+
+
+def _call(tool, **kw):
+    mcp = DummyMCP()
+    register_resource_tools(mcp)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(mcp.tools[tool](**kw))
+    finally:
+        loop.close()
+
+
+def test_outline_symbols_cover_members_with_spans():
+    got = [(s["kind"], s["name"], s["container"], s["line"], s["end_line"])
+           for s in symbol_index.outline_symbols(BRAIN, "Assets/Brain.cs")]
+    assert got == [
+        ("namespace", "Game.AI", None, 2, 27),
+        ("class", "Brain", "Game.AI", 6, 26),
+        ("field", "speed", "Game.AI.Brain", 8, 8),
+        ("property", "Health", "Game.AI.Brain", 9, 9),
+        ("property", "Label", "Game.AI.Brain", 10, 10),
+        ("field", "Died", "Game.AI.Brain", 11, 11),
+        ("constructor", "Brain", "Game.AI.Brain", 13, 13),
+        ("method", "Update", "Game.AI.Brain", 15, 19),
+        ("class", "Memory", "Game.AI.Brain", 21, 25),
+        ("field", "Last", "Game.AI.Brain.Memory", 23, 23),
+        ("method", "Clear", "Game.AI.Brain.Memory", 24, 24),
+    ]
+
+
+def test_outline_symbols_cover_one_line_bodies_and_positional_records():
+    text = "namespace Geo {\n    public record Point(int X, int Y);\n    struct S { public void M() { } class Inner { public void Foo() {} } }\n}\n"
+    got = [(s["kind"], s["name"], s["container"], s["line"]) for s in symbol_index.outline_symbols(text, "Assets/Geo.cs")]
+    assert got == [
+        ("namespace", "Geo", None, 1),
+        ("record", "Point", "Geo", 2),
+        ("struct", "S", "Geo", 3),
+        ("method", "M", "Geo.S", 3),
+        ("class", "Inner", "Geo.S", 3),
+        ("method", "Foo", "Geo.S.Inner", 3),
+    ]
+
+
+def test_find_symbol_filters_by_kind_and_container(project):
+    data = _call("find_symbol", name="Update", project_root=str(project))["data"]
+    assert [(s["uri"], s["line"]) for s in data["symbols"]] == [
+        ("unity://path/Assets/Scripts/Brain.cs", 15), ("unity://path/Assets/Scripts/Player.cs", 3)]
+    data = _call("find_symbol", name="update", container="Brain", ignore_case=True, project_root=str(project))["data"]
+    assert [s["container"] for s in data["symbols"]] == ["Game.AI.Brain"]
+    data = _call("find_symbol", name="Brain", kind="class", project_root=str(project))["data"]
+    assert data["count"] == 1 and data["symbols"][0]["end_line"] == 26
+
+    data = _call("list_symbols", uri="unity://path/Assets/Scripts/Brain.cs", kind="property", project_root=str(project))["data"]
+    assert [s["name"] for s in data["symbols"]] == ["Health", "Label"]
+
+
+def test_changed_and_removed_files_are_reoutlined(project, monkeypatch):
+    monkeypatch.setattr(config, "symbol_index_poll_s", 3600.0)
+    index = symbol_index.get_index(project)
+    assert len(index.find("Update")) == 2
+    (project / "Assets" / "Scripts" / "Player.cs").write_text(
+        "public class Player : MonoBehaviour\n{\n    void LateUpdate() { }\n}\n", encoding="utf-8")
+    (project / "Assets" / "Scripts" / "Brain.cs").unlink()
+    assert len(index.find("Update")) == 2  # not re-checked until invalidated
+    project_index.invalidate(project)
+    symbol_index.invalidate(project)
+    assert index.find("Update") == [] and [s["line"] for s in index.find("LateUpdate")] == [3]
+    assert index.find("Brain") == [] and "Game.AI" not in index.by_name
+    assert index.stats["outlined"] == 3
+
+
+def test_written_files_are_rechecked_alone(project, monkeypatch):
+    import index_support
+    monkeypatch.setattr(config, "symbol_index_poll_s", 3600.0)
+    monkeypatch.setattr(config, "project_index_poll_s", 3600.0)
+    index = symbol_index.get_index(project)
+    assert len(index.find("Update")) == 2
+    outlined = index.stats["outlined"]
+    scripts = project / "Assets" / "Scripts"
+    (scripts / "Player.cs").write_text("public class Player : MonoBehaviour\n{\n    void LateUpdate() { }\n}\n", encoding="utf-8")
+    (scripts / "Enemy.cs").write_text("public class Enemy { void Update() { } }\n", encoding="utf-8")
+    (scripts / "Brain.cs").unlink()
+    for rel in ("Player.cs", "Enemy.cs", "Brain.cs"):
+        index_support.notify_written(project, f"Assets/Scripts/{rel}")
+    assert [s["path"] for s in index.find("Update")] == ["Assets/Scripts/Enemy.cs"]
+    assert [s["line"] for s in index.find("LateUpdate")] == [3] and index.find("Brain") == []
+    assert index.stats["outlined"] == outlined + 2  # no other file was re-read
+    assert "Assets/Scripts/Enemy.cs" in {e["path"] for e in project_index.get_index(project).files(suffix=".cs")}
+
+
+def test_same_size_rewrite_in_one_timestamp_tick_is_reoutlined(project):
+    index = symbol_index.get_index(project)
+    assert [s["name"] for s in index.find("Player")] == ["Player"]
+    target = project / "Assets" / "Scripts" / "Player.cs"
+    st = target.stat()
+    target.write_text(target.read_text(encoding="utf-8").replace("Player", "Runner"), encoding="utf-8")
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+    symbol_index.invalidate(project)
+    assert index.find("Player") == [] and [s["path"] for s in index.find("Runner")] == ["Assets/Scripts/Player.cs"]
+
+
+def test_parallel_build_matches_in_process_build(project, monkeypatch):
+    for i in range(12):
+        (project / "Assets" / "Scripts" / f"Gen{i}.cs").write_text(
+            f"namespace Gen\n{{\n    public class Gen{i}\n    {{\n        public int Value{i};\n        void Run() {{ }}\n    }}\n}}\n", encoding="utf-8")
+    serial = symbol_index.get_index(project).symbols()
+    symbol_index.reset()
+    monkeypatch.setattr(config, "symbol_index_parallel_min_files", 1)
+    monkeypatch.setattr(config, "search_workers", 2)
+    try:
+        parallel = symbol_index.get_index(project).symbols()
+    finally:
+        project_search.shutdown()
+    assert parallel == serial and len([s for s in serial if s["name"] == "Run"]) == 12
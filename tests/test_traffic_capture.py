@@ -0,0 +1,72 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+TOOLS = ROOT / "tools"
+sys.path.insert(0, str(SRC))
+sys.path.insert(0, str(TOOLS))
+
+import traffic_capture  # noqa: E402
+from unity_connection import UnityConnection  # noqa: E402
+from fake_unity_bridge import FakeUnityBridge  # noqa: E402
+
+
+def _load_replay():
+    spec = importlib.util.spec_from_file_location("replay_capture", TOOLS / "replay_capture.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@pytest.fixture()
+def recorder(tmp_path, monkeypatch):
+    rec = traffic_capture.TrafficRecorder(str(tmp_path / "capture.ndjson.gz"))
+    monkeypatch.setattr(traffic_capture, "_recorder", rec)
+    yield rec
+    rec.close()
+
+
+def test_records_framed_exchanges_and_replays(recorder):
+    bridge = FakeUnityBridge(scripts={"Assets/Scripts/A.cs": "class A {}\n"}).start()
+    conn = UnityConnection(host="127.0.0.1", port=bridge.port)
+    try:
+        assert conn.connect()
+        assert conn.send_command("ping", {}) == {"message": "pong"}
+        read = conn.send_command("manage_script", {"action": "read", "name": "A", "path": "Assets/Scripts"})
+        assert read["data"]["contents"] == "class A {}\n"
+    finally:
+        conn.disconnect()
+        bridge.stop()
+    recorder.close()
+
+    records = list(traffic_capture.load_capture(recorder.path))
+    assert [r["dir"] for r in records] == ["request", "response", "request", "response"]
+    assert records[2]["type"] == "manage_script"
+    assert all(r["sid"] == recorder.session for r in records)
+
+    replay = _load_replay()
+    exchanges = replay.load_exchanges(recorder.path)
+    assert len(exchanges) == 2
+    report = replay.replay(exchanges, speed=0)
+    assert report["replayed"] == 2
+    assert report["errors"] == 0
+    assert report["response_mismatches"] == 0
+    assert report["bridge_payload_misses"] == 0
+
+
+def test_replay_bridge_hands_out_each_response_once():
+    replay = _load_replay()
+    exchanges = [
+        {"type": "manage_script", "request": req, "response": resp, "elapsed_ms": 1.0}
+        for req, resp in ((b'{"type": "manage_script", "n": 1}', b"first"), (b'{"type": "manage_script", "n": 2}', b"second"))
+    ]
+    bridge = replay.ReplayBridge(exchanges)
+    assert bridge.handle_payload(b'{"type": "manage_script", "n": 9}') == b"first"  # fallback by type
+    assert bridge.handle_payload(b'{"type": "manage_script", "n": 2}') == b"second"
+    assert bridge.handle_payload(b'{"type": "manage_script", "n": 1}') != b"first"  # already served
+    assert bridge.misses == 2
@@ -0,0 +1,157 @@
+import sys
+import asyncio
+import os
+import pathlib
+import time
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+import project_index  # noqa: E402
+import trigram_index  # noqa: E402
+from config import config  # noqa: E402
+from tools.resource_tools import register_resource_tools  # noqa: E402
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "trigram_index_dir", str(tmp_path / "cache"))
+    project_index.reset()
+    trigram_index.reset()
+    scripts = tmp_path / "Assets" / "Scripts"
+    scripts.mkdir(parents=True)
+    for i in range(20):
+        role = "Player" if i % 5 == 0 else "Enemy"
+        (scripts / f"{role}{i:02d}.cs").write_text(
+            f"public class {role}{i:02d} : MonoBehaviour\n{{\n    void Update() {{ Move{i}(); }}\n}}\n", encoding="utf-8")
+    (scripts / "Readme.txt").write_text("PlayerController lives here\n", encoding="utf-8")
+    (scripts / "Turkish.cs").write_text("// İnit order\n", encoding="utf-8")
+    for path in scripts.iterdir():
+        _age(path)
+    yield tmp_path
+    project_index.reset()
+    trigram_index.reset()
+
+
+def _age(path, seconds=60.0):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def _call(name, **kw):
+    mcp = DummyMCP()
+    register_resource_tools(mcp)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(mcp.tools[name](**kw))
+    finally:
+        loop.close()
+
+
+def test_patterns_are_planned_into_required_literals():
+    assert trigram_index.plan_pattern(r"class\s+(\w+)\s*:\s*MonoBehaviour") == [["class", "MonoBehaviour"]]
+    assert trigram_index.plan_pattern(r"(Player|Enemy)Con") == [["Player", "Con"], ["Enemy", "Con"]]
+    assert trigram_index.plan_pattern(r"(?:abc)?def") == [["def"]]
+    assert trigram_index.plan_pattern(r"ab|cde") is None
+    assert trigram_index.plan_pattern(r"\w+\(\)") is None
+
+
+def test_candidates_narrow_without_losing_matches(project):
+    index = trigram_index.get_index(project)
+    assert index.candidates(r"class Player\d+") == {f"Assets/Scripts/Player{i:02d}.cs" for i in (0, 5, 10, 15)}
+    moves = index.candidates(r"Move1[0-9]\(")  # requires "Move1": a superset of the real matches
+    assert moves == {p for p in index.files if any(f"{i:02d}.cs" in p for i in [1, *range(10, 20)])}
+    assert index.candidates(r"init", 0) == {"Assets/Scripts/Turkish.cs"}  # folded like re.IGNORECASE
+    assert index.candidates(r"\d+") is None
+
+    data = _call("find_in_project", pattern=r"PlayerController|class Player05", project_root=str(project))["data"]
+    uris = [f["uri"] for f in data["files"]]
+    assert uris == ["unity://path/Assets/Scripts/Player05.cs", "unity://path/Assets/Scripts/Readme.txt"]
+    assert data["files_searched"] == 2  # the non-indexed .txt is always searched
+
+
+def test_changed_and_removed_files_are_reindexed(project, monkeypatch):
+    monkeypatch.setattr(config, "trigram_index_poll_s", 3600.0)
+    index = trigram_index.get_index(project)
+    assert index.candidates(r"Move3\(") == {"Assets/Scripts/Enemy03.cs"}
+    target = project / "Assets" / "Scripts" / "Enemy03.cs"
+    target.write_text("public class Enemy03 { void Jump() {} }\n", encoding="utf-8")
+    _age(target, 30.0)
+    (project / "Assets" / "Scripts" / "Enemy04.cs").unlink()
+    project_index.invalidate(project)
+    trigram_index.invalidate(project)
+    assert index.candidates(r"Move3\(") == set()
+    assert index.candidates(r"Jump\(\)") == {"Assets/Scripts/Enemy03.cs"}
+    assert "Assets/Scripts/Enemy04.cs" not in index.files
+    assert index.stats["indexed"] == 22
+
+
+def test_find_in_file_skips_files_the_index_rules_out(project, monkeypatch):
+    trigram_index.get_index(project).candidates("Update")
+    uri = "unity://path/Assets/Scripts/Enemy01.cs"
+    monkeypatch.setattr(pathlib.Path, "read_text", lambda *a, **k: (_ for _ in ()).throw(AssertionError("file read")))
+    resp = _call("find_in_file", uri=uri, pattern="PlayerController", project_root=str(project))
+    assert resp == {"success": True, "data": {"matches": [], "count": 0}}
+    monkeypatch.undo()
+
+    path = project / "Assets" / "Scripts" / "Enemy01.cs"
+    path.write_text(path.read_text(encoding="utf-8") + "// PlayerController\n", encoding="utf-8")
+    resp = _call("find_in_file", uri=uri, pattern="PlayerController", project_root=str(project))
+    assert resp["data"]["count"] == 1  # modified since indexing: searched directly
+
+
+def test_files_written_within_the_racy_window_are_not_trusted(project, monkeypatch):
+    monkeypatch.setattr(config, "trigram_index_poll_s", 0.0)
+    index = trigram_index.get_index(project)
+    target = project / "Assets" / "Scripts" / "Racy.cs"
+    target.write_text("class AAAA {}\n", encoding="utf-8")
+    project_index.invalidate(project)
+    assert "Assets/Scripts/Racy.cs" in index.candidates("AAAA")
+    st = target.stat()
+    target.write_text("class BBBB {}\n", encoding="utf-8")  # same size, same timestamp tick
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert "Assets/Scripts/Racy.cs" in index.candidates("BBBB")
+    assert not index.rules_out("Assets/Scripts/Racy.cs", "BBBB")
+
+    _age(target)
+    assert index.candidates("BBBB") == {"Assets/Scripts/Racy.cs"}
+    assert index.rules_out("Assets/Scripts/Racy.cs", "AAAA")
+
+
+def test_index_is_saved_compactly_and_reloaded(project):
+    trigram_index.get_index(project).candidates("Update")
+    assert not (project / "cache").exists()  # saved in the background, not on the query path
+    trigram_index.flush_saves()
+    saved = list((project / "cache").glob("trigrams-*.bin"))
+    assert len(saved) == 1 and saved[0].stat().st_size < sum(
+        os.path.getsize(p) for p in (project / "Assets" / "Scripts").glob("*.cs"))
+
+    trigram_index.reset()
+    reloaded = trigram_index.get_index(project)
+    assert reloaded.candidates(r"Move7\(") == {"Assets/Scripts/Enemy07.cs"}
+    assert reloaded.stats["indexed"] == 0  # nothing re-read after a restart
@@ -0,0 +1,258 @@
+import sys
+import asyncio
+import pathlib
+import types
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+
+# stub mcp.server.fastmcp
+mcp_pkg = types.ModuleType("mcp")
+server_pkg = types.ModuleType("mcp.server")
+fastmcp_pkg = types.ModuleType("mcp.server.fastmcp")
+class _Dummy: pass
+fastmcp_pkg.FastMCP = _Dummy
+fastmcp_pkg.Context = _Dummy
+server_pkg.fastmcp = fastmcp_pkg
+mcp_pkg.server = server_pkg
+sys.modules.setdefault("mcp", mcp_pkg)
+sys.modules.setdefault("mcp.server", server_pkg)
+sys.modules.setdefault("mcp.server.fastmcp", fastmcp_pkg)
+
+import asset_graph  # noqa: E402
+import project_index  # noqa: E402
+import unity_yaml  # noqa: E402
+from config import config  # noqa: E402
+from tools.resource_tools import register_resource_tools  # noqa: E402
+
+
+SCRIPT = "f" * 32
+PREFAB = "d" * 32
+
+SCENE = f"""%YAML 1.1
+%TAG !u! tag:unity3d.com,2011:
+--- !u!104 &2
+RenderSettings:
+  m_ObjectHideFlags: 0
+  m_Fog: 0
+--- !u!1 &100
+GameObject:
+  m_ObjectHideFlags: 0
+  serializedVersion: 6
+  m_Component:
+  - component: {{fileID: 101}}
+  - component: {{fileID: 102}}
+  m_Layer: 5
+  m_Name: 'Player''s Canvas'
+  m_TagString: Untagged
+  m_IsActive: 1
+--- !u!224 &101
+RectTransform:
+  m_GameObject: {{fileID: 100}}
+  m_LocalRotation: {{x: 0, y: 0, z: 0, w: 1}}
+  m_LocalPosition: {{x: 0, y: 0, z: 0}}
+  m_LocalScale: {{x: 2, y: 2, z: 2}}
+  m_Children:
+  - {{fileID: 201}}
+  - {{fileID: 301}}
+  m_Father: {{fileID: 0}}
+--- !u!114 &102
+MonoBehaviour:
+  m_GameObject: {{fileID: 100}}
+  m_Enabled: 1
+  m_Script: {{fileID: 11500000, guid: {SCRIPT}, type: 3}}
+  m_Name:
+  nested:
+    m_Enabled: 0
+--- !u!1 &200
+GameObject:
+  m_Component:
+  - component: {{fileID: 201}}
+  m_Layer: 0
+  m_Name: Button
+  m_TagString: Respawn
+  m_IsActive: 0
+--- !u!4 &201
+Transform:
+  m_GameObject: {{fileID: 200}}
+  m_LocalPosition: {{x: 1.5, y: -2, z: 0}}
+  m_Children: []
+  m_Father: {{fileID: 101}}
+--- !u!1001 &400
+PrefabInstance:
+  m_ObjectHideFlags: 0
+  serializedVersion: 2
+  m_Modification:
+    serializedVersion: 3
+    m_TransformParent: {{fileID: 101}}
+    m_Modifications:
+    - target: {{fileID: 7, guid: {PREFAB}, type: 3}}
+      propertyPath: m_Name
+      value: Enemy (1)
+      objectReference: {{fileID: 0}}
+    - target: {{fileID: 8, guid: {PREFAB}, type: 3}}
+      propertyPath: m_LocalPosition.x
+      value: 3
+      objectReference: {{fileID: 0}}
+  m_SourcePrefab: {{fileID: 100100000, guid: {PREFAB}, type: 3}}
+--- !u!4 &301 stripped
+Transform:
+  m_CorrespondingSourceObject: {{fileID: 8, guid: {PREFAB}, type: 3}}
+  m_PrefabInstance: {{fileID: 400}}
+--- !u!1 &500
+GameObject:
+  m_Component:
+  - component: {{fileID: 501}}
+  m_Name: Light
+  m_IsActive: 1
+--- !u!4 &501
+Transform:
+  m_GameObject: {{fileID: 500}}
+  m_Children: []
+  m_Father: {{fileID: 0}}
+--- !u!1660057539 &9223372036854775807
+SceneRoots:
+  m_ObjectHideFlags: 0
+  m_Roots:
+  - {{fileID: 501}}
+  - {{fileID: 101}}
+"""
+
+
+class DummyMCP:
+    def __init__(self): self.tools = {}
+    def tool(self, *args, **kwargs):
+        def deco(fn): self.tools[fn.__name__] = fn; return fn
+        return deco
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "asset_graph_dir", str(tmp_path / "cache"))
+    project_index.reset()
+    asset_graph.reset()
+    unity_yaml.reset()
+    scenes = tmp_path / "Assets" / "Scenes"
+    scenes.mkdir(parents=True)
+    (scenes / "Main.unity").write_text(SCENE, encoding="utf-8")
+    (tmp_path / "Assets" / "Hud.cs").write_text("class Hud {}\n", encoding="utf-8")
+    (tmp_path / "Assets" / "Hud.cs.meta").write_text(f"fileFormatVersion: 2\nguid: {SCRIPT}\n", encoding="utf-8")
+    yield tmp_path
+    project_index.reset()
+    asset_graph.reset()
+    unity_yaml.reset()
+
+
+def _call(**kw):
+    mcp = DummyMCP()
+    register_resource_tools(mcp)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(mcp.tools["read_hierarchy"](**kw))
+    finally:
+        loop.close()
+
+
+def test_tree_links_transforms_prefab_instances_and_scene_roots(project):
+    tree = unity_yaml.load(project / "Assets" / "Scenes" / "Main.unity")
+    assert [path for path, _ in tree.walk()] == [
+        "Light", "Player's Canvas", "Player's Canvas/Button", "Player's Canvas/Enemy (1)"]
+    canvas = tree.at("Player's Canvas")
+    assert canvas["layer"] == 5 and canvas["transform"]["scale"] == {"x": 2.0, "y": 2.0, "z": 2.0}
+    assert canvas["components"] == [
+        {"type": "RectTransform", "fileID": 101},
+        {"type": "MonoBehaviour", "fileID": 102, "script": SCRIPT, "enabled": True}]
+    button = tree.at("Player's Canvas/Button")
+    assert (button["active"], button["tag"], button["transform"]["position"]) == (False, "Respawn", {"x": 1.5, "y": -2.0, "z": 0.0})
+    enemy = tree.at("Player's Canvas/Enemy (1)")
+    assert enemy["prefab"] == PREFAB and enemy["children"] == []
+
+
+def test_read_hierarchy_tool_trees_and_queries(project):
+    uri = "unity://path/Assets/Scenes/Main.unity"
+    data = _call(uri=uri, max_depth=0, include_components=False, project_root=str(project))["data"]
+    assert [(n["name"], n["childCount"]) for n in data["roots"]] == [("Light", 0), ("Player's Canvas", 2)]
+    assert "components" not in data["roots"][0] and data["objects"] == 4
+
+    data = _call(uri=uri, root_path="Player's Canvas", project_root=str(project))["data"]
+    script = data["roots"][0]["components"][1]["script"]
+    assert script == {"guid": SCRIPT, "uri": "unity://path/Assets/Hud.cs"}
+    assert [c["name"] for c in data["roots"][0]["children"]] == ["Button", "Enemy (1)"]
+    assert data["roots"][0]["children"][1]["prefab"] == {"guid": PREFAB, "uri": None}
+    assert asset_graph._graphs.loaded() == []  # GUIDs came from .meta files, not a project-wide graph build
+
+    data = _call(uri=uri, component="MonoBehaviour", project_root=str(project))["data"]
+    assert [m["path"] for m in data["matches"]] == ["Player's Canvas"]
+    data = _call(uri=uri, name="*n*", max_results=1, project_root=str(project))["data"]
+    assert [m["path"] for m in data["matches"]] == ["Player's Canvas"] and data["truncated"] is True
+
+    missing = _call(uri=uri, root_path="Nope", project_root=str(project))
+    assert missing["success"] is False
+
+
+def test_trees_are_cached_until_the_file_changes(project, monkeypatch):
+    path = project / "Assets" / "Scenes" / "Main.unity"
+    first = unity_yaml.load(path)
+    monkeypatch.setattr(unity_yaml, "iter_documents", lambda lines: pytest.fail("re-parsed"))
+    assert unity_yaml.load(path) is first
+    monkeypatch.undo()
+    path.write_text(SCENE.replace("m_Name: Light", "m_Name: Sun"), encoding="utf-8")
+    assert [p for p, _ in unity_yaml.load(path).walk()][0] == "Sun"
+
+    (project / "Assets" / "Binary.prefab").write_bytes(b"\x00\x01binary")
+    resp = _call(uri="unity://path/Assets/Binary.prefab", project_root=str(project))
+    assert resp["success"] is False and "Force Text" in resp["error"]
+
+
+ENEMY = f"""%YAML 1.1
+%TAG !u! tag:unity3d.com,2011:
+--- !u!1 &7
+GameObject:
+  m_Component:
+  - component: {{fileID: 8}}
+  m_Name: EnemyBase
+--- !u!4 &8
+Transform:
+  m_GameObject: {{fileID: 7}}
+  m_Children:
+  - {{fileID: 10}}
+  m_Father: {{fileID: 0}}
+--- !u!1 &9
+GameObject:
+  m_Component:
+  - component: {{fileID: 10}}
+  m_Name: Child
+--- !u!4 &10
+Transform:
+  m_GameObject: {{fileID: 9}}
+  m_Children: []
+  m_Father: {{fileID: 8}}
+"""
+
+
+def test_instance_name_comes_from_the_override_on_the_prefab_root(project):
+    scene = SCENE.replace(
+        "    - target: {fileID: 7,",
+        f"    - target: {{fileID: 9, guid: {PREFAB}, type: 3}}\n"
+        "      propertyPath: m_Name\n      value: ChildRenamed\n      objectReference: {fileID: 0}\n"
+        "    - target: {fileID: 7,").replace("value: Enemy (1)", "value: EnemyRoot")
+    path = project / "Assets" / "Scenes" / "Main.unity"
+    path.write_text(scene, encoding="utf-8")
+    (project / "Assets" / "Enemy.prefab").write_text(ENEMY, encoding="utf-8")
+    (project / "Assets" / "Enemy.prefab.meta").write_text(f"fileFormatVersion: 2\nguid: {PREFAB}\n", encoding="utf-8")
+
+    doc = next(d for d in unity_yaml.iter_documents(scene.splitlines(True)) if d.class_id == unity_yaml.PREFAB_INSTANCE)
+    assert doc.name_overrides == {9: "ChildRenamed", 7: "EnemyRoot"}
+    assert unity_yaml.load(path).at("Player's Canvas/ChildRenamed") is None
+
+    data = _call(uri="unity://path/Assets/Scenes/Main.unity", root_path="Player's Canvas", project_root=str(project))["data"]
+    enemy = data["roots"][0]["children"][1]
+    assert enemy["name"] == "EnemyRoot" and enemy["prefab"] == {"guid": PREFAB, "uri": "unity://path/Assets/Enemy.prefab"}
+
+    path.write_text(scene.replace("value: EnemyRoot", "value: 0").replace("propertyPath: m_Name\n      value: 0",
+                                                                          "propertyPath: m_IsActive\n      value: 0"), encoding="utf-8")
+    assert [p for p, _ in unity_yaml.load(path, lambda guid: (7, "EnemyBase")).walk()][-1] == "Player's Canvas/EnemyBase"
@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Offline micro-benchmark suite for the MCP for Unity Python server.
+
+Unlike tools/benchmark_operation_queue.py this does not need a running Unity
+Editor: everything runs against synthetic inputs and an in-process fake
+bridge (tools/fake_unity_bridge.py), so results are reproducible and can be
+stored as JSON baselines and compared in CI.
+
+Usage:
+    # Run all benchmarks and print a summary
+    python tools/benchmark_server.py run
+
+    # Save results as a baseline (or any JSON file)
+    python tools/benchmark_server.py run --output tools/benchmarks/baseline.json
+
+    # Compare two result files; exits 1 when a median regresses past the threshold
+    python tools/benchmark_server.py compare tools/benchmarks/baseline.json current.json --threshold 0.25
+
+    # Run and compare against the stored baseline in one step
+    python tools/benchmark_server.py check --baseline tools/benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import statistics
+import struct
+import sys
+import tempfile
+import time
+import types
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "benchmarks" / "baseline.json"
+LONG_SCRIPT = ROOT / "TestProjects" / "UnityMCPTests" / "Assets" / "Scripts" / "LongUnityScriptClaudeTest.cs"
+
+sys.path.insert(0, str(SRC))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# The benchmarks only exercise pure-Python helpers; fall back to a minimal
+# mcp.server.fastmcp stand-in (same approach as tests/) when the MCP SDK is
+# not installed in the current interpreter.
+try:
+    import mcp.server.fastmcp  # noqa: F401
+except ImportError:
+    _mcp = types.ModuleType("mcp")
+    _server = types.ModuleType("mcp.server")
+    _fastmcp = types.ModuleType("mcp.server.fastmcp")
+
+    class _Dummy:
+        pass
+
+    _fastmcp.FastMCP = _Dummy
+    _fastmcp.Context = _Dummy
+    _server.fastmcp = _fastmcp
+    _mcp.server = _server
+    sys.modules.setdefault("mcp", _mcp)
+    sys.modules.setdefault("mcp.server", _server)
+    sys.modules.setdefault("mcp.server.fastmcp", _fastmcp)
+
+
+class _ToolCollector:
+    """Minimal FastMCP substitute that captures registered tool functions."""
+
+    def __init__(self):
+        self.tools: Dict[str, Callable[..., Any]] = {}
+
+    def tool(self, *args, **kwargs):
+        def deco(fn):
+            self.tools[fn.__name__] = fn
+            return fn
+        return deco
+
+
+# -----------------------------
+# Benchmark registry
+# -----------------------------
+
+# Each benchmark is a factory returning (callable, cleanup). Setup work done in
+# the factory is excluded from timing.
+BENCHMARKS: Dict[str, Callable[[], Any]] = {}
+
+
+def benchmark(name: str):
+    def deco(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return deco
+
+
+def _synthetic_script(methods: int = 200) -> str:
+    parts = ["using UnityEngine;", "", "public class Generated : MonoBehaviour", "{"]
+    for i in range(methods):
+        parts.extend([
+            f"    private int field{i} = {i};",
+            f"    public void Method{i}(int value)",
+            "    {",
+            f"        if (value > {i})",
+            "        {",
+            f"            Debug.Log(\"method {i}\");",
+            "        }",
+            "    }",
+            "",
+        ])
+    parts.append("}")
+    return "\n".join(parts) + "\n"
+
+
+def _long_script() -> str:
+    if LONG_SCRIPT.exists():
+        return LONG_SCRIPT.read_text(encoding="utf-8")
+    return _synthetic_script(250)
+
+
+@benchmark("framing.encode")
+def bench_framing_encode():
+    params = {"action": "apply_text_edits", "name": "Bench", "path": "Assets/Scripts",
+              "edits": [{"startLine": i, "startCol": 1, "endLine": i, "endCol": 1, "newText": "// x\n"} for i in range(1, 50)]}
+
+    def run():
+        payload = json.dumps({"type": "manage_script", "params": params}, ensure_ascii=False).encode("utf-8")
+        return struct.pack(">Q", len(payload)) + payload
+    return run, None
+
+
+@benchmark("framing.decode")
+def bench_framing_decode():
+    from unity_connection import UnityConnection
+    body = json.dumps({"status": "success", "result": {"success": True, "data": {"contents": _synthetic_script(50)}}}).encode("utf-8")
+    frame = struct.pack(">Q", len(body)) + body
+    left, right = socket.socketpair()
+    right.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, max(len(frame) * 2, 1 << 16))
+    conn = UnityConnection(host="127.0.0.1", port=1)
+    conn.use_framing = True
+
+    def run():
+        left.sendall(frame)
+        return json.loads(conn.receive_full_response(right).decode("utf-8"))
+
+    def cleanup():
+        left.close()
+        right.close()
+    return run, cleanup
+
+
+def _load_edits_module():
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("bench_manage_script_edits", SRC / "tools" / "manage_script_edits.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@benchmark("edits.apply_locally.mixed")
+def bench_apply_edits_mixed():
+    mod = _load_edits_module()
+    text = _synthetic_script(200)
+    edits = [
+        {"op": "anchor_insert", "anchor": r"\s*}\s*$", "position": "before", "text": "\n    void Added() {}\n"},
+        {"op": "regex_replace", "pattern": r"Debug\.Log\(\"method 1(\d)\"\)", "replacement": "Debug.LogWarning(\"m$1\")"},
+        {"op": "prepend", "text": "// header"},
+        {"op": "append", "text": "// footer"},
+    ]
+    edits += [{"op": "replace_range", "startLine": 10 + i * 9, "startCol": 1, "endLine": 10 + i * 9, "endCol": 1, "text": "// r\n"} for i in range(20)]
+
+    def run():
+        return mod._apply_edits_locally(text, edits)
+    return run, None
+
+
+@benchmark("edits.apply_locally.replace_range_long")
+def bench_apply_edits_replace_range_long():
+    mod = _load_edits_module()
+    text = _long_script()
+    line_count = text.count("\n")
+    step = max(1, line_count // 60)
+    edits = [{"op": "replace_range", "startLine": 1 + i * step, "startCol": 1, "endLine": 1 + i * step, "endCol": 1, "text": f"// edit {i}\n"}
+             for i in range(60)]
+
+    def run():
+        return mod._apply_edits_locally(text, edits)
+    return run, None
+
+
+@benchmark("edits.apply_locally.replace_range_large_batch")
+def bench_apply_edits_replace_range_large_batch():
+    # 300 multi-line replacements spread over a ~2700-line generated script
+    mod = _load_edits_module()
+    text = _synthetic_script(300)
+    line_count = text.count("\n")
+    step = max(3, line_count // 300)
+    edits = [{"op": "replace_range", "startLine": 1 + i * step, "startCol": 1, "endLine": 3 + i * step, "endCol": 1,
+              "text": f"    // replaced {i}\n    // second line\n"}
+             for i in range(300)]
+
+    def run():
+        return mod._apply_edits_locally(text, edits)
+    return run, None
+
+
+@benchmark("edits.find_best_anchor_match")
+def bench_find_best_anchor_match():
+    import re
+    mod = _load_edits_module()
+    text = _synthetic_script(300)
+
+    def run():
+        return mod._find_best_anchor_match(r"\s*}\s*$", text, re.MULTILINE, prefer_last=True)
+    return run, None
+
+
+def _legacy_closing_brace_match(matches, text: str):
+    """Reference copy of the original per-match scorer (re-counts lines and re-scans context)."""
+    import re
+    scored = []
+    lines = text.splitlines()
+    for match in matches:
+        score = 0
+        line_num = text[:match.start()].count('\n')
+        if line_num < len(lines):
+            line_content = lines[line_num]
+            indentation = len(line_content) - len(line_content.lstrip())
+            score += max(0, 20 - indentation)
+            distance_from_end = len(lines) - line_num
+            score += max(0, 10 - distance_from_end)
+            for context_line in lines[max(0, line_num - 3):min(len(lines), line_num + 2)]:
+                if re.search(r'\b(void|public|private|protected)\s+\w+\s*\(', context_line):
+                    score -= 5
+            if indentation <= 4 and distance_from_end <= 3:
+                score += 15
+        scored.append((score, match))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored[0][1] if scored else None
+
+
+@benchmark("edits.closing_brace_scoring.many_matches")
+def bench_closing_brace_scoring():
+    # Every closing brace of a ~6000-line script is a candidate
+    import re
+    mod = _load_edits_module()
+    text = _synthetic_script(600)
+    matches = list(re.finditer(r"\s*}\s*$", text, re.MULTILINE))
+    expected = _legacy_closing_brace_match(matches, text)
+    if mod._find_best_closing_brace_match(matches, text).start() != expected.start():
+        raise RuntimeError("closing brace scorer disagrees with the legacy reference")
+
+    def run():
+        return mod._find_best_closing_brace_match(matches, text)
+    return run, None
+
+
+def _make_project(root: Path, files: int) -> None:
+    (root / "ProjectSettings").mkdir(parents=True, exist_ok=True)
+    for i in range(files):
+        d = root / "Assets" / f"Folder{i % 40:02d}" / f"Sub{i % 7}"
+        d.mkdir(parents=True, exist_ok=True)
+        suffix = ".cs" if i % 3 else ".png"
+        (d / f"File{i:05d}{suffix}").write_text("// generated\n", encoding="utf-8")
+
+
+def _resource_tools():
+    from tools.resource_tools import register_resource_tools
+    collector = _ToolCollector()
+    register_resource_tools(collector)
+    return collector.tools
+
+
+@benchmark("resources.list_resources")
+def bench_list_resources():
+    tmp = tempfile.TemporaryDirectory()
+    root = Path(tmp.name)
+    _make_project(root, 3000)
+    list_resources = _resource_tools()["list_resources"]
+    loop = asyncio.new_event_loop()
+
+    def run():
+        return loop.run_until_complete(list_resources(ctx=None, pattern="*.cs", under="Assets", limit=5000, project_root=str(root)))
+
+    def cleanup():
+        loop.close()
+        tmp.cleanup()
+    return run, cleanup
+
+
+def _big_file_project():
+    tmp = tempfile.TemporaryDirectory()
+    root = Path(tmp.name)
+    (root / "ProjectSettings").mkdir(parents=True)
+    scripts = root / "Assets" / "Scripts"
+    scripts.mkdir(parents=True)
+    (scripts / "Big.cs").write_text(_synthetic_script(6000), encoding="utf-8")
+    return tmp, root
+
+
+@benchmark("resources.read_resource.tail")
+def bench_read_resource_tail():
+    tmp, root = _big_file_project()
+    read_resource = _resource_tools()["read_resource"]
+    loop = asyncio.new_event_loop()
+
+    def run():
+        return loop.run_until_complete(read_resource(uri="unity://path/Assets/Scripts/Big.cs", ctx=None, tail_lines=20, project_root=str(root)))
+
+    def cleanup():
+        loop.close()
+        tmp.cleanup()
+    return run, cleanup
+
+
+@benchmark("resources.read_resource.window")
+def bench_read_resource_window():
+    tmp, root = _big_file_project()
+    read_resource = _resource_tools()["read_resource"]
+    loop = asyncio.new_event_loop()
+
+    def run():
+        return loop.run_until_complete(read_resource(uri="unity://path/Assets/Scripts/Big.cs", ctx=None, start_line=30000,
+                                                     line_count=40, project_root=str(root)))
+
+    def cleanup():
+        loop.close()
+        tmp.cleanup()
+    return run, cleanup
+
+
+def _make_search_project(root: Path, files: int) -> None:
+    body = "\n".join(f"    public void Step{j}() {{ counter += {j}; }}" for j in range(30))
+    for i in range(files):
+        d = root / "Assets" / f"Module{i % 50:02d}" / f"Part{i % 20:02d}"
+        d.mkdir(parents=True, exist_ok=True)
+        marker = "    // FindMe: rare symbol\n" if i % 997 == 0 else ""
+        (d / f"Type{i:05d}.cs").write_text(f"public class Type{i:05d}\n{{\n    int counter;\n{marker}{body}\n}}\n", encoding="utf-8")
+
+
+@benchmark("search.find_in_project.50k_files")
+def bench_find_in_project():
+    import project_index
+    import project_search
+    tmp = tempfile.TemporaryDirectory()
+    root = Path(tmp.name)
+    _make_search_project(root, 50_000)
+    find_in_project = _resource_tools()["find_in_project"]
+    project_index.get_index(root).files()  # index build is list_resources' cost, not the search's
+    loop = asyncio.new_event_loop()
+
+    def run():
+        resp = loop.run_until_complete(find_in_project(pattern=r"FindMe:\s+rare", ctx=None, max_results=1000,
+                                                       project_root=str(root)))
+        if resp["data"]["count"] != 51:
+            raise AssertionError(f"unexpected match count {resp['data']['count']}")
+        return resp
+
+    def cleanup():
+        loop.close()
+        project_search.shutdown()
+        tmp.cleanup()
+    return run, cleanup
+
+
+@benchmark("e2e.script_apply_edits.fake_bridge")
+def bench_e2e_tool_call():
+    import unity_connection
+    from fake_unity_bridge import FakeUnityBridge
+
+    original = _synthetic_script(100)
+    bridge = FakeUnityBridge(scripts={"Assets/Scripts/Bench.cs": original}).start()
+    conn = unity_connection.UnityConnection(host="127.0.0.1", port=bridge.port)
+    if not conn.connect():
+        raise RuntimeError("could not connect to fake bridge")
+    previous = unity_connection._unity_connection
+    unity_connection._unity_connection = conn
+
+    mod = _load_edits_module()
+    collector = _ToolCollector()
+    mod.register_manage_script_edits_tools(collector)
+    script_apply_edits = collector.tools["script_apply_edits"]
+    edits = [{"op": "replace_range", "startLine": 1, "startCol": 1, "endLine": 1, "endCol": 1, "text": "// bench\n"}]
+
+    def run():
+        bridge.scripts["Assets/Scripts/Bench.cs"] = original
+        resp = script_apply_edits(None, name="Bench", path="Assets/Scripts", edits=edits)
+        if not resp.get("success"):
+            raise RuntimeError(f"tool call failed: {resp}")
+        return resp
+
+    def cleanup():
+        unity_connection._unity_connection = previous
+        conn.disconnect()
+        bridge.stop()
+    return run, cleanup
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+
+def _calibrate(fn: Callable[[], Any], min_time: float) -> int:
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            return loops
+        loops *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+
+def run_benchmark(name: str, rounds: int, min_time: float) -> Dict[str, Any]:
+    fn, cleanup = BENCHMARKS[name]()
+    try:
+        fn()  # warm-up (imports, caches)
+        loops = _calibrate(fn, min_time)
+        samples: List[float] = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            samples.append((time.perf_counter() - start) / loops)
+    finally:
+        if cleanup:
+            cleanup()
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "rounds": rounds,
+        "loops": loops,
+    }
+
+
+def run_all(selected: Optional[List[str]], rounds: int, min_time: float) -> Dict[str, Any]:
+    names = [n for n in BENCHMARKS if not selected or any(s in n for s in selected)]
+    results: Dict[str, Any] = {}
+    for name in names:
+        results[name] = run_benchmark(name, rounds, min_time)
+        print(f"{name:48s} median {results[name]['median'] * 1e6:12.1f} us  (loops={results[name]['loops']})", file=sys.stderr)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rounds": rounds,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float, metric: str = "median") -> Dict[str, Any]:
+    """Compare two result documents. A benchmark regresses when current/baseline > 1 + threshold."""
+    base = baseline.get("benchmarks", {})
+    cur = current.get("benchmarks", {})
+    rows = []
+    regressions = []
+    for name in sorted(set(base) | set(cur)):
+        if name not in base or name not in cur:
+            rows.append({"name": name, "status": "missing_in_baseline" if name not in base else "missing_in_current"})
+            continue
+        b = float(base[name][metric])
+        c = float(cur[name][metric])
+        ratio = (c / b) if b > 0 else float("inf")
+        status = "regressed" if ratio > 1.0 + threshold else ("improved" if ratio < 1.0 - threshold else "ok")
+        row = {"name": name, "baseline": b, "current": c, "ratio": ratio, "status": status}
+        rows.append(row)
+        if status == "regressed":
+            regressions.append(row)
+    return {"threshold": threshold, "metric": metric, "rows": rows, "regressions": regressions}
+
+
+def _print_comparison(report: Dict[str, Any]) -> None:
+    for row in report["rows"]:
+        if "ratio" not in row:
+            print(f"{row['name']:48s} {row['status']}")
+            continue
+        print(f"{row['name']:48s} {row['baseline'] * 1e6:12.1f} us -> {row['current'] * 1e6:12.1f} us  x{row['ratio']:.2f}  {row['status']}")
+    if report["regressions"]:
+        print(f"\n{len(report['regressions'])} benchmark(s) regressed by more than {report['threshold']:.0%}")
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write(doc: Dict[str, Any], path: str) -> None:
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Offline benchmark suite for the MCP for Unity server")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    def add_run_args(p):
+        p.add_argument("--filter", action="append", help="Only run benchmarks whose name contains this substring")
+        p.add_argument("--rounds", type=int, default=7)
+        p.add_argument("--min-time", type=float, default=0.02, help="Minimum seconds per round (loops are calibrated)")
+
+    p_run = sub.add_parser("run", help="Run benchmarks")
+    add_run_args(p_run)
+    p_run.add_argument("--output", help="Write results JSON to this path")
+
+    p_cmp = sub.add_parser("compare", help="Compare two result files")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.25)
+
+    p_chk = sub.add_parser("check", help="Run benchmarks and compare against a baseline")
+    add_run_args(p_chk)
+    p_chk.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    p_chk.add_argument("--threshold", type=float, default=0.25)
+    p_chk.add_argument("--output", help="Also write the current results JSON to this path")
+
+    p_list = sub.add_parser("list", help="List available benchmarks")
+
+    args = ap.parse_args(argv)
+
+    if args.command == "list":
+        for name in BENCHMARKS:
+            print(name)
+        return 0
+    if args.command == "run":
+        doc = run_all(args.filter, args.rounds, args.min_time)
+        if args.output:
+            _write(doc, args.output)
+        else:
+            print(json.dumps(doc, indent=2, sort_keys=True))
+        return 0
+    if args.command == "compare":
+        report = compare(_load(args.baseline), _load(args.current), args.threshold)
+        _print_comparison(report)
+        return 1 if report["regressions"] else 0
+    if args.command == "check":
+        doc = run_all(args.filter, args.rounds, args.min_time)
+        if args.output:
+            _write(doc, args.output)
+        report = compare(_load(args.baseline), doc, args.threshold)
+        _print_comparison(report)
+        return 1 if report["regressions"] else 0
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
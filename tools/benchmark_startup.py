@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the MCP for Unity Python server.
+
+Measures, in fresh interpreter processes:
+- import_ms: spawn -> `import server` finished (module import + tool registration)
+- initialize_ms: spawn -> JSON-RPC `initialize` answered over stdio
+- tools_list_ms: `tools/list` round trip after initialization
+- ready_overhead_ms: initialize_ms - import_ms, i.e. lifespan startup and the
+  first request; this is what a slow Unity connect or port discovery inflates
+
+No Unity Editor is needed (and none should be running for reproducible
+numbers): the server is started with an empty HOME so port discovery finds no
+registry files and the background connection attempt fails fast.
+
+Usage:
+    python tools/benchmark_startup.py --runs 5
+    python tools/benchmark_startup.py --runs 5 --max-ready-ms 200 --max-initialize-ms 1500 --report startup.json
+"""
+
+import argparse
+import json
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+
+_IMPORT_SNIPPET = "import server"
+
+# Used when the MCP SDK is missing: times the tool modules against the same
+# minimal fastmcp stand-in as tests/ and tools/benchmark_server.py.
+_STUB_IMPORT_SNIPPET = """
+import sys, types
+_mcp = types.ModuleType("mcp"); _server = types.ModuleType("mcp.server"); _fastmcp = types.ModuleType("mcp.server.fastmcp")
+class _Dummy:
+    pass
+_fastmcp.FastMCP = _fastmcp.Context = _fastmcp.Image = _Dummy
+sys.modules.update({"mcp": _mcp, "mcp.server": _server, "mcp.server.fastmcp": _fastmcp})
+import tools, unity_connection
+"""
+
+
+def _mcp_available(python: str) -> bool:
+    probe = subprocess.run([python, "-c", "import mcp.server.fastmcp"], cwd=str(SRC),
+                           capture_output=True)
+    return probe.returncode == 0
+
+
+def _isolated_env(home: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["HOME"] = home
+    env["USERPROFILE"] = home
+    env.pop("UNITY_MCP_CAPTURE", None)
+    env.pop("UNITY_MCP_MEMORY_TRACE", None)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def measure_import(python: str, env: Dict[str, str], snippet: str) -> float:
+    start = time.perf_counter()
+    proc = subprocess.run([python, "-c", snippet], cwd=str(SRC), env=env, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000.0
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{proc.stderr.strip()}")
+    return elapsed
+
+
+def _read_message(lines: "queue.Queue[Optional[str]]", want_id: int, timeout: float) -> Dict[str, Any]:
+    deadline = time.perf_counter() + timeout
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutError(f"No response to request {want_id} within {timeout}s")
+        try:
+            line = lines.get(timeout=remaining)
+        except queue.Empty:
+            continue
+        if line is None:
+            raise RuntimeError("Server exited before responding")
+        try:
+            msg = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # stray non-protocol output
+        if msg.get("id") == want_id:
+            return msg
+
+
+def _pump(stream, lines: "queue.Queue[Optional[str]]") -> None:
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+def _send(proc: subprocess.Popen, message: Dict[str, Any]) -> None:
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+
+
+def measure_session(python: str, env: Dict[str, str], timeout: float) -> Dict[str, float]:
+    start = time.perf_counter()
+    proc = subprocess.Popen([python, "server.py"], cwd=str(SRC), env=env, text=True, bufsize=1,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    lines: "queue.Queue[Optional[str]]" = queue.Queue()
+    threading.Thread(target=_pump, args=(proc.stdout, lines), daemon=True).start()
+    try:
+        _send(proc, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "benchmark-startup", "version": "1.0"},
+            },
+        })
+        init = _read_message(lines, 1, timeout)
+        initialize_ms = (time.perf_counter() - start) * 1000.0
+        if "error" in init:
+            raise RuntimeError(f"initialize failed: {init['error']}")
+
+        _send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        sent = time.perf_counter()
+        _send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        listed = _read_message(lines, 2, timeout)
+        tools_list_ms = (time.perf_counter() - sent) * 1000.0
+        tool_count = len((listed.get("result") or {}).get("tools") or [])
+    finally:
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            proc.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    return {"initialize_ms": initialize_ms, "tools_list_ms": tools_list_ms, "tool_count": tool_count}
+
+
+def _stats(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    return {
+        "median": round(statistics.median(values), 2),
+        "min": round(min(values), 2),
+        "max": round(max(values), 2),
+    }
+
+
+def run(runs: int, python: str, timeout: float) -> Dict[str, Any]:
+    has_mcp = _mcp_available(python)
+    imports: List[float] = []
+    sessions: List[Dict[str, float]] = []
+    with tempfile.TemporaryDirectory() as home:
+        env = _isolated_env(home)
+        # Warm-up run populates __pycache__ so every measured run is equally warm
+        measure_import(python, env, _IMPORT_SNIPPET if has_mcp else _STUB_IMPORT_SNIPPET)
+        for _ in range(max(1, runs)):
+            imports.append(measure_import(python, env, _IMPORT_SNIPPET if has_mcp else _STUB_IMPORT_SNIPPET))
+            if has_mcp:
+                sessions.append(measure_session(python, env, timeout))
+
+    report: Dict[str, Any] = {
+        "python": sys.version.split()[0],
+        "runs": max(1, runs),
+        "mcp_sdk": has_mcp,
+        "import_ms": _stats(imports),
+    }
+    if sessions:
+        init = [s["initialize_ms"] for s in sessions]
+        report["initialize_ms"] = _stats(init)
+        report["tools_list_ms"] = _stats([s["tools_list_ms"] for s in sessions])
+        report["tool_count"] = sessions[-1]["tool_count"]
+        report["ready_overhead_ms"] = round(max(0.0, statistics.median(init) - statistics.median(imports)), 2)
+    else:
+        report["note"] = "MCP SDK not importable; only tool module import time was measured"
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Measure MCP for Unity server import time and first-response latency")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--python", default=sys.executable, help="Interpreter with the server's dependencies installed")
+    ap.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for each response")
+    ap.add_argument("--max-ready-ms", type=float, help="Fail when the median ready_overhead_ms exceeds this")
+    ap.add_argument("--max-import-ms", type=float, help="Fail when the median import_ms exceeds this")
+    ap.add_argument("--max-initialize-ms", type=float, help="Fail when the median initialize_ms exceeds this")
+    ap.add_argument("--require-mcp", action="store_true", help="Fail when the MCP SDK is not importable")
+    ap.add_argument("--report", help="Write the JSON report to this path")
+    args = ap.parse_args(argv)
+
+    report = run(args.runs, args.python, args.timeout)
+    text = json.dumps(report, indent=2)
+    if args.report:
+        Path(args.report).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    failures = []
+    if args.require_mcp and not report["mcp_sdk"]:
+        failures.append("MCP SDK not importable")
+    if args.max_import_ms is not None and report["import_ms"]["median"] > args.max_import_ms:
+        failures.append(f"import_ms median {report['import_ms']['median']} > {args.max_import_ms}")
+    if args.max_initialize_ms is not None and "initialize_ms" in report and report["initialize_ms"]["median"] > args.max_initialize_ms:
+        failures.append(f"initialize_ms median {report['initialize_ms']['median']} > {args.max_initialize_ms}")
+    if args.max_ready_ms is not None and "ready_overhead_ms" in report and report["ready_overhead_ms"] > args.max_ready_ms:
+        failures.append(f"ready_overhead_ms {report['ready_overhead_ms']} > {args.max_ready_ms}")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+In-process stand-in for the Unity MCP bridge.
+
+Speaks the same wire protocol as MCPForUnityBridge (plain-text WELCOME
+handshake advertising FRAMING=1, then 8-byte big-endian length-prefixed
+frames) so the Python server, the stress tool and the benchmark suite can
+run without a Unity Editor.
+
+Behavior is intentionally small:
+- `ping` → pong
+- `manage_script` read/get_sha/apply_text_edits/create/delete against an
+  in-memory {"Assets/...cs": text} store (precondition SHA is enforced like
+  ManageScript.ApplyTextEdits)
+- `manage_editor` get_project_root → the configured project root
+- anything else → a generic success envelope
+
+Usage:
+    python tools/fake_unity_bridge.py --port 6400 --latency-ms 2
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+HANDSHAKE = b"WELCOME UNITY-MCP 1 FRAMING=1\n"
+FRAMED_MAX = 64 * 1024 * 1024
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _index_from_line_col(text: str, line: int, col: int) -> Optional[int]:
+    """1-based line/col to 0-based index, mirroring ManageScript.TryIndexFromLineCol."""
+    cur_line, cur_col = 1, 1
+    for i in range(len(text) + 1):
+        if cur_line == line and cur_col == col:
+            return i
+        if i == len(text):
+            break
+        if text[i] == "\n":
+            cur_line += 1
+            cur_col = 1
+        else:
+            cur_col += 1
+    return None
+
+
+def _read_exact(conn: socket.socket, count: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < count:
+        chunk = conn.recv(count - len(buf))
+        if not chunk:
+            raise ConnectionError("client closed")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+class FakeUnityBridge:
+    """Threaded TCP server emulating the Unity bridge protocol."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        scripts: Optional[Dict[str, str]] = None,
+        project_root: Optional[str] = None,
+        latency_s: float = 0.0,
+        responder: Optional[Callable[[str, Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.scripts: Dict[str, str] = dict(scripts or {})
+        self.project_root = project_root
+        self.latency_s = latency_s
+        # Optional override: return a result dict to short-circuit the default handlers
+        self.responder = responder
+        self.commands_handled = 0
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def start(self) -> "FakeUnityBridge":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(64)
+        sock.settimeout(0.2)
+        self._sock = sock
+        self.port = sock.getsockname()[1]
+        t = threading.Thread(target=self._accept_loop, name="fake-unity-accept", daemon=True)
+        t.start()
+        self._threads.append(t)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except Exception:
+                pass
+            self._sock = None
+
+    def __enter__(self) -> "FakeUnityBridge":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # -----------------------------
+    # Networking
+    # -----------------------------
+    def _accept_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            t = threading.Thread(target=self._serve, args=(conn,), name="fake-unity-conn", daemon=True)
+            t.start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        try:
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn.sendall(HANDSHAKE)
+            while not self._stop.is_set():
+                header = _read_exact(conn, 8)
+                length = struct.unpack(">Q", header)[0]
+                if length == 0 or length > FRAMED_MAX:
+                    break
+                payload = _read_exact(conn, length)
+                response = self.handle_payload(payload)
+                conn.sendall(struct.pack(">Q", len(response)) + response)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # -----------------------------
+    # Command handling
+    # -----------------------------
+    def handle_payload(self, payload: bytes) -> bytes:
+        if self.latency_s > 0:
+            time.sleep(self.latency_s)
+        with self._lock:
+            self.commands_handled += 1
+        if payload.strip() == b"ping":
+            return b'{"status":"success","result":{"message":"pong"}}'
+        try:
+            command = json.loads(payload.decode("utf-8"))
+            command_type = command.get("type") or ""
+            params = command.get("params") or {}
+            result = None
+            if self.responder is not None:
+                result = self.responder(command_type, params)
+            if result is None:
+                result = self.handle_command(command_type, params)
+            envelope = {"status": "success", "result": result}
+        except Exception as e:
+            envelope = {"status": "error", "error": str(e)}
+        return json.dumps(envelope, ensure_ascii=False).encode("utf-8")
+
+    def handle_command(self, command_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if command_type == "manage_script":
+            return self._manage_script(params)
+        if command_type == "manage_editor" and params.get("action") == "get_project_root":
+            if not self.project_root:
+                return {"success": False, "error": "No project root configured"}
+            return {"success": True, "data": {"projectRoot": self.project_root}}
+        return {"success": True, "message": f"{command_type} ok (fake bridge)"}
+
+    def _manage_script(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        action = (params.get("action") or "").lower()
+        name = params.get("name") or ""
+        directory = (params.get("path") or "Assets").rstrip("/")
+        rel = f"{directory}/{name}.cs"
+        with self._lock:
+            current = self.scripts.get(rel)
+            if action == "create":
+                contents = params.get("contents") or ""
+                if params.get("contentsEncoded"):
+                    contents = base64.b64decode(params.get("encodedContents", "")).decode("utf-8")
+                self.scripts[rel] = contents
+                return {"success": True, "data": {"path": rel}}
+            if current is None:
+                return {"success": False, "error": f"Script not found at '{rel}'."}
+            if action == "read":
+                return {"success": True, "data": {"path": rel, "contents": current}}
+            if action == "get_sha":
+                return {"success": True, "data": {"sha256": _sha256(current), "lengthBytes": len(current.encode("utf-8")), "path": rel}}
+            if action == "delete":
+                del self.scripts[rel]
+                return {"success": True, "data": {"path": rel}}
+            if action == "apply_text_edits":
+                return self._apply_text_edits(rel, current, params)
+            return {"success": True, "message": f"manage_script.{action} ok (fake bridge)"}
+
+    def _apply_text_edits(self, rel: str, current: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        current_sha = _sha256(current)
+        expected = params.get("precondition_sha256")
+        if not expected:
+            return {"success": False, "code": "precondition_required", "data": {"current_sha256": current_sha}}
+        if expected.lower() != current_sha:
+            return {"success": False, "code": "stale_file", "data": {"status": "stale_file", "expected_sha256": expected, "current_sha256": current_sha}}
+        spans = []
+        for e in params.get("edits") or []:
+            a = _index_from_line_col(current, int(e.get("startLine", 1)), int(e.get("startCol", 1)))
+            b = _index_from_line_col(current, int(e.get("endLine", 1)), int(e.get("endCol", 1)))
+            if a is None or b is None or b < a:
+                return {"success": False, "code": "bad_range", "message": f"Edit range out of bounds: {e}"}
+            spans.append((a, b, e.get("newText", "")))
+        working = current
+        for a, b, new_text in sorted(spans, key=lambda s: s[0], reverse=True):
+            working = working[:a] + new_text + working[b:]
+        self.scripts[rel] = working
+        return {
+            "success": True,
+            "message": f"Applied {len(spans)} text edit(s) to '{rel}'.",
+            "data": {"uri": f"unity://path/{rel}", "path": rel, "editsApplied": len(spans), "sha256": _sha256(working)},
+        }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Run a fake Unity MCP bridge for offline testing")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=6400)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="Artificial per-command latency")
+    ap.add_argument("--project-root", default=None, help="Value returned for manage_editor get_project_root")
+    args = ap.parse_args()
+
+    bridge = FakeUnityBridge(args.host, args.port, project_root=args.project_root, latency_s=args.latency_ms / 1000.0).start()
+    print(f"Fake Unity bridge listening on {bridge.host}:{bridge.port}")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bridge.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded Unity bridge capture offline.
+
+Captures are produced by the server when config.capture_path or
+UNITY_MCP_CAPTURE is set (see src/traffic_capture.py). This driver starts a
+fake bridge that answers each request with its recorded response, then
+pushes the recorded requests through the server's real UnityConnection at
+the original pace (or faster), so server-side changes can be measured
+against production traffic shapes without a Unity Editor.
+
+Usage:
+    # Replay at original pace, reproducing Unity's recorded processing time
+    python tools/replay_capture.py capture.ndjson.gz --replay-latency
+
+    # As fast as possible, report to a file
+    python tools/replay_capture.py capture.ndjson.gz --speed 0 --report replay.json
+
+    # Only serve the capture on a port (point a live server at it)
+    python tools/replay_capture.py capture.ndjson.gz --serve-only --port 6400
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "UnityMcpBridge" / "UnityMcpServer~" / "src"
+sys.path.insert(0, str(SRC))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_unity_bridge import FakeUnityBridge  # noqa: E402
+from traffic_capture import decode_payload, load_capture  # noqa: E402
+
+
+def load_exchanges(path: str, session: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Pair request/response records into ordered exchanges.
+
+    session: a recorded "sid" to replay; defaults to the first session in the file.
+    """
+    requests: Dict[tuple, Dict[str, Any]] = {}
+    order: List[tuple] = []
+    chosen = session
+    for rec in load_capture(path):
+        sid = rec.get("sid", "")
+        if chosen is None:
+            chosen = sid
+        if chosen != "all" and sid != chosen:
+            continue
+        key = (sid, rec.get("seq"))
+        if rec.get("dir") == "request":
+            requests[key] = {
+                "t": float(rec.get("t", 0.0)),
+                "type": rec.get("type") or "",
+                "request": decode_payload(rec.get("payload")),
+                "response": None,
+                "elapsed_ms": None,
+                "error": None,
+            }
+            order.append(key)
+        elif key in requests and rec.get("dir") == "response":
+            requests[key]["response"] = decode_payload(rec.get("payload"))
+            requests[key]["elapsed_ms"] = rec.get("elapsed_ms")
+        elif key in requests and rec.get("dir") == "error":
+            requests[key]["error"] = rec.get("error")
+    return [requests[k] for k in order]
+
+
+class ReplayBridge(FakeUnityBridge):
+    """Fake bridge answering requests with their recorded responses."""
+
+    def __init__(self, exchanges: List[Dict[str, Any]], replay_latency: bool = False, speed: float = 1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.replay_latency = replay_latency
+        self.speed = speed
+        self.misses = 0
+        # Every entry sits in both queues; one taken from either is marked used and skipped in the other
+        self._by_payload: Dict[bytes, deque] = defaultdict(deque)
+        self._by_type: Dict[str, deque] = defaultdict(deque)
+        self._used: set = set()
+        for i, ex in enumerate(exchanges):
+            if ex["response"] is None:
+                continue
+            entry = (i, ex["response"], ex["elapsed_ms"] or 0.0)
+            self._by_payload[ex["request"].strip()].append(entry)
+            self._by_type[ex["type"]].append(entry)
+
+    def _command_type(self, payload: bytes) -> str:
+        if payload.strip() == b"ping":
+            return "ping"
+        try:
+            return json.loads(payload.decode("utf-8")).get("type") or ""
+        except Exception:
+            return ""
+
+    def _take(self, queue: Optional[deque]) -> Optional[tuple]:
+        while queue:
+            entry = queue.popleft()
+            if entry[0] not in self._used:
+                self._used.add(entry[0])
+                return entry
+        return None
+
+    def handle_payload(self, payload: bytes) -> bytes:
+        with self._lock:
+            entry = self._take(self._by_payload.get(payload.strip()))
+            if entry is None:
+                # Payload changed (e.g. server-side edit logic differs); fall back to same command type
+                entry = self._take(self._by_type.get(self._command_type(payload)))
+                self.misses += 1
+        if entry is None:
+            return super().handle_payload(payload)
+        with self._lock:
+            self.commands_handled += 1
+        _, response, elapsed_ms = entry
+        if self.replay_latency and elapsed_ms:
+            time.sleep((elapsed_ms / 1000.0) / (self.speed if self.speed > 0 else 1.0))
+        return response
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[idx]
+
+
+def replay(exchanges: List[Dict[str, Any]], speed: float = 1.0, replay_latency: bool = False) -> Dict[str, Any]:
+    from unity_connection import UnityConnection
+
+    bridge = ReplayBridge(exchanges, replay_latency=replay_latency, speed=speed).start()
+    conn = UnityConnection(host="127.0.0.1", port=bridge.port)
+    if not conn.connect():
+        bridge.stop()
+        raise RuntimeError("Could not connect to replay bridge")
+
+    latencies: List[float] = []
+    errors = 0
+    mismatches = 0
+    t0 = exchanges[0]["t"] if exchanges else 0.0
+    start = time.monotonic()
+    try:
+        for ex in exchanges:
+            if speed > 0:
+                delay = start + (ex["t"] - t0) / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            if ex["type"] == "ping":
+                command_type, params = "ping", {}
+            else:
+                try:
+                    command = json.loads(ex["request"].decode("utf-8"))
+                    command_type, params = command.get("type") or ex["type"], command.get("params") or {}
+                except Exception:
+                    errors += 1
+                    continue
+            sent = time.perf_counter()
+            try:
+                result = conn.send_command(command_type, params)
+                if ex["response"] is not None and command_type != "ping":
+                    recorded = json.loads(ex["response"].decode("utf-8")).get("result", {})
+                    if recorded != result:
+                        mismatches += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - sent) * 1000.0)
+    finally:
+        conn.disconnect()
+        bridge.stop()
+
+    wall = time.monotonic() - start
+    ordered = sorted(latencies)
+    original = [e["elapsed_ms"] for e in exchanges if e["elapsed_ms"] is not None]
+    original_sorted = sorted(original)
+    return {
+        "exchanges": len(exchanges),
+        "replayed": len(latencies),
+        "errors": errors,
+        "response_mismatches": mismatches,
+        "bridge_payload_misses": bridge.misses,
+        "wall_time_s": round(wall, 3),
+        "recorded_span_s": round((exchanges[-1]["t"] - t0) if exchanges else 0.0, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(ordered, 50), 3),
+            "p90": round(_percentile(ordered, 90), 3),
+            "p99": round(_percentile(ordered, 99), 3),
+            "max": round(ordered[-1], 3) if ordered else 0.0,
+        },
+        "recorded_latency_ms": {
+            "p50": round(_percentile(original_sorted, 50), 3),
+            "p90": round(_percentile(original_sorted, 90), 3),
+            "p99": round(_percentile(original_sorted, 99), 3),
+            "max": round(original_sorted[-1], 3) if original_sorted else 0.0,
+        },
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Replay a recorded Unity bridge capture against a local fake bridge")
+    ap.add_argument("capture", help="Path to a .ndjson.gz capture written by the server")
+    ap.add_argument("--session", default=None, help="Recorded session id (sid) to replay, or 'all' (default: first)")
+    ap.add_argument("--speed", type=float, default=1.0, help="Pace multiplier; 2 = twice as fast, 0 = no pacing")
+    ap.add_argument("--replay-latency", action="store_true", help="Delay responses by Unity's recorded processing time")
+    ap.add_argument("--serve-only", action="store_true", help="Only serve recorded responses; do not drive requests")
+    ap.add_argument("--port", type=int, default=0, help="Port for --serve-only (default: ephemeral)")
+    ap.add_argument("--report", help="Write the JSON report to this path")
+    args = ap.parse_args()
+
+    exchanges = load_exchanges(args.capture, args.session)
+    if not exchanges:
+        print("No exchanges found in capture", file=sys.stderr)
+        return 1
+
+    if args.serve_only:
+        bridge = ReplayBridge(exchanges, replay_latency=args.replay_latency, speed=args.speed, port=args.port).start()
+        print(f"Serving {len(exchanges)} recorded exchanges on 127.0.0.1:{bridge.port}", file=sys.stderr)
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            bridge.stop()
+        return 0
+
+    report = replay(exchanges, speed=args.speed, replay_latency=args.replay_latency)
+    text = json.dumps(report, indent=2)
+    if args.report:
+        Path(args.report).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
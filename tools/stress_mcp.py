@@ -2,6 +2,7 @@
 import asyncio
 import argparse
 import json
+import math
 import os
 import struct
 import time
@@ -91,8 +92,244 @@ def make_execute_menu_item(menu_path: str) -> bytes:
     return json.dumps(payload).encode("utf-8")
 
 
-async def client_loop(idx: int, host: str, port: int, stop_time: float, stats: dict):
+class LatencyHistogram:
+    """HDR-style log-linear histogram of latencies in microseconds.
+
+    Values below 2**SUB_BITS are stored exactly; larger values keep their top
+    SUB_BITS significant bits, bounding relative error to ~1/2**(SUB_BITS-1)
+    (under 2% with the default) with a small, fixed number of buckets.
+    """
+
+    SUB_BITS = 7
+
+    def __init__(self):
+        self.counts: dict[int, int] = {}
+        self.total = 0
+        self.max_us = 0
+        self.min_us = None
+        self.sum_us = 0
+
+    def _bucket(self, value_us: int) -> int:
+        if value_us < (1 << self.SUB_BITS):
+            return value_us
+        shift = value_us.bit_length() - self.SUB_BITS
+        return ((value_us >> shift) << shift) | ((1 << shift) >> 1)  # bucket midpoint
+
+    def record(self, seconds: float) -> None:
+        value_us = max(0, int(seconds * 1_000_000))
+        key = self._bucket(value_us)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += 1
+        self.sum_us += value_us
+        self.max_us = max(self.max_us, value_us)
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for k, v in other.counts.items():
+            self.counts[k] = self.counts.get(k, 0) + v
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+
+    def percentile(self, pct: float) -> int:
+        if not self.total:
+            return 0
+        rank = max(1, math.ceil(pct / 100.0 * self.total))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return min(key, self.max_us)
+        return self.max_us
+
+    def summary(self) -> dict:
+        def ms(us: int) -> float:
+            return round(us / 1000.0, 3)
+        return {
+            "count": self.total,
+            "min_ms": ms(self.min_us or 0),
+            "mean_ms": ms(int(self.sum_us / self.total)) if self.total else 0.0,
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+            "p999_ms": ms(self.percentile(99.9)),
+            "max_ms": ms(self.max_us),
+        }
+
+
+class LoadRecorder:
+    """Per-command latency histograms plus a per-second throughput/error timeline."""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.errors: dict[str, int] = {}
+        self.timeline: dict[int, dict] = {}
+
+    def record(self, command: str, latency_s: float, ok: bool) -> None:
+        if ok:
+            self.histograms.setdefault(command, LatencyHistogram()).record(latency_s)
+        else:
+            self.errors[command] = self.errors.get(command, 0) + 1
+        second = int(time.time() - self.start)
+        slot = self.timeline.setdefault(second, {"t": second, "completed": 0, "errors": 0})
+        slot["completed" if ok else "errors"] += 1
+
+    def report(self) -> dict:
+        overall = LatencyHistogram()
+        for h in self.histograms.values():
+            overall.merge(h)
+        elapsed = max(1e-9, time.time() - self.start)
+        completed = overall.total
+        by_command = {}
+        for name in sorted(set(self.histograms) | set(self.errors)):
+            hist = self.histograms.get(name, LatencyHistogram())
+            by_command[name] = dict(hist.summary(), errors=self.errors.get(name, 0))
+        return {
+            "duration_s": round(elapsed, 3),
+            "completed": completed,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(completed / elapsed, 2),
+            "latency": overall.summary(),
+            "by_command": by_command,
+            "timeline": [self.timeline[k] for k in sorted(self.timeline)],
+        }
+
+
+# Read-only command mix approximating an agent session; weights are relative.
+DEFAULT_MIX = "ping=40,editor_state=10,read_console=15,script_read=20,find_gameobject=10,get_sha=5"
+
+
+def parse_mix(spec: str) -> list[tuple[str, float]]:
+    mix = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in COMMAND_BUILDERS:
+            raise ValueError(f"Unknown command '{name}' in mix; choose from {sorted(COMMAND_BUILDERS)}")
+        mix.append((name, float(weight or 1.0)))
+    if not mix:
+        raise ValueError("Command mix is empty")
+    return mix
+
+
+def _script_locator(unity_file: str | None) -> tuple[str, str]:
+    if unity_file:
+        parts = Path(unity_file).resolve().parts
+        if "Assets" in parts:
+            rel = Path(*parts[parts.index("Assets"):])
+            return rel.stem, rel.parent.as_posix()
+    return "LongUnityScriptClaudeTest", "Assets/Scripts"
+
+
+def build_command(name: str, unity_file: str | None) -> bytes:
+    return COMMAND_BUILDERS[name](unity_file)
+
+
+def _json_command(command_type: str, params: dict) -> bytes:
+    return json.dumps({"type": command_type, "params": params}).encode("utf-8")
+
+
+COMMAND_BUILDERS = {
+    "ping": lambda f: make_ping_frame(),
+    "editor_state": lambda f: _json_command("manage_editor", {"action": "get_state"}),
+    "read_console": lambda f: _json_command("read_console", {"action": "get", "types": ["error", "warning"], "count": 20, "format": "detailed"}),
+    "script_read": lambda f: _json_command("manage_script", dict(zip(("name", "path"), _script_locator(f)), action="read")),
+    "get_sha": lambda f: _json_command("manage_script", dict(zip(("name", "path"), _script_locator(f)), action="get_sha")),
+    "find_gameobject": lambda f: _json_command("manage_gameobject", {"action": "find", "searchMethod": "by_name", "searchTerm": "Main Camera", "findAll": False}),
+}
+
+
+def _response_ok(raw: bytes) -> bool:
+    try:
+        obj = json.loads(raw.decode("utf-8", errors="ignore"))
+    except Exception:
+        return False
+    return isinstance(obj, dict) and obj.get("status") != "error"
+
+
+async def _open_client(host: str, port: int):
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=TIMEOUT)
+    await asyncio.wait_for(do_handshake(reader), timeout=TIMEOUT)
+    return reader, writer
+
+
+async def _close_client(writer) -> None:
+    if writer is None:
+        return
+    try:
+        writer.close()
+        await writer.wait_closed()
+    except Exception:
+        pass
+
+
+async def open_loop_driver(host: str, port: int, stop_time: float, rate: float, connections: int,
+                           mix: list[tuple[str, float]], unity_file: str | None, recorder: LoadRecorder,
+                           stats: dict, poisson: bool = False):
+    """Issue requests at a fixed arrival rate regardless of response times.
+
+    Latency is measured from each request's scheduled send time, so queueing
+    behind slow responses is counted (no coordinated omission).
+    """
+    pool: asyncio.Queue = asyncio.Queue()
+    for _ in range(max(1, connections)):
+        pool.put_nowait(None)  # lazily connected slot
+    names = [n for n, _ in mix]
+    weights = [w for _, w in mix]
+    inflight: set[asyncio.Task] = set()
+
+    async def issue(name: str, scheduled: float):
+        slot = await pool.get()
+        reader = writer = None
+        try:
+            if slot is None:
+                reader, writer = await _open_client(host, port)
+            else:
+                reader, writer = slot
+            await write_frame(writer, build_command(name, unity_file))
+            raw = await asyncio.wait_for(read_frame(reader), timeout=TIMEOUT)
+            ok = _response_ok(raw)
+            recorder.record(name, time.perf_counter() - scheduled, ok)
+            stats["open_loop_requests"] = stats.get("open_loop_requests", 0) + 1
+            pool.put_nowait((reader, writer))
+            writer = None
+        except Exception:
+            recorder.record(name, time.perf_counter() - scheduled, False)
+            stats["disconnects"] += 1
+            await _close_client(writer)
+            pool.put_nowait(None)
+
+    interval = 1.0 / max(rate, 1e-6)
+    next_at = time.perf_counter()
+    while time.time() < stop_time:
+        now = time.perf_counter()
+        if next_at > now:
+            await asyncio.sleep(next_at - now)
+        name = random.choices(names, weights=weights, k=1)[0]
+        task = asyncio.create_task(issue(name, next_at))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+        next_at += random.expovariate(rate) if poisson else interval
+    if inflight:
+        await asyncio.wait(inflight, timeout=TIMEOUT * 2)
+    while not pool.empty():
+        slot = pool.get_nowait()
+        if slot is not None:
+            await _close_client(slot[1])
+
+
+async def client_loop(idx: int, host: str, port: int, stop_time: float, stats: dict,
+                      recorder: LoadRecorder | None = None, mix: list[tuple[str, float]] | None = None,
+                      unity_file: str | None = None, think_time: float = 0.02):
     reconnect_delay = 0.2
+    names = [n for n, _ in (mix or [("ping", 1.0)])]
+    weights = [w for _, w in (mix or [("ping", 1.0)])]
     while time.time() < stop_time:
         writer = None
         try:
@@ -106,11 +343,18 @@ async def client_loop(idx: int, host: str, port: int, stop_time: float, stats: d
 
             # Main activity loop (keep-alive + light load). Edit spam handled by reload_churn_task.
             while time.time() < stop_time:
-                # Ping-only; edits are sent via reload_churn_task to avoid console spam
-                await write_frame(writer, make_ping_frame())
-                _ = await asyncio.wait_for(read_frame(reader), timeout=TIMEOUT)
-                stats["pings"] += 1
-                await asyncio.sleep(0.02 + random.uniform(-0.003, 0.003))
+                # Read-only command mix (agent-like by default); edits are sent via
+                # reload_churn_task to avoid console spam
+                name = random.choices(names, weights=weights, k=1)[0]
+                sent = time.perf_counter()
+                await write_frame(writer, build_command(name, unity_file))
+                raw = await asyncio.wait_for(read_frame(reader), timeout=TIMEOUT)
+                if recorder is not None:
+                    recorder.record(name, time.perf_counter() - sent, _response_ok(raw))
+                if name == "ping":
+                    stats["pings"] += 1
+                reconnect_delay = 0.2
+                await asyncio.sleep(max(0.0, think_time + random.uniform(-0.003, 0.003)))
 
         except (ConnectionError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
             stats["disconnects"] += 1
@@ -302,26 +546,68 @@ async def main():
     ap.add_argument("--host", default="127.0.0.1")
     ap.add_argument("--project", default=str(Path(__file__).resolve().parents[1] / "TestProjects" / "UnityMCPTests"))
     ap.add_argument("--unity-file", default=str(Path(__file__).resolve().parents[1] / "TestProjects" / "UnityMCPTests" / "Assets" / "Scripts" / "LongUnityScriptClaudeTest.cs"))
-    ap.add_argument("--clients", type=int, default=10)
+    ap.add_argument("--clients", type=int, default=10, help="Closed-loop clients (0 to disable)")
     ap.add_argument("--duration", type=int, default=60)
     ap.add_argument("--storm-count", type=int, default=1, help="Number of scripts to touch each cycle")
+    ap.add_argument("--mix", default="default", help=f"Weighted command mix for load traffic, e.g. 'ping=1'; 'default' is '{DEFAULT_MIX}'")
+    ap.add_argument("--think-ms", type=float, default=20.0, help="Closed-loop pause between requests per client")
+    ap.add_argument("--rate", type=float, default=0.0, help="Open-loop arrival rate in requests/sec (0 disables open loop)")
+    ap.add_argument("--open-connections", type=int, default=8, help="Connection pool size for the open-loop driver")
+    ap.add_argument("--poisson", action="store_true", help="Use exponential inter-arrival times in open-loop mode")
+    ap.add_argument("--no-churn", action="store_true", help="Disable the reload churn task")
+    ap.add_argument("--simulate", action="store_true", help="Run against an in-process fake bridge instead of Unity")
+    ap.add_argument("--sim-latency-ms", type=float, default=1.0, help="Per-command latency of the simulated bridge")
+    ap.add_argument("--report", help="Write the machine-readable JSON report to this path")
     args = ap.parse_args()
 
-    port = discover_port(args.project)
-    stop_time = time.time() + max(10, args.duration)
+    mix = parse_mix(DEFAULT_MIX if args.mix == "default" else args.mix)
+
+    bridge = None
+    if args.simulate:
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from fake_unity_bridge import FakeUnityBridge
+        scripts = {}
+        if args.unity_file and Path(args.unity_file).exists():
+            name, directory = _script_locator(args.unity_file)
+            scripts[f"{directory}/{name}.cs"] = Path(args.unity_file).read_text(encoding="utf-8")
+        bridge = FakeUnityBridge(args.host, 0, scripts=scripts, latency_s=args.sim_latency_ms / 1000.0).start()
+        port = bridge.port
+    else:
+        port = discover_port(args.project)
+    stop_time = time.time() + max(1 if args.simulate else 10, args.duration)
 
     stats = {"pings": 0, "menus": 0, "mods": 0, "disconnects": 0, "errors": 0}
+    recorder = LoadRecorder(time.time())
     tasks = []
 
-    # Spawn clients
-    for i in range(max(1, args.clients)):
-        tasks.append(asyncio.create_task(client_loop(i, args.host, port, stop_time, stats)))
+    # Spawn closed-loop clients
+    for i in range(max(0, args.clients)):
+        tasks.append(asyncio.create_task(client_loop(i, args.host, port, stop_time, stats, recorder, mix, args.unity_file, args.think_ms / 1000.0)))
+
+    # Open-loop driver at a fixed arrival rate
+    if args.rate > 0:
+        tasks.append(asyncio.create_task(open_loop_driver(args.host, port, stop_time, args.rate, args.open_connections, mix, args.unity_file, recorder, stats, poisson=args.poisson)))
 
     # Spawn reload churn task
-    tasks.append(asyncio.create_task(reload_churn_task(args.project, stop_time, args.unity_file, args.host, port, stats, storm_count=args.storm_count)))
+    if not args.no_churn:
+        tasks.append(asyncio.create_task(reload_churn_task(args.project, stop_time, args.unity_file, args.host, port, stats, storm_count=args.storm_count)))
 
-    await asyncio.gather(*tasks, return_exceptions=True)
-    print(json.dumps({"port": port, "stats": stats}, indent=2))
+    try:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if bridge is not None:
+            bridge.stop()
+
+    report = {
+        "port": port,
+        "target": "simulated" if args.simulate else "live",
+        "config": {"clients": args.clients, "rate": args.rate, "mix": dict(mix), "duration": args.duration, "poisson": args.poisson},
+        "stats": stats,
+        "load": recorder.report(),
+    }
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(json.dumps(report, indent=2))
 
 
 if __name__ == "__main__":